@@ -0,0 +1,198 @@
+import os
+from fractions import Fraction
+from typing import List, Optional, Sequence, Tuple
+
+from backend.core.sparse_matrix import SparseMatrix
+
+# Almacenamiento y solver en banda para sistemas con A(i,j) = 0 si j < i - lower o j > i + upper
+# (e.g. las discretizaciones de EDP en 1D, tridiagonales con miles de incógnitas). Cada fila guarda
+# sólo los elementos de la banda, y la eliminación sólo recorre la banda: O(n * lower * (lower + upper))
+# en lugar de O(n³), y memoria O(n * (lower + upper)) en lugar de O(n²).
+#   - tridiagonal (lower = upper = 1): algoritmo de Thomas, O(n);
+#   - ancho general: LU en banda, con intercambio de filas sólo si un pivote es cero (el relleno queda
+#     acotado a lower columnas más de ancho superior).
+# Ambos retornan None si la matriz es singular: el rango y el tipo de solución los determina entonces
+# la eliminación general.
+#
+# Variables de entorno:
+#   MATRIX_BANDED_MIN_DIMENSION  Dimensión mínima para usar el solver en banda automáticamente. Por defecto 20.
+#   MATRIX_BANDED_MAX_FRACTION   Ancho total de banda (lower + upper + 1) máximo, como fracción de la dimensión. Por defecto 0.1.
+
+BANDED_MIN_DIMENSION = int(os.environ.get("MATRIX_BANDED_MIN_DIMENSION", 20))
+BANDED_MAX_FRACTION = float(os.environ.get("MATRIX_BANDED_MAX_FRACTION", 0.1))
+
+_ZERO = Fraction(0)
+
+
+def matrix_bandwidths(matrix: Sequence[Sequence[Fraction]]) -> Tuple[int, int]:
+    """(lower, upper): máximas distancias debajo y encima de la diagonal con un elemento no nulo."""
+    lower = upper = 0
+    for i, row in enumerate(matrix):
+        columns = [j for j, value in enumerate(row) if value]
+        if columns:
+            lower = max(lower, i - columns[0])
+            upper = max(upper, columns[-1] - i)
+    return lower, upper
+
+
+def sparse_bandwidths(matrix: SparseMatrix) -> Tuple[int, int]:
+    """Como matrix_bandwidths, recorriendo sólo los no nulos de la representación dispersa."""
+    lower = upper = 0
+    for i, row in enumerate(matrix.data):
+        if row:
+            lower = max(lower, i - min(row))
+            upper = max(upper, max(row) - i)
+    return lower, upper
+
+
+def is_banded_candidate(n: int, lower: int, upper: int) -> bool:
+    """True si un sistema n x n con esos anchos de banda debe usar el solver en banda."""
+    return n >= BANDED_MIN_DIMENSION and lower + upper + 1 <= BANDED_MAX_FRACTION * n
+
+
+class BandedMatrix:
+    """
+    Matriz cuadrada en banda: rows[i] son los elementos de la fila i desde la columna starts[i]
+    (= max(0, i - lower)) hasta min(n - 1, i + upper).
+    """
+
+    __slots__ = ("n", "lower", "upper", "starts", "rows")
+
+    def __init__(self, n: int, lower: int, upper: int, starts: List[int], rows: List[List[Fraction]]):
+        self.n = n
+        self.lower = lower
+        self.upper = upper
+        self.starts = starts
+        self.rows = rows
+
+    @classmethod
+    def from_fractions(cls, matrix: Sequence[Sequence[Fraction]], lower: int, upper: int) -> "BandedMatrix":
+        """Copia la banda de una matriz densa. ValueError si hay elementos no nulos fuera de la banda."""
+        n = len(matrix)
+        starts, rows = [], []
+        for i, row in enumerate(matrix):
+            start, stop = max(0, i - lower), min(n, i + upper + 1)
+            if any(row[j] for j in range(start)) or any(row[j] for j in range(stop, n)):
+                raise ValueError(f"La fila {i+1} de A tiene elementos no nulos fuera de la banda declarada.")
+            starts.append(start)
+            rows.append(list(row[start:stop]))
+        return cls(n, lower, upper, starts, rows)
+
+    @classmethod
+    def from_sparse(cls, matrix: SparseMatrix, lower: int, upper: int) -> "BandedMatrix":
+        """Banda de una matriz dispersa (cuyos no nulos deben estar dentro de la banda)."""
+        n = matrix.rows
+        starts, rows = [], []
+        for i, entries in enumerate(matrix.data):
+            start, stop = max(0, i - lower), min(n, i + upper + 1)
+            row = [_ZERO] * (stop - start)
+            for j, value in entries.items():
+                if not start <= j < stop:
+                    raise ValueError(f"La fila {i+1} de A tiene elementos no nulos fuera de la banda declarada.")
+                row[j - start] = value
+            starts.append(start)
+            rows.append(row)
+        return cls(n, lower, upper, starts, rows)
+
+    def get(self, i: int, j: int) -> Fraction:
+        offset = j - self.starts[i]
+        row = self.rows[i]
+        return row[offset] if 0 <= offset < len(row) else _ZERO
+
+
+def thomas_solve(band: BandedMatrix, rhs_rows: Sequence[Sequence[Fraction]]) -> Optional[List[List[Fraction]]]:
+    """
+    Algoritmo de Thomas para una matriz tridiagonal (lower = upper = 1, sin pivoteo): una pasada
+    hacia adelante elimina la subdiagonal (m_i = b_i - (a_i / m_(i-1)) * c_(i-1)) y una sustitución
+    hacia atrás obtiene x_i = (d_i - c_i * x_(i+1)) / m_i. Retorna la solución de cada columna de
+    rhs_rows, o None si aparece un pivote m_i cero (band_solve lo resuelve con intercambios).
+    """
+    n = band.n
+    k = len(rhs_rows[0]) if rhs_rows else 0
+    pivots = [band.get(i, i) for i in range(n)] # m_i
+    rhs = [list(values) for values in rhs_rows] # d_i
+    for i in range(1, n):
+        if not pivots[i - 1]:
+            return None
+        sub = band.get(i, i - 1)
+        if not sub:
+            continue
+        factor = sub / pivots[i - 1]
+        pivots[i] -= factor * band.get(i - 1, i)
+        previous, values = rhs[i - 1], rhs[i]
+        for c in range(k):
+            if previous[c]:
+                values[c] -= factor * previous[c]
+    if not pivots[n - 1]:
+        return None
+    solutions = [[_ZERO] * n for _ in range(k)]
+    for c in range(k):
+        x = solutions[c]
+        x[n - 1] = rhs[n - 1][c] / pivots[n - 1]
+        for i in range(n - 2, -1, -1):
+            x[i] = (rhs[i][c] - band.get(i, i + 1) * x[i + 1]) / pivots[i]
+    return solutions
+
+
+def band_solve(band: BandedMatrix, rhs_rows: Sequence[Sequence[Fraction]]) -> Optional[List[List[Fraction]]]:
+    """
+    Eliminación Gaussiana en banda (LU en banda) y sustitución hacia atrás. El pivote de la columna
+    j es el elemento diagonal si no es cero; si lo es, la primera fila de la banda (hasta lower filas
+    más abajo) con elemento no nulo, lo que extiende esa fila como máximo lower columnas a la derecha.
+    Retorna la solución de cada columna de rhs_rows, o None si A es singular.
+    """
+    n, lower = band.n, band.lower
+    k = len(rhs_rows[0]) if rhs_rows else 0
+    starts = list(band.starts)
+    rows = [list(row) for row in band.rows]
+    rhs = [list(values) for values in rhs_rows]
+
+    def value_at(i: int, j: int) -> Fraction:
+        offset = j - starts[i]
+        return rows[i][offset] if 0 <= offset < len(rows[i]) else _ZERO
+
+    for j in range(n):
+        last = min(n - 1, j + lower)
+        p = j
+        while p <= last and not value_at(p, j):
+            p += 1
+        if p > last:
+            return None # Columna sin pivote: A es singular
+        if p != j:
+            starts[j], starts[p] = starts[p], starts[j]
+            rows[j], rows[p] = rows[p], rows[j]
+            rhs[j], rhs[p] = rhs[p], rhs[j]
+        pivot_start, pivot_row, pivot_rhs = starts[j], rows[j], rhs[j]
+        pivot = pivot_row[j - pivot_start]
+        pivot_stop = pivot_start + len(pivot_row)
+        for i in range(j + 1, last + 1):
+            entry = value_at(i, j)
+            if not entry:
+                continue
+            factor = entry / pivot
+            row, start = rows[i], starts[i]
+            if start + len(row) < pivot_stop:
+                row.extend([_ZERO] * (pivot_stop - start - len(row))) # Relleno por un intercambio previo
+            for col in range(j + 1, pivot_stop):
+                value = pivot_row[col - pivot_start]
+                if value:
+                    row[col - start] -= factor * value
+            row[j - start] = _ZERO
+            values = rhs[i]
+            for c in range(k):
+                if pivot_rhs[c]:
+                    values[c] -= factor * pivot_rhs[c]
+
+    solutions = [[_ZERO] * n for _ in range(k)]
+    for i in range(n - 1, -1, -1):
+        start, row = starts[i], rows[i]
+        pivot = row[i - start]
+        for c in range(k):
+            x = solutions[c]
+            total = rhs[i][c]
+            for col in range(i + 1, start + len(row)):
+                value = row[col - start]
+                if value and x[col]:
+                    total -= value * x[col]
+            x[i] = total / pivot
+    return solutions
@@ -0,0 +1,58 @@
+from fractions import Fraction
+from typing import List, Tuple
+
+from backend.core.rational_matrix import RationalMatrix
+
+
+def bareiss_determinant(matrix: RationalMatrix) -> Tuple[Fraction, int]:
+    """
+    Calcula el determinante con la eliminación sin fracciones de Bareiss.
+
+    Cada fila racional se escala por su denominador para obtener una matriz entera N,
+    de modo que det(A) = det(N) / (producto de los denominadores de fila). Sobre N
+    todas las divisiones son exactas entre enteros, y los elementos intermedios son
+    menores de orden k de la matriz, por lo que su tamaño crece sólo linealmente.
+
+    Returns:
+        Tuple[Fraction, int]: (determinante, número de intercambios de filas realizados).
+    """
+    n = matrix.rows
+    if n != matrix.cols:
+        raise ValueError("La matriz debe ser cuadrada para calcular el determinante.")
+    if n == 0:
+        return Fraction(1), 0
+
+    rows: List[List[int]] = [matrix.data[i * n:(i + 1) * n] for i in range(n)]
+    scale = 1
+    for den in matrix.dens:
+        scale *= den
+
+    sign = 1
+    swaps = 0
+    previous_pivot = 1
+    for k in range(n - 1):
+        if rows[k][k] == 0:
+            for i in range(k + 1, n):
+                if rows[i][k] != 0:
+                    rows[k], rows[i] = rows[i], rows[k]
+                    sign = -sign
+                    swaps += 1
+                    break
+            else:
+                return Fraction(0), swaps
+        pivot_row = rows[k]
+        pivot = pivot_row[k]
+        for i in range(k + 1, n):
+            row = rows[i]
+            factor = row[k]
+            if factor == 0:
+                # Con factor nulo la fórmula se reduce a (row[j] * pivot) // previous_pivot
+                for j in range(k + 1, n):
+                    row[j] = row[j] * pivot // previous_pivot
+            else:
+                for j in range(k + 1, n):
+                    row[j] = (row[j] * pivot - factor * pivot_row[j]) // previous_pivot
+            row[k] = 0
+        previous_pivot = pivot
+
+    return Fraction(sign * rows[n - 1][n - 1], scale), swaps
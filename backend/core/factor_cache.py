@@ -0,0 +1,113 @@
+import hashlib
+import os
+import threading
+from fractions import Fraction
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple, Union
+
+from backend.models import Matrix
+from backend.core.lup import LUPFactors
+from backend.core.sparse_matrix import SparseMatrix
+from backend.utils.result_store import RESULT_STORE
+
+# Caché LRU acotada de factorizaciones PA = LU. La clave es un hash canónico de A (cada elemento no
+# nulo con su columna, como numerador/denominador reducido), de modo que "0.5", "1/2" y 0.5 comparten
+# la misma entrada, y una entrada dispersa se busca con su SparseMatrix, sin crear la forma densa.
+# /operations/lu_factorization la llena; solve, determinante e inversa la consultan.
+# En los procesos del pool de operaciones (ver backend/utils/executor.py) la caché registra además las
+# factorizaciones nuevas en `exported`, para copiarlas a la caché del proceso principal.
+# Si está configurado el almacén persistente (ver backend/utils/result_store.py), las factorizaciones
+# también se guardan ahí y se buscan ahí cuando no están en memoria.
+#
+# Variables de entorno:
+#   MATRIX_FACTOR_CACHE_SIZE  Número máximo de factorizaciones guardadas (0 = desactivada). Por defecto 128.
+
+
+def canonical_matrix_key(matrix: Union[Sequence[Sequence[Fraction]], SparseMatrix]) -> str:
+    """
+    Hash SHA-256 de la forma canónica de una matriz de Fractions o una SparseMatrix (dimensiones
+    incluidas): sólo los elementos no nulos, de modo que ambas formas de la misma matriz coinciden.
+    """
+    digest = hashlib.sha256()
+    if isinstance(matrix, SparseMatrix):
+        digest.update(f"{matrix.rows}x{matrix.cols}".encode())
+        rows = (sorted(row.items()) for row in matrix.data)
+    else:
+        digest.update(f"{len(matrix)}x{len(matrix[0]) if matrix else 0}".encode())
+        rows = ([(j, value) for j, value in enumerate(row) if value] for row in matrix)
+    for row in rows:
+        digest.update(b";")
+        digest.update(",".join(f"{j}:{value.numerator}/{value.denominator}" for j, value in row).encode())
+    return digest.hexdigest()
+
+
+class FactorCache:
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, LUPFactors]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exported: Optional[List[Tuple[str, LUPFactors]]] = None # Sólo en procesos del pool
+
+    @classmethod
+    def from_env(cls) -> "FactorCache":
+        return cls(max_entries=int(os.environ.get("MATRIX_FACTOR_CACHE_SIZE", 128)))
+
+    def get(self, matrix: Matrix) -> Optional[LUPFactors]:
+        if self.max_entries <= 0:
+            return None
+        key = canonical_matrix_key(matrix)
+        with self._lock:
+            factors = self._entries.get(key)
+            if factors is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return factors
+        factors = RESULT_STORE.get(f"lu:{key}")
+        if factors is None:
+            self.misses += 1
+            return None
+        self.put_entries([(key, factors)])
+        self.hits += 1
+        return factors
+
+    def contains(self, matrix: Matrix) -> bool:
+        """True si hay una factorización guardada para la matriz (no cuenta como acierto ni fallo)."""
+        if self.max_entries <= 0:
+            return False
+        key = canonical_matrix_key(matrix)
+        with self._lock:
+            return key in self._entries
+
+    def put(self, matrix: Matrix, factors: LUPFactors) -> None:
+        if self.max_entries <= 0:
+            return
+        key = canonical_matrix_key(matrix)
+        if self.exported is not None:
+            self.exported.append((key, factors))
+        self.put_entries([(key, factors)])
+        RESULT_STORE.put(f"lu:{key}", factors)
+
+    def put_entries(self, entries: Sequence[Tuple[str, LUPFactors]]) -> None:
+        """Guarda factorizaciones ya indexadas por su clave canónica (e.g. las exportadas por un proceso del pool)."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, factors in entries:
+                self._entries[key] = factors
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False) # Descarta la menos usada recientemente
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+FACTOR_CACHE = FactorCache.from_env()
@@ -0,0 +1,151 @@
+import os
+from fractions import Fraction
+from math import lcm
+from typing import List, Optional, Sequence
+
+from backend.core.lup import LUPFactors
+from backend.core.rational_matrix import RationalMatrix
+
+# Factorización A = L D Lᵀ de matrices simétricas, exacta y sin raíces cuadradas (la forma de Cholesky
+# que no requiere que A sea definida positiva ni sale de los racionales). Sólo se guarda y elimina el
+# triángulo inferior, empaquetado por filas: n(n+1)/2 elementos y ~n³/6 operaciones, la mitad que la
+# eliminación Gaussiana sobre la matriz completa.
+# La eliminación es la de Bareiss sobre c·A (c = mcm de los denominadores, un escalar que conserva la
+# simetría): sin pivoteo, la submatriz restante sigue siendo simétrica, todas las divisiones son exactas
+# entre enteros y el pivote k es el menor principal de orden k + 1. De ahí D(k) = p_k / p_(k-1) / c y
+# L(i,k) = a_ik / p_k. Sin pivoteo la factorización existe si los menores principales 1..n-1 no son cero.
+#
+# Variables de entorno:
+#   MATRIX_LDLT_MIN_DIMENSION  Dimensión mínima para usar LDLᵀ automáticamente en solve y determinante
+#                              cuando se piden los pasos completos (que muestran la eliminación Gaussiana). Por defecto 5.
+
+LDLT_MIN_DIMENSION = int(os.environ.get("MATRIX_LDLT_MIN_DIMENSION", 5))
+
+
+def packed_index(i: int, j: int) -> int:
+    """Posición del elemento (i, j), j <= i, en el triángulo inferior empaquetado por filas."""
+    return i * (i + 1) // 2 + j
+
+
+def is_symmetric(matrix: Sequence[Sequence[Fraction]]) -> bool:
+    n = len(matrix)
+    return all(len(row) == n for row in matrix) and all(matrix[i][j] == matrix[j][i] for i in range(n) for j in range(i))
+
+
+def pack_lower(matrix: Sequence[Sequence[Fraction]]) -> List[Fraction]:
+    """Triángulo inferior (diagonal incluida) de una matriz simétrica, empaquetado por filas."""
+    return [value for i, row in enumerate(matrix) for value in row[:i + 1]]
+
+
+class LDLTFactors:
+    """
+    Factorización A = L D Lᵀ: L triangular inferior con 1s en la diagonal (lower guarda su parte
+    estrictamente inferior empaquetada: L(i,j), j < i, en i(i-1)/2 + j) y D diagonal.
+    """
+
+    __slots__ = ("n", "lower", "diagonal")
+
+    def __init__(self, n: int, lower: List[Fraction], diagonal: List[Fraction]):
+        self.n = n
+        self.lower = lower
+        self.diagonal = diagonal
+
+    def l(self, i: int, j: int) -> Fraction:
+        if i == j:
+            return Fraction(1)
+        return self.lower[i * (i - 1) // 2 + j] if j < i else Fraction(0)
+
+    @property
+    def is_singular(self) -> bool:
+        return not all(self.diagonal)
+
+    @property
+    def positive_definite(self) -> bool:
+        """A es definida positiva si y sólo si todos los pivotes de D son positivos (criterio de Sylvester)."""
+        return all(d > 0 for d in self.diagonal)
+
+    def determinant(self) -> Fraction:
+        value = Fraction(1)
+        for d in self.diagonal:
+            value *= d
+        return value
+
+    def solve(self, vector_b: Sequence[Fraction]) -> Optional[List[Fraction]]:
+        """
+        Resuelve Ax=b: L y = b (hacia adelante), z = D⁻¹ y y Lᵀ x = z (hacia atrás, recorriendo L
+        por columnas). Retorna None si D tiene un cero.
+        """
+        if self.is_singular:
+            return None
+        n, lower = self.n, self.lower
+        y = [Fraction(value) for value in vector_b]
+        for i in range(1, n):
+            offset = i * (i - 1) // 2
+            total = y[i]
+            for j in range(i):
+                if lower[offset + j] and y[j]:
+                    total -= lower[offset + j] * y[j]
+            y[i] = total
+        x = [y[i] / self.diagonal[i] for i in range(n)]
+        for i in range(n - 1, 0, -1):
+            if x[i]:
+                offset = i * (i - 1) // 2
+                for j in range(i):
+                    if lower[offset + j]:
+                        x[j] -= lower[offset + j] * x[i]
+        return x
+
+    def lower_matrix(self) -> List[List[Fraction]]:
+        return [[self.l(i, j) for j in range(self.n)] for i in range(self.n)]
+
+    def to_lup(self) -> LUPFactors:
+        """Los mismos factores como PA = LU (P = I, U = D Lᵀ), para la caché de factorizaciones."""
+        n = self.n
+        upper = [[self.diagonal[i] * self.l(j, i) if j >= i else Fraction(0) for j in range(n)] for i in range(n)]
+        return LUPFactors(RationalMatrix.from_fractions(self.lower_matrix()), RationalMatrix.from_fractions(upper), list(range(n)), 0)
+
+
+class LDLTBreakdown(Exception):
+    """Pivote cero en la posición k (base 0): A no admite LDLᵀ sin pivoteo."""
+
+    def __init__(self, k: int):
+        super().__init__(f"Pivote D({k+1},{k+1}) es cero. La factorización LDLᵀ (sin pivoteo) no es posible.")
+        self.k = k
+
+
+def ldlt_factorize(packed: Sequence[Fraction], n: int) -> LDLTFactors:
+    """
+    Factoriza la matriz simétrica cuyo triángulo inferior empaquetado es packed (ver pack_lower).
+    Lanza LDLTBreakdown si un menor principal de orden < n es cero; si sólo lo es det(A), la
+    factorización existe y D(n,n) = 0.
+    """
+    scale = lcm(*(value.denominator for value in packed)) if packed else 1
+    a = [value.numerator * (scale // value.denominator) for value in packed] # c·A, entera
+
+    previous = 1
+    for k in range(n - 1):
+        pivot = a[packed_index(k, k)]
+        if pivot == 0:
+            raise LDLTBreakdown(k)
+        column = [a[packed_index(j, k)] for j in range(k + 1, n)] # a_jk, j > k (no cambian en este paso)
+        for i in range(k + 1, n):
+            row = packed_index(i, 0)
+            a_ik = column[i - k - 1]
+            # a_ij <- (p_k a_ij - a_ik a_jk) / p_(k-1), sólo para j <= i (la otra mitad es simétrica)
+            segment = a[row + k + 1:row + i + 1]
+            if a_ik:
+                a[row + k + 1:row + i + 1] = [(pivot * a_ij - a_ik * a_jk) // previous for a_ij, a_jk in zip(segment, column)]
+            else:
+                a[row + k + 1:row + i + 1] = [pivot * a_ij // previous for a_ij in segment]
+        previous = pivot
+
+    lower: List[Fraction] = []
+    diagonal: List[Fraction] = []
+    previous = 1
+    for i in range(n):
+        row = packed_index(i, 0)
+        lower.extend(Fraction(a[row + j], a[packed_index(j, j)]) for j in range(i))
+        pivot = a[row + i]
+        diagonal.append(Fraction(pivot, previous * scale))
+        previous = pivot
+    return LDLTFactors(n, lower, diagonal)
@@ -0,0 +1,230 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fractions import Fraction
+from math import log2
+from typing import List, Optional, Sequence, Tuple
+
+from backend.core.rational_matrix import RationalMatrix
+from backend.utils import executor
+
+# Motor multimodular: el determinante (y el rango) de una matriz entera se calcula módulo muchos
+# primos de una palabra y se reconstruye con el Teorema Chino del Resto. La cota de Hadamard decide
+# cuántos primos hacen falta para que la reconstrucción sea exacta.
+#
+# Variables de entorno:
+#   MATRIX_MODULAR_WORKERS  Procesos para repartir los primos (1 = sin pool). Por defecto 1.
+#
+# El pool se crea la primera vez que se usa y se reutiliza en los cálculos siguientes (crear procesos
+# "spawn" cuesta más que muchos determinantes). Dentro de un proceso del pool de operaciones (ver
+# backend/utils/executor.py) los primos se recorren en serie: ese proceso ya es un trabajo aparte.
+
+PRIME_BITS = 31
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37) # Determinista para n < 3.3e24
+_PRIMES: List[int] = []
+
+MODULAR_WORKERS = int(os.environ.get("MATRIX_MODULAR_WORKERS", 1))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _is_prime(n: int) -> bool:
+    if n < 2:
+        return False
+    for p in _MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def word_primes(count: int) -> List[int]:
+    """Retorna los `count` mayores primos menores que 2^31 (se generan una vez y se reutilizan)."""
+    candidate = _PRIMES[-1] - 2 if _PRIMES else (1 << PRIME_BITS) - 1
+    while len(_PRIMES) < count:
+        if _is_prime(candidate):
+            _PRIMES.append(candidate)
+        candidate -= 2
+    return _PRIMES[:count]
+
+
+def hadamard_bound_bits(rows: Sequence[Sequence[int]]) -> float:
+    """
+    log2 de la cota de Hadamard: |det(N)| <= prod_i ||fila_i||. También acota cualquier menor de N.
+    """
+    bits = 0.0
+    for row in rows:
+        norm_squared = sum(value * value for value in row)
+        if norm_squared > 1:
+            bits += log2(norm_squared) / 2
+    return bits
+
+
+def _primes_for_bound(bound_bits: float) -> List[int]:
+    # El producto de los primos debe superar 2 * cota para reconstruir valores con signo.
+    count = int((bound_bits + 2) // (PRIME_BITS - 1)) + 1
+    return word_primes(count)
+
+
+def determinant_mod_p(rows: Sequence[Sequence[int]], p: int) -> int:
+    """Determinante de una matriz entera módulo p (eliminación Gaussiana en Z/pZ)."""
+    n = len(rows)
+    matrix = [[value % p for value in row] for row in rows]
+    det = 1
+    for k in range(n):
+        pivot_row = next((i for i in range(k, n) if matrix[i][k]), -1)
+        if pivot_row == -1:
+            return 0
+        if pivot_row != k:
+            matrix[k], matrix[pivot_row] = matrix[pivot_row], matrix[k]
+            det = -det
+        pivot = matrix[k][k]
+        det = det * pivot % p
+        inverse = pow(pivot, -1, p)
+        row_k = matrix[k]
+        for i in range(k + 1, n):
+            row = matrix[i]
+            factor = row[k] * inverse % p
+            if factor:
+                row[k + 1:] = [(a - factor * b) % p for a, b in zip(row[k + 1:], row_k[k + 1:])]
+    return det % p
+
+
+def rank_mod_p(rows: Sequence[Sequence[int]], p: int) -> int:
+    """Rango de una matriz entera módulo p."""
+    matrix = [[value % p for value in row] for row in rows]
+    n_rows = len(matrix)
+    n_cols = len(matrix[0]) if n_rows else 0
+    rank = 0
+    for col in range(n_cols):
+        pivot_row = next((i for i in range(rank, n_rows) if matrix[i][col]), -1)
+        if pivot_row == -1:
+            continue
+        matrix[rank], matrix[pivot_row] = matrix[pivot_row], matrix[rank]
+        inverse = pow(matrix[rank][col], -1, p)
+        row_r = matrix[rank]
+        for i in range(rank + 1, n_rows):
+            row = matrix[i]
+            factor = row[col] * inverse % p
+            if factor:
+                row[col:] = [(a - factor * b) % p for a, b in zip(row[col:], row_r[col:])]
+        rank += 1
+        if rank == n_rows:
+            break
+    return rank
+
+
+def _residues(rows: Sequence[Sequence[int]], primes: Sequence[int], func) -> List[int]:
+    return [func(rows, p) for p in primes]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # "spawn" evita hacer fork de un servidor con varios hilos activos.
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def _map_primes(rows: List[List[int]], primes: List[int], func, workers: int) -> List[int]:
+    # Cada primo es independiente: con varios procesos se reparten en bloques para enviar la matriz
+    # una sola vez por bloque.
+    if workers <= 1 or len(primes) < 2 or executor._IN_WORKER:
+        return _residues(rows, primes, func)
+    chunks = [primes[i::workers] for i in range(min(workers, len(primes)))]
+    pool = _get_pool(workers)
+    try:
+        partial = list(pool.map(_residues, [rows] * len(chunks), chunks, [func] * len(chunks)))
+    except BrokenProcessPool: # Un proceso terminó: el pool se recrea en el próximo cálculo
+        _discard_pool(pool)
+        return _residues(rows, primes, func)
+    by_prime = {}
+    for chunk, values in zip(chunks, partial):
+        by_prime.update(zip(chunk, values))
+    return [by_prime[p] for p in primes]
+
+
+def crt_reconstruct(residues: Sequence[int], primes: Sequence[int]) -> int:
+    """
+    Reconstruye el entero x con |x| < (prod primos) / 2 a partir de x mod p_i (algoritmo de Garner).
+    """
+    value, modulus = 0, 1
+    for r, p in zip(residues, primes):
+        delta = (r - value) * pow(modulus, -1, p) % p
+        value += modulus * delta
+        modulus *= p
+    if value > modulus // 2:
+        value -= modulus
+    return value
+
+
+def _integer_rows(matrix: RationalMatrix) -> Tuple[List[List[int]], int]:
+    # Matriz entera N con A = diag(1/dens) * N: det(A) = det(N) / prod(dens) y rango(A) = rango(N).
+    cols = matrix.cols
+    rows = [matrix.data[i * cols:(i + 1) * cols] for i in range(matrix.rows)]
+    scale = 1
+    for den in matrix.dens:
+        scale *= den
+    return rows, scale
+
+
+def modular_determinant(matrix: RationalMatrix, workers: int = MODULAR_WORKERS) -> Tuple[Fraction, int, float]:
+    """
+    Determinante exacto mediante residuos módulo primos de 31 bits y reconstrucción CRT.
+
+    Returns:
+        Tuple[Fraction, int, float]: (determinante, número de primos usados, log2 de la cota de Hadamard).
+    """
+    if matrix.rows != matrix.cols:
+        raise ValueError("La matriz debe ser cuadrada para calcular el determinante.")
+    rows, scale = _integer_rows(matrix)
+    bound_bits = hadamard_bound_bits(rows)
+    primes = _primes_for_bound(bound_bits)
+    residues = _map_primes(rows, primes, determinant_mod_p, workers)
+    return Fraction(crt_reconstruct(residues, primes), scale), len(primes), bound_bits
+
+
+def modular_rank(matrix: RationalMatrix) -> int:
+    """
+    Rango exacto sobre Q. El rango módulo p nunca supera el rango real, y un menor no nulo (acotado
+    por Hadamard) no puede anularse módulo todos los primos cuyo producto supera la cota; por eso el
+    máximo sobre esos primos es el rango exacto.
+    """
+    rows, _ = _integer_rows(matrix)
+    primes = _primes_for_bound(hadamard_bound_bits(rows))
+    full_rank = min(matrix.rows, matrix.cols)
+    rank = 0
+    for p in primes:
+        # El caso habitual es que el primer primo ya dé el rango máximo posible.
+        rank = max(rank, rank_mod_p(rows, p))
+        if rank == full_rank:
+            break
+    return rank
@@ -0,0 +1,321 @@
+from fractions import Fraction
+from math import gcd, lcm
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+from backend.models import Matrix
+
+Number = Union[int, Fraction]
+
+
+class RationalMatrix:
+    """
+    Matriz racional exacta almacenada como un búfer plano de enteros.
+
+    La fila i ocupa data[i*cols:(i+1)*cols] y su valor real es data[k] / dens[i],
+    es decir, cada fila comparte un único denominador positivo. Las operaciones de
+    fila trabajan sólo con enteros y reducen la fila completa con un único gcd,
+    en lugar de crear un objeto Fraction (con su propio gcd) por cada celda.
+    """
+
+    __slots__ = ("rows", "cols", "data", "dens")
+
+    def __init__(self, rows: int, cols: int, data: List[int], dens: List[int]):
+        self.rows = rows
+        self.cols = cols
+        self.data = data
+        self.dens = dens
+
+    # --- Construcción ---
+
+    @classmethod
+    def zeros(cls, rows: int, cols: int) -> "RationalMatrix":
+        return cls(rows, cols, [0] * (rows * cols), [1] * rows)
+
+    @classmethod
+    def identity(cls, n: int) -> "RationalMatrix":
+        matrix = cls.zeros(n, n)
+        for i in range(n):
+            matrix.data[i * n + i] = 1
+        return matrix
+
+    @classmethod
+    def from_fractions(cls, matrix: Sequence[Sequence[Number]]) -> "RationalMatrix":
+        """
+        Construye la matriz a partir de una lista de listas de Fraction (o enteros).
+        Cada fila se lleva al mínimo común denominador de sus elementos.
+        """
+        rows = len(matrix)
+        cols = len(matrix[0]) if rows > 0 else 0
+        data: List[int] = []
+        dens: List[int] = []
+        for row in matrix:
+            den = 1
+            for value in row:
+                if isinstance(value, Fraction) and value.denominator != 1:
+                    den = lcm(den, value.denominator)
+            if den == 1:
+                data.extend(int(value) for value in row)
+            else:
+                data.extend(value.numerator * (den // value.denominator) if isinstance(value, Fraction) else value * den for value in row)
+            dens.append(den)
+        return cls(rows, cols, data, dens)
+
+    @classmethod
+    def column_vector(cls, vector: Sequence[Number]) -> "RationalMatrix":
+        return cls.from_fractions([[value] for value in vector])
+
+    def copy(self) -> "RationalMatrix":
+        return RationalMatrix(self.rows, self.cols, self.data[:], self.dens[:])
+
+    # --- Acceso ---
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.rows, self.cols
+
+    def get(self, i: int, j: int) -> Fraction:
+        return Fraction(self.data[i * self.cols + j], self.dens[i])
+
+    def is_zero(self, i: int, j: int) -> bool:
+        return self.data[i * self.cols + j] == 0
+
+    def row(self, i: int) -> List[Fraction]:
+        start = i * self.cols
+        den = self.dens[i]
+        return [Fraction(value, den) for value in self.data[start:start + self.cols]]
+
+    def raw_row(self, i: int) -> Tuple[List[int], int]:
+        """Fila i en la representación interna: (numeradores, denominador común)."""
+        start = i * self.cols
+        return self.data[start:start + self.cols], self.dens[i]
+
+    def column(self, j: int) -> List[Fraction]:
+        return [self.get(i, j) for i in range(self.rows)]
+
+    def to_fractions(self) -> Matrix:
+        return [self.row(i) for i in range(self.rows)]
+
+    def is_integer(self) -> bool:
+        return all(den == 1 for den in self.dens)
+
+    def set(self, i: int, j: int, value: Number) -> None:
+        """Asigna un elemento, llevando la fila a un denominador común si es necesario."""
+        value = Fraction(value)
+        den = self.dens[i]
+        if value.denominator != den and den % value.denominator != 0:
+            new_den = lcm(den, value.denominator)
+            scale = new_den // den
+            start = i * self.cols
+            for k in range(start, start + self.cols):
+                self.data[k] *= scale
+            self.dens[i] = den = new_den
+        self.data[i * self.cols + j] = value.numerator * (den // value.denominator)
+        self._normalize_row(i)
+
+    def set_row(self, i: int, values: Sequence[Number]) -> None:
+        """Reemplaza la fila i completa por los valores dados."""
+        row = RationalMatrix.from_fractions([values])
+        start = i * self.cols
+        self.data[start:start + self.cols] = row.data
+        self.dens[i] = row.dens[0]
+
+    def set_raw_row(self, i: int, values: List[int], den: int) -> None:
+        """Reemplaza la fila i con datos obtenidos de raw_row (ya normalizados)."""
+        start = i * self.cols
+        self.data[start:start + self.cols] = values
+        self.dens[i] = den
+
+    def submatrix(self, row_start: int, row_stop: int, col_start: int, col_stop: int) -> "RationalMatrix":
+        """Retorna la submatriz [row_start:row_stop, col_start:col_stop] como una nueva matriz."""
+        cols = col_stop - col_start
+        result = RationalMatrix(row_stop - row_start, cols, [], [])
+        for i in range(row_start, row_stop):
+            start = i * self.cols
+            result.data.extend(self.data[start + col_start:start + col_stop])
+            result.dens.append(self.dens[i])
+            result._normalize_row(i - row_start)
+        return result
+
+    def augment(self, other: "RationalMatrix") -> "RationalMatrix":
+        """Retorna la matriz aumentada [self | other] (mismo número de filas)."""
+        if self.rows != other.rows:
+            raise ValueError("Las matrices deben tener el mismo número de filas para aumentarse.")
+        cols = self.cols + other.cols
+        result = RationalMatrix(self.rows, cols, [], [])
+        for i in range(self.rows):
+            da, db = self.dens[i], other.dens[i]
+            den = lcm(da, db)
+            sa, sb = den // da, den // db
+            start_a, start_b = i * self.cols, i * other.cols
+            result.data.extend(value * sa for value in self.data[start_a:start_a + self.cols])
+            result.data.extend(value * sb for value in other.data[start_b:start_b + other.cols])
+            result.dens.append(den)
+        return result
+
+    def transpose(self) -> "RationalMatrix":
+        return RationalMatrix.from_fractions([self.column(j) for j in range(self.cols)])
+
+    # --- Operaciones elementales de fila ---
+
+    def swap_rows(self, i: int, j: int) -> None:
+        if i == j:
+            return
+        cols = self.cols
+        si, sj = i * cols, j * cols
+        self.data[si:si + cols], self.data[sj:sj + cols] = self.data[sj:sj + cols], self.data[si:si + cols]
+        self.dens[i], self.dens[j] = self.dens[j], self.dens[i]
+
+    def scale_row(self, i: int, factor: Number) -> None:
+        """F_i = factor * F_i"""
+        factor = Fraction(factor)
+        if factor == 0:
+            raise ValueError("No se puede escalar una fila por cero.")
+        start = i * self.cols
+        num = factor.numerator
+        if num != 1:
+            for k in range(start, start + self.cols):
+                self.data[k] *= num
+        self.dens[i] *= factor.denominator
+        self._normalize_row(i)
+
+    def subtract_scaled_row(self, target: int, source: int, factor: Number, start: int = 0) -> None:
+        """
+        F_target = F_target - factor * F_source, actualizando sólo las columnas >= start.
+        Las columnas anteriores a start conservan su valor (sólo cambia su representación).
+        """
+        factor = Fraction(factor)
+        if factor == 0:
+            return
+        cols = self.cols
+        data = self.data
+        dt, ds = self.dens[target], self.dens[source]
+        den = lcm(dt, ds * factor.denominator)
+        scale_t = den // dt
+        scale_s = factor.numerator * (den // (ds * factor.denominator))
+        t0, s0 = target * cols, source * cols
+        if scale_t != 1:
+            for k in range(t0, t0 + cols):
+                data[k] *= scale_t
+        for k in range(start, cols):
+            value = data[s0 + k]
+            if value:
+                data[t0 + k] -= scale_s * value
+        self.dens[target] = den
+        self._normalize_row(target)
+
+    def _normalize_row(self, i: int) -> None:
+        start = i * self.cols
+        row = self.data[start:start + self.cols]
+        g = gcd(self.dens[i], *row)
+        if g > 1:
+            self.data[start:start + self.cols] = [value // g for value in row]
+            self.dens[i] //= g
+
+    # --- Productos y aritmética ---
+
+    def dot_row_vector(self, i: int, vector: Sequence[Number], start: int = 0, stop: Optional[int] = None) -> Fraction:
+        """Producto punto de la fila i (columnas start..stop-1) con un vector de Fractions."""
+        stop = self.cols if stop is None else stop
+        offset = i * self.cols
+        return self._accumulate(
+            ((self.data[offset + k], Fraction(vector[k])) for k in range(start, stop)),
+            self.dens[i],
+        )
+
+    def dot_row_column(self, i: int, other: "RationalMatrix", j: int, start: int = 0, stop: Optional[int] = None) -> Fraction:
+        """Producto punto de la fila i de esta matriz con la columna j de other, sobre k en [start, stop)."""
+        stop = self.cols if stop is None else stop
+        offset = i * self.cols
+        return self._accumulate(
+            ((self.data[offset + k], (other.data[k * other.cols + j], other.dens[k])) for k in range(start, stop)),
+            self.dens[i],
+        )
+
+    @staticmethod
+    def _accumulate(terms: Iterable, row_den: int) -> Fraction:
+        # Suma enteros sobre un denominador común (mcm incremental) y crea una sola Fraction al final.
+        num, den = 0, 1
+        for a, b in terms:
+            if a == 0:
+                continue
+            if isinstance(b, Fraction):
+                b_num, b_den = b.numerator, b.denominator
+            else:
+                b_num, b_den = b
+            if b_num == 0:
+                continue
+            if b_den == den:
+                num += a * b_num
+            else:
+                new_den = lcm(den, b_den)
+                num = num * (new_den // den) + a * b_num * (new_den // b_den)
+                den = new_den
+        return Fraction(num, den * row_den)
+
+    def _combine(self, other: "RationalMatrix", sign: int) -> "RationalMatrix":
+        if self.shape != other.shape:
+            raise ValueError("Las matrices deben tener las mismas dimensiones.")
+        cols = self.cols
+        result = RationalMatrix(self.rows, cols, [], [])
+        for i in range(self.rows):
+            da, db = self.dens[i], other.dens[i]
+            start = i * cols
+            row_a = self.data[start:start + cols]
+            row_b = other.data[start:start + cols]
+            if da == db:
+                den = da
+                row = [a + sign * b for a, b in zip(row_a, row_b)]
+            else:
+                den = lcm(da, db)
+                sa, sb = den // da, sign * (den // db)
+                row = [a * sa + b * sb for a, b in zip(row_a, row_b)]
+            result.data.extend(row)
+            result.dens.append(den)
+            result._normalize_row(i)
+        return result
+
+    def add(self, other: "RationalMatrix") -> "RationalMatrix":
+        return self._combine(other, 1)
+
+    def subtract(self, other: "RationalMatrix") -> "RationalMatrix":
+        return self._combine(other, -1)
+
+    def matmul(self, other: "RationalMatrix") -> "RationalMatrix":
+        """
+        Producto matricial exacto.
+        Las filas de other se llevan a un denominador común D, de modo que cada elemento
+        del resultado es un producto punto entero dividido por dens[i] * D.
+        """
+        if self.cols != other.rows:
+            raise ValueError("El número de columnas de A debe ser igual al número de filas de B.")
+        common = 1
+        for den in other.dens:
+            common = lcm(common, den)
+        p = other.cols
+        scaled_b = []
+        for k in range(other.rows):
+            scale = common // other.dens[k]
+            start = k * p
+            scaled_b.append([value * scale for value in other.data[start:start + p]] if scale != 1 else other.data[start:start + p])
+        result = RationalMatrix(self.rows, p, [], [])
+        for i in range(self.rows):
+            start = i * self.cols
+            acc = [0] * p
+            for k, a in enumerate(self.data[start:start + self.cols]):
+                if a == 0:
+                    continue
+                row_b = scaled_b[k]
+                for j in range(p):
+                    acc[j] += a * row_b[j]
+            result.data.extend(acc)
+            result.dens.append(self.dens[i] * common)
+            result._normalize_row(i)
+        return result
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RationalMatrix):
+            return NotImplemented
+        return self.shape == other.shape and self.to_fractions() == other.to_fractions()
+
+    def __repr__(self) -> str:
+        return f"RationalMatrix({self.rows}x{self.cols}, {self.to_fractions()!r})"
@@ -0,0 +1,229 @@
+import heapq
+import os
+from fractions import Fraction
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Representación dispersa (diccionario de filas) para matrices con pocos elementos no nulos: la fila i
+# es un dict {columna: valor} sólo con los elementos distintos de cero. Suma, resta y producto
+# recorren sólo los no nulos, y la eliminación (sparse_eliminate) elige el orden de los pivotes para
+# generar el menor relleno posible (criterio de Markowitz).
+#
+# Las operaciones usan esta representación automáticamente cuando la matriz es lo bastante grande y
+# lo bastante dispersa (ver is_sparse_candidate); las matrices pequeñas de clase siguen el camino
+# denso, que produce los pasos didácticos.
+#
+# Variables de entorno:
+#   MATRIX_SPARSE_MAX_DENSITY   Fracción máxima de elementos no nulos para usar el camino disperso. Por defecto 0.1.
+#   MATRIX_SPARSE_MIN_ELEMENTS  Número mínimo de elementos (filas*columnas) para usarlo. Por defecto 400.
+
+SPARSE_MAX_DENSITY = float(os.environ.get("MATRIX_SPARSE_MAX_DENSITY", 0.1))
+SPARSE_MIN_ELEMENTS = int(os.environ.get("MATRIX_SPARSE_MIN_ELEMENTS", 400))
+
+_ZERO = Fraction(0)
+
+
+def is_sparse_candidate(rows: int, cols: int, nonzeros: int) -> bool:
+    """True si una matriz de rows x cols con nonzeros elementos no nulos debe usar el camino disperso."""
+    elements = rows * cols
+    return elements >= SPARSE_MIN_ELEMENTS and nonzeros <= SPARSE_MAX_DENSITY * elements
+
+
+class SparseMatrix:
+    """Matriz racional dispersa: data[i] = {j: A(i,j)} con los elementos no nulos de la fila i."""
+
+    __slots__ = ("rows", "cols", "data")
+
+    def __init__(self, rows: int, cols: int, data: List[Dict[int, Fraction]]):
+        self.rows = rows
+        self.cols = cols
+        self.data = data
+
+    @classmethod
+    def from_fractions(cls, matrix: Sequence[Sequence[Fraction]]) -> "SparseMatrix":
+        rows = len(matrix)
+        cols = len(matrix[0]) if rows > 0 else 0
+        return cls(rows, cols, [{j: value for j, value in enumerate(row) if value} for row in matrix])
+
+    @property
+    def nnz(self) -> int:
+        return sum(len(row) for row in self.data)
+
+    @property
+    def density(self) -> float:
+        elements = self.rows * self.cols
+        return self.nnz / elements if elements else 0.0
+
+    def get(self, i: int, j: int) -> Fraction:
+        return self.data[i].get(j, _ZERO)
+
+    def to_fractions(self) -> List[List[Fraction]]:
+        result = []
+        for row in self.data:
+            dense = [_ZERO] * self.cols
+            for j, value in row.items():
+                dense[j] = value
+            result.append(dense)
+        return result
+
+    def _combine(self, other: "SparseMatrix", sign: int) -> "SparseMatrix":
+        if (self.rows, self.cols) != (other.rows, other.cols):
+            raise ValueError("Las matrices deben tener las mismas dimensiones.")
+        data = []
+        for row_a, row_b in zip(self.data, other.data):
+            row = dict(row_a)
+            for j, value in row_b.items():
+                total = row.get(j, _ZERO) + sign * value
+                if total:
+                    row[j] = total
+                else:
+                    row.pop(j, None)
+            data.append(row)
+        return SparseMatrix(self.rows, self.cols, data)
+
+    def add(self, other: "SparseMatrix") -> "SparseMatrix":
+        return self._combine(other, 1)
+
+    def subtract(self, other: "SparseMatrix") -> "SparseMatrix":
+        return self._combine(other, -1)
+
+    def matmul(self, other: "SparseMatrix") -> "SparseMatrix":
+        """Producto fila por fila: la fila i del resultado combina las filas k de B con A(i,k) != 0."""
+        if self.cols != other.rows:
+            raise ValueError("El número de columnas de A debe ser igual al número de filas de B.")
+        data = []
+        for row_a in self.data:
+            acc: Dict[int, Fraction] = {}
+            for k, a in row_a.items():
+                for j, b in other.data[k].items():
+                    acc[j] = acc.get(j, _ZERO) + a * b
+            data.append({j: value for j, value in acc.items() if value})
+        return SparseMatrix(self.rows, other.cols, data)
+
+
+class SparseElimination:
+    """
+    Resultado de sparse_eliminate: PAQ = LU con los pivotes (fila, columna) en orden de eliminación.
+    rows son las filas de U (las filas de A reducidas, sólo en las columnas aún no eliminadas) y rhs
+    los lados derechos transformados de cada fila.
+    """
+
+    __slots__ = ("n_rows", "n_cols", "pivots", "rows", "rhs", "fill")
+
+    def __init__(self, n_rows: int, n_cols: int, pivots: List[Tuple[int, int]], rows: List[Dict[int, Fraction]], rhs: List[List[Fraction]], fill: int):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.pivots = pivots
+        self.rows = rows
+        self.rhs = rhs
+        self.fill = fill
+
+    @property
+    def rank(self) -> int:
+        return len(self.pivots)
+
+    def determinant(self) -> Fraction:
+        """det(A) = sgn(P) * sgn(Q) * producto de los pivotes (0 si la matriz es singular)."""
+        if self.rank < self.n_rows:
+            return _ZERO
+        value = Fraction(permutation_sign([i for i, _ in self.pivots]) * permutation_sign([j for _, j in self.pivots]))
+        for i, j in self.pivots:
+            value *= self.rows[i][j]
+        return value
+
+    def inconsistent_columns(self) -> List[bool]:
+        """Por cada lado derecho: True si alguna fila sin pivote (nula en A) tiene constante no nula."""
+        pivot_rows = {i for i, _ in self.pivots}
+        free_rows = [i for i in range(self.n_rows) if i not in pivot_rows]
+        k = len(self.rhs[0]) if self.rhs else 0
+        return [any(self.rhs[i][c] for i in free_rows) for c in range(k)]
+
+    def solve(self, column: int = 0) -> List[Fraction]:
+        """Sustitución hacia atrás en orden inverso de los pivotes (requiere rango completo)."""
+        x = [_ZERO] * self.n_cols
+        for i, j in reversed(self.pivots):
+            row = self.rows[i]
+            total = self.rhs[i][column]
+            for col, value in row.items():
+                if col != j:
+                    total -= value * x[col]
+            x[j] = total / row[j]
+        return x
+
+
+def permutation_sign(permutation: List[int]) -> int:
+    """Signo (+1 o -1) de una permutación de 0..n-1, por la paridad de sus ciclos."""
+    sign, seen = 1, [False] * len(permutation)
+    for start in range(len(permutation)):
+        if seen[start]:
+            continue
+        length, i = 0, start
+        while not seen[i]:
+            seen[i] = True
+            i = permutation[i]
+            length += 1
+        if length % 2 == 0:
+            sign = -sign
+    return sign
+
+
+def sparse_eliminate(matrix: SparseMatrix, rhs: Optional[List[List[Fraction]]] = None) -> SparseElimination:
+    """
+    Eliminación Gaussiana exacta sobre la representación dispersa, con orden de pivotes de Markowitz
+    aproximado: en cada paso se elige la columna activa con menos elementos no nulos y, en ella, la
+    fila con menos elementos no nulos (el producto (r-1)(c-1) acota el relleno que genera el pivote).
+    Al ser aritmética exacta, cualquier pivote no nulo es válido: el orden sólo busca conservar la
+    dispersión. rhs[i] son los lados derechos de la fila i (se transforman junto con A).
+    """
+    n_rows, n_cols = matrix.rows, matrix.cols
+    rows = [dict(row) for row in matrix.data]
+    rhs = [list(values) for values in rhs] if rhs is not None else [[] for _ in range(n_rows)]
+    column_rows: List[set] = [set() for _ in range(n_cols)] # Filas activas con elemento no nulo en cada columna
+    for i, row in enumerate(rows):
+        for j in row:
+            column_rows[j].add(i)
+
+    heap = [(len(column_rows[j]), j) for j in range(n_cols) if column_rows[j]]
+    heapq.heapify(heap)
+    eliminated_columns = [False] * n_cols
+    pivots: List[Tuple[int, int]] = []
+    fill = 0
+    while heap:
+        count, j = heapq.heappop(heap)
+        if eliminated_columns[j] or count != len(column_rows[j]):
+            continue # Entrada desactualizada del heap
+        if count == 0:
+            continue
+        candidates = column_rows[j]
+        p = min(candidates, key=lambda i: (len(rows[i]), i))
+        pivot_row, pivot = rows[p], rows[p][j]
+        pivot_rhs = rhs[p]
+        eliminated_columns[j] = True
+        for col in pivot_row:
+            column_rows[col].discard(p)
+        changed = set()
+        for i in list(candidates):
+            row = rows[i]
+            factor = row.pop(j) / pivot
+            candidates.discard(i)
+            for col, value in pivot_row.items():
+                if col == j:
+                    continue
+                updated = row.get(col, _ZERO) - factor * value
+                if updated:
+                    if col not in row:
+                        fill += 1
+                        column_rows[col].add(i)
+                    row[col] = updated
+                elif col in row:
+                    del row[col]
+                    column_rows[col].discard(i)
+                changed.add(col)
+            values = rhs[i]
+            for c, value in enumerate(pivot_rhs):
+                if value:
+                    values[c] -= factor * value
+        for col in changed | set(pivot_row):
+            if not eliminated_columns[col]:
+                heapq.heappush(heap, (len(column_rows[col]), col))
+        pivots.append((p, j))
+    return SparseElimination(n_rows, n_cols, pivots, rows, rhs, fill)
@@ -0,0 +1,297 @@
+from fractions import Fraction
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from backend.core.bareiss import bareiss_determinant
+from backend.core.lup import LUPFactors
+from backend.core.rational_matrix import RationalMatrix
+from backend.core.sparse_matrix import SparseMatrix, permutation_sign, sparse_eliminate
+
+# Detección de estructura sobre la matriz ya convertida a Fraction y atajos que evitan la
+# eliminación completa O(n³):
+#   - diagonal: determinante = producto de la diagonal, solución x_i = b_i / a_ii;
+#   - triangular (superior o inferior): producto de la diagonal y sustitución directa O(n²);
+#   - permutación (una entrada no nula por fila y columna): la inversa es la transpuesta con los
+#     recíprocos, el determinante es sgn(P) * producto de las entradas;
+#   - diagonal por bloques: cada bloque se resuelve por separado (con su propio atajo, o con
+#     eliminación si es un bloque general).
+# La detección recorre la matriz una vez (O(n²)), mucho menos que cualquier eliminación.
+
+DIAGONAL = "diagonal"
+UPPER_TRIANGULAR = "upper_triangular"
+LOWER_TRIANGULAR = "lower_triangular"
+PERMUTATION = "permutation"
+BLOCK_DIAGONAL = "block_diagonal"
+GENERAL = "general"
+
+# Con pasos detallados, las matrices menores que esta dimensión siguen la eliminación didáctica
+# aunque tengan estructura (igual que Bareiss y LDLᵀ): los pasos fila a fila son legibles y es lo
+# que se espera ver. Sin pasos detallados los atajos se aplican a cualquier dimensión.
+STRUCTURE_MIN_DIMENSION = 5
+
+_ZERO = Fraction(0)
+_ONE = Fraction(1)
+
+
+class MatrixStructure:
+    """
+    Estructura detectada de una matriz cuadrada. perm[i] es la columna de la única entrada no nula
+    de la fila i (sólo para permutaciones) y blocks los rangos [inicio, fin) de los bloques diagonales.
+    """
+
+    __slots__ = ("kind", "n", "perm", "blocks", "nonsingular_diagonal")
+
+    def __init__(self, kind: str, n: int, perm: Optional[List[int]] = None, blocks: Optional[List[Tuple[int, int]]] = None, nonsingular_diagonal: bool = False):
+        self.kind = kind
+        self.n = n
+        self.perm = perm
+        self.blocks = blocks
+        self.nonsingular_diagonal = nonsingular_diagonal
+
+    @property
+    def direct(self) -> bool:
+        """True si los atajos resuelven sin ninguna eliminación (diagonal, permutación o triangular con diagonal no nula)."""
+        return self.kind in (DIAGONAL, PERMUTATION) or (self.kind in (UPPER_TRIANGULAR, LOWER_TRIANGULAR) and self.nonsingular_diagonal)
+
+    @property
+    def description(self) -> str:
+        if self.kind == DIAGONAL:
+            return "matriz diagonal"
+        if self.kind == UPPER_TRIANGULAR:
+            return "matriz triangular superior"
+        if self.kind == LOWER_TRIANGULAR:
+            return "matriz triangular inferior"
+        if self.kind == PERMUTATION:
+            return "matriz de permutación (una entrada no nula por fila y por columna)"
+        if self.kind == BLOCK_DIAGONAL:
+            sizes = ", ".join(str(end - start) for start, end in self.blocks)
+            return f"matriz diagonal por bloques ({len(self.blocks)} bloques de tamaño {sizes})"
+        return "matriz general"
+
+
+def use_structure_shortcuts(n: int, detailed_steps: bool) -> bool:
+    """True si los atajos por estructura deben aplicarse a una matriz n x n (ver STRUCTURE_MIN_DIMENSION)."""
+    return not detailed_steps or n >= STRUCTURE_MIN_DIMENSION
+
+
+def detect_structure(matrix: Sequence[Sequence[Fraction]]) -> MatrixStructure:
+    """Clasifica una matriz cuadrada de Fractions (ver arriba) recorriéndola una sola vez."""
+    n = len(matrix)
+    upper = lower = permutation = True
+    nonsingular_diagonal = True
+    perm: List[int] = []
+    column_used = [False] * n
+    last_row_in_column = [-1] * n # Última fila con entrada no nula en cada columna
+    last_column_in_row = [-1] * n
+    for i, row in enumerate(matrix):
+        columns = [j for j, value in enumerate(row) if value]
+        if not row[i]:
+            nonsingular_diagonal = False
+        if columns:
+            upper = upper and columns[0] >= i
+            lower = lower and columns[-1] <= i
+            last_column_in_row[i] = columns[-1]
+            for j in columns:
+                last_row_in_column[j] = i
+        if permutation:
+            if len(columns) == 1 and not column_used[columns[0]]:
+                column_used[columns[0]] = True
+                perm.append(columns[0])
+            else:
+                permutation = False
+
+    if upper and lower:
+        return MatrixStructure(DIAGONAL, n, nonsingular_diagonal=nonsingular_diagonal)
+    if permutation:
+        return MatrixStructure(PERMUTATION, n, perm=perm)
+    if upper:
+        return MatrixStructure(UPPER_TRIANGULAR, n, nonsingular_diagonal=nonsingular_diagonal)
+    if lower:
+        return MatrixStructure(LOWER_TRIANGULAR, n, nonsingular_diagonal=nonsingular_diagonal)
+
+    # Bloques diagonales contiguos: un bloque termina en k si ninguna entrada de las filas o
+    # columnas 0..k llega más allá de k.
+    blocks: List[Tuple[int, int]] = []
+    start, reach = 0, -1
+    for k in range(n):
+        reach = max(reach, last_column_in_row[k], last_row_in_column[k])
+        if reach <= k:
+            blocks.append((start, k + 1))
+            start = k + 1
+    if len(blocks) > 1:
+        return MatrixStructure(BLOCK_DIAGONAL, n, blocks=blocks, nonsingular_diagonal=nonsingular_diagonal)
+    return MatrixStructure(GENERAL, n, nonsingular_diagonal=nonsingular_diagonal)
+
+
+def _block(matrix: Sequence[Sequence[Fraction]], start: int, end: int) -> List[List[Fraction]]:
+    return [list(row[start:end]) for row in matrix[start:end]]
+
+
+def structured_determinant(matrix: Sequence[Sequence[Fraction]], structure: MatrixStructure) -> Fraction:
+    """Determinante con el atajo de la estructura; los bloques generales se calculan con Bareiss."""
+    if structure.kind in (DIAGONAL, UPPER_TRIANGULAR, LOWER_TRIANGULAR):
+        value = _ONE
+        for i in range(structure.n):
+            value *= matrix[i][i]
+        return value
+    if structure.kind == PERMUTATION:
+        value = Fraction(permutation_sign(structure.perm))
+        for i, j in enumerate(structure.perm):
+            value *= matrix[i][j]
+        return value
+    if structure.kind == BLOCK_DIAGONAL:
+        value = _ONE
+        for start, end in structure.blocks:
+            block = _block(matrix, start, end)
+            block_structure = detect_structure(block)
+            if block_structure.kind == GENERAL:
+                value *= bareiss_determinant(RationalMatrix.from_fractions(block))[0]
+            else:
+                value *= structured_determinant(block, block_structure)
+            if not value:
+                break
+        return value
+    raise ValueError("La matriz no tiene una estructura especial.")
+
+
+class StructuredSolution:
+    """
+    Resultado de structured_solve para AX=B: rango de A, si cada columna de B es inconsistente y las
+    soluciones (sólo si A tiene rango completo), como los de SparseElimination.
+    """
+
+    __slots__ = ("rank", "inconsistent", "solutions")
+
+    def __init__(self, rank: int, inconsistent: List[bool], solutions: Optional[List[List[Fraction]]]):
+        self.rank = rank
+        self.inconsistent = inconsistent
+        self.solutions = solutions
+
+
+def _substitute(matrix: Sequence[Sequence[Fraction]], column: List[Fraction], lower: bool) -> List[Fraction]:
+    """Sustitución hacia adelante (lower) o hacia atrás sobre una matriz triangular con diagonal no nula."""
+    n = len(matrix)
+    x = [_ZERO] * n
+    order = range(n) if lower else range(n - 1, -1, -1)
+    for i in order:
+        row = matrix[i]
+        total = column[i]
+        for j in (range(i) if lower else range(i + 1, n)):
+            if row[j] and x[j]:
+                total -= row[j] * x[j]
+        x[i] = total / row[i]
+    return x
+
+
+def structured_solve(matrix: Sequence[Sequence[Fraction]], structure: MatrixStructure, rhs_rows: Sequence[Sequence[Fraction]]) -> Optional[StructuredSolution]:
+    """
+    Resuelve AX=B con el atajo de la estructura (rhs_rows[i] son los lados derechos de la fila i).
+    Retorna None si el atajo no aplica (matriz general, o triangular con un cero en la diagonal:
+    entonces el rango requiere eliminación).
+    """
+    n = structure.n
+    k = len(rhs_rows[0]) if rhs_rows else 0
+    columns = [[rhs_rows[i][c] for i in range(n)] for c in range(k)]
+    if structure.kind == DIAGONAL:
+        zero_rows = [i for i in range(n) if not matrix[i][i]]
+        if zero_rows: # Ecuaciones 0 = b_i: inconsistentes si b_i != 0, si no la variable x_i queda libre
+            return StructuredSolution(n - len(zero_rows), [any(column[i] for i in zero_rows) for column in columns], None)
+        return StructuredSolution(n, [False] * k, [[column[i] / matrix[i][i] for i in range(n)] for column in columns])
+    if structure.kind in (UPPER_TRIANGULAR, LOWER_TRIANGULAR):
+        if not structure.nonsingular_diagonal:
+            return None
+        lower = structure.kind == LOWER_TRIANGULAR
+        return StructuredSolution(n, [False] * k, [_substitute(matrix, column, lower) for column in columns])
+    if structure.kind == PERMUTATION:
+        solutions = []
+        for column in columns:
+            x = [_ZERO] * n
+            for i, j in enumerate(structure.perm):
+                x[j] = column[i] / matrix[i][j]
+            solutions.append(x)
+        return StructuredSolution(n, [False] * k, solutions)
+    if structure.kind == BLOCK_DIAGONAL:
+        rank, inconsistent = 0, [False] * k
+        solutions = [[_ZERO] * n for _ in range(k)]
+        for start, end in structure.blocks:
+            block = _block(matrix, start, end)
+            block_rhs = rhs_rows[start:end]
+            block_structure = detect_structure(block)
+            result = structured_solve(block, block_structure, block_rhs) if block_structure.kind != GENERAL else None
+            if result is None: # Bloque general (o triangular singular): eliminación sólo sobre el bloque
+                elimination = sparse_eliminate(SparseMatrix.from_fractions(block), [list(values) for values in block_rhs])
+                block_solutions = [elimination.solve(c) for c in range(k)] if elimination.rank == end - start else None
+                result = StructuredSolution(elimination.rank, elimination.inconsistent_columns(), block_solutions)
+            rank += result.rank
+            inconsistent = [a or b for a, b in zip(inconsistent, result.inconsistent)]
+            if result.solutions is not None:
+                for c in range(k):
+                    solutions[c][start:end] = result.solutions[c]
+        return StructuredSolution(rank, inconsistent, solutions if rank == n else None)
+    return None
+
+
+def structured_inverse(matrix: Sequence[Sequence[Fraction]], structure: MatrixStructure) -> Optional[List[List[Fraction]]]:
+    """Inversa con el atajo de la estructura (resolviendo A X = I), o None si la matriz es singular."""
+    n = structure.n
+    if structure.kind in (UPPER_TRIANGULAR, LOWER_TRIANGULAR) and not structure.nonsingular_diagonal:
+        return None # Una matriz triangular es singular si y sólo si tiene un cero en la diagonal
+    identity = [[_ONE if i == j else _ZERO for j in range(n)] for i in range(n)]
+    result = structured_solve(matrix, structure, identity)
+    if result is None or result.solutions is None:
+        return None
+    return [[result.solutions[j][i] for j in range(n)] for i in range(n)]
+
+
+def structured_lu(matrix: Sequence[Sequence[Fraction]], structure: MatrixStructure, pivoting: str,
+                  factorize_block: Optional[Callable[[List[List[Fraction]]], Optional[LUPFactors]]] = None) -> Optional[LUPFactors]:
+    """
+    Factorización PA = LU con el atajo de la estructura, idéntica a la que producirían Doolittle
+    (pivoting="none") o el pivoteo parcial ("partial"). Retorna None si el atajo no aplica (la
+    factorización general se encarga, incluidos sus mensajes de error). factorize_block factoriza
+    los bloques generales de una matriz diagonal por bloques (None si fallan); sólo se usa con ellas.
+    """
+    n = structure.n
+    identity = list(range(n))
+    if structure.kind in (DIAGONAL, UPPER_TRIANGULAR) and (structure.nonsingular_diagonal or pivoting == "partial"):
+        # L = I, U = A: ninguna columna tiene entradas debajo de la diagonal
+        return LUPFactors(RationalMatrix.identity(n), RationalMatrix.from_fractions(matrix), identity, 0)
+    if structure.kind == LOWER_TRIANGULAR and pivoting == "none" and structure.nonsingular_diagonal:
+        # A = (A D⁻¹) D con D la diagonal de A
+        L = [[matrix[i][j] / matrix[j][j] if j <= i else _ZERO for j in range(n)] for i in range(n)]
+        U = [[matrix[i][i] if i == j else _ZERO for j in range(n)] for i in range(n)]
+        return LUPFactors(RationalMatrix.from_fractions(L), RationalMatrix.from_fractions(U), identity, 0)
+    if structure.kind == PERMUTATION and pivoting == "partial":
+        # El pivoteo parcial lleva a la fila k la única fila con entrada no nula en la columna k
+        # (sin eliminar nada): se reproducen sus intercambios para obtener la misma P.
+        row_of_column = [0] * n
+        for i, j in enumerate(structure.perm):
+            row_of_column[j] = i
+        order, position = list(identity), list(identity) # order[k] = fila de A en la posición k; position es su inversa
+        swaps = 0
+        for k in range(n):
+            p = position[row_of_column[k]]
+            if p != k:
+                order[k], order[p] = order[p], order[k]
+                position[order[k]], position[order[p]] = k, p
+                swaps += 1
+        U = [[matrix[order[i]][i] if i == j else _ZERO for j in range(n)] for i in range(n)]
+        return LUPFactors(RationalMatrix.identity(n), RationalMatrix.from_fractions(U), order, swaps)
+    if structure.kind == BLOCK_DIAGONAL and factorize_block is not None:
+        # Ni Doolittle ni el pivoteo parcial mezclan bloques: la factorización es la de cada bloque
+        L, U = [[_ZERO] * n for _ in range(n)], [[_ZERO] * n for _ in range(n)]
+        perm, swaps = [], 0
+        for start, end in structure.blocks:
+            block = _block(matrix, start, end)
+            block_structure = detect_structure(block)
+            factors = structured_lu(block, block_structure, pivoting, factorize_block) if block_structure.kind != GENERAL else None
+            if factors is None:
+                factors = factorize_block(block)
+            if factors is None:
+                return None
+            for i in range(end - start):
+                L[start + i][start:end] = factors.L.row(i)
+                U[start + i][start:end] = factors.U.row(i)
+            perm.extend(start + p for p in factors.perm)
+            swaps += factors.swaps
+        return LUPFactors(RationalMatrix.from_fractions(L), RationalMatrix.from_fractions(U), perm, swaps)
+    return None
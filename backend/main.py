@@ -1,6 +1,5 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Request
 from fastapi.responses import HTMLResponse 
-from starlette.staticfiles import StaticFiles 
 from fastapi.middleware.cors import CORSMiddleware
 from backend.models import ApiResponse, MatrixInput, TwoMatrixInput 
 from backend.operations.addition import router as addition_router
@@ -10,7 +9,16 @@ from backend.operations.determinant import router as determinant_router
 from backend.operations.inverse import router as inverse_router # Router para matriz inversa
 from backend.operations.gaussian_elimination import router as gaussian_elimination_router # Router para eliminación Gaussiana
 from backend.operations.lu_factorization import router as lu_factorization_router # Router para factorización LU
+from backend.operations.ldlt_factorization import router as ldlt_factorization_router # Router para factorización LDLᵀ de matrices simétricas
 from backend.operations.gauss_jordan_elimination import router as gauss_jordan_elimination_router # Router para eliminación Gauss-Jordan
+from backend.operations.batch import router as batch_router # Router para lotes de operaciones
+from backend.operations.stream import router as stream_router # Router para operaciones con pasos en streaming
+from backend.core.factor_cache import FACTOR_CACHE
+from backend.utils.result_cache import RESULT_CACHE, SINGLE_FLIGHT
+from backend.utils.result_store import RESULT_STORE
+from backend.utils.compression import CompressionMiddleware
+from backend.utils.static_assets import StaticAssets
+from backend.utils.wire_format import BinaryMatrixMiddleware
 import pathlib 
 
 app = FastAPI(
@@ -28,10 +36,19 @@ app.add_middleware(
     allow_headers=["*"],  # Permite todas las cabeceras
 )
 
+# Cuerpos binarios (application/octet-stream) en /operations/* (ver backend/utils/wire_format.py)
+app.add_middleware(BinaryMatrixMiddleware)
+
+# Compresión negociada (gzip, brotli, zstd) de las respuestas grandes y en streaming (ver backend/utils/compression.py)
+app.add_middleware(CompressionMiddleware)
+
 # --- Determinar la ruta absoluta al directorio 'static' ---
 STATIC_DIR = pathlib.Path(__file__).resolve().parent / "static"
 INDEX_HTML_PATH = STATIC_DIR / "index.html"
 
+# Archivos de la interfaz cargados y precomprimidos una sola vez (ver backend/utils/static_assets.py)
+STATIC_ASSETS = StaticAssets.from_env(STATIC_DIR)
+
 # Incluir routers para todas las operaciones matriciales
 app.include_router(addition_router, prefix="/operations", tags=["Matrix Operations"]) 
 app.include_router(subtraction_router, prefix="/operations", tags=["Matrix Operations"])
@@ -40,26 +57,35 @@ app.include_router(determinant_router, prefix="/operations", tags=["Matrix Opera
 app.include_router(inverse_router, prefix="/operations", tags=["Matrix Operations"]) 
 app.include_router(gaussian_elimination_router, prefix="/operations", tags=["Matrix Operations"])
 app.include_router(lu_factorization_router, prefix="/operations", tags=["Matrix Operations"])
+app.include_router(ldlt_factorization_router, prefix="/operations", tags=["Matrix Operations"])
 app.include_router(gauss_jordan_elimination_router, prefix="/operations", tags=["Matrix Operations"])
+app.include_router(batch_router, prefix="/operations", tags=["Matrix Operations"])
+app.include_router(stream_router, prefix="/operations", tags=["Matrix Operations"])
 
-# Montar los archivos estáticos para la interfaz de usuario
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+# Archivos estáticos para la interfaz de usuario (desde memoria, con huella, ETag y precompresión)
+@app.api_route("/static/{name:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def static_file(name: str, request: Request):
+    """
+    Sirve un archivo de la interfaz por su nombre (e.g. script.js) o por su nombre con huella
+    (e.g. script.<huella>.js, con caché inmutable).
+    """
+    asset, immutable = STATIC_ASSETS.lookup(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return asset.response(request.headers, immutable=immutable)
 
-@app.get("/", response_class=HTMLResponse, include_in_schema=False)
-async def read_root():
+@app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse, include_in_schema=False)
+async def read_root(request: Request):
     """
-    Sirve la página principal de la aplicación (index.html).
+    Sirve la página principal de la aplicación (index.html), desde memoria.
     
     Returns:
-        HTMLResponse: Contenido HTML de la página principal o página de error si no se encuentra.
+        Response: Contenido HTML de la página principal (o 304 si el navegador ya lo tiene) o página de error si no se encuentra.
     """
-    try:
-        with open(INDEX_HTML_PATH, encoding="utf-8") as f: # Usar ruta absoluta
-            return HTMLResponse(content=f.read(), status_code=200)
-    except FileNotFoundError:
+    asset, _ = STATIC_ASSETS.lookup(INDEX_HTML_PATH.name)
+    if asset is None:
         return HTMLResponse(content="<html><body><h1>Archivo no encontrado</h1><p>index.html no encontrado.</p></body></html>", status_code=404)
-    except Exception as e:
-        return HTMLResponse(content=f"<html><body><h1>Error</h1><p>Ocurrió un error: {str(e)}</p></body></html>", status_code=500)
+    return asset.response(request.headers)
 
 
 @app.get("/health", summary="Chequeo de salud del API", tags=["General"])
@@ -72,6 +98,19 @@ async def health_check():
     """
     return {"status": "ok"}
 
+@app.get("/cache", summary="Estadísticas de las cachés de resultados y factorizaciones", tags=["General"])
+async def cache_stats():
+    """
+    Retorna el estado de la caché de resultados (entradas, bytes aproximados, aciertos y fallos) y los
+    aciertos y fallos de la caché de factorizaciones LU. coalesced cuenta las solicitudes que esperaron
+    un cálculo idéntico en curso; store, el estado del almacén persistente (si está configurado).
+    """
+    return {
+        "results": {**RESULT_CACHE.stats(), "in_flight": SINGLE_FLIGHT.in_flight(), "coalesced": SINGLE_FLIGHT.coalesced},
+        "factorizations": {"entries": len(FACTOR_CACHE), "hits": FACTOR_CACHE.hits, "misses": FACTOR_CACHE.misses},
+        "store": RESULT_STORE.stats(),
+    }
+
 if __name__ == "__main__":
     # Para ejecutar la API localmente (opcional, uvicorn puede manejar esto desde la terminal):
     import uvicorn
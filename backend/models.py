@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Union, Any, Dict
+from pydantic import AfterValidator, BaseModel, Field, PrivateAttr, WrapValidator, field_validator, model_validator
+from typing import Annotated, List, Union, Any, Dict, Literal
 from fractions import Fraction
+from backend.utils.matrix_parser import parse_vector, validate_matrix_input
 
 # Definición para un elemento de matriz que puede ser int, float, o str (para fracciones)
 MatrixElement = Union[int, float, str]
@@ -11,32 +12,94 @@ Matrix = List[List[Fraction]]         # Para uso interno con Fracciones
 OutputMatrix = List[List[str]]        # Para la salida, con fracciones como strings
 OutputVector = List[str]              # Para la salida de un vector solución, con fracciones como strings
 
+# Formato plano de una matriz: dimensiones y elementos fila por fila (ver backend/utils/matrix_parser.py)
+class FlatMatrix(BaseModel):
+    rows: int = Field(..., ge=0, description="Número de filas")
+    cols: int = Field(..., ge=0, description="Número de columnas")
+    data: List[MatrixElement] = Field(..., description="rows*cols elementos, fila por fila")
+
+# Formatos dispersos de una matriz: sólo los elementos no nulos, índices base 0 (ver backend/utils/matrix_parser.py)
+class CSRMatrix(BaseModel):
+    rows: int = Field(..., ge=0, description="Número de filas")
+    cols: int = Field(..., ge=0, description="Número de columnas")
+    row_ptr: List[int] = Field(..., description="rows+1 índices: los elementos de la fila i son values[row_ptr[i]:row_ptr[i+1]]")
+    col_idx: List[int] = Field(..., description="Columna de cada elemento de values")
+    values: List[MatrixElement] = Field(..., description="Elementos no nulos, fila por fila")
+
+class SparseRowsMatrix(BaseModel):
+    rows: int = Field(..., ge=0, description="Número de filas")
+    cols: int = Field(..., ge=0, description="Número de columnas")
+    entries: Dict[str, Dict[str, MatrixElement]] = Field(..., description="{fila: {columna: valor}} con los elementos no nulos")
+
+# Entradas de los modelos: InputMatrix (o FlatMatrix, CSRMatrix, SparseRowsMatrix), convertida a
+# Fraction al validar el modelo, en una sola pasada (ver backend/utils/matrix_parser.py)
+ParsedMatrix = Annotated[InputMatrix, WrapValidator(validate_matrix_input, json_schema_input_type=Union[InputMatrix, FlatMatrix, CSRMatrix, SparseRowsMatrix])]
+ParsedVector = Annotated[List[MatrixElement], AfterValidator(parse_vector)]
+
+# Nivel de detalle de los pasos (ver backend/utils/steps.py)
+StepsMode = Literal["none", "summary", "full"]
+StepsFormat = Literal["text", "json"]
+OutputFormat = Literal["nested", "flat"]
+
+# Opciones comunes a todas las entradas: nivel de detalle y formato de los pasos devueltos, y formato
+# de las matrices del resultado (ver backend/utils/wire_format.py)
+class StepsOption(BaseModel):
+    steps: StepsMode = Field("full", description="Detalle de los pasos: none (sin pasos), summary (sólo resumen) o full (todos los pasos).")
+    steps_format: StepsFormat = Field("text", description="Formato de los pasos: text (líneas de texto) o json (operaciones de fila y matrices como objetos compactos).")
+    output_format: OutputFormat = Field("nested", description="Formato de las matrices del resultado: nested (lista de filas) o flat ({\"rows\", \"cols\", \"data\"}).")
+
 # Modelo Pydantic para la entrada de una matriz
-class MatrixInput(BaseModel):
-    matrix: InputMatrix
+class MatrixInput(StepsOption):
+    matrix: ParsedMatrix
+
+# Modelo Pydantic para la entrada del determinante, con el método de cálculo opcional
+class DeterminantInput(MatrixInput):
+    method: Literal["auto", "gaussian", "bareiss", "modular", "sparse"] = Field("auto", description="Método de cálculo: auto (Gauss para matrices pequeñas, Bareiss para grandes, eliminación dispersa para grandes con pocos no nulos), gaussian, bareiss, modular (residuos módulo primos + CRT) o sparse (eliminación dispersa con pivotes de Markowitz).")
+
+# Modelo Pydantic para la entrada de la factorización LU, con el tipo de pivoteo opcional
+class LUInput(MatrixInput):
+    pivoting: Literal["none", "partial"] = Field("none", description="none: Doolittle sin pivoteo (A = LU); partial: pivoteo parcial por máximo valor absoluto (PA = LU).")
 
 # Modelo Pydantic para la entrada de dos matrices
-class TwoMatrixInput(BaseModel):
-    matrix_a: InputMatrix
-    matrix_b: InputMatrix
+class TwoMatrixInput(StepsOption):
+    matrix_a: ParsedMatrix
+    matrix_b: ParsedMatrix
+
+# Modelo Pydantic para la entrada de un sistema de ecuaciones Ax=b (o AX=B con varios lados derechos)
+class SystemInput(StepsOption):
+    matrix_a: ParsedMatrix  # Coeficientes de la matriz A
+    vector_b: Union[ParsedVector, None] = None  # Vector de constantes b
+    matrix_b: Union[ParsedMatrix, None] = Field(None, description="Matriz B (n x k) con k lados derechos; alternativa a vector_b. Se elimina [A|B] una sola vez.")
+    bandwidth: Union[int, None] = Field(None, ge=0, description="Semiancho de banda declarado de A (A(i,j) = 0 si |i-j| > bandwidth): resuelve con el solver en banda (Thomas si es 1). Sin declararlo, la banda se detecta.")
+
+    @model_validator(mode='after')
+    def check_single_right_hand_side(self):
+        if (self.vector_b is None) == (self.matrix_b is None):
+            raise ValueError("Se debe proporcionar vector_b o matrix_b (pero no ambos).")
+        return self
+
+# Modelo Pydantic para un trabajo de /operations/batch: nombre de la operación y sus operandos
+class BatchJob(BaseModel):
+    op: str = Field(..., description="Operación a ejecutar (e.g. determinant, inverse, solve_system_gaussian).")
+    operands: Dict[str, Any] = Field(..., description="Cuerpo que recibiría el endpoint individual /operations/<op>.")
 
-# Modelo Pydantic para la entrada de un sistema de ecuaciones Ax=b
-class SystemInput(BaseModel):
-    matrix_a: InputMatrix  # Coeficientes de la matriz A
-    vector_b: List[MatrixElement]  # Vector de constantes b
+# Modelo Pydantic para la entrada de /operations/batch
+class BatchInput(BaseModel):
+    jobs: List[BatchJob]
 
 # Nuevo modelo para el resultado de la Factorización LU
 class LUFactorizationResult(BaseModel):
     matrix_l: OutputMatrix = Field(..., description="Matriz triangular inferior L")
     matrix_u: OutputMatrix = Field(..., description="Matriz triangular superior U")
-    # Podríamos añadir una matriz de permutación P si implementamos LUP
+    matrix_p: Union[OutputMatrix, None] = Field(None, description="Matriz de permutación P (PA = LU), presente si se usó pivoteo parcial")
 
 # Modelo Pydantic para la respuesta estándar de la API
 class ApiResponse(BaseModel):
     success: bool
     result: Union[OutputMatrix, str, LUFactorizationResult, Dict[str, Any], None] = Field(None, description="Resultado de la operación. Puede ser una matriz, un escalar (string), un objeto con L y U, un objeto de solución de sistema, o nulo.")
-    steps: Union[List[str], None] = Field(None, description="Pasos detallados del cálculo.")
+    steps: Union[List[Union[str, Dict[str, Any]]], None] = Field(None, description="Pasos detallados del cálculo (strings, y objetos {\"op\": ...} si steps_format es json).")
     error: Union[str, None] = Field(None, description="Mensaje de error si success es false.")
+    _json: Union[bytes, None] = PrivateAttr(None) # JSON ya serializado (ver backend/utils/responses.py)
 
     @field_validator('result', mode='before')
     def set_result_none_if_not_success(cls, v, values):
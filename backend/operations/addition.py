@@ -1,18 +1,26 @@
 from fastapi import APIRouter
-from fractions import Fraction
 
 from backend.models import TwoMatrixInput, ApiResponse
-from backend.utils.validators import validar_dimensiones_para_suma_resta
-from backend.utils.type_converters import to_fraction, format_fraction_output
-from backend.utils.formatters import format_matrix_for_steps
+from backend.utils.validators import validar_dimensiones_para_suma_resta, validar_costo_operacion
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixValueError, matrix_fractions, matrix_sparse
+from backend.core.rational_matrix import RationalMatrix
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
 
 @router.post("/add", response_model=ApiResponse, summary="Suma de dos matrices")
-async def add_matrices(data: TwoMatrixInput):
+@cached_result("add")
+@compact_output
+@offloaded("add")
+def add_matrices(data: TwoMatrixInput):
     """
     Suma dos matrices A y B. Los elementos pueden ser números o fracciones (ej. "1/2", "1 / 2").
-    Valida la compatibilidad de dimensiones (hasta 4x4) y la validez de los elementos.
+    Valida la compatibilidad de dimensiones, el costo estimado de la operación y la validez de los elementos.
     Retorna la matriz resultante con elementos como enteros o strings de fracción.
     Incluye pasos del proceso en la respuesta, con formato mejorado para matrices.
     """
@@ -22,34 +30,44 @@ async def add_matrices(data: TwoMatrixInput):
     if error_validacion_dim: return ApiResponse(success=False, error=error_validacion_dim)  # Si la validación falla, retorna un error en la respuesta
     
     num_filas = len(raw_matrix_a)  # Obtiene el número de filas de la matriz A
-    num_columnas = len(raw_matrix_a[0]) if num_filas > 0 else 0  # Obtiene el número de columnas de la matriz A (si hay filas)
+    num_columnas = raw_matrix_a.cols if num_filas > 0 else 0  # Obtiene el número de columnas de la matriz A (si hay filas; registrado al convertir la entrada)
     
-    try:
-        frac_matrix_a = [[to_fraction(el) for el in row] for row in raw_matrix_a]  # Convierte los elementos de la matriz A a objetos Fraction
-        frac_matrix_b = [[to_fraction(el) for el in row] for row in raw_matrix_b]  # Convierte los elementos de la matriz B a objetos Fraction
-    except ValueError as e: return ApiResponse(success=False, error=str(e))  # Si la conversión falla, retorna un error en la respuesta
+    try: dispersa_a = matrix_sparse(raw_matrix_a)  # Representación dispersa de A (None si conviene el camino denso, ver backend/core/sparse_matrix.py)
+    except MatrixValueError as e: return ApiResponse(success=False, error=e.detail("A"))  # Si la conversión falla, retorna un error en la respuesta (con la posición del elemento)
+    try: dispersa_b = matrix_sparse(raw_matrix_b)  # Representación dispersa de B
+    except MatrixValueError as e: return ApiResponse(success=False, error=e.detail("B"))  # Si la conversión falla, retorna un error en la respuesta (con la posición del elemento)
+    usar_dispersa = dispersa_a is not None and dispersa_b is not None  # La suma dispersa sólo conviene si ambas matrices son dispersas
+    densidad = max(dispersa_a.density, dispersa_b.density) if usar_dispersa else 1.0  # Fracción de elementos no nulos que se recorren
+    try: frac_matrix_a = None if usar_dispersa else matrix_fractions(raw_matrix_a)  # Matriz A como objetos Fraction, sólo para el camino denso (convertida al validar la entrada)
+    except MatrixValueError as e: return ApiResponse(success=False, error=e.detail("A"))  # La forma densa de una entrada dispersa puede exceder el presupuesto de memoria
+    try: frac_matrix_b = None if usar_dispersa else matrix_fractions(raw_matrix_b)  # Matriz B como objetos Fraction, sólo para el camino denso (convertida al validar la entrada)
+    except MatrixValueError as e: return ApiResponse(success=False, error=e.detail("B"))  # La forma densa de una entrada dispersa puede exceder el presupuesto de memoria
+    error_costo = validar_costo_operacion("add", [dispersa_a, dispersa_b] if usar_dispersa else [frac_matrix_a, frac_matrix_b], num_filas, num_columnas, con_pasos=data.steps == "full", densidad=densidad)  # Valida el tamaño contra la política de costo configurada
+    if error_costo: return ApiResponse(success=False, error=error_costo)  # Si la operación excede el presupuesto de costo, retorna un error en la respuesta
     
-    resultado_frac = [[Fraction(0) for _ in range(num_columnas)] for _ in range(num_filas)]  # Inicializa la matriz resultante con elementos Fraction(0)
-    pasos = ["Inicio de la suma de matrices A y B."]  # Inicializa la lista de pasos con un mensaje de inicio
+    if usar_dispersa: resultado = dispersa_a.add(dispersa_b)  # Calcula C = A + B recorriendo sólo los elementos no nulos
+    else: resultado = RationalMatrix.from_fractions(frac_matrix_a).add(RationalMatrix.from_fractions(frac_matrix_b))  # Calcula C = A + B con el motor de matrices racionales
+    pasos = StepLog(data.steps, ["Inicio de la suma de matrices A y B."], steps_format=data.steps_format)  # Inicializa el registro de pasos (con el nivel de detalle pedido) con un mensaje de inicio
+    if usar_dispersa: pasos.append(f"Matrices dispersas ({dispersa_a.nnz} y {dispersa_b.nnz} elementos no nulos de {num_filas * num_columnas}): se suman sólo los elementos no nulos.")  # Informa el camino disperso
     
-    output_matrix_a_for_steps = [[format_fraction_output(el) for el in row] for row in frac_matrix_a]  # Formatea la matriz A para mostrar en los pasos
-    pasos.extend(format_matrix_for_steps(output_matrix_a_for_steps, "Matriz A"))  # Agrega la matriz A formateada a la lista de pasos
-    output_matrix_b_for_steps = [[format_fraction_output(el) for el in row] for row in frac_matrix_b]  # Formatea la matriz B para mostrar en los pasos
-    pasos.extend(format_matrix_for_steps(output_matrix_b_for_steps, "Matriz B"))  # Agrega la matriz B formateada a la lista de pasos
+    if pasos.enabled:  # Las matrices de entrada sólo se formatean si se devuelven pasos
+        pasos.input_matrix(raw_matrix_a, "Matriz A")  # Agrega la matriz A a la lista de pasos (la forma densa de una entrada dispersa se crea sólo aquí)
+        pasos.input_matrix(raw_matrix_b, "Matriz B")  # Agrega la matriz B a la lista de pasos
     
     pasos.append("Calculando cada elemento de la matriz resultante C = A + B:")  # Agrega un mensaje a la lista de pasos
-    if num_columnas > 0:  # Si hay columnas en las matrices
+    if num_columnas > 0 and pasos.detailed:  # Si hay columnas en las matrices y se piden los pasos elemento a elemento
         for i in range(num_filas):  # Itera sobre las filas
             for j in range(num_columnas):  # Itera sobre las columnas
-                a_ij = frac_matrix_a[i][j]  # Obtiene el elemento A(i,j) como Fraction
-                b_ij = frac_matrix_b[i][j]  # Obtiene el elemento B(i,j) como Fraction
-                suma_elemento_frac = a_ij + b_ij  # Suma los elementos A(i,j) y B(i,j)
-                resultado_frac[i][j] = suma_elemento_frac  # Asigna la suma al elemento C(i,j) de la matriz resultante
+                a_ij = dispersa_a.get(i, j) if usar_dispersa else frac_matrix_a[i][j]  # Obtiene el elemento A(i,j) como Fraction
+                b_ij = dispersa_b.get(i, j) if usar_dispersa else frac_matrix_b[i][j]  # Obtiene el elemento B(i,j) como Fraction
+                if usar_dispersa and not a_ij and not b_ij: continue  # En matrices dispersas sólo se detallan los elementos con algún sumando no nulo
+                suma_elemento_frac = resultado.get(i, j)  # Obtiene el elemento C(i,j) = A(i,j) + B(i,j) de la matriz resultante
                 str_a_ij = format_fraction_output(a_ij)  # Formatea el elemento A(i,j) para mostrar en los pasos
                 str_b_ij = format_fraction_output(b_ij)  # Formatea el elemento B(i,j) para mostrar en los pasos
                 str_suma = format_fraction_output(suma_elemento_frac)  # Formatea la suma para mostrar en los pasos
                 pasos.append(f"  C({i+1},{j+1}) = A({i+1},{j+1}) + B({i+1},{j+1}) = {str_a_ij} + {str_b_ij} = {str_suma}")  # Agrega el paso de suma a la lista de pasos
                 
-    resultado_output = [[format_fraction_output(el) for el in row] for row in resultado_frac]  # Formatea la matriz resultante para la salida
+        if usar_dispersa: pasos.append("  Los demás elementos de C son 0.")  # Los elementos omitidos son 0 + 0
+    resultado_output = [[format_fraction_output(el) for el in row] for row in resultado.to_fractions()]  # Formatea la matriz resultante para la salida
     pasos.append("Suma completada.")  # Agrega un mensaje de finalización a la lista de pasos
-    return ApiResponse(success=True, result=resultado_output, steps=pasos)  # Retorna la respuesta exitosa con la matriz resultante y los pasos
\ No newline at end of file
+    return ApiResponse(success=True, result=resultado_output, steps=pasos.for_response())  # Retorna la respuesta exitosa con la matriz resultante y los pasos
\ No newline at end of file
@@ -0,0 +1,61 @@
+import asyncio
+import os
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from backend.models import BatchInput, BatchJob, ApiResponse
+from backend.operations.registry import OPERATIONS
+
+router = APIRouter()
+
+# Variables de entorno:
+#   MATRIX_BATCH_MAX_JOBS  Número máximo de trabajos por solicitud a /operations/batch. Por defecto 1000.
+BATCH_MAX_JOBS = int(os.environ.get("MATRIX_BATCH_MAX_JOBS", 1000))
+
+
+def _run_job(job: BatchJob) -> Dict[str, Any]:
+    """
+    Ejecuta un trabajo con la misma validación y cálculo que su endpoint individual.
+    Los errores (operación desconocida, 422 de validación, 400 de HTTPException y cualquier error
+    inesperado, como 500) se reportan en el resultado del trabajo en lugar de abortar el lote.
+    """
+    if job.op not in OPERATIONS:
+        disponibles = ", ".join(OPERATIONS)
+        return {"op": job.op, "success": False, "status_code": 400, "result": None, "steps": None,
+                "error": f"Operación desconocida: '{job.op}'. Operaciones disponibles: {disponibles}."}
+
+    input_model, operation = OPERATIONS[job.op]
+    try:
+        response = operation(input_model.model_validate(job.operands))
+    except ValidationError as e:
+        return {"op": job.op, "success": False, "status_code": 422, "result": None, "steps": None,
+                "error": e.errors(include_url=False, include_context=False, include_input=False)}
+    except HTTPException as e:
+        return {"op": job.op, "success": False, "status_code": e.status_code, "result": None, "steps": None, "error": e.detail}
+    except Exception as e: # Un trabajo que falla no cancela los demás del asyncio.gather
+        return {"op": job.op, "success": False, "status_code": 500, "result": None, "steps": None, "error": f"Error inesperado: {str(e)}"}
+    return {"op": job.op, "status_code": 200, **response.model_dump()}
+
+
+@router.post("/batch", response_model=ApiResponse, summary="Ejecuta varias operaciones matriciales independientes en una sola solicitud")
+async def batch_operations_endpoint(data: BatchInput):
+    """
+    Ejecuta una lista de trabajos heterogéneos ({"op": ..., "operands": {...}}) de forma concurrente
+    y retorna, en el mismo orden, el resultado o el error de cada uno en result["results"].
+    Cada trabajo se valida y calcula igual que en su endpoint /operations/<op>.
+    """
+    if not data.jobs:
+        raise HTTPException(status_code=400, detail="El lote debe contener al menos un trabajo.")
+    if len(data.jobs) > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"El lote contiene {len(data.jobs)} trabajos; el máximo permitido es {BATCH_MAX_JOBS}.")
+
+    results: List[Dict[str, Any]] = await asyncio.gather(*(run_in_threadpool(_run_job, job) for job in data.jobs))
+    failed = sum(1 for result in results if not result["success"])
+    return ApiResponse(
+        success=True,
+        result={"results": results, "total": len(results), "failed": failed},
+        steps=None
+    )
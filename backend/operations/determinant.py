@@ -1,23 +1,154 @@
 from fastapi import APIRouter, HTTPException
-from typing import List
+from typing import List, Optional
 from fractions import Fraction
 
-from backend.models import MatrixInput, ApiResponse, Matrix
-from backend.utils.type_converters import to_fraction, format_fraction_output
-from backend.utils.formatters import format_matrix_for_steps
-from backend.utils.validators import validar_matriz
+from backend.models import DeterminantInput, ApiResponse, Matrix
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixValueError, matrix_fractions, matrix_sparse
+from backend.utils.validators import validar_matriz, validar_costo_operacion
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
+from backend.core.rational_matrix import RationalMatrix
+from backend.core.bareiss import bareiss_determinant
+from backend.core.modular import modular_determinant, modular_rank
+from backend.core.lup import LUPFactors
+from backend.core.sparse_matrix import SparseMatrix, permutation_sign, sparse_eliminate
+from backend.core.structure import BLOCK_DIAGONAL, GENERAL, PERMUTATION, MatrixStructure, detect_structure, structured_determinant, use_structure_shortcuts
+from backend.core.ldlt import LDLT_MIN_DIMENSION, LDLTBreakdown, is_symmetric, ldlt_factorize, pack_lower
+from backend.core.factor_cache import FACTOR_CACHE
 
-router = APIRouter()
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
 
-def _calculate_determinant_gaussian(matrix_input: List[List[Fraction]], steps_ref: List[str]) -> Fraction:
+# A partir de esta dimensión la eliminación sin fracciones de Bareiss es más barata que el bucle
+# con Fraction (y los pasos fila a fila dejan de ser legibles). Por debajo se mantiene la eliminación
+# Gaussiana, que produce los pasos didácticos.
+BAREISS_MIN_DIMENSION = 5
+
+def _should_use_bareiss(matrix_input: List[List[Fraction]], detailed_steps: bool = True) -> bool:
+    """
+    Decide si el determinante debe calcularse con Bareiss en lugar del bucle Gaussiano con Fraction.
+    Si no se piden los pasos detallados, Bareiss es preferible para cualquier dimensión.
+    """
+    return not detailed_steps or len(matrix_input) >= BAREISS_MIN_DIMENSION
+
+def _calculate_determinant_bareiss(matrix_input: List[List[Fraction]], steps_ref: StepLog) -> Fraction:
+    """
+    Calcula el determinante con la eliminación sin fracciones de Bareiss.
+    Las entradas racionales se escalan por fila a una matriz entera y sólo se hacen divisiones enteras exactas.
+    Añade un resumen del cálculo a steps_ref.
+    """
+    matrix = RationalMatrix.from_fractions(matrix_input)
+    steps_ref.append("Calculando el determinante mediante eliminación de Bareiss (sin fracciones):")
+    if not matrix.is_integer():
+        scale = 1
+        for den in matrix.dens:
+            scale *= den
+        steps_ref.append(f"  Cada fila se multiplica por el denominador común de sus elementos para obtener una matriz entera N; det(A) = det(N) / {scale}.")
+    determinant_value, swaps = bareiss_determinant(matrix)
+    if swaps:
+        steps_ref.append(f"  Se realizaron {swaps} intercambio(s) de filas (multiplicador del determinante: {format_fraction_output(Fraction((-1) ** swaps))}).")
+    steps_ref.append(f"  det(A) = {format_fraction_output(determinant_value)}")
+    return determinant_value
+
+def _calculate_determinant_modular(matrix_input: List[List[Fraction]], steps_ref: StepLog) -> Fraction:
+    """
+    Calcula el determinante con el motor multimodular: eliminación módulo primos de 31 bits
+    (independientes entre sí, repartibles entre procesos) y reconstrucción con el Teorema Chino del Resto.
+    Si el determinante es 0, informa además el rango exacto de la matriz.
+    Añade un resumen del cálculo a steps_ref.
+    """
+    matrix = RationalMatrix.from_fractions(matrix_input)
+    steps_ref.append("Calculando el determinante mediante el método multimodular (residuos módulo primos + CRT):")
+    if not matrix.is_integer():
+        scale = 1
+        for den in matrix.dens:
+            scale *= den
+        steps_ref.append(f"  Cada fila se multiplica por el denominador común de sus elementos para obtener una matriz entera N; det(A) = det(N) / {scale}.")
+    determinant_value, primes_used, bound_bits = modular_determinant(matrix)
+    steps_ref.append(f"  Cota de Hadamard: |det(N)| <= 2^{bound_bits:.1f}; se usaron {primes_used} primo(s) de 31 bits.")
+    steps_ref.append(f"  Los residuos det(N) mod p se combinaron con el Teorema Chino del Resto.")
+    steps_ref.append(f"  det(A) = {format_fraction_output(determinant_value)}")
+    if determinant_value == 0:
+        steps_ref.append(f"  La matriz es singular: rango(A) = {modular_rank(matrix)}")
+    return determinant_value
+
+def _calculate_determinant_sparse(matrix: SparseMatrix, steps_ref: StepLog) -> Fraction:
+    """
+    Calcula el determinante con eliminación dispersa: sólo se recorren los elementos no nulos y los
+    pivotes se eligen para generar el menor relleno (criterio de Markowitz, ver backend/core/sparse_matrix.py).
+    det(A) = sgn(P) * sgn(Q) * producto de los pivotes, con P y Q las permutaciones de filas y columnas.
+    Añade un resumen del cálculo a steps_ref.
+    """
+    steps_ref.append("Calculando el determinante mediante eliminación dispersa (pivotes elegidos para minimizar el relleno):")
+    steps_ref.append(f"  La matriz tiene {matrix.nnz} elementos no nulos de {matrix.rows * matrix.cols} (densidad {matrix.density:.1%}).")
+    elimination = sparse_eliminate(matrix)
+    steps_ref.append(f"  La eliminación generó {elimination.fill} elemento(s) no nulo(s) nuevo(s) (relleno).")
+    determinant_value = elimination.determinant()
+    if elimination.rank < matrix.rows:
+        steps_ref.append(f"  La matriz es singular: rango(A) = {elimination.rank}")
+    steps_ref.append(f"  det(A) = {format_fraction_output(determinant_value)}")
+    return determinant_value
+
+def _calculate_determinant_structured(matrix_input: List[List[Fraction]], structure: MatrixStructure, steps_ref: StepLog) -> Fraction:
+    """
+    Calcula el determinante con el atajo de la estructura detectada (ver backend/core/structure.py),
+    sin eliminación: producto de la diagonal (diagonal o triangular), signo de la permutación por el
+    producto de sus entradas, o producto de los determinantes de cada bloque.
+    """
+    steps_ref.append(f"Estructura detectada: {structure.description}. No se requiere eliminación.")
+    if structure.kind == PERMUTATION:
+        entries = " * ".join(format_fraction_output(matrix_input[i][j]) for i, j in enumerate(structure.perm))
+        steps_ref.append(f"  det(A) = sgn(P) * producto de las entradas no nulas = {permutation_sign(structure.perm)} * ({entries})")
+    elif structure.kind == BLOCK_DIAGONAL:
+        steps_ref.append("  det(A) = producto de los determinantes de cada bloque diagonal (cada bloque se calcula por separado).")
+    else:
+        diag_product_str = " * ".join(format_fraction_output(matrix_input[i][i]) for i in range(structure.n))
+        steps_ref.append(f"  det(A) = producto de los elementos de la diagonal = {diag_product_str}")
+    determinant_value = structured_determinant(matrix_input, structure)
+    steps_ref.append(f"         = {format_fraction_output(determinant_value)}")
+    return determinant_value
+
+def _calculate_determinant_ldlt(matrix_input: List[List[Fraction]], steps_ref: StepLog) -> Optional[Fraction]:
+    """
+    Determinante de una matriz simétrica con A = L D Lᵀ (ver backend/core/ldlt.py): det(A) = producto
+    de D, eliminando sólo el triángulo inferior. Retorna None si la factorización sin pivoteo no existe.
+    """
+    n = len(matrix_input)
+    steps_ref.append(f"Matriz simétrica: se factoriza A = L D Lᵀ sobre su triángulo inferior ({n * (n + 1) // 2} de {n * n} elementos).")
+    try:
+        factors = ldlt_factorize(pack_lower(matrix_input), n)
+    except LDLTBreakdown as e:
+        steps_ref.append(f"  {e} Se usa la eliminación de Bareiss con intercambio de filas.")
+        return None
+    determinant_value = factors.determinant()
+    steps_ref.append(f"  det(A) = det(L) * det(D) * det(Lᵀ) = producto de los pivotes de D = {format_fraction_output(determinant_value)}")
+    return determinant_value
+
+def _calculate_determinant_from_factors(factors: LUPFactors, steps_ref: StepLog) -> Fraction:
+    """
+    Calcula el determinante a partir de una factorización PA = LU ya calculada:
+    det(A) = (-1)^intercambios * producto de la diagonal de U. Costo O(n).
+    """
+    steps_ref.append("Se reutiliza la factorización PA = LU almacenada para esta matriz (calculada en /operations/lu_factorization).")
+    diag_product_str = " * ".join(format_fraction_output(factors.U.get(i, i)) for i in range(factors.n))
+    sign = Fraction(-1 if factors.swaps % 2 else 1)
+    determinant_value = factors.determinant()
+    steps_ref.append(f"  det(A) = {format_fraction_output(sign)} * ({diag_product_str})")
+    steps_ref.append(f"         = {format_fraction_output(determinant_value)}")
+    return determinant_value
+
+def _calculate_determinant_gaussian(matrix_input: List[List[Fraction]], steps_ref: StepLog) -> Fraction:
     """
     Calcula el determinante de una matriz utilizando eliminación Gaussiana.
     Transforma la matriz a una forma triangular superior.
     Añade pasos detallados del cálculo a steps_ref.
     """
-    # Crear una copia profunda para evitar modificar la lista de listas original si se pasa por referencia
-    matrix = [[val for val in row] for row in matrix_input]
-    n = len(matrix) # Obtiene la dimensión de la matriz (asumiendo que es cuadrada)
+    # Copia en el motor de matrices racionales para no modificar la lista de listas original
+    matrix = RationalMatrix.from_fractions(matrix_input)
+    n = matrix.rows # Obtiene la dimensión de la matriz (asumiendo que es cuadrada)
     determinant_multiplier = Fraction(1) # Inicializa el multiplicador del determinante para los intercambios de filas
 
     steps_ref.append("Transformando la matriz a forma triangular superior mediante eliminación Gaussiana:")
@@ -26,7 +157,7 @@ def _calculate_determinant_gaussian(matrix_input: List[List[Fraction]], steps_re
         # Encontrar pivote para esta columna
         pivot_row = -1 # Inicializa el índice de la fila pivote
         for i in range(h, n): # Busca una fila con un valor no nulo en la columna h, desde la fila h hasta el final
-            if matrix[i][h] != 0:
+            if not matrix.is_zero(i, h):
                 pivot_row = i # Si encuentra un valor no nulo, actualiza el índice de la fila pivote
                 break
         
@@ -38,38 +169,37 @@ def _calculate_determinant_gaussian(matrix_input: List[List[Fraction]], steps_re
 
         # Intercambiar filas si es necesario para mover el pivote a la diagonal
         if pivot_row != h:
-            matrix[h], matrix[pivot_row] = matrix[pivot_row], matrix[h] # Intercambia la fila actual con la fila pivote
+            matrix.swap_rows(h, pivot_row) # Intercambia la fila actual con la fila pivote
             determinant_multiplier *= -1 # Actualiza el multiplicador del determinante (cambia de signo)
-            steps_ref.append(f"Intercambiando Fila {h+1} con Fila {pivot_row+1} para obtener un pivote no nulo en A({h+1},{h+1}).")
-            steps_ref.append(f"  (Multiplicador del determinante actual: {format_fraction_output(determinant_multiplier)})")
-            steps_ref.extend(format_matrix_for_steps(matrix, "Matriz después del intercambio"))
+            steps_ref.row_op("swap", "Intercambiando Fila {row} con Fila {other} para obtener un pivote no nulo en A({row},{row}).", row=h + 1, other=pivot_row + 1)
+            steps_ref.row_op("sign", "  (Multiplicador del determinante actual: {value})", value=determinant_multiplier)
+            steps_ref.snapshot(matrix, "Matriz después del intercambio", rows=(h, pivot_row))
 
         # Eliminar otras filas
         # El elemento pivote es matrix[h][h]
-        pivot_element = matrix[h][h] # Obtiene el valor del elemento pivote
-        steps_ref.append(f"Pivote actual A({h+1},{h+1}) = {format_fraction_output(pivot_element)}")
+        pivot_element = matrix.get(h, h) # Obtiene el valor del elemento pivote
+        steps_ref.row_op("pivot", "Pivote actual A({row},{col}) = {value}", row=h + 1, col=h + 1, value=pivot_element)
 
         for i in range(h + 1, n): # Para todas las filas debajo del pivote
-            if matrix[i][h] != 0: # Si el elemento debajo del pivote no es cero
-                factor = matrix[i][h] / pivot_element # Calcula el factor para eliminar el elemento
-                operation_description = f"F{i+1} = F{i+1} - ({format_fraction_output(factor)}) * F{h+1}" # Describe la operación de fila
-                steps_ref.append(f"Eliminando elemento A({i+1},{h+1}) usando la operación: {operation_description}")
+            if not matrix.is_zero(i, h): # Si el elemento debajo del pivote no es cero
+                factor = matrix.get(i, h) / pivot_element # Calcula el factor para eliminar el elemento
+                steps_ref.row_op("eliminate", "Eliminando elemento A({row},{col}) usando la operación: F{row} = F{row} - ({factor}) * F{source}", row=i + 1, col=h + 1, source=h + 1, factor=factor)
                 
-                # Aplicar operación de fila
-                for j in range(h, n): # Iterar a través de las columnas de la fila actual
-                    matrix[i][j] -= factor * matrix[h][j] # Aplica la operación de fila para eliminar el elemento
+                # Aplicar operación de fila (columnas h..n-1) para eliminar el elemento
+                matrix.subtract_scaled_row(i, h, factor, start=h)
                 
-                steps_ref.extend(format_matrix_for_steps(matrix, "Matriz después de la operación"))
+                steps_ref.snapshot(matrix, "Matriz después de la operación", rows=(i,))
 
     # La matriz ahora está en forma triangular superior. El determinante es el producto de los elementos diagonales * multiplicador
     steps_ref.append("La matriz está en forma triangular superior.")
-    steps_ref.extend(format_matrix_for_steps(matrix, "Matriz triangular superior final"))
+    steps_ref.matrix(matrix, "Matriz triangular superior final")
 
     determinant_value = determinant_multiplier # Inicializa el valor del determinante con el multiplicador
     diag_product_str_parts = []
     for i in range(n):
-        determinant_value *= matrix[i][i] # Multiplica el determinante por el elemento diagonal
-        diag_product_str_parts.append(format_fraction_output(matrix[i][i])) # Guarda el elemento diagonal formateado para mostrar
+        diagonal_element = matrix.get(i, i)
+        determinant_value *= diagonal_element # Multiplica el determinante por el elemento diagonal
+        diag_product_str_parts.append(format_fraction_output(diagonal_element)) # Guarda el elemento diagonal formateado para mostrar
     
     diag_product_str = " * ".join(diag_product_str_parts) # Une los elementos diagonales formateados con " * "
     if n > 0 :
@@ -84,8 +214,11 @@ def _calculate_determinant_gaussian(matrix_input: List[List[Fraction]], steps_re
     return determinant_value
 
 @router.post("/determinant", response_model=ApiResponse, summary="Cálculo de determinante de una matriz usando Eliminación Gaussiana")
-async def calculate_determinant_endpoint(data: MatrixInput):
-    steps: List[str] = []
+@cached_result("determinant")
+@compact_output
+@offloaded("determinant")
+def calculate_determinant_endpoint(data: DeterminantInput):
+    steps = StepLog(data.steps, steps_format=data.steps_format)
 
     # 1. Validación
     rows, cols, error_msg_val = validar_matriz(data.matrix, "suministrada") 
@@ -97,47 +230,78 @@ async def calculate_determinant_endpoint(data: MatrixInput):
     if rows is None or cols is None: # No debería ocurrir si error_msg_val es None, pero como salvaguarda
         raise HTTPException(status_code=400, detail="Error al obtener dimensiones de la matriz.")
 
-    if rows > 4:
-        raise HTTPException(status_code=400, detail=f"La operación está limitada a matrices de hasta 4 filas. Se recibió una matriz con {rows} filas.")
-    if cols > 4:
-        raise HTTPException(status_code=400, detail=f"La operación está limitada a matrices de hasta 4 columnas. Se recibió una matriz con {cols} columnas.")
     if rows != cols:
         raise HTTPException(status_code=400, detail=f"La matriz debe ser cuadrada para calcular el determinante. Se recibió una matriz de {rows}x{cols}.")
     
     n = rows # Tamaño de la matriz cuadrada
 
-    # 2. Conversión de tipo
-    matrix_a_frac: List[List[Fraction]] = []
+    # 2. Conversión de tipo (convertida al validar la entrada)
     try:
-        for i, row_data in enumerate(data.matrix):
-            if len(row_data) != n: # Redundante si validar_matriz verifica rectangularidad
-                 raise ValueError(f"La fila {i+1} tiene {len(row_data)} elementos, se esperaban {n}.")
-            matrix_a_frac.append([to_fraction(val) for val in row_data])
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        # Representación dispersa: automática si la matriz es grande y con pocos no nulos (ver backend/core/sparse_matrix.py).
+        # En el camino disperso no se crea la forma densa de una entrada dispersa (ver matrix_parser.py).
+        sparse_matrix = matrix_sparse(data.matrix, force=data.method == "sparse") if data.method in ("auto", "sparse") else None
+        matrix_a_frac: Optional[List[List[Fraction]]] = matrix_fractions(data.matrix) if sparse_matrix is None else None
+    except MatrixValueError as e:
+        raise HTTPException(status_code=400, detail=e.detail("A"))
+
+    # Estructura (diagonal, triangular, permutación, por bloques): en auto evita la eliminación (ver backend/core/structure.py).
+    # Las matrices pequeñas con pasos detallados siguen la eliminación Gaussiana didáctica, como con Bareiss, y
+    # las dispersas la eliminación dispersa, que en esas estructuras no genera relleno.
+    structure = detect_structure(matrix_a_frac) if data.method == "auto" and n > 1 and sparse_matrix is None and use_structure_shortcuts(n, steps.detailed) else None
+    use_structure = structure is not None and structure.kind != GENERAL
+
+    # Simétrica y densa, sin otra estructura: LDLᵀ con la mitad de las operaciones (mismo criterio de tamaño para los pasos detallados)
+    symmetric = (data.method == "auto" and n > 1 and structure is not None and not use_structure and sparse_matrix is None
+                 and (not steps.detailed or n >= LDLT_MIN_DIMENSION) and is_symmetric(matrix_a_frac))
+
+    # Sólo la eliminación Gaussiana genera instantáneas fila a fila; Bareiss, el método multimodular, la eliminación dispersa y los atajos por estructura resumen el cálculo.
+    pasos_detallados = steps.detailed and sparse_matrix is None and not use_structure and not symmetric and (data.method == "gaussian" or (data.method == "auto" and not _should_use_bareiss(matrix_a_frac)))
+    operacion_costo = "determinant_modular" if data.method == "modular" else "substitution" if use_structure and structure.direct else "ldlt_factorization" if symmetric else "determinant"
+    error_costo = validar_costo_operacion(operacion_costo, [matrix_a_frac if sparse_matrix is None else sparse_matrix], n, n, con_pasos=pasos_detallados, densidad=sparse_matrix.density if sparse_matrix is not None else 1.0)
+    if error_costo:
+        raise HTTPException(status_code=400, detail=error_costo)
 
     steps.append("Matriz de entrada A:")
-    steps.extend(format_matrix_for_steps(matrix_a_frac, f"A ({n}x{n})"))
+    steps.input_matrix(data.matrix, f"A ({n}x{n})")
 
-    # 3. Cálculo del determinante usando eliminación Gaussiana
+    # 3. Cálculo del determinante usando eliminación Gaussiana (o Bareiss para matrices grandes, o el método pedido)
     determinant_value: Fraction
+    method_name = "eliminación Gaussiana"
     
     if n == 0: # Debería ser detectado por validar_matriz
         determinant_value = Fraction(1) # O 0, por convención. validar_matriz debería prevenir esto.
         steps.append("La matriz está vacía. El determinante de una matriz 0x0 es 1 por convención.")
     elif n == 1:
-        determinant_value = matrix_a_frac[0][0]
+        determinant_value = matrix_a_frac[0][0] if sparse_matrix is None else sparse_matrix.get(0, 0)
         steps.append(f"La matriz es 1x1. El determinante es el único elemento: det(A) = {format_fraction_output(determinant_value)}")
-    else: # n > 1 (es decir, 2x2, 3x3, 4x4)
+    elif data.method == "auto" and not steps.detailed and (cached_factors := FACTOR_CACHE.get(matrix_a_frac if sparse_matrix is None else sparse_matrix)) is not None:
+        determinant_value = _calculate_determinant_from_factors(cached_factors, steps)
+        method_name = "la factorización LU almacenada"
+    elif use_structure:
+        determinant_value = _calculate_determinant_structured(matrix_a_frac, structure, steps)
+        method_name = "el atajo para la estructura detectada"
+    elif symmetric and (ldlt_value := _calculate_determinant_ldlt(matrix_a_frac, steps)) is not None:
+        determinant_value = ldlt_value
+        method_name = "la factorización LDLᵀ"
+    elif sparse_matrix is not None: # sparse, o auto con una matriz dispersa
+        determinant_value = _calculate_determinant_sparse(sparse_matrix, steps)
+        method_name = "eliminación dispersa"
+    elif data.method == "modular":
+        determinant_value = _calculate_determinant_modular(matrix_a_frac, steps)
+        method_name = "el método multimodular (CRT)"
+    elif data.method == "bareiss" or (data.method == "auto" and _should_use_bareiss(matrix_a_frac, steps.detailed)):
+        determinant_value = _calculate_determinant_bareiss(matrix_a_frac, steps)
+        method_name = "eliminación de Bareiss"
+    else: # gaussian, o auto con 1 < n < BAREISS_MIN_DIMENSION
         determinant_value = _calculate_determinant_gaussian(matrix_a_frac, steps)
 
     # 4. Formatear salida
     formatted_determinant = format_fraction_output(determinant_value)
     
-    steps.append(f"El determinante final (calculado mediante eliminación Gaussiana) de la matriz A es: {formatted_determinant}")
+    steps.append(f"El determinante final (calculado mediante {method_name}) de la matriz A es: {formatted_determinant}")
 
     return ApiResponse(
         success=True,
         result=formatted_determinant,
-        steps=steps
+        steps=steps.for_response()
     ) 
\ No newline at end of file
@@ -3,16 +3,65 @@ from typing import List, Tuple, Optional
 from fractions import Fraction
 
 from backend.models import SystemInput, ApiResponse, Matrix, OutputMatrix
-from backend.utils.type_converters import to_fraction, format_fraction_output
-from backend.utils.formatters import format_matrix_for_steps
-from backend.utils.validators import validar_matriz, validar_vector
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixValueError, matrix_fractions, vector_fractions
+from backend.utils.validators import validar_matriz, validar_vector, validar_costo_operacion
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
+from backend.core.rational_matrix import RationalMatrix
 
-router = APIRouter()
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
+
+def _reduce_to_rref(augmented_matrix: RationalMatrix, n_rows: int, n_cols_a: int, steps_ref: StepLog) -> int:
+    """
+    Lleva la matriz aumentada [A|b] (o [A|B]) a forma escalonada reducida, buscando pivotes sólo en
+    las n_cols_a columnas de A. Retorna el número de filas pivote, que es el rango de A.
+    """
+    pivot_row = 0 # Inicializa la fila del pivote
+    for col in range(n_cols_a): # Itera sobre las columnas de la matriz A
+        if pivot_row >= n_rows: break # Si la fila del pivote es mayor o igual al número de filas, termina el bucle
+
+        i_max = pivot_row # Inicializa el índice de la fila con el valor absoluto máximo
+        max_abs = abs(augmented_matrix.get(pivot_row, col)) # Valor absoluto máximo encontrado hasta ahora
+        for i in range(pivot_row + 1, n_rows): # Itera sobre las filas debajo de la fila del pivote
+            candidate_abs = abs(augmented_matrix.get(i, col))
+            if candidate_abs > max_abs: # Si el valor absoluto del elemento actual es mayor que el valor absoluto del elemento máximo actual
+                i_max, max_abs = i, candidate_abs # Actualiza el índice de la fila con el valor absoluto máximo
+        
+        # La aritmética es exacta (Fraction): sólo un cero exacto impide pivotear; una tolerancia
+        # descartaría entradas pequeñas pero no nulas como 0.0000000000001
+        if max_abs == 0: # Si toda la columna (desde la fila del pivote) es cero
+            steps_ref.row_op("skip", "  Pivote en columna {col} (para A({row},{col})) es cero o insignificante. Saltando esta columna.", row=pivot_row + 1, col=col + 1) # Registra la columna sin pivote
+            continue # Salta a la siguiente columna
+
+        if i_max != pivot_row: # Si el índice de la fila con el valor absoluto máximo no es igual a la fila del pivote
+            augmented_matrix.swap_rows(pivot_row, i_max) # Intercambia las filas
+            steps_ref.row_op("swap", "  Intercambiando Fila {row} con Fila {other}.", row=pivot_row + 1, other=i_max + 1) # Registra el intercambio
+            steps_ref.snapshot(augmented_matrix, "Después de intercambio", rows=(pivot_row, i_max)) # Registra la matriz aumentada (se formatea al serializar)
+
+        pivot_element = augmented_matrix.get(pivot_row, col) # Obtiene el elemento pivote
+        if pivot_element != 1: # Si el elemento pivote no es 1
+            steps_ref.row_op("scale", "  Normalizando Fila {row}: F{row} = F{row} / {divisor}", row=pivot_row + 1, divisor=pivot_element) # Registra la normalización
+            augmented_matrix.scale_row(pivot_row, 1 / pivot_element) # Divide cada elemento de la fila por el elemento pivote
+            steps_ref.snapshot(augmented_matrix, "Después de normalizar", rows=(pivot_row,)) # Registra la matriz aumentada (se formatea al serializar)
+        
+        for i in range(n_rows): # Itera sobre las filas
+            if i != pivot_row: # Si la fila actual no es la fila del pivote
+                if not augmented_matrix.is_zero(i, col): # Si el factor no es cero
+                    factor = augmented_matrix.get(i, col) # Obtiene el factor para eliminar
+                    steps_ref.row_op("eliminate", "  Eliminando en Fila {row}: F{row} = F{row} - ({factor}) * F{source}", row=i + 1, source=pivot_row + 1, factor=factor) # Registra la eliminación
+                    augmented_matrix.subtract_scaled_row(i, pivot_row, factor, start=col) # Elimina el elemento (columnas col..final)
+                    if steps_ref.detailed: steps_ref.snapshot(augmented_matrix, f"Después de F{i+1}", rows=(i,)) # Registra la matriz aumentada (se formatea al serializar)
+        pivot_row += 1 # Incrementa la fila del pivote
+    return pivot_row
 
 def _gauss_jordan_elimination(
     matrix_a_frac: Matrix, 
     vector_b_frac: List[Fraction], 
-    steps_ref: List[str]
+    steps_ref: StepLog
 ) -> Tuple[Optional[OutputMatrix], Optional[List[str]], str, bool, Optional[str]]:
     """
     Resuelve un sistema Ax=b usando eliminación de Gauss-Jordan.
@@ -32,52 +81,18 @@ def _gauss_jordan_elimination(
     if n_cols_a == 0: # Maneja el caso si matrix_a_frac es [[]] o similar
          return None, None, "Error: Matriz A no puede tener cero columnas.", False, "Matriz A sin columnas."
 
-    augmented_matrix: Matrix = [row[:] + [vector_b_frac[i]] for i, row in enumerate(matrix_a_frac)] # Crea la matriz aumentada [A|b]
+    augmented_matrix = RationalMatrix.from_fractions(matrix_a_frac).augment(RationalMatrix.column_vector(vector_b_frac)) # Crea la matriz aumentada [A|b]
     n_cols_aug = n_cols_a + 1 # Calcula el número de columnas de la matriz aumentada
     
     steps_ref.append("Matriz aumentada inicial [A|b]:") # Agrega un mensaje a los pasos
-    steps_ref.extend(format_matrix_for_steps(augmented_matrix, f"Aumentada ({n_rows}x{n_cols_aug})")) # Agrega la matriz aumentada formateada a los pasos
-
-    pivot_row = 0 # Inicializa la fila del pivote
-    for col in range(n_cols_a): # Itera sobre las columnas de la matriz A
-        if pivot_row >= n_rows: break # Si la fila del pivote es mayor o igual al número de filas, termina el bucle
-
-        i_max = pivot_row # Inicializa el índice de la fila con el valor absoluto máximo
-        for i in range(pivot_row + 1, n_rows): # Itera sobre las filas debajo de la fila del pivote
-            if abs(augmented_matrix[i][col]) > abs(augmented_matrix[i_max][col]): # Si el valor absoluto del elemento actual es mayor que el valor absoluto del elemento máximo actual
-                i_max = i # Actualiza el índice de la fila con el valor absoluto máximo
-        
-        # Usando un número muy pequeño para verificar el cero efectivo para el pivote
-        # Esta tolerancia podría necesitar ajuste dependiendo de la precisión esperada
-        if abs(augmented_matrix[i_max][col]) < Fraction(1, 10**12): # Si el valor absoluto del elemento máximo es menor que la tolerancia
-            steps_ref.append(f"  Pivote en columna {col+1} (para A({pivot_row+1},{col+1})) es cero o insignificante. Saltando esta columna.") # Agrega un mensaje a los pasos
-            continue # Salta a la siguiente columna
+    steps_ref.matrix(augmented_matrix.to_fractions(), f"Aumentada ({n_rows}x{n_cols_aug})") # Agrega la matriz aumentada formateada a los pasos
 
-        if i_max != pivot_row: # Si el índice de la fila con el valor absoluto máximo no es igual a la fila del pivote
-            augmented_matrix[pivot_row], augmented_matrix[i_max] = augmented_matrix[i_max], augmented_matrix[pivot_row] # Intercambia las filas
-            steps_ref.append(f"  Intercambiando Fila {pivot_row+1} con Fila {i_max+1}.") # Agrega un mensaje a los pasos
-            steps_ref.extend(format_matrix_for_steps(augmented_matrix, "Después de intercambio")) # Agrega la matriz aumentada formateada a los pasos
+    pivot_row = _reduce_to_rref(augmented_matrix, n_rows, n_cols_a, steps_ref) # Número de filas pivote (rango de A)
 
-        pivot_element = augmented_matrix[pivot_row][col] # Obtiene el elemento pivote
-        if pivot_element != 1: # Si el elemento pivote no es 1
-            steps_ref.append(f"  Normalizando Fila {pivot_row+1}: F{pivot_row+1} = F{pivot_row+1} / {format_fraction_output(pivot_element)}") # Agrega un mensaje a los pasos
-            for j in range(col, n_cols_aug): # Itera sobre las columnas desde la columna del pivote hasta el final de la fila
-                augmented_matrix[pivot_row][j] /= pivot_element # Divide cada elemento de la fila por el elemento pivote
-            steps_ref.extend(format_matrix_for_steps(augmented_matrix, "Después de normalizar")) # Agrega la matriz aumentada formateada a los pasos
-        
-        for i in range(n_rows): # Itera sobre las filas
-            if i != pivot_row: # Si la fila actual no es la fila del pivote
-                factor = augmented_matrix[i][col] # Obtiene el factor para eliminar
-                if factor != 0: # Si el factor no es cero
-                    steps_ref.append(f"  Eliminando en Fila {i+1}: F{i+1} = F{i+1} - ({format_fraction_output(factor)}) * F{pivot_row+1}") # Agrega un mensaje a los pasos
-                    for j in range(col, n_cols_aug): # Itera sobre las columnas desde la columna del pivote hasta el final de la fila
-                        augmented_matrix[i][j] -= factor * augmented_matrix[pivot_row][j] # Elimina el elemento
-                    steps_ref.extend(format_matrix_for_steps(augmented_matrix, f"Después de F{i+1}")) # Agrega la matriz aumentada formateada a los pasos
-        pivot_row += 1 # Incrementa la fila del pivote
-
-    rref_output = [[format_fraction_output(el) for el in r_row] for r_row in augmented_matrix] # Formatea la matriz aumentada en forma escalonada reducida
+    rref_frac = augmented_matrix.to_fractions() # Matriz aumentada en forma escalonada reducida como Fractions
+    rref_output = [[format_fraction_output(el) for el in r_row] for r_row in rref_frac] # Formatea la matriz aumentada en forma escalonada reducida
     steps_ref.append("Forma escalonada reducida por filas (RREF) de la matriz aumentada:") # Agrega un mensaje a los pasos
-    steps_ref.extend(format_matrix_for_steps(rref_output, f"RREF ({n_rows}x{n_cols_aug})")) # Agrega la matriz en forma escalonada reducida formateada a los pasos
+    steps_ref.matrix(rref_output, f"RREF ({n_rows}x{n_cols_aug})") # Agrega la matriz en forma escalonada reducida formateada a los pasos
     
     rank_A = 0 # Inicializa el rango de A
     # Cálculo más robusto del rango: cuenta las filas no nulas en la parte A de RREF, o el número de columnas pivote encontradas
@@ -86,7 +101,7 @@ def _gauss_jordan_elimination(
 
     # Verifica la inconsistencia: 0 = k donde k != 0
     for i in range(rank_A, n_rows): # Verifica las filas que deberían ser todas cero en la parte A
-        if all(augmented_matrix[i][j] == 0 for j in range(n_cols_a)) and augmented_matrix[i][n_cols_a] != 0: # Si todos los elementos en la parte A son cero y el elemento en la parte b no es cero
+        if all(augmented_matrix.is_zero(i, j) for j in range(n_cols_a)) and not augmented_matrix.is_zero(i, n_cols_a): # Si todos los elementos en la parte A son cero y el elemento en la parte b no es cero
             msg = "El sistema no tiene solución (es inconsistente)." # El sistema no tiene solución
             err_detail = msg # El detalle del error es el mensaje
             steps_ref.append(f"  Fila {i+1} de RREF ({rref_output[i]}) indica inconsistencia (0 = {rref_output[i][n_cols_a]}).") # Agrega un mensaje a los pasos
@@ -103,13 +118,13 @@ def _gauss_jordan_elimination(
     # Verifica si hay una solución única: rank_A == número de variables
     if rank_A == n_cols_a: # Si el rango de A es igual al número de columnas de A
         # Esto implica que rank_A también es <= n_rows. Si el sistema es consistente.
-        solution_vector_frac = [augmented_matrix[i][n_cols_a] for i in range(n_cols_a)] # Asume que n_cols_a <= n_rows después de RREF
+        solution_vector_frac = [rref_frac[i][n_cols_a] for i in range(n_cols_a)] # Asume que n_cols_a <= n_rows después de RREF
         output_solution_list_str = [format_fraction_output(val) for val in solution_vector_frac] # Formatea el vector solución
         msg = "El sistema tiene una solución única." # El sistema tiene una solución única
         steps_ref.append(msg) # Agrega el mensaje a los pasos
         steps_ref.append("Vector solución x:") # Agrega un mensaje a los pasos
         solution_for_steps = [[val] for val in output_solution_list_str] # Crea una matriz para los pasos
-        steps_ref.extend(format_matrix_for_steps(solution_for_steps, f"x ({n_cols_a}x1)")) # Agrega el vector solución formateado a los pasos
+        steps_ref.matrix(solution_for_steps, f"x ({n_cols_a}x1)") # Agrega el vector solución formateado a los pasos
         return rref_output, output_solution_list_str, msg, True, None # Retorna la matriz en forma escalonada reducida, el vector solución, el mensaje, True y None
 
     # Respaldo para los casos en que se calcula RREF pero no se ajusta a los patrones de solución estándar Ax=b
@@ -118,15 +133,94 @@ def _gauss_jordan_elimination(
     steps_ref.append(msg) # Agrega el mensaje a los pasos
     return rref_output, None, msg, True, None # Retorna la matriz en forma escalonada reducida, None, el mensaje, True y None
 
+def _gauss_jordan_elimination_multiple(
+    matrix_a_frac: Matrix,
+    matrix_b_frac: Matrix,
+    steps_ref: StepLog
+) -> Tuple[OutputMatrix, List[Optional[List[str]]], List[str]]:
+    """
+    Resuelve AX=B (k lados derechos) reduciendo [A|B] a RREF una sola vez.
+    Returns: RREF_matrix, solution_vectors (uno por columna de B, None si no es única), messages (uno por columna).
+    """
+    n_rows = len(matrix_a_frac)
+    n_cols_a = len(matrix_a_frac[0])
+    k = len(matrix_b_frac[0])
+    augmented_matrix = RationalMatrix.from_fractions(matrix_a_frac).augment(RationalMatrix.from_fractions(matrix_b_frac)) # Crea la matriz aumentada [A|B]
+
+    steps_ref.append(f"Matriz aumentada inicial [A|B] ({k} lados derechos):")
+    steps_ref.matrix(augmented_matrix.to_fractions(), f"Aumentada ({n_rows}x{n_cols_a + k})")
+
+    rank_A = _reduce_to_rref(augmented_matrix, n_rows, n_cols_a, steps_ref)
+
+    rref_frac = augmented_matrix.to_fractions()
+    rref_output = [[format_fraction_output(el) for el in r_row] for r_row in rref_frac]
+    steps_ref.append("Forma escalonada reducida por filas (RREF) de la matriz aumentada:")
+    steps_ref.matrix(rref_output, f"RREF ({n_rows}x{n_cols_a + k})")
+
+    solution_vectors: List[Optional[List[str]]] = []
+    messages: List[str] = []
+    for j in range(k): # Cada columna de B se clasifica sobre la misma RREF
+        inconsistent = any(not augmented_matrix.is_zero(i, n_cols_a + j) for i in range(rank_A, n_rows))
+        if inconsistent:
+            messages.append("El sistema no tiene solución (es inconsistente).")
+            solution_vectors.append(None)
+        elif rank_A < n_cols_a:
+            messages.append("El sistema tiene soluciones infinitas.")
+            solution_vectors.append(None)
+        else:
+            messages.append("El sistema tiene una solución única.")
+            solution_vectors.append([format_fraction_output(rref_frac[i][n_cols_a + j]) for i in range(n_cols_a)])
+        steps_ref.append(f"  Columna {j+1} de B: {messages[-1]}")
+    return rref_output, solution_vectors, messages
+
+def _to_fraction_matrix(matrix: List[List], name: str) -> Matrix:
+    try: return matrix_fractions(matrix) # Convertida al validar la entrada
+    except MatrixValueError as e: raise ValueError(e.detail(name))
+
+def _to_fraction_vector(vector: List, name: str) -> List[Fraction]:
+    try: return vector_fractions(vector)
+    except MatrixValueError as e: raise ValueError(e.detail(name))
+
+def _solve_matrix_b_gauss_jordan(payload: SystemInput, num_filas_a: int, num_cols_a: int, steps_log: StepLog) -> ApiResponse:
+    """Resuelve AX=B con Gauss-Jordan. Los errores de validación se lanzan como ValueError (400)."""
+    num_filas_b, num_cols_b, error_val_b = validar_matriz(payload.matrix_b, "B") # Valida la matriz B
+    if error_val_b: raise ValueError(f"{error_val_b}")
+    if num_filas_a != num_filas_b:
+        raise ValueError(f"El número de filas de la matriz A ({num_filas_a}) debe coincidir con el número de filas de la matriz B ({num_filas_b}).")
+
+    matrix_a_frac = _to_fraction_matrix(payload.matrix_a, "A")
+    matrix_b_frac = _to_fraction_matrix(payload.matrix_b, "B")
+
+    error_costo = validar_costo_operacion("gauss_jordan_elimination", [matrix_a_frac, matrix_b_frac], num_filas_a, num_cols_a, columnas_extra=num_cols_b, con_pasos=steps_log.detailed)
+    if error_costo: raise ValueError(error_costo)
+
+    steps_log.append("Matriz A original:"); steps_log.matrix(matrix_a_frac, f"A ({num_filas_a}x{num_cols_a})")
+    steps_log.append("Matriz de constantes B:"); steps_log.matrix(matrix_b_frac, f"B ({num_filas_b}x{num_cols_b})")
+
+    rref_matrix, solution_vectors, messages = _gauss_jordan_elimination_multiple(matrix_a_frac, matrix_b_frac, steps_log)
+
+    inconsistent = "El sistema no tiene solución (es inconsistente)."
+    all_inconsistent = all(message == inconsistent for message in messages) # Sólo falla si ninguna columna tiene solución
+    summary = f"Se resolvieron {len(messages)} sistemas sobre la misma RREF de [A|B]."
+    steps_log.append(summary)
+    response_payload = {"message": summary, "messages": messages, "solution_vectors": solution_vectors, "rref_matrix": rref_matrix}
+    return ApiResponse(success=not all_inconsistent, result=response_payload, steps=steps_log.for_response(), error=inconsistent if all_inconsistent else None)
+
 @router.post("/gauss_jordan_elimination", response_model=ApiResponse)
-async def solve_system_gauss_jordan(payload: SystemInput) -> ApiResponse:
-    steps_log = [] # Inicializa el registro de pasos
+@cached_result("gauss_jordan_elimination")
+@compact_output
+@offloaded("gauss_jordan_elimination")
+def solve_system_gauss_jordan(payload: SystemInput) -> ApiResponse:
+    steps_log = StepLog(payload.steps, steps_format=payload.steps_format) # Inicializa el registro de pasos con el nivel de detalle pedido
     try:
         matrix_a_orig = payload.matrix_a # Obtiene la matriz A original
         vector_b_orig = payload.vector_b # Obtiene el vector b original
 
         num_filas_a, num_cols_a, error_val_a = validar_matriz(matrix_a_orig, "A") # Valida la matriz A
         if error_val_a: raise ValueError(f"{error_val_a}") # Mensaje de error más simple para HTTPException
+
+        if payload.matrix_b is not None: # Varios lados derechos: AX=B
+            return _solve_matrix_b_gauss_jordan(payload, num_filas_a, num_cols_a, steps_log)
         
         num_elems_b, error_val_b = validar_vector(vector_b_orig, "b") # Valida el vector b
         if error_val_b: raise ValueError(f"{error_val_b}")
@@ -137,25 +231,15 @@ async def solve_system_gauss_jordan(payload: SystemInput) -> ApiResponse:
         if num_filas_a != num_elems_b:
             raise ValueError(f"El número de filas de la matriz A ({num_filas_a}) debe coincidir con el número de elementos del vector b ({num_elems_b}).")
 
-        # Límites de dimensión (máximo 4x4 para A, por lo que aumentada es máximo 4x5)
-        if num_filas_a > 4: raise ValueError(f"La matriz A está limitada a un máximo de 4 filas. Se recibió {num_filas_a}x{num_cols_a}.")
-        if num_cols_a > 4: raise ValueError(f"La matriz A está limitada a un máximo de 4 columnas. Se recibió {num_filas_a}x{num_cols_a}.")
-
-        matrix_a_frac: Matrix = [] # Inicializa la matriz A de fracciones
-        for i, row_a in enumerate(matrix_a_orig): # Itera sobre las filas de la matriz A original
-            current_row_frac_a = [] # Inicializa la fila actual de fracciones de A
-            for j, val_a in enumerate(row_a): # Itera sobre los valores de la fila actual
-                try: current_row_frac_a.append(to_fraction(val_a)) # Convierte el valor a fracción y lo agrega a la fila actual
-                except ValueError as e: raise ValueError(f"Error de conversión en A[{i+1}][{j+1}]: {e}") # Lanza un error si la conversión falla
-            matrix_a_frac.append(current_row_frac_a) # Agrega la fila actual a la matriz A de fracciones
-
-        vector_b_frac: List[Fraction] = [] # Inicializa el vector b de fracciones
-        for i, val_b in enumerate(vector_b_orig): # Itera sobre los valores del vector b original
-            try: vector_b_frac.append(to_fraction(val_b)) # Convierte el valor a fracción y lo agrega al vector b
-            except ValueError as e: raise ValueError(f"Error de conversión en b[{i+1}]: {e}") # Lanza un error si la conversión falla
+        matrix_a_frac: Matrix = _to_fraction_matrix(matrix_a_orig, "A") # Matriz A de fracciones (con la posición del elemento inválido si falla)
+        vector_b_frac: List[Fraction] = _to_fraction_vector(vector_b_orig, "b") # Vector b de fracciones
+
+        # Límite de tamaño según la política de costo configurada (reemplaza el antiguo máximo de 4x4)
+        error_costo = validar_costo_operacion("gauss_jordan_elimination", [matrix_a_frac, [vector_b_frac]], num_filas_a, num_cols_a, columnas_extra=1, con_pasos=steps_log.detailed)
+        if error_costo: raise ValueError(error_costo)
         
-        steps_log.append("Matriz A original:"); steps_log.extend(format_matrix_for_steps(matrix_a_frac, f"A ({num_filas_a}x{num_cols_a})")) # Agrega la matriz A original a los pasos
-        steps_log.append("Vector de constantes b:"); steps_log.extend(format_matrix_for_steps([[val] for val in vector_b_frac], f"b ({num_elems_b}x1)")) # Agrega el vector b original a los pasos
+        steps_log.append("Matriz A original:"); steps_log.matrix(matrix_a_frac, f"A ({num_filas_a}x{num_cols_a})") # Agrega la matriz A original a los pasos
+        steps_log.append("Vector de constantes b:"); steps_log.matrix([[val] for val in vector_b_frac], f"b ({num_elems_b}x1)") # Agrega el vector b original a los pasos
         
         rref_matrix, solution_vector, message, rref_calc_ok, calc_error_detail = _gauss_jordan_elimination(
             matrix_a_frac, vector_b_frac, steps_log
@@ -185,7 +269,7 @@ async def solve_system_gauss_jordan(payload: SystemInput) -> ApiResponse:
             if not error_for_response: error_for_response = "Fallo interno en el cálculo de Gauss-Jordan." # Si no hay error, el error es "Fallo interno en el cálculo de Gauss-Jordan."
 
         response_payload = {"message": message, "solution_vector": solution_vector, "rref_matrix": rref_matrix} # Crea la carga útil de la respuesta
-        return ApiResponse(success=api_success_status, result=response_payload, steps=steps_log, error=error_for_response) # Retorna la respuesta de la API
+        return ApiResponse(success=api_success_status, result=response_payload, steps=steps_log.for_response(), error=error_for_response) # Retorna la respuesta de la API
 
     except ValueError as e: # Atrapa los errores de validación antes de la lógica central
         raise HTTPException(status_code=400, detail=str(e)) # Lanza una excepción HTTP
@@ -193,4 +277,4 @@ async def solve_system_gauss_jordan(payload: SystemInput) -> ApiResponse:
         raise e # Lanza la excepción
     except Exception as e: # Captura todos los errores inesperados
         # import traceback; traceback.print_exc(); # Para la depuración del lado del servidor
-        return ApiResponse(success=False, result=None, error=f"Error inesperado: {str(e)}", steps=steps_log or ["Error inesperado."]) # Retorna una respuesta de error
+        return ApiResponse(success=False, result=None, error=f"Error inesperado: {str(e)}", steps=steps_log.for_response() or (["Error inesperado."] if steps_log.enabled else None)) # Retorna una respuesta de error
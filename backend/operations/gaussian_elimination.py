@@ -1,18 +1,70 @@
 from fastapi import APIRouter, HTTPException
-from typing import List, Tuple, Union
+from typing import List, Optional, Tuple, Union
 from fractions import Fraction
 
-from backend.models import SystemInput, ApiResponse, MatrixElement
-from backend.utils.type_converters import to_fraction, format_fraction_output
-from backend.utils.formatters import format_matrix_for_steps, format_augmented_matrix_for_steps
-from backend.utils.validators import validar_matriz
+from backend.models import SystemInput, ApiResponse, MatrixElement, Matrix
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixValueError, matrix_fractions, matrix_sparse, vector_fractions
+from backend.utils.validators import validar_matriz, validar_costo_operacion
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
+from backend.core.rational_matrix import RationalMatrix
+from backend.core.sparse_matrix import SparseMatrix, sparse_eliminate
+from backend.core.banded import BandedMatrix, band_solve, is_banded_candidate, matrix_bandwidths, sparse_bandwidths, thomas_solve
+from backend.core.ldlt import LDLT_MIN_DIMENSION, LDLTBreakdown, is_symmetric, ldlt_factorize, pack_lower
+from backend.core.factor_cache import FACTOR_CACHE
+from backend.core.structure import BLOCK_DIAGONAL, DIAGONAL, GENERAL, LOWER_TRIANGULAR, PERMUTATION, UPPER_TRIANGULAR, MatrixStructure, detect_structure, structured_solve, use_structure_shortcuts
 
-router = APIRouter()
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
+
+_ELIMINATE_TEMPLATE = "Eliminando elemento A({row},{col}) usando la operación: F{row} = F{row} - ({factor}) * F{source}"
+
+def _forward_elimination(augmented_matrix: RationalMatrix, n: int, steps_ref: StepLog) -> int:
+    """
+    Lleva [A|B] (A de n x n) a forma escalonada por filas con pivoteo parcial. Una columna sin pivote
+    no consume fila, de modo que las filas desde el rango retornado son nulas en A.
+    Retorna el rango de A.
+    """
+    rank = 0 # Fila del próximo pivote
+    for h in range(n): # h es la columna del pivote actual
+        if rank == n:
+            break
+        # Encontrar la fila con el pivote máximo en la columna h (desde la fila rank hacia abajo)
+        pivot_row = rank
+        pivot_abs = abs(augmented_matrix.get(rank, h))
+        for i in range(rank + 1, n):
+            candidate_abs = abs(augmented_matrix.get(i, h))
+            if candidate_abs > pivot_abs:
+                pivot_row, pivot_abs = i, candidate_abs
+        if pivot_abs == 0:
+            continue # Columna sin pivote (variable libre): el rango queda por debajo de n
+
+        # Intercambiar filas si es necesario
+        if pivot_row != rank:
+            augmented_matrix.swap_rows(rank, pivot_row)
+            steps_ref.row_op("swap", "Intercambiando Fila {row} con Fila {other} para obtener un pivote más grande (o no nulo) en A({row},{row}).", row=rank + 1, other=pivot_row + 1)
+            steps_ref.snapshot(augmented_matrix, "Matriz aumentada después del intercambio", n, rows=(rank, pivot_row))
+
+        pivot_element = augmented_matrix.get(rank, h)
+        steps_ref.row_op("pivot", "Pivote actual A({row},{col}) = {value}", row=rank + 1, col=h + 1, value=pivot_element)
+
+        # Eliminar elementos debajo del pivote
+        for i in range(rank + 1, n):
+            if not augmented_matrix.is_zero(i, h):
+                factor = augmented_matrix.get(i, h) / pivot_element
+                steps_ref.row_op("eliminate", _ELIMINATE_TEMPLATE, row=i + 1, col=h + 1, source=rank + 1, factor=factor)
+                augmented_matrix.subtract_scaled_row(i, rank, factor, start=h) # Incluye las columnas de constantes
+                steps_ref.snapshot(augmented_matrix, "Matriz aumentada después de la operación", n, rows=(i,))
+        rank += 1
+    return rank
 
 def _solve_gaussian_elimination(
     matrix_a_frac: List[List[Fraction]], 
     vector_b_frac: List[Fraction], 
-    steps_ref: List[str]
+    steps_ref: StepLog
 ) -> Tuple[Union[List[Fraction], None], str, bool]:
     """
     Resuelve un sistema de ecuaciones lineales Ax=b usando Eliminación Gaussiana.
@@ -33,63 +85,20 @@ def _solve_gaussian_elimination(
         return None, f"El vector b debe tener {n} elementos, pero tiene {len(vector_b_frac)}.", False
 
     # Formar la matriz aumentada [A|b]
-    augmented_matrix = [matrix_a_frac[i] + [vector_b_frac[i]] for i in range(n)]
+    augmented_matrix = RationalMatrix.from_fractions(matrix_a_frac).augment(RationalMatrix.column_vector(vector_b_frac))
     steps_ref.append("Matriz aumentada inicial [A|b]:")
-    steps_ref.extend(format_augmented_matrix_for_steps(augmented_matrix, n, f"Aumentada ({n}x{n+1})"))
+    steps_ref.augmented_matrix(augmented_matrix, n, f"Aumentada ({n}x{n+1})")
 
     # Fase de eliminación (hacia adelante) para obtener forma escalonada por filas
-    for h in range(n):  # h es la fila y columna del pivote actual
-        # Encontrar la fila con el pivote máximo en la columna h (desde la fila h hacia abajo)
-        pivot_row = h
-        for i in range(h + 1, n):
-            if abs(augmented_matrix[i][h]) > abs(augmented_matrix[pivot_row][h]):
-                pivot_row = i
-        
-        # Intercambiar filas si es necesario
-        if pivot_row != h:
-            augmented_matrix[h], augmented_matrix[pivot_row] = augmented_matrix[pivot_row], augmented_matrix[h]
-            steps_ref.append(f"Intercambiando Fila {h+1} con Fila {pivot_row+1} para obtener un pivote más grande (o no nulo) en A({h+1},{h+1}).")
-            steps_ref.extend(format_augmented_matrix_for_steps(augmented_matrix, n, "Matriz aumentada después del intercambio"))
-
-        # Verificar si el pivote es cero (lo que podría indicar singularidad o dependencia lineal)
-        if augmented_matrix[h][h] == 0:
-            # Si hay un elemento no cero en la columna de constantes b para esta fila, entonces no hay solución
-            if augmented_matrix[h][n] != 0:
-                steps_ref.append(f"Fila {h+1} de la matriz escalonada es [0 ... 0 | {format_fraction_output(augmented_matrix[h][n])}] donde el término constante no es cero.")
-                steps_ref.append("Esto indica una inconsistencia.")
-                return None, "El sistema no tiene solución (es inconsistente).", True 
-            # Si el pivote es cero y la constante también es cero, podría haber soluciones infinitas
-            # o podría ser una fila de ceros que no aporta información.
-            # Para simplificar, si llegamos a un pivote cero aquí, asumimos dependencia y potencial para infinitas soluciones,
-            # a menos que una inconsistencia anterior lo haya descartado.
-            # Esta lógica necesitaría ser más robusta para caracterizar completamente las soluciones infinitas.
-            continue # Avanzar a la siguiente fila, puede haber una fila de ceros.
-
-        pivot_element = augmented_matrix[h][h]
-        steps_ref.append(f"Pivote actual A({h+1},{h+1}) = {format_fraction_output(pivot_element)}")
-
-        # Eliminar elementos debajo del pivote
-        for i in range(h + 1, n):
-            if augmented_matrix[i][h] != 0:
-                factor = augmented_matrix[i][h] / pivot_element
-                operation_description = f"F{i+1} = F{i+1} - ({format_fraction_output(factor)}) * F{h+1}"
-                steps_ref.append(f"Eliminando elemento A({i+1},{h+1}) usando la operación: {operation_description}")
-                
-                for j in range(h, n + 1): # Incluir la columna de constantes b
-                    augmented_matrix[i][j] -= factor * augmented_matrix[h][j]
-                steps_ref.extend(format_augmented_matrix_for_steps(augmented_matrix, n, "Matriz aumentada después de la operación"))
+    rank_a = _forward_elimination(augmented_matrix, n, steps_ref)
 
     steps_ref.append("Matriz en forma escalonada por filas:")
-    steps_ref.extend(format_augmented_matrix_for_steps(augmented_matrix, n, "Forma Escalonada"))
-
-    # Verificar consistencia y número de soluciones
-    rank_a = 0
-    for i in range(n):
-        is_zero_row_a = all(augmented_matrix[i][j] == 0 for j in range(n))
-        if not is_zero_row_a:
-            rank_a +=1
-        elif augmented_matrix[i][n] != 0: # Fila [0 0 ... 0 | c] con c != 0
-            steps_ref.append(f"Fila {i+1} ([0...0 | {format_fraction_output(augmented_matrix[i][n])}]) indica que el sistema es inconsistente.")
+    steps_ref.augmented_matrix(augmented_matrix, n, "Forma Escalonada")
+
+    # Verificar consistencia y número de soluciones: las filas desde rank_a son nulas en A
+    for i in range(rank_a, n):
+        if not augmented_matrix.is_zero(i, n): # Fila [0 0 ... 0 | c] con c != 0
+            steps_ref.append(f"Fila {i+1} ([0...0 | {format_fraction_output(augmented_matrix.get(i, n))}]) indica que el sistema es inconsistente.")
             return None, "El sistema no tiene solución (es inconsistente).", True
 
     if rank_a < n:
@@ -102,28 +111,30 @@ def _solve_gaussian_elimination(
     solution = [Fraction(0) for _ in range(n)]
     steps_ref.append("Iniciando sustitución hacia atrás para encontrar la solución:")
     for i in range(n - 1, -1, -1):
-        sum_ax = Fraction(0)
-        for j in range(i + 1, n):
-            sum_ax += augmented_matrix[i][j] * solution[j]
+        sum_ax = augmented_matrix.dot_row_vector(i, solution, start=i + 1, stop=n)
         
-        if augmented_matrix[i][i] == 0:
+        if augmented_matrix.is_zero(i, i):
              # Esto no debería ocurrir si rank_a == n y no hubo inconsistencia previa.
              # Podría ocurrir si el sistema es singular y rank_a < n pero se omitió el chequeo.
              steps_ref.append(f"Error: Elemento diagonal A({i+1},{i+1}) es cero durante la sustitución hacia atrás y se esperaba solución única.")
              return None, "Error durante la sustitución hacia atrás, posible sistema singular no detectado antes.", False
 
-        solution[i] = (augmented_matrix[i][n] - sum_ax) / augmented_matrix[i][i]
+        const_term = augmented_matrix.get(i, n)
+        pivot_val = augmented_matrix.get(i, i)
+        solution[i] = (const_term - sum_ax) / pivot_val
+        if not steps_ref.detailed:
+            continue
         sum_ax_str = format_fraction_output(sum_ax)
-        const_term_str = format_fraction_output(augmented_matrix[i][n])
-        pivot_val_str = format_fraction_output(augmented_matrix[i][i])
+        const_term_str = format_fraction_output(const_term)
+        pivot_val_str = format_fraction_output(pivot_val)
         sol_i_str = format_fraction_output(solution[i])
         variable_name = f"x{i+1}" # o x, y, z, w
         if n <= 4: variable_name = ['x', 'y', 'z', 'w'][i]
 
         if n - (i+1) > 0: # Si hay términos en sum_ax
             steps_ref.append(f"  De Fila {i+1}: {pivot_val_str}*{variable_name} + ... = {const_term_str}")
-            steps_ref.append(f"  {pivot_val_str}*{variable_name} = {const_term_str} - ({sum_ax_str}) = {format_fraction_output(augmented_matrix[i][n] - sum_ax)}")
-            steps_ref.append(f"  {variable_name} = {format_fraction_output(augmented_matrix[i][n] - sum_ax)} / {pivot_val_str} = {sol_i_str}")
+            steps_ref.append(f"  {pivot_val_str}*{variable_name} = {const_term_str} - ({sum_ax_str}) = {format_fraction_output(const_term - sum_ax)}")
+            steps_ref.append(f"  {variable_name} = {format_fraction_output(const_term - sum_ax)} / {pivot_val_str} = {sol_i_str}")
         else: # Última variable o sistema 1x1
             steps_ref.append(f"  De Fila {i+1}: {pivot_val_str}*{variable_name} = {const_term_str}")
             steps_ref.append(f"  {variable_name} = {const_term_str} / {pivot_val_str} = {sol_i_str}")
@@ -131,9 +142,287 @@ def _solve_gaussian_elimination(
     steps_ref.append("Sustitución hacia atrás completada.")
     return solution, "El sistema tiene una solución única.", True
 
-@router.post("/solve_system_gaussian", response_model=ApiResponse, summary="Resuelve un sistema Ax=b usando Eliminación Gaussiana")
-async def solve_system_gaussian_endpoint(data: SystemInput):
-    steps: List[str] = []
+# Mensajes por columna de B (los mismos que para un único vector b)
+_MSG_UNIQUE = "El sistema tiene una solución única."
+_MSG_INFINITE = "El sistema tiene soluciones infinitas."
+_MSG_INCONSISTENT = "El sistema no tiene solución (es inconsistente)."
+
+def _solve_gaussian_elimination_multiple(
+    matrix_a_frac: Matrix,
+    matrix_b_frac: Matrix,
+    steps_ref: StepLog
+) -> Tuple[List[Optional[List[Fraction]]], List[str]]:
+    """
+    Resuelve AX=B para k lados derechos a la vez: la matriz aumentada [A|B] se elimina una sola vez
+    (mismo pivoteo que con un vector b) y luego se hace sustitución hacia atrás por cada columna de B.
+
+    Retorna:
+        - solutions: Para cada columna de B, el vector solución si es única, None en otros casos.
+        - messages: Para cada columna de B, el tipo de solución (única, infinitas, sin solución).
+    """
+    n = len(matrix_a_frac)
+    k = len(matrix_b_frac[0])
+    augmented_matrix = RationalMatrix.from_fractions(matrix_a_frac).augment(RationalMatrix.from_fractions(matrix_b_frac))
+    steps_ref.append(f"Matriz aumentada inicial [A|B] ({k} lados derechos):")
+    steps_ref.augmented_matrix(augmented_matrix, n, f"Aumentada ({n}x{n+k})")
+
+    # Fase de eliminación (hacia adelante), compartida por todas las columnas de B
+    rank_a = _forward_elimination(augmented_matrix, n, steps_ref)
+
+    steps_ref.append("Matriz en forma escalonada por filas:")
+    steps_ref.augmented_matrix(augmented_matrix, n, "Forma Escalonada")
+
+    if rank_a < n:
+        # Rango deficiente: cada columna de B es inconsistente (alguna fila [0 ... 0 | c], c != 0) o tiene soluciones infinitas
+        steps_ref.append(f"El rango de la matriz de coeficientes ({rank_a}) es menor que el número de variables ({n}).")
+        messages = []
+        for j in range(k):
+            inconsistent = any(not augmented_matrix.is_zero(i, n + j) for i in range(rank_a, n))
+            messages.append(_MSG_INCONSISTENT if inconsistent else _MSG_INFINITE)
+            steps_ref.append(f"  Columna {j+1} de B: {messages[-1]}")
+        return [None] * k, messages
+
+    # Sustitución hacia atrás, una vez por columna de B sobre la misma forma escalonada (rango n: los pivotes son la diagonal)
+    steps_ref.append("Iniciando sustitución hacia atrás para cada columna de B:")
+    solutions: List[List[Fraction]] = [[Fraction(0)] * n for _ in range(k)]
+    for i in range(n - 1, -1, -1):
+        pivot_val = augmented_matrix.get(i, i)
+        for j in range(k):
+            sum_ax = augmented_matrix.dot_row_vector(i, solutions[j], start=i + 1, stop=n)
+            solutions[j][i] = (augmented_matrix.get(i, n + j) - sum_ax) / pivot_val
+    if steps_ref.detailed:
+        for j in range(k):
+            steps_ref.append(f"  x{j+1} = ({', '.join(format_fraction_output(val) for val in solutions[j])})")
+    steps_ref.append("Sustitución hacia atrás completada.")
+    return solutions, [_MSG_UNIQUE] * k
+
+def _solve_sparse_elimination(
+    sparse_a: SparseMatrix,
+    rhs_rows: Matrix,
+    steps_ref: StepLog
+) -> Tuple[List[Optional[List[Fraction]]], List[str]]:
+    """
+    Resuelve AX=B (rhs_rows[i] son los lados derechos de la fila i) con eliminación dispersa: sólo se
+    recorren los elementos no nulos y los pivotes se eligen para generar el menor relleno (criterio
+    de Markowitz, ver backend/core/sparse_matrix.py). Los pasos resumen el cálculo.
+
+    Retorna, como _solve_gaussian_elimination_multiple, la solución y el mensaje de cada lado derecho.
+    """
+    n = sparse_a.rows
+    k = len(rhs_rows[0]) if rhs_rows else 0
+    steps_ref.append("Resolviendo mediante eliminación dispersa (pivotes elegidos para minimizar el relleno):")
+    steps_ref.append(f"  La matriz A tiene {sparse_a.nnz} elementos no nulos de {n * sparse_a.cols} (densidad {sparse_a.density:.1%}).")
+    elimination = sparse_eliminate(sparse_a, rhs_rows)
+    steps_ref.append(f"  La eliminación generó {elimination.fill} elemento(s) no nulo(s) nuevo(s) (relleno).")
+    if elimination.rank < n:
+        steps_ref.append(f"El rango de la matriz de coeficientes ({elimination.rank}) es menor que el número de variables ({n}).")
+        messages = [_MSG_INCONSISTENT if inconsistent else _MSG_INFINITE for inconsistent in elimination.inconsistent_columns()]
+        return [None] * k, messages
+    steps_ref.append("  Sustitución hacia atrás en el orden inverso de los pivotes.")
+    return [elimination.solve(j) for j in range(k)], [_MSG_UNIQUE] * k
+
+_STRUCTURED_SOLVE_STEPS = {
+    DIAGONAL: "  Cada ecuación tiene una sola incógnita: x_i = b_i / A(i,i).",
+    UPPER_TRIANGULAR: "  Sustitución hacia atrás directa sobre A (ya está en forma escalonada).",
+    LOWER_TRIANGULAR: "  Sustitución hacia adelante directa sobre A.",
+    PERMUTATION: "  Cada ecuación i tiene una sola incógnita x_j (la de su entrada no nula A(i,j)): x_j = b_i / A(i,j).",
+    BLOCK_DIAGONAL: "  Cada bloque diagonal es un sistema independiente y se resuelve por separado.",
+}
+
+def _solve_structured(
+    matrix_a_frac: Matrix,
+    structure: MatrixStructure,
+    rhs_rows: Matrix,
+    steps_ref: StepLog
+) -> Optional[Tuple[List[Optional[List[Fraction]]], List[str]]]:
+    """
+    Resuelve AX=B (rhs_rows[i] son los lados derechos de la fila i) con el atajo de la estructura
+    detectada (ver backend/core/structure.py), sin eliminar la matriz completa.
+    Retorna None si el atajo no aplica (triangular con un cero en la diagonal); si no, como
+    _solve_gaussian_elimination_multiple, la solución y el mensaje de cada lado derecho.
+    """
+    result = structured_solve(matrix_a_frac, structure, rhs_rows)
+    if result is None:
+        return None
+    n = structure.n
+    k = len(rhs_rows[0]) if rhs_rows else 0
+    steps_ref.append(f"Estructura detectada: {structure.description}. No se requiere eliminación Gaussiana.")
+    steps_ref.append(_STRUCTURED_SOLVE_STEPS[structure.kind])
+    if result.rank < n:
+        steps_ref.append(f"El rango de la matriz de coeficientes ({result.rank}) es menor que el número de variables ({n}).")
+        return [None] * k, [_MSG_INCONSISTENT if inconsistent else _MSG_INFINITE for inconsistent in result.inconsistent]
+    return result.solutions, [_MSG_UNIQUE] * k
+
+def _banded_matrix(data: SystemInput, matrix_a_frac: Optional[Matrix], sparse_a: Optional[SparseMatrix]) -> Optional[BandedMatrix]:
+    """
+    Banda de A (ver backend/core/banded.py) si se declaró su semiancho (data.bandwidth) o si la banda
+    detectada es angosta respecto de la dimensión; None para usar los demás métodos. Si A es dispersa
+    (sparse_a), la banda se arma desde sus no nulos y matrix_a_frac es None.
+    """
+    n = len(data.matrix_a)
+    if data.bandwidth is not None:
+        lower = upper = min(data.bandwidth, n - 1)
+    else:
+        lower, upper = sparse_bandwidths(sparse_a) if sparse_a is not None else matrix_bandwidths(matrix_a_frac)
+        if not is_banded_candidate(n, lower, upper):
+            return None
+    try:
+        return BandedMatrix.from_sparse(sparse_a, lower, upper) if sparse_a is not None else BandedMatrix.from_fractions(matrix_a_frac, lower, upper)
+    except ValueError as e: # Elementos fuera de la banda declarada
+        raise HTTPException(status_code=400, detail=f"Error en Matriz A: {str(e)}")
+
+def _solve_banded(
+    band: BandedMatrix,
+    rhs_rows: Matrix,
+    steps_ref: StepLog
+) -> Optional[Tuple[List[Optional[List[Fraction]]], List[str]]]:
+    """
+    Resuelve AX=B (rhs_rows[i] son los lados derechos de la fila i) con el solver en banda: algoritmo
+    de Thomas si A es tridiagonal, LU en banda si no. Los pasos resumen el cálculo.
+    Retorna None si A es singular (la eliminación general clasifica entonces el sistema); si no, como
+    _solve_gaussian_elimination_multiple, la solución y el mensaje de cada lado derecho.
+    """
+    k = len(rhs_rows[0]) if rhs_rows else 0
+    steps_ref.append(f"Matriz en banda: {band.lower} diagonal(es) debajo y {band.upper} encima de la diagonal principal; "
+                     f"se almacenan y recorren sólo los {sum(len(row) for row in band.rows)} elementos de la banda.")
+    solutions = None
+    if band.lower <= 1 and band.upper <= 1:
+        steps_ref.append("  Resolviendo con el algoritmo de Thomas (tridiagonal): eliminación de la subdiagonal y sustitución hacia atrás, O(n).")
+        solutions = thomas_solve(band, rhs_rows)
+        if solutions is None:
+            steps_ref.append("  El algoritmo de Thomas encontró un pivote cero: se usa LU en banda con intercambio de filas.")
+    if solutions is None:
+        if band.lower > 1 or band.upper > 1:
+            steps_ref.append(f"  Resolviendo con LU en banda: eliminación sólo dentro de la banda, O(n * {band.lower} * {band.lower + band.upper}).")
+        solutions = band_solve(band, rhs_rows)
+    if solutions is None:
+        steps_ref.append("  La matriz es singular: la eliminación general determina el tipo de solución.")
+        return None
+    return solutions, [_MSG_UNIQUE] * k
+
+def _use_ldlt(matrix_a_frac: Matrix, structure: Optional[MatrixStructure], band: Optional[BandedMatrix], sparse_a: Optional[SparseMatrix], steps: StepLog) -> bool:
+    """
+    True si A es simétrica y densa, sin otra estructura: se resuelve con LDLᵀ (ver backend/core/ldlt.py).
+    Las matrices pequeñas con pasos completos siguen la eliminación Gaussiana didáctica.
+    """
+    return (structure is not None and structure.kind == GENERAL and band is None and sparse_a is None
+            and (not steps.detailed or len(matrix_a_frac) >= LDLT_MIN_DIMENSION) and is_symmetric(matrix_a_frac))
+
+def _solve_ldlt(
+    matrix_a_frac: Matrix,
+    rhs_rows: Matrix,
+    steps_ref: StepLog
+) -> Optional[Tuple[List[Optional[List[Fraction]]], List[str]]]:
+    """
+    Resuelve AX=B para A simétrica con A = L D Lᵀ, eliminando sólo el triángulo inferior.
+    Retorna None si la factorización sin pivoteo no existe o A es singular (la eliminación general
+    clasifica entonces el sistema); si no, la solución y el mensaje de cada lado derecho.
+    """
+    n = len(matrix_a_frac)
+    k = len(rhs_rows[0]) if rhs_rows else 0
+    steps_ref.append(f"Matriz simétrica: A = L D Lᵀ (sin raíces cuadradas) sobre su triángulo inferior ({n * (n + 1) // 2} de {n * n} elementos), "
+                     "con la mitad de las operaciones de la eliminación Gaussiana.")
+    try:
+        factors = ldlt_factorize(pack_lower(matrix_a_frac), n)
+    except LDLTBreakdown as e:
+        steps_ref.append(f"  {e} Se usa la eliminación Gaussiana con intercambio de filas.")
+        return None
+    if factors.is_singular:
+        steps_ref.append(f"  D({n},{n}) = 0: la matriz es singular; la eliminación general determina el tipo de solución.")
+        return None
+    steps_ref.append("  Resolviendo L y = b (sustitución hacia adelante), D z = y y Lᵀ x = z (sustitución hacia atrás).")
+    return [factors.solve([row[c] for row in rhs_rows]) for c in range(k)], [_MSG_UNIQUE] * k
+
+def _cost_matrix(matrix_a_frac: Optional[Matrix], sparse_a: Optional[SparseMatrix]) -> Matrix:
+    """A para medir el tamaño en bits de la entrada: sólo sus no nulos si es dispersa (evita recorrer n² ceros)."""
+    return [list(row.values()) for row in sparse_a.data] if sparse_a is not None else matrix_a_frac
+
+def _solve_cost(direct: bool, band: Optional[BandedMatrix], sparse_a: Optional[SparseMatrix], symmetric: bool = False) -> Tuple[str, float]:
+    """Operación y fracción de elementos que recorre la solución, para la política de costo (1.0 si es densa)."""
+    if direct:
+        return "substitution", 1.0
+    if band is not None:
+        return "banded", (band.lower + band.upper + 1) / band.n
+    if symmetric:
+        return "ldlt_factorization", 1.0
+    return "solve_system_gaussian", sparse_a.density if sparse_a is not None else 1.0
+
+def _summarize_multiple_messages(messages: List[str]) -> str:
+    if all(message == _MSG_UNIQUE for message in messages):
+        return f"El sistema tiene una solución única para cada una de las {len(messages)} columnas de B."
+    return (f"Se resolvieron {len(messages)} sistemas: {messages.count(_MSG_UNIQUE)} con solución única, "
+            f"{messages.count(_MSG_INFINITE)} con soluciones infinitas y {messages.count(_MSG_INCONSISTENT)} inconsistentes.")
+
+def _solve_system_matrix_b(data: SystemInput, rows_a: int, cols_a: int, steps: StepLog) -> ApiResponse:
+    """
+    Resuelve AX=B (matrix_b con k columnas): valida y convierte B, y elimina [A|B] una sola vez
+    (o usa la factorización PA = LU almacenada de A, resolviendo cada columna por sustitución).
+    """
+    rows_b, cols_b, error_msg_b = validar_matriz(data.matrix_b, "B")
+    if error_msg_b:
+        raise HTTPException(status_code=400, detail=f"Error en Matriz B: {error_msg_b}")
+    if rows_a != rows_b:
+        raise HTTPException(status_code=400, detail=f"El número de filas de la matriz A ({rows_a}) debe coincidir con el número de filas de la matriz B ({rows_b}).")
+
+    try:
+        sparse_a = matrix_sparse(data.matrix_a) if rows_a == cols_a else None # Representación dispersa si A es grande y con pocos no nulos
+        matrix_a_frac = matrix_fractions(data.matrix_a) if sparse_a is None else None # Convertidas al validar la entrada (la forma densa, sólo si se usa)
+    except MatrixValueError as e:
+        raise HTTPException(status_code=400, detail=e.detail("A"))
+    try:
+        matrix_b_frac = matrix_fractions(data.matrix_b)
+    except MatrixValueError as e:
+        raise HTTPException(status_code=400, detail=e.detail("B"))
+
+    structure = detect_structure(matrix_a_frac) if rows_a == cols_a and sparse_a is None else None # Diagonal, triangular, permutación o por bloques (una A dispersa sigue la banda o la eliminación dispersa, sin relleno en esas estructuras)
+    band = _banded_matrix(data, matrix_a_frac, sparse_a) if rows_a == cols_a else None # Banda declarada o detectada
+    # Con pasos detallados, las matrices pequeñas siguen la eliminación aunque tengan estructura, como el determinante
+    use_structure = structure is not None and structure.kind != GENERAL and data.bandwidth is None and use_structure_shortcuts(rows_a, steps.detailed)
+    direct = use_structure and structure.direct
+    symmetric = _use_ldlt(matrix_a_frac, structure, band, sparse_a, steps) # Simétrica y densa: LDLᵀ
+    operacion, densidad = _solve_cost(direct, band, sparse_a, symmetric)
+    error_costo = validar_costo_operacion(operacion, [_cost_matrix(matrix_a_frac, sparse_a), matrix_b_frac], rows_a, cols_a, columnas_extra=cols_b,
+                                          con_pasos=steps.detailed and sparse_a is None and band is None and not direct and not symmetric, densidad=densidad)
+    if error_costo:
+        raise HTTPException(status_code=400, detail=error_costo)
+
+    steps.append("Sistema de ecuaciones AX=B:")
+    steps.append("Matriz de coeficientes A:")
+    steps.input_matrix(data.matrix_a, f"A ({rows_a}x{cols_a})")
+    steps.append("Matriz de constantes B:")
+    steps.matrix(matrix_b_frac, f"B ({rows_b}x{cols_b})")
+
+    if rows_a != cols_a:
+        raise HTTPException(status_code=400, detail="La matriz de coeficientes A debe ser cuadrada para este método simplificado de solución única.")
+
+    cached_factors = FACTOR_CACHE.get(matrix_a_frac if sparse_a is None else sparse_a) if not steps.detailed else None # Con pasos detallados se muestra siempre la eliminación
+    if cached_factors is not None and not cached_factors.is_singular:
+        steps.append("Se reutiliza la factorización PA = LU almacenada para A (calculada en /operations/lu_factorization).")
+        steps.append("Resolviendo L y = P b (sustitución hacia adelante) y U x = y (sustitución hacia atrás) para cada columna de B.")
+        solutions = [cached_factors.solve([row[j] for row in matrix_b_frac]) for j in range(cols_b)]
+        messages = [_MSG_UNIQUE] * cols_b
+    elif use_structure and (structured := _solve_structured(matrix_a_frac, structure, matrix_b_frac, steps)) is not None:
+        solutions, messages = structured
+    elif band is not None and (banded := _solve_banded(band, matrix_b_frac, steps)) is not None:
+        solutions, messages = banded
+    elif symmetric and (factored := _solve_ldlt(matrix_a_frac, matrix_b_frac, steps)) is not None:
+        solutions, messages = factored
+    elif sparse_a is not None:
+        solutions, messages = _solve_sparse_elimination(sparse_a, matrix_b_frac, steps)
+    else:
+        solutions, messages = _solve_gaussian_elimination_multiple(matrix_a_frac, matrix_b_frac, steps)
+
+    formatted_solutions = [[format_fraction_output(val) for val in solution] if solution is not None else None for solution in solutions]
+    message = _summarize_multiple_messages(messages)
+    steps.append(message)
+    return ApiResponse(success=True, result={"solution_vectors": formatted_solutions, "messages": messages, "message": message}, steps=steps.for_response())
+
+@router.post("/solve_system_gaussian", response_model=ApiResponse, summary="Resuelve un sistema Ax=b (o AX=B con varios lados derechos) usando Eliminación Gaussiana")
+@cached_result("solve_system_gaussian")
+@compact_output
+@offloaded("solve_system_gaussian")
+def solve_system_gaussian_endpoint(data: SystemInput):
+    steps = StepLog(data.steps, steps_format=data.steps_format)
 
     # 1. Validar Matriz A
     rows_a, cols_a, error_msg_a = validar_matriz(data.matrix_a, "A")
@@ -143,6 +432,9 @@ async def solve_system_gaussian_endpoint(data: SystemInput):
     if rows_a is None or cols_a is None: # Salvaguarda
         raise HTTPException(status_code=400, detail="Error al obtener dimensiones de la matriz A.")
 
+    if data.matrix_b is not None: # Varios lados derechos: AX=B
+        return _solve_system_matrix_b(data, rows_a, cols_a, steps)
+
     # Validar Vector b (como una matriz de N x 1 conceptualmente para validación)
     matrix_b_for_validation: List[List[MatrixElement]] = [[el] for el in data.vector_b] # Primero convertir
     rows_b, _, error_msg_b = validar_matriz(matrix_b_for_validation, "Vector b", expected_cols=1) # _ para cols_b ya que sabemos que es 1
@@ -164,34 +456,38 @@ async def solve_system_gaussian_endpoint(data: SystemInput):
     # Validaciones específicas de dimensiones para Ax=b
     if rows_a != rows_b:
         raise HTTPException(status_code=400, detail=f"El número de filas de la matriz A ({rows_a}) debe coincidir con el número de elementos del vector b ({rows_b}).")
-    if cols_a > 4 or rows_a > 4: # Mantenemos límite de 4x4 para A
-        raise HTTPException(status_code=400, detail=f"La matriz A está limitada a dimensiones de hasta 4x4. Se recibió {rows_a}x{cols_a}.")
 
     # ---- Aquí comienzan las conversiones y el log de pasos ----
     # 2. Conversión a Fracciones y registro inicial de pasos
-    matrix_a_frac: List[List[Fraction]] = []
-    vector_b_frac: List[Fraction] = []
     try:
-        for i, row_data in enumerate(data.matrix_a):
-            # Esta validación de ragged es redundante si validar_matriz funcionó bien,
-            # pero es una salvaguarda por si acaso y para ser explícitos.
-            if len(row_data) != cols_a:
-                raise ValueError(f"La fila {i+1} de la matriz A tiene {len(row_data)} elementos, se esperaban {cols_a}.")
-            matrix_a_frac.append([to_fraction(val) for val in row_data])
-        
-        for val_b in data.vector_b: # Usar data.vector_b directamente para la conversión
-            vector_b_frac.append(to_fraction(val_b))
+        sparse_a = matrix_sparse(data.matrix_a) if rows_a == cols_a else None # Representación dispersa si A es grande y con pocos no nulos
+        matrix_a_frac: Optional[List[List[Fraction]]] = matrix_fractions(data.matrix_a) if sparse_a is None else None # Convertidos al validar la entrada (la forma densa, sólo si se usa)
+    except MatrixValueError as e: # Elemento inválido, con su posición
+        raise HTTPException(status_code=400, detail=e.detail("A"))
+    try:
+        vector_b_frac: List[Fraction] = vector_fractions(data.vector_b)
+    except MatrixValueError as e:
+        raise HTTPException(status_code=400, detail=e.detail("b"))
 
-    except ValueError as e: # Captura errores de to_fraction
-        raise HTTPException(status_code=400, detail=f"Error de conversión de valor: {str(e)}")
+    structure = detect_structure(matrix_a_frac) if rows_a == cols_a and sparse_a is None else None # Diagonal, triangular, permutación o por bloques (una A dispersa sigue la banda o la eliminación dispersa, sin relleno en esas estructuras)
+    band = _banded_matrix(data, matrix_a_frac, sparse_a) if rows_a == cols_a else None # Banda declarada o detectada
+    # Con pasos detallados, las matrices pequeñas siguen la eliminación aunque tengan estructura, como el determinante
+    use_structure = structure is not None and structure.kind != GENERAL and data.bandwidth is None and use_structure_shortcuts(rows_a, steps.detailed)
+    direct = use_structure and structure.direct
+    symmetric = _use_ldlt(matrix_a_frac, structure, band, sparse_a, steps) # Simétrica y densa: LDLᵀ
+    operacion, densidad = _solve_cost(direct, band, sparse_a, symmetric)
+    error_costo = validar_costo_operacion(operacion, [_cost_matrix(matrix_a_frac, sparse_a), [vector_b_frac]], rows_a, cols_a, columnas_extra=1,
+                                          con_pasos=steps.detailed and sparse_a is None and band is None and not direct and not symmetric, densidad=densidad)
+    if error_costo:
+        raise HTTPException(status_code=400, detail=error_costo)
 
     # Agregar pasos iniciales DESPUÉS de las validaciones y conversiones principales
     steps.append("Sistema de ecuaciones Ax=b:")
     steps.append("Matriz de coeficientes A:")
-    steps.extend(format_matrix_for_steps(matrix_a_frac, f"A ({rows_a}x{cols_a})"))
+    steps.input_matrix(data.matrix_a, f"A ({rows_a}x{cols_a})")
     steps.append("Vector de constantes b:")
     vector_b_display = [[el] for el in vector_b_frac] # Formatear b como columna para mostrar
-    steps.extend(format_matrix_for_steps(vector_b_display, f"b ({rows_b}x1)"))
+    steps.matrix(vector_b_display, f"b ({rows_b}x1)")
 
     # ---- Fin de validaciones críticas que deben ser HTTPException ----
     # ---- Comienzo de lógica de resolución donde _solve_gaussian_elimination puede retornar success=False ----
@@ -204,21 +500,36 @@ async def solve_system_gaussian_endpoint(data: SystemInput):
         # precondición para la lógica de resolución actual.
         raise HTTPException(status_code=400, detail="La matriz de coeficientes A debe ser cuadrada para este método simplificado de solución única.")
 
-    # 3. Resolver usando Eliminación Gaussiana
-    solution_frac, message, success_solve = _solve_gaussian_elimination(matrix_a_frac, vector_b_frac, steps)
+    # 3. Resolver usando Eliminación Gaussiana (o sustituciones triangulares si A ya fue factorizada)
+    cached_factors = FACTOR_CACHE.get(matrix_a_frac if sparse_a is None else sparse_a) if not steps.detailed else None # Con pasos detallados se muestra siempre la eliminación
+    if cached_factors is not None and not cached_factors.is_singular:
+        steps.append("Se reutiliza la factorización PA = LU almacenada para A (calculada en /operations/lu_factorization).")
+        steps.append("Resolviendo L y = P b (sustitución hacia adelante) y U x = y (sustitución hacia atrás).")
+        solution_frac, message, success_solve = cached_factors.solve(vector_b_frac), "El sistema tiene una solución única.", True
+    elif use_structure and (structured := _solve_structured(matrix_a_frac, structure, [[value] for value in vector_b_frac], steps)) is not None:
+        solution_frac, message, success_solve = structured[0][0], structured[1][0], True
+    elif band is not None and (banded := _solve_banded(band, [[value] for value in vector_b_frac], steps)) is not None:
+        solution_frac, message, success_solve = banded[0][0], banded[1][0], True
+    elif symmetric and (factored := _solve_ldlt(matrix_a_frac, [[value] for value in vector_b_frac], steps)) is not None:
+        solution_frac, message, success_solve = factored[0][0], factored[1][0], True
+    elif sparse_a is not None: # A dispersa: eliminación que sólo recorre los no nulos
+        solutions, messages = _solve_sparse_elimination(sparse_a, [[value] for value in vector_b_frac], steps)
+        solution_frac, message, success_solve = solutions[0], messages[0], True
+    else: # Sin factores (o A singular): la eliminación clasifica el sistema
+        solution_frac, message, success_solve = _solve_gaussian_elimination(matrix_a_frac, vector_b_frac, steps)
 
     if not success_solve: # Error interno durante la resolución o caso no manejado como éxito (e.g. no cuadrada en _solve)
         # Si _solve_gaussian_elimination devuelve success_solve=False, el mensaje ya indica el problema.
-        return ApiResponse(success=False, error=message, steps=steps) # Este error ya no debería ser por A no cuadrada si se chequeó antes
+        return ApiResponse(success=False, error=message, steps=steps.for_response()) # Este error ya no debería ser por A no cuadrada si se chequeó antes
 
     if solution_frac:
         formatted_solution = [format_fraction_output(val) for val in solution_frac]
         steps.append("Solución del sistema x:")
         # Formatear x como una matriz columna para mostrar
         solution_display = [[el] for el in formatted_solution]
-        steps.extend(format_matrix_for_steps(solution_display, f"x ({rows_a}x1)"))
+        steps.matrix(solution_display, f"x ({rows_a}x1)")
         
-        return ApiResponse(success=True, result={"solution_vector": formatted_solution, "message": message}, steps=steps)
+        return ApiResponse(success=True, result={"solution_vector": formatted_solution, "message": message}, steps=steps.for_response())
     else:
         # Casos de no solución o múltiples soluciones
-        return ApiResponse(success=True, result={"message": message}, steps=steps, error=(message if "no tiene solución" in message else None) ) 
\ No newline at end of file
+        return ApiResponse(success=True, result={"message": message}, steps=steps.for_response(), error=(message if "no tiene solución" in message else None) ) 
\ No newline at end of file
@@ -3,13 +3,22 @@ from typing import List, Tuple
 from fractions import Fraction
 
 from backend.models import MatrixInput, ApiResponse, Matrix
-from backend.utils.type_converters import to_fraction, format_fraction_output
-from backend.utils.formatters import format_matrix_for_steps
-from backend.utils.validators import validar_matriz
-
-router = APIRouter()
-
-def _gauss_jordan_inverse(matrix_input: List[List[Fraction]], steps_ref: List[str]) -> Tuple[List[List[Fraction]] | None, bool]:
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixValueError, matrix_fractions
+from backend.utils.validators import validar_matriz, validar_costo_operacion
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
+from backend.core.rational_matrix import RationalMatrix
+from backend.core.lup import LUPFactors
+from backend.core.factor_cache import FACTOR_CACHE
+from backend.core.structure import BLOCK_DIAGONAL, DIAGONAL, GENERAL, LOWER_TRIANGULAR, PERMUTATION, UPPER_TRIANGULAR, MatrixStructure, detect_structure, structured_inverse, use_structure_shortcuts
+
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
+
+def _gauss_jordan_inverse(matrix_input: List[List[Fraction]], steps_ref: StepLog) -> Tuple[List[List[Fraction]] | None, bool]:
     """
     Calcula la inversa de una matriz utilizando eliminación de Gauss-Jordan.
     Aumenta la matriz con una matriz identidad [A|I] y la transforma a [I|A^-1].
@@ -17,22 +26,18 @@ def _gauss_jordan_inverse(matrix_input: List[List[Fraction]], steps_ref: List[st
     Añade pasos detallados del cálculo a steps_ref.
     """
     n = len(matrix_input)
-    # Crear una copia profunda para evitar modificar la lista de listas original
-    matrix_a = [[val for val in row] for row in matrix_input]
-
-    # Aumentar con matriz identidad
-    identity_matrix = [[Fraction(1) if i == j else Fraction(0) for j in range(n)] for i in range(n)]
-    augmented_matrix = [matrix_a[i] + identity_matrix[i] for i in range(n)]
+    # Aumentar con matriz identidad (el motor trabaja sobre una copia, la lista original no se modifica)
+    augmented_matrix = RationalMatrix.from_fractions(matrix_input).augment(RationalMatrix.identity(n))
     
     steps_ref.append("Matriz aumentada inicial [A|I]:")
-    steps_ref.extend(format_matrix_for_steps(augmented_matrix, f"Augmented ({n}x{2*n})"))
+    steps_ref.matrix(augmented_matrix, f"Augmented ({n}x{2*n})")
 
     # Realizar eliminación Gaussiana para obtener [I|A^-1]
     for h in range(n):  # h es el índice de la fila y columna del pivote actual
         # Encontrar pivote para esta columna
         pivot_row = -1
         for i in range(h, n):
-            if augmented_matrix[i][h] != 0:
+            if not augmented_matrix.is_zero(i, h):
                 pivot_row = i
                 break
         
@@ -43,59 +48,97 @@ def _gauss_jordan_inverse(matrix_input: List[List[Fraction]], steps_ref: List[st
 
         # Intercambiar filas si es necesario para mover el pivote a la diagonal
         if pivot_row != h:
-            augmented_matrix[h], augmented_matrix[pivot_row] = augmented_matrix[pivot_row], augmented_matrix[h]
-            steps_ref.append(f"Intercambiando Fila {h+1} con Fila {pivot_row+1} para obtener un pivote no nulo en A({h+1},{h+1}).")
-            steps_ref.extend(format_matrix_for_steps(augmented_matrix, "Matriz aumentada después del intercambio"))
+            augmented_matrix.swap_rows(h, pivot_row)
+            steps_ref.row_op("swap", "Intercambiando Fila {row} con Fila {other} para obtener un pivote no nulo en A({row},{row}).", row=h + 1, other=pivot_row + 1)
+            steps_ref.snapshot(augmented_matrix, "Matriz aumentada después del intercambio", rows=(h, pivot_row))
 
         # Normalizar fila del pivote (hacer que el elemento pivote sea 1)
-        pivot_element = augmented_matrix[h][h]
+        pivot_element = augmented_matrix.get(h, h)
         if pivot_element != 1:
             if pivot_element == 0: # Debería ser detectado por pivot_row == -1, pero como salvaguarda
                  steps_ref.append(f"Error: Pivote en A({h+1},{h+1}) es cero inesperadamente.")
                  steps_ref.append("La matriz no es invertible (singular).")
                  return None, False
             
-            steps_ref.append(f"Normalizando Fila {h+1}: F{h+1} = F{h+1} / {format_fraction_output(pivot_element)}")
-            for j in range(2 * n): # Iterar por todas las columnas de la matriz aumentada
-                augmented_matrix[h][j] /= pivot_element
-            
-            steps_ref.extend(format_matrix_for_steps(augmented_matrix, f"Matriz aumentada después de normalizar F{h+1}"))
+            augmented_matrix.scale_row(h, 1 / pivot_element) # Divide todas las columnas de la fila por el pivote
+            steps_ref.row_op("scale", "Normalizando Fila {row}: F{row} = F{row} / {divisor}", row=h + 1, divisor=pivot_element)
+            if steps_ref.detailed:
+                steps_ref.snapshot(augmented_matrix, f"Matriz aumentada después de normalizar F{h+1}", rows=(h,))
         
-        steps_ref.append(f"Pivote en A({h+1},{h+1}) es 1.")
+        steps_ref.row_op("pivot", "Pivote en A({row},{col}) es 1.", row=h + 1, col=h + 1)
 
         # Eliminar otras filas (hacer que otros elementos en la columna pivote sean cero)
         for i in range(n):
             if i != h: # Para todas las filas excepto la fila pivote
-                if augmented_matrix[i][h] != 0: # Si el elemento en la columna pivote no es cero
-                    factor = augmented_matrix[i][h]
-                    operation_description = f"F{i+1} = F{i+1} - ({format_fraction_output(factor)}) * F{h+1}"
-                    steps_ref.append(f"Eliminando elemento A({i+1},{h+1}) usando la operación: {operation_description}")
-                    
-                    for j in range(h, 2 * n): # Iterar por las columnas relevantes
-                        augmented_matrix[i][j] -= factor * augmented_matrix[h][j]
-                    
-                    steps_ref.extend(format_matrix_for_steps(augmented_matrix, f"Matriz aumentada después de la operación en F{i+1}"))
+                if not augmented_matrix.is_zero(i, h): # Si el elemento en la columna pivote no es cero
+                    factor = augmented_matrix.get(i, h)
+                    steps_ref.row_op("eliminate", "Eliminando elemento A({row},{col}) usando la operación: F{row} = F{row} - ({factor}) * F{source}", row=i + 1, col=h + 1, source=h + 1, factor=factor)
+                    augmented_matrix.subtract_scaled_row(i, h, factor, start=h) # Sólo cambian las columnas relevantes (h..2n-1)
+                    if steps_ref.detailed:
+                        steps_ref.snapshot(augmented_matrix, f"Matriz aumentada después de la operación en F{i+1}", rows=(i,))
 
     # Verificar si el lado izquierdo es una matriz identidad
     for i in range(n):
         for j in range(n):
-            if (i == j and augmented_matrix[i][j] != 1) or \
-               (i != j and augmented_matrix[i][j] != 0):
+            if (i == j and augmented_matrix.get(i, j) != 1) or \
+               (i != j and not augmented_matrix.is_zero(i, j)):
                 steps_ref.append("La parte izquierda de la matriz aumentada no es la matriz identidad después de la eliminación.")
                 steps_ref.append("La matriz no es invertible (singular).")
                 return None, False
 
     # Extraer matriz inversa
-    inverse_matrix = [row[n:] for row in augmented_matrix]
+    inverse_matrix = augmented_matrix.submatrix(0, n, n, 2 * n).to_fractions()
     steps_ref.append("Proceso de eliminación de Gauss-Jordan completado.")
     steps_ref.append("La parte izquierda es la matriz identidad, la parte derecha es la inversa A⁻¹.")
-    steps_ref.extend(format_matrix_for_steps(inverse_matrix, "Matriz Inversa A⁻¹"))
+    steps_ref.matrix(inverse_matrix, "Matriz Inversa A⁻¹")
+    return inverse_matrix, True
+
+def _inverse_from_factors(factors: LUPFactors, steps_ref: StepLog) -> Tuple[List[List[Fraction]] | None, bool]:
+    """
+    Calcula la inversa a partir de una factorización PA = LU ya calculada, resolviendo
+    L y = P e_j y U x = y para cada columna e_j de la identidad (O(n²) por columna).
+    """
+    steps_ref.append("Se reutiliza la factorización PA = LU almacenada para esta matriz (calculada en /operations/lu_factorization).")
+    if factors.is_singular:
+        steps_ref.append("U tiene un cero en la diagonal.")
+        steps_ref.append("La matriz no es invertible (singular).")
+        return None, False
+    steps_ref.append("Resolviendo A x = e_j por sustitución hacia adelante (L) y hacia atrás (U) para cada columna de la identidad.")
+    inverse_matrix = factors.inverse()
+    steps_ref.matrix(inverse_matrix, "Matriz Inversa A⁻¹")
+    return inverse_matrix, True
+
+_STRUCTURED_INVERSE_STEPS = {
+    DIAGONAL: "  A⁻¹ es diagonal, con los recíprocos de la diagonal de A.",
+    UPPER_TRIANGULAR: "  A⁻¹ es triangular superior: cada columna se obtiene resolviendo A x = e_j por sustitución hacia atrás.",
+    LOWER_TRIANGULAR: "  A⁻¹ es triangular inferior: cada columna se obtiene resolviendo A x = e_j por sustitución hacia adelante.",
+    PERMUTATION: "  A⁻¹(j,i) = 1 / A(i,j) para cada entrada no nula A(i,j); los demás elementos son 0.",
+    BLOCK_DIAGONAL: "  A⁻¹ es diagonal por bloques: cada bloque se invierte por separado.",
+}
+
+def _inverse_structured(matrix_input: List[List[Fraction]], structure: MatrixStructure, steps_ref: StepLog) -> Tuple[List[List[Fraction]] | None, bool]:
+    """
+    Calcula la inversa con el atajo de la estructura detectada (ver backend/core/structure.py):
+    recíprocos de la diagonal, sustitución directa sobre la matriz triangular, transpuesta de la
+    permutación con los recíprocos de sus entradas, o la inversa de cada bloque diagonal.
+    """
+    steps_ref.append(f"Estructura detectada: {structure.description}. Se evita la eliminación de Gauss-Jordan.")
+    steps_ref.append(_STRUCTURED_INVERSE_STEPS[structure.kind])
+    inverse_matrix = structured_inverse(matrix_input, structure)
+    if inverse_matrix is None:
+        steps_ref.append("  La matriz es singular (un cero en la diagonal, o un bloque singular).")
+        steps_ref.append("La matriz no es invertible (singular).")
+        return None, False
+    steps_ref.matrix(inverse_matrix, "Matriz Inversa A⁻¹")
     return inverse_matrix, True
 
 
 @router.post("/inverse", response_model=ApiResponse, summary="Cálculo de la inversa de una matriz usando Gauss-Jordan")
-async def calculate_inverse_endpoint(data: MatrixInput):
-    steps: List[str] = []
+@cached_result("inverse")
+@compact_output
+@offloaded("inverse")
+def calculate_inverse_endpoint(data: MatrixInput):
+    steps = StepLog(data.steps, steps_format=data.steps_format)
 
     # 1. Validación
     rows, cols, error_msg_val = validar_matriz(data.matrix, "suministrada")
@@ -105,38 +148,48 @@ async def calculate_inverse_endpoint(data: MatrixInput):
     if rows is None or cols is None:
         raise HTTPException(status_code=400, detail="Error al obtener dimensiones de la matriz.")
 
-    if rows > 4:
-        raise HTTPException(status_code=400, detail=f"La operación está limitada a matrices de hasta 4 filas. Se recibió una matriz con {rows} filas.")
-    if cols > 4:
-        raise HTTPException(status_code=400, detail=f"La operación está limitada a matrices de hasta 4 columnas. Se recibió una matriz con {cols} columnas.")
     if rows != cols:
         raise HTTPException(status_code=400, detail=f"La matriz debe ser cuadrada para calcular su inversa. Se recibió una matriz de {rows}x{cols}.")
     
     n = rows
 
     # 2. Conversión de tipos
-    matrix_a_frac: List[List[Fraction]] = []
     try:
-        for i, row_data in enumerate(data.matrix):
-            matrix_a_frac.append([to_fraction(val) for val in row_data])
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        matrix_a_frac: List[List[Fraction]] = matrix_fractions(data.matrix) # Convertida al validar la entrada
+    except MatrixValueError as e:
+        raise HTTPException(status_code=400, detail=e.detail("A"))
+
+    # Diagonal, triangular, permutación o por bloques (ver backend/core/structure.py); con pasos detallados
+    # las matrices pequeñas siguen Gauss-Jordan, como el determinante
+    structure = detect_structure(matrix_a_frac) if use_structure_shortcuts(n, steps.detailed) else None
+    direct = structure is not None and structure.direct
+    error_costo = validar_costo_operacion("substitution" if direct else "inverse", [matrix_a_frac], n, n, columnas_extra=n, con_pasos=steps.detailed and not direct)
+    if error_costo:
+        raise HTTPException(status_code=400, detail=error_costo)
 
     steps.append("Matriz de entrada A:")
-    steps.extend(format_matrix_for_steps(matrix_a_frac, f"A ({n}x{n})"))
+    steps.matrix(matrix_a_frac, f"A ({n}x{n})")
 
     # 3. Cálculo de la inversa usando Gauss-Jordan
     if n == 0: # Debería ser detectado por validar_matriz
         raise HTTPException(status_code=400, detail="No se puede calcular la inversa de una matriz vacía.")
 
-    inverse_matrix_frac, is_invertible = _gauss_jordan_inverse(matrix_a_frac, steps)
+    # Con pasos detallados no se reutiliza la factorización almacenada: los pasos no deben depender de
+    # solicitudes anteriores (la misma entrada devuelve siempre la misma eliminación)
+    cached_factors = FACTOR_CACHE.get(matrix_a_frac) if not steps.detailed else None
+    if cached_factors is not None:
+        inverse_matrix_frac, is_invertible = _inverse_from_factors(cached_factors, steps)
+    elif structure is not None and structure.kind != GENERAL: # Diagonal, triangular, permutación o por bloques (ver backend/core/structure.py)
+        inverse_matrix_frac, is_invertible = _inverse_structured(matrix_a_frac, structure, steps)
+    else:
+        inverse_matrix_frac, is_invertible = _gauss_jordan_inverse(matrix_a_frac, steps)
 
     if not is_invertible:
-        # Los pasos para la no invertibilidad ya han sido añadidos por _gauss_jordan_inverse
+        # Los pasos para la no invertibilidad ya han sido añadidos por _gauss_jordan_inverse (o _inverse_from_factors, _inverse_structured)
         return ApiResponse(
             success=False,
             error="La matriz no es invertible (singular). Los pasos detallan el problema.",
-            steps=steps,
+            steps=steps.for_response(),
             result=None # Establecer explícitamente el resultado como None o una lista vacía
         )
 
@@ -145,7 +198,7 @@ async def calculate_inverse_endpoint(data: MatrixInput):
         # Este caso idealmente debería estar cubierto por la verificación is_invertible.
         # Añadido como salvaguarda.
         steps.append("Error inesperado: La matriz fue marcada como invertible pero no se generó la inversa.")
-        return ApiResponse(success=False, error="Error interno al calcular la inversa.", steps=steps)
+        return ApiResponse(success=False, error="Error interno al calcular la inversa.", steps=steps.for_response())
 
     formatted_inverse_matrix = [
         [format_fraction_output(val) for val in row] 
@@ -157,5 +210,5 @@ async def calculate_inverse_endpoint(data: MatrixInput):
     return ApiResponse(
         success=True,
         result=formatted_inverse_matrix,
-        steps=steps
+        steps=steps.for_response()
     ) 
\ No newline at end of file
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, HTTPException
+from typing import List
+from fractions import Fraction
+
+from backend.models import MatrixInput, ApiResponse, Matrix, OutputMatrix
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixValueError, matrix_fractions
+from backend.utils.validators import validar_matriz, validar_costo_operacion
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
+from backend.core.ldlt import LDLTBreakdown, is_symmetric, ldlt_factorize, pack_lower
+from backend.core.factor_cache import FACTOR_CACHE
+
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
+
+def _log_ldlt_factors(matrix_l: Matrix, diagonal: List[Fraction], steps_ref: StepLog) -> None:
+    """Registra D(k,k) y la columna k de L (sólo en modo full)."""
+    n = len(diagonal)
+    for k in range(n):
+        steps_ref.append(f"  D({k+1},{k+1}) = {format_fraction_output(diagonal[k])}")
+        for i in range(k + 1, n):
+            if matrix_l[i][k]:
+                steps_ref.append(f"    L({i+1},{k+1}) = {format_fraction_output(matrix_l[i][k])}")
+
+
+@router.post("/ldlt_factorization", response_model=ApiResponse, summary="Factorización A = L D Lᵀ de una matriz simétrica (exacta, sin raíces cuadradas)")
+@cached_result("ldlt_factorization")
+@compact_output
+@offloaded("ldlt_factorization")
+def ldlt_factorization_endpoint(data: MatrixInput):
+    """
+    Factoriza una matriz simétrica A = L D Lᵀ, con L triangular inferior con unos en la diagonal y D
+    diagonal, guardando y eliminando sólo el triángulo inferior (ver backend/core/ldlt.py).
+    Si todos los pivotes de D son positivos, A es definida positiva y L D^(1/2) es su factor de Cholesky.
+    La factorización se guarda en la caché de factores (como PA = LU con P = I y U = D Lᵀ).
+    """
+    steps = StepLog(data.steps, steps_format=data.steps_format)
+
+    # 1. Validar Matriz A
+    rows_a, cols_a, error_msg_val = validar_matriz(data.matrix, "A")
+    if error_msg_val:
+        raise HTTPException(status_code=400, detail=f"Error en Matriz A: {error_msg_val}")
+    if rows_a != cols_a:
+        raise HTTPException(status_code=400, detail=f"La matriz A debe ser cuadrada para la factorización LDLᵀ. Se recibió {rows_a}x{cols_a}.")
+
+    n = rows_a
+
+    # 2. Conversión a Fracciones
+    try:
+        matrix_a_frac: Matrix = matrix_fractions(data.matrix) # Convertida al validar la entrada
+    except MatrixValueError as e: # Elemento inválido, con su posición
+        raise HTTPException(status_code=400, detail=e.detail("A"))
+
+    if not is_symmetric(matrix_a_frac):
+        raise HTTPException(status_code=400, detail="La matriz A debe ser simétrica (A = Aᵀ) para la factorización LDLᵀ.")
+    error_costo = validar_costo_operacion("ldlt_factorization", [matrix_a_frac], n, n, con_pasos=steps.detailed)
+    if error_costo:
+        raise HTTPException(status_code=400, detail=error_costo)
+
+    steps.append("Matriz de entrada A:")
+    steps.matrix(matrix_a_frac, f"A ({n}x{n})")
+
+    # 3. Factorización sobre el triángulo inferior empaquetado
+    steps.append(f"A es simétrica: se almacena sólo su triángulo inferior ({n * (n + 1) // 2} de {n * n} elementos).")
+    steps.append("Eliminación simétrica sin fracciones (Bareiss) sobre el triángulo inferior: D(k,k) es el cociente de menores principales consecutivos y L(i,k) = a(i,k) / a(k,k).")
+    try:
+        factors = ldlt_factorize(pack_lower(matrix_a_frac), n)
+    except LDLTBreakdown as e:
+        steps.append(str(e))
+        return ApiResponse(success=False, error=str(e), steps=steps.for_response(), result=None)
+
+    matrix_l_frac = factors.lower_matrix()
+    if steps.detailed:
+        _log_ldlt_factors(matrix_l_frac, factors.diagonal, steps)
+    steps.append("Factorización LDLᵀ completada.")
+    if factors.positive_definite:
+        steps.append("Todos los pivotes de D son positivos: A es definida positiva, y L D^(1/2) es su factor de Cholesky.")
+    else:
+        steps.append("D tiene pivotes negativos o nulos: A no es definida positiva.")
+
+    FACTOR_CACHE.put(matrix_a_frac, factors.to_lup()) # Reutilizable por solve, determinante e inversa sobre la misma A
+
+    # 4. Formatear L y D para la salida
+    output_l: OutputMatrix = [[format_fraction_output(el) for el in row] for row in matrix_l_frac]
+    output_d: OutputMatrix = [[format_fraction_output(factors.diagonal[i]) if i == j else "0" for j in range(n)] for i in range(n)]
+    steps.append("Matriz L final:")
+    steps.matrix(output_l, "L")
+    steps.append("Matriz D final:")
+    steps.matrix(output_d, "D")
+
+    return ApiResponse(
+        success=True,
+        result={"matrix_l": output_l, "matrix_d": output_d, "positive_definite": factors.positive_definite},
+        steps=steps.for_response()
+    )
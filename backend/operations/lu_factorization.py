@@ -2,14 +2,23 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Tuple
 from fractions import Fraction
 
-from backend.models import MatrixInput, ApiResponse, LUFactorizationResult, Matrix, OutputMatrix
-from backend.utils.type_converters import to_fraction, format_fraction_output
-from backend.utils.formatters import format_matrix_for_steps
-from backend.utils.validators import validar_matriz
+from backend.models import LUInput, ApiResponse, LUFactorizationResult, Matrix, OutputMatrix
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixValueError, matrix_fractions
+from backend.utils.validators import validar_matriz, validar_costo_operacion
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
+from backend.core.rational_matrix import RationalMatrix
+from backend.core.lup import LUPFactors
+from backend.core.factor_cache import FACTOR_CACHE
+from backend.core.structure import BLOCK_DIAGONAL, DIAGONAL, LOWER_TRIANGULAR, PERMUTATION, UPPER_TRIANGULAR, detect_structure, structured_lu, use_structure_shortcuts
 
-router = APIRouter()
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
 
-def _lu_decomposition_doolittle(matrix_a_frac: Matrix, steps_ref: List[str]) -> Tuple[Matrix | None, Matrix | None, bool, str | None]:
+def _lu_decomposition_doolittle(matrix_a_frac: Matrix, steps_ref: StepLog) -> Tuple[Matrix | None, Matrix | None, bool, str | None]:
     """
     Realiza la descomposición LU de una matriz A utilizando el método de Doolittle.
     A = LU, donde L es triangular inferior con 1s en la diagonal, y U es triangular superior.
@@ -17,7 +26,7 @@ def _lu_decomposition_doolittle(matrix_a_frac: Matrix, steps_ref: List[str]) ->
 
     Args:
         matrix_a_frac: Matriz de entrada A (cuadrada) con elementos como Fraction.
-        steps_ref: Lista para registrar los pasos detallados del cálculo.
+        steps_ref: Registro de pasos (los pasos elemento a elemento sólo se generan en modo full).
 
     Returns:
         Tuple[Matrix | None, Matrix | None, bool, str | None]:
@@ -31,61 +40,143 @@ def _lu_decomposition_doolittle(matrix_a_frac: Matrix, steps_ref: List[str]) ->
         return None, None, False, "La matriz de entrada no puede estar vacía."
     
     # Inicializar matrices L y U con ceros
-    L = [[Fraction(0) for _ in range(n)] for _ in range(n)]
-    U = [[Fraction(0) for _ in range(n)] for _ in range(n)]
+    L = RationalMatrix.zeros(n, n)
+    U = RationalMatrix.zeros(n, n)
 
-    steps_ref.append("Inicializando matrices L y U.")
-    steps_ref.extend(format_matrix_for_steps([[format_fraction_output(el) for el in row] for row in L], "Matriz L Inicial"))
-    steps_ref.extend(format_matrix_for_steps([[format_fraction_output(el) for el in row] for row in U], "Matriz U Inicial"))
+    if steps_ref.detailed:
+        steps_ref.append("Inicializando matrices L y U.")
+        steps_ref.snapshot(L, "Matriz L Inicial")
+        steps_ref.snapshot(U, "Matriz U Inicial")
 
     steps_ref.append("Calculando elementos de L y U:")
 
     for k in range(n):
         # Calcular diagonal de L (siempre 1 para Doolittle) y elementos de U en la fila k
-        L[k][k] = Fraction(1)
-        steps_ref.append(f"  L({k+1},{k+1}) = 1 (Diagonal de L en Doolittle)")
+        L.set(k, k, 1)
+        if steps_ref.detailed:
+            steps_ref.append(f"  L({k+1},{k+1}) = 1 (Diagonal de L en Doolittle)")
 
-        steps_ref.append(f"  Calculando fila {k+1} de U:")
+        if steps_ref.detailed:
+            steps_ref.append(f"  Calculando fila {k+1} de U:")
+        u_row = [Fraction(0)] * n
         for j in range(k, n): # Columnas de U
-            sum_lu = Fraction(0)
-            for p in range(k): # Sumatoria de L[k][p] * U[p][j]
-                sum_lu += L[k][p] * U[p][j]
+            sum_lu = L.dot_row_column(k, U, j, stop=k) # Sumatoria de L[k][p] * U[p][j] para p < k
             
-            U[k][j] = matrix_a_frac[k][j] - sum_lu
-            steps_ref.append(f"    U({k+1},{j+1}) = A({k+1},{j+1}) - Σ(L({k+1},p)*U(p,{j+1})) for p=1 to {k}")
-            steps_ref.append(f"             = {format_fraction_output(matrix_a_frac[k][j])} - {format_fraction_output(sum_lu)} = {format_fraction_output(U[k][j])}")
+            u_row[j] = matrix_a_frac[k][j] - sum_lu
+            if steps_ref.detailed:
+                steps_ref.append(f"    U({k+1},{j+1}) = A({k+1},{j+1}) - Σ(L({k+1},p)*U(p,{j+1})) for p=1 to {k}")
+                steps_ref.append(f"             = {format_fraction_output(matrix_a_frac[k][j])} - {format_fraction_output(sum_lu)} = {format_fraction_output(u_row[j])}")
+        U.set_row(k, u_row)
 
         # Verificar si U[k][k] es cero (pivote cero), lo que detendría la división para L
-        if U[k][k] == 0:
+        if U.is_zero(k, k):
             error_msg = f"Error: Pivote U({k+1},{k+1}) es cero. La descomposición LU (sin pivoteo) no es posible o la matriz es singular."
             steps_ref.append(error_msg)
             return None, None, False, error_msg
         
         # Calcular elementos de L en la columna k (debajo de la diagonal)
-        if k + 1 < n: # Solo si hay filas debajo de la actual
-             steps_ref.append(f"  Calculando columna {k+1} de L (debajo de la diagonal):")
+        if k + 1 < n and steps_ref.detailed: # Solo si hay filas debajo de la actual
+            steps_ref.append(f"  Calculando columna {k+1} de L (debajo de la diagonal):")
+        pivot_u = U.get(k, k)
         for i in range(k + 1, n): # Filas de L
-            sum_lu = Fraction(0)
-            for p in range(k): # Sumatoria de L[i][p] * U[p][k]
-                sum_lu += L[i][p] * U[p][k]
+            sum_lu = L.dot_row_column(i, U, k, stop=k) # Sumatoria de L[i][p] * U[p][k] para p < k
             
-            L[i][k] = (matrix_a_frac[i][k] - sum_lu) / U[k][k]
-            steps_ref.append(f"    L({i+1},{k+1}) = (A({i+1},{k+1}) - Σ(L({i+1},p)*U(p,{k+1}))) / U({k+1},{k+1}) for p=1 to {k}")
-            steps_ref.append(f"             = ({format_fraction_output(matrix_a_frac[i][k])} - {format_fraction_output(sum_lu)}) / {format_fraction_output(U[k][k])} = {format_fraction_output(L[i][k])}")
+            l_ik = (matrix_a_frac[i][k] - sum_lu) / pivot_u
+            L.set(i, k, l_ik)
+            if steps_ref.detailed:
+                steps_ref.append(f"    L({i+1},{k+1}) = (A({i+1},{k+1}) - Σ(L({i+1},p)*U(p,{k+1}))) / U({k+1},{k+1}) for p=1 to {k}")
+                steps_ref.append(f"             = ({format_fraction_output(matrix_a_frac[i][k])} - {format_fraction_output(sum_lu)}) / {format_fraction_output(pivot_u)} = {format_fraction_output(l_ik)}")
 
     steps_ref.append("Descomposición LU completada.")
-    return L, U, True, None
+    return L.to_fractions(), U.to_fractions(), True, None
 
+def _lup_decomposition_partial_pivoting(matrix_a_frac: Matrix, steps_ref: StepLog) -> LUPFactors:
+    """
+    Realiza la descomposición PA = LU con pivoteo parcial: en cada columna se elige como pivote el
+    elemento de mayor valor absoluto (desde la diagonal hacia abajo) y se intercambian filas.
+    Nunca falla por un pivote cero; si una columna no tiene pivote la matriz es singular y U(k,k) = 0.
 
-@router.post("/lu_factorization", response_model=ApiResponse, summary="Descomposición LU de una matriz (método Doolittle sin pivoteo)")
-async def lu_factorization_endpoint(data: MatrixInput):
+    Args:
+        matrix_a_frac: Matriz de entrada A (cuadrada) con elementos como Fraction.
+        steps_ref: Registro de pasos (los pasos elemento a elemento sólo se generan en modo full).
+
+    Returns:
+        LUPFactors: Factores L, U y la permutación de filas.
+    """
+    n = len(matrix_a_frac)
+    U = RationalMatrix.from_fractions(matrix_a_frac) # Se reduce sobre una copia de A
+    multipliers: List[List[Fraction]] = [[Fraction(0)] * n for _ in range(n)] # Parte estrictamente inferior de L
+    perm = list(range(n))
+    swaps = 0
+
+    steps_ref.append("Eliminación Gaussiana con pivoteo parcial (PA = LU):")
+    for k in range(n):
+        # Pivote de mayor valor absoluto en la columna k
+        pivot_row = k
+        pivot_abs = abs(U.get(k, k))
+        for i in range(k + 1, n):
+            candidate_abs = abs(U.get(i, k))
+            if candidate_abs > pivot_abs:
+                pivot_row, pivot_abs = i, candidate_abs
+
+        if pivot_abs == 0:
+            steps_ref.append(f"  Columna {k+1} no tiene pivote no nulo: U({k+1},{k+1}) = 0 (la matriz es singular).")
+            continue
+
+        if pivot_row != k:
+            U.swap_rows(k, pivot_row)
+            multipliers[k], multipliers[pivot_row] = multipliers[pivot_row], multipliers[k] # Los multiplicadores ya calculados viajan con su fila
+            perm[k], perm[pivot_row] = perm[pivot_row], perm[k]
+            swaps += 1
+            steps_ref.row_op("swap", "  Intercambiando Fila {row} con Fila {other} (P registra el intercambio).", row=k + 1, other=pivot_row + 1)
+
+        pivot_element = U.get(k, k)
+        steps_ref.row_op("pivot", "  Pivote U({row},{col}) = {value}", row=k + 1, col=k + 1, value=pivot_element)
+        for i in range(k + 1, n):
+            if not U.is_zero(i, k):
+                factor = U.get(i, k) / pivot_element
+                multipliers[i][k] = factor
+                U.subtract_scaled_row(i, k, factor, start=k)
+                steps_ref.row_op("eliminate", "    L({row},{col}) = {factor}; F{row} = F{row} - ({factor}) * F{source}", row=i + 1, col=k + 1, source=k + 1, factor=factor)
+        steps_ref.snapshot(U, "Matriz después de eliminar la columna", rows=range(k, n)) # Intercambio y eliminaciones sólo tocan las filas k..n-1
+
+    for i in range(n):
+        multipliers[i][i] = Fraction(1)
+    steps_ref.append("Descomposición PA = LU completada.")
+    return LUPFactors(RationalMatrix.from_fractions(multipliers), U, perm, swaps)
+
+_STRUCTURED_LU_STEPS = {
+    DIAGONAL: "  L = I y U = A (no hay elementos que eliminar).",
+    UPPER_TRIANGULAR: "  L = I y U = A (no hay elementos que eliminar debajo de la diagonal).",
+    LOWER_TRIANGULAR: "  U = diagonal de A y L = A con cada columna dividida por su elemento diagonal.",
+    PERMUTATION: "  P lleva a cada fila k la única fila con entrada no nula en la columna k; L = I y U = PA (diagonal).",
+    BLOCK_DIAGONAL: "  Cada bloque diagonal se factoriza por separado; L, U y P son diagonales por bloques.",
+}
+
+def _factorize_block(block: Matrix, pivoting: str) -> LUPFactors | None:
+    """Factoriza un bloque general de una matriz diagonal por bloques, sin registrar pasos (None si Doolittle falla)."""
+    silent = StepLog("none")
+    if pivoting == "partial":
+        return _lup_decomposition_partial_pivoting(block, silent)
+    matrix_l, matrix_u, success, _ = _lu_decomposition_doolittle(block, silent)
+    if not success:
+        return None
+    return LUPFactors(RationalMatrix.from_fractions(matrix_l), RationalMatrix.from_fractions(matrix_u), list(range(len(block))), 0)
+
+
+@router.post("/lu_factorization", response_model=ApiResponse, summary="Descomposición LU de una matriz (Doolittle sin pivoteo o LUP con pivoteo parcial)")
+@cached_result("lu_factorization")
+@compact_output
+@offloaded("lu_factorization")
+def lu_factorization_endpoint(data: LUInput):
     """
     Realiza la descomposición LU de una matriz A, de forma que A = LU.
     L es una matriz triangular inferior con unos en la diagonal.
     U es una matriz triangular superior.
-    La implementación actual no utiliza pivoteo.
+    Por defecto no utiliza pivoteo; con pivoting="partial" calcula PA = LU y retorna también P.
+    La factorización se guarda en la caché de factores para que solve, determinante e inversa la reutilicen.
     """
-    steps: List[str] = []
+    steps = StepLog(data.steps, steps_format=data.steps_format)
 
     # 1. Validar Matriz A
     rows_a, cols_a, error_msg_val = validar_matriz(data.matrix, "A")
@@ -98,41 +189,62 @@ async def lu_factorization_endpoint(data: MatrixInput):
     # Validaciones específicas para LU
     if rows_a != cols_a:
         raise HTTPException(status_code=400, detail=f"La matriz A debe ser cuadrada para la descomposición LU. Se recibió {rows_a}x{cols_a}.")
-    if rows_a > 4: # Mantenemos límite de 4x4
-        raise HTTPException(status_code=400, detail=f"La matriz A está limitada a dimensiones de hasta 4x4 para LU. Se recibió {rows_a}x{cols_a}.")
 
     n = rows_a
 
     # 2. Conversión a Fracciones
-    matrix_a_frac: Matrix = []
     try:
-        for i, row_data in enumerate(data.matrix):
-            if len(row_data) != n: # Redundante si validar_matriz chequea rectangularidad
-                 raise ValueError(f"La fila {i+1} de la matriz A tiene {len(row_data)} elementos, se esperaban {n}.")
-            matrix_a_frac.append([to_fraction(val) for val in row_data])
-    except ValueError as e: # Captura errores de to_fraction
-        raise HTTPException(status_code=400, detail=f"Error de conversión de valor: {str(e)}")
+        matrix_a_frac: Matrix = matrix_fractions(data.matrix) # Convertida al validar la entrada
+    except MatrixValueError as e: # Elemento inválido, con su posición
+        raise HTTPException(status_code=400, detail=e.detail("A"))
+
+    # Los atajos directos por estructura (diagonal, triangular, permutación) cuestan O(n²): se aplican antes de validar el costo
+    # (con pasos detallados, las matrices pequeñas siguen la eliminación, como el determinante)
+    structure = detect_structure(matrix_a_frac) if use_structure_shortcuts(n, steps.detailed) else None
+    structured_factors = structured_lu(matrix_a_frac, structure, data.pivoting) if structure is not None and structure.direct else None
+    error_costo = validar_costo_operacion("substitution" if structured_factors is not None else "lu_factorization", [matrix_a_frac], n, n, con_pasos=steps.detailed and structured_factors is None)
+    if error_costo:
+        raise HTTPException(status_code=400, detail=error_costo)
 
     steps.append("Matriz de entrada A:")
-    steps.extend(format_matrix_for_steps(matrix_a_frac, f"A ({n}x{n})"))
+    steps.matrix(matrix_a_frac, f"A ({n}x{n})")
+
+    # 3. Descomposición LU (directa si A es diagonal, triangular, de permutación o por bloques, ver backend/core/structure.py)
+    if structure is not None and structure.kind == BLOCK_DIAGONAL:
+        structured_factors = structured_lu(matrix_a_frac, structure, data.pivoting, lambda block: _factorize_block(block, data.pivoting))
+    if structured_factors is not None:
+        factors = structured_factors
+        steps.append(f"Estructura detectada: {structure.description}. Los factores se obtienen sin eliminación completa:")
+        steps.append(_STRUCTURED_LU_STEPS[structure.kind])
+        matrix_l_frac, matrix_u_frac = factors.L.to_fractions(), factors.U.to_fractions()
+    elif data.pivoting == "partial":
+        factors = _lup_decomposition_partial_pivoting(matrix_a_frac, steps)
+        matrix_l_frac, matrix_u_frac = factors.L.to_fractions(), factors.U.to_fractions()
+    else:
+        matrix_l_frac, matrix_u_frac, success, error_lu = _lu_decomposition_doolittle(matrix_a_frac, steps)
 
-    # 3. Descomposición LU
-    matrix_l_frac, matrix_u_frac, success, error_lu = _lu_decomposition_doolittle(matrix_a_frac, steps)
+        if not success or matrix_l_frac is None or matrix_u_frac is None:
+            # El error_lu ya está en los steps si fue generado por _lu_decomposition_doolittle
+            # Si no hay error_lu específico pero falló, usar un mensaje genérico.
+            error_message = error_lu if error_lu else "No se pudo completar la descomposición LU."
+            return ApiResponse(success=False, error=error_message, steps=steps.for_response(), result=None)
+        factors = LUPFactors(RationalMatrix.from_fractions(matrix_l_frac), RationalMatrix.from_fractions(matrix_u_frac), list(range(n)), 0)
 
-    if not success or matrix_l_frac is None or matrix_u_frac is None:
-        # El error_lu ya está en los steps si fue generado por _lu_decomposition_doolittle
-        # Si no hay error_lu específico pero falló, usar un mensaje genérico.
-        error_message = error_lu if error_lu else "No se pudo completar la descomposición LU."
-        return ApiResponse(success=False, error=error_message, steps=steps, result=None)
+    FACTOR_CACHE.put(matrix_a_frac, factors) # Reutilizable por solve, determinante e inversa sobre la misma A
 
-    # 4. Formatear matrices L y U para la salida
+    # 4. Formatear matrices L y U (y P) para la salida
     output_l: OutputMatrix = [[format_fraction_output(el) for el in row] for row in matrix_l_frac]
     output_u: OutputMatrix = [[format_fraction_output(el) for el in row] for row in matrix_u_frac]
+    output_p: OutputMatrix | None = None
+    if data.pivoting == "partial":
+        output_p = [[format_fraction_output(el) for el in row] for row in factors.permutation_matrix()]
+        steps.append("Matriz de permutación P:")
+        steps.matrix(output_p, "P")
 
     steps.append("Matriz L final:")
-    steps.extend(format_matrix_for_steps(output_l, "L"))
+    steps.matrix(output_l, "L")
     steps.append("Matriz U final:")
-    steps.extend(format_matrix_for_steps(output_u, "U"))
+    steps.matrix(output_u, "U")
     
     # Verificar A = L*U (opcional, para depuración o como paso extra)
     # Product_LU = [[sum(L[i][k] * U[k][j] for k in range(n)) for j in range(n)] for i in range(n)]
@@ -142,6 +254,6 @@ async def lu_factorization_endpoint(data: MatrixInput):
 
     return ApiResponse(
         success=True,
-        result=LUFactorizationResult(matrix_l=output_l, matrix_u=output_u),
-        steps=steps
+        result=LUFactorizationResult(matrix_l=output_l, matrix_u=output_u, matrix_p=output_p),
+        steps=steps.for_response()
     ) 
\ No newline at end of file
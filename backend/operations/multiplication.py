@@ -1,15 +1,23 @@
 from fastapi import APIRouter, HTTPException
 from typing import List
-from fractions import Fraction
 
 from backend.models import TwoMatrixInput, ApiResponse, Matrix
-from backend.utils.type_converters import to_fraction, format_fraction_output
-from backend.utils.formatters import format_matrix_for_steps
-from backend.utils.validators import validar_matriz, validar_dimensiones_para_multiplicacion
-
-router = APIRouter()
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixSizeError, MatrixValueError, matrix_fractions, matrix_sparse
+from backend.utils.validators import validar_matriz, validar_dimensiones_para_multiplicacion, validar_costo_operacion
+from backend.core.rational_matrix import RationalMatrix
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
+
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
 
 @router.post("/multiply", response_model=ApiResponse, summary="Multiplicación de dos matrices")
+@cached_result("multiply")
+@compact_output
+@offloaded("multiply")
 def multiply_matrices_endpoint(data: TwoMatrixInput):
     """
     Multiplica dos matrices A y B.
@@ -19,7 +27,7 @@ def multiply_matrices_endpoint(data: TwoMatrixInput):
     es el producto punto de la fila i de A y la columna j de B.
     C[i][j] = A[i][0]*B[0][j] + A[i][1]*B[1][j] + ... + A[i][n-1]*B[n-1][j]
     """
-    steps = [] # Lista para almacenar los pasos de la operación
+    steps = StepLog(data.steps, steps_format=data.steps_format) # Registro de los pasos de la operación, con el nivel de detalle pedido
     error_msg = None # Variable para almacenar mensajes de error
 
     # Validar y convertir Matriz A
@@ -27,78 +35,85 @@ def multiply_matrices_endpoint(data: TwoMatrixInput):
     if error_msg_a:
         raise HTTPException(status_code=400, detail=error_msg_a) # Lanzar excepción si hay un error en la matriz A
     
-    matrix_a_frac: Matrix = [] # Inicializar la matriz A como una lista de listas de fracciones
     try:
-        for i, row_a in enumerate(data.matrix_a): # Iterar sobre las filas de la matriz A
-            row_a_frac = [] # Inicializar la fila como una lista de fracciones
-            for j, val_a in enumerate(row_a): # Iterar sobre los valores de la fila
-                row_a_frac.append(to_fraction(val_a)) # Convertir el valor a fracción y agregarlo a la fila
-            matrix_a_frac.append(row_a_frac) # Agregar la fila a la matriz
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e)) # Lanzar excepción si hay un error de conversión
+        sparse_a = matrix_sparse(data.matrix_a) # Representación dispersa de A si es grande y con pocos no nulos (convertida al validar la entrada)
+    except MatrixValueError as e:
+        raise HTTPException(status_code=400, detail=e.detail("A")) # Lanzar excepción si hay un error de conversión
 
     steps.append("Matriz A ingresada:") # Agregar un paso al registro
-    steps.extend(format_matrix_for_steps(matrix_a_frac, "Matriz A")) # Agregar la matriz A formateada a los pasos
+    steps.input_matrix(data.matrix_a, "Matriz A") # Agregar la matriz A a los pasos
 
     # Validar y convertir Matriz B
-    rows_b_val, cols_b_val, error_msg_b = validar_matriz(data.matrix_b, "B") # Validar la matriz B
+    _, cols_b, error_msg_b = validar_matriz(data.matrix_b, "B") # Validar la matriz B
     if error_msg_b:
         raise HTTPException(status_code=400, detail=error_msg_b) # Lanzar excepción si hay un error en la matriz B
 
-    # Verificar límites de tamaño antes de continuar
-    if rows_a is not None and rows_a > 4:
-        raise HTTPException(status_code=400, detail=f"La operación está limitada a matrices de hasta 4 filas. La matriz A tiene {rows_a} filas.")
-    if cols_a is not None and cols_a > 4:
-        raise HTTPException(status_code=400, detail=f"La operación está limitada a matrices de hasta 4 columnas. La matriz A tiene {cols_a} columnas.")
-    if rows_b_val is not None and rows_b_val > 4:
-        raise HTTPException(status_code=400, detail=f"La operación está limitada a matrices de hasta 4 filas. La matriz B tiene {rows_b_val} filas.")
-    if cols_b_val is not None and cols_b_val > 4:
-        raise HTTPException(status_code=400, detail=f"La operación está limitada a matrices de hasta 4 columnas. La matriz B tiene {cols_b_val} columnas.")
-
-    matrix_b_frac: Matrix = [] # Inicializar la matriz B como una lista de listas de fracciones
     try:
-        for i, row_b in enumerate(data.matrix_b): # Iterar sobre las filas de la matriz B
-            row_b_frac = [] # Inicializar la fila como una lista de fracciones
-            for j, val_b in enumerate(row_b): # Iterar sobre los valores de la fila
-                row_b_frac.append(to_fraction(val_b)) # Convertir el valor a fracción y agregarlo a la fila
-            matrix_b_frac.append(row_b_frac) # Agregar la fila a la matriz
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e)) # Lanzar excepción si hay un error de conversión
+        sparse_b = matrix_sparse(data.matrix_b) # Representación dispersa de B (convertida al validar la entrada)
+    except MatrixValueError as e:
+        raise HTTPException(status_code=400, detail=e.detail("B")) # Lanzar excepción si hay un error de conversión
 
     steps.append("Matriz B ingresada:") # Agregar un paso al registro
-    steps.extend(format_matrix_for_steps(matrix_b_frac, "Matriz B")) # Agregar la matriz B formateada a los pasos
+    steps.input_matrix(data.matrix_b, "Matriz B") # Agregar la matriz B a los pasos
 
-    # Validar dimensiones para multiplicación
-    valid_dims, dim_error_msg = validar_dimensiones_para_multiplicacion(matrix_a_frac, matrix_b_frac) # Validar las dimensiones de las matrices
+    # Validar dimensiones para multiplicación (sobre las entradas: no requiere la forma densa)
+    valid_dims, dim_error_msg = validar_dimensiones_para_multiplicacion(data.matrix_a, data.matrix_b) # Validar las dimensiones de las matrices
     if not valid_dims:
         raise HTTPException(status_code=400, detail=dim_error_msg) # Lanzar excepción si las dimensiones no son válidas
 
-    # Lógica de multiplicación
-    rows_a = len(matrix_a_frac) # Obtener el número de filas de la matriz A
-    cols_a = len(matrix_a_frac[0]) # Obtener el número de columnas de la matriz A (también es el número de filas de la matriz B)
-    cols_b = len(matrix_b_frac[0]) # Obtener el número de columnas de la matriz B
-
-    result_matrix_frac: Matrix = [[Fraction(0) for _ in range(cols_b)] for _ in range(rows_a)] # Inicializar la matriz resultante con ceros
+    # Si alguna de las matrices es dispersa, el producto recorre sólo los elementos no nulos (ver backend/core/sparse_matrix.py);
+    # si no, se usa la forma densa de ambas
+    use_sparse = sparse_a is not None or sparse_b is not None
+    try:
+        if use_sparse:
+            sparse_a = sparse_a or matrix_sparse(data.matrix_a, force=True)
+            sparse_b = sparse_b or matrix_sparse(data.matrix_b, force=True)
+        else:
+            matrix_a_frac: Matrix = matrix_fractions(data.matrix_a) # Matriz A como fracciones
+            matrix_b_frac: Matrix = matrix_fractions(data.matrix_b) # Matriz B como fracciones
+    except MatrixSizeError as e: # La forma densa de una entrada dispersa excede el presupuesto de memoria
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Verificar el tamaño contra la política de costo configurada antes de continuar
+    error_costo = validar_costo_operacion("multiply", [sparse_a, sparse_b] if use_sparse else [matrix_a_frac, matrix_b_frac], rows_a, cols_a, columnas_extra=cols_b, con_pasos=steps.detailed,
+                                          densidad=sparse_a.density * sparse_b.density if use_sparse else 1.0)
+    if error_costo:
+        raise HTTPException(status_code=400, detail=error_costo)
+
+    if use_sparse:
+        result_matrix_frac: Matrix = sparse_a.matmul(sparse_b).to_fractions() # Calcular C = A x B combinando sólo los productos no nulos
+    else:
+        result_matrix = RationalMatrix.from_fractions(matrix_a_frac).matmul(RationalMatrix.from_fractions(matrix_b_frac)) # Calcular C = A x B con productos punto enteros
+        result_matrix_frac: Matrix = result_matrix.to_fractions() # Matriz resultante con elementos Fraction
     calculation_steps = [] # Inicializar la lista de pasos de cálculo
 
     steps.append("Proceso de multiplicación (A x B):") # Agregar un paso al registro
-    for i in range(rows_a): # Iterar sobre las filas de la matriz A
-        for j in range(cols_b): # Iterar sobre las columnas de la matriz B
-            dot_product = Fraction(0) # Inicializar el producto punto
-            step_detail = f"Elemento C[{i+1}][{j+1}] = " # Inicializar el detalle del paso
-            calculation_parts = [] # Inicializar la lista de partes del cálculo
-            for k in range(cols_a): # cols_a es igual a rows_b. Iterar sobre las columnas de A / filas de B
-                term = matrix_a_frac[i][k] * matrix_b_frac[k][j] # Calcular el término
-                dot_product += term # Sumar el término al producto punto
-                calculation_parts.append(f"({format_fraction_output(matrix_a_frac[i][k])} * {format_fraction_output(matrix_b_frac[k][j])})") # Agregar el término formateado a las partes del cálculo
-            step_detail += " + ".join(calculation_parts) # Unir las partes del cálculo con el signo de suma
-            step_detail += f" = {format_fraction_output(dot_product)}" # Agregar el resultado formateado al detalle del paso
-            calculation_steps.append(step_detail) # Agregar el detalle del paso a la lista de pasos de cálculo
-            result_matrix_frac[i][j] = dot_product # Asignar el producto punto al elemento de la matriz resultante
+    if use_sparse:
+        steps.append(f"Matrices dispersas (A: {sparse_a.nnz} de {rows_a * cols_a} elementos no nulos, B: {sparse_b.nnz} de {cols_a * cols_b}): sólo se multiplican los pares de elementos no nulos.")
+    if steps.detailed: # Sólo en modo full se detalla cada producto punto
+        for i in range(rows_a): # Iterar sobre las filas de la matriz A
+            for j in range(cols_b): # Iterar sobre las columnas de la matriz B
+                dot_product = result_matrix_frac[i][j] # Producto punto ya calculado por el motor
+                step_detail = f"Elemento C[{i+1}][{j+1}] = " # Inicializar el detalle del paso
+                calculation_parts = [] # Inicializar la lista de partes del cálculo
+                if use_sparse: # En matrices dispersas sólo se detallan los términos no nulos
+                    terms = [k for k in sorted(sparse_a.data[i]) if j in sparse_b.data[k]]
+                    if not terms:
+                        continue # C[i][j] = 0: no hay términos no nulos
+                else:
+                    terms = range(cols_a) # cols_a es igual a rows_b
+                for k in terms: # Iterar sobre las columnas de A / filas de B
+                    a_ik, b_kj = (sparse_a.get(i, k), sparse_b.get(k, j)) if use_sparse else (matrix_a_frac[i][k], matrix_b_frac[k][j])
+                    calculation_parts.append(f"({format_fraction_output(a_ik)} * {format_fraction_output(b_kj)})") # Agregar el término formateado a las partes del cálculo
+                step_detail += " + ".join(calculation_parts) # Unir las partes del cálculo con el signo de suma
+                step_detail += f" = {format_fraction_output(dot_product)}" # Agregar el resultado formateado al detalle del paso
+                calculation_steps.append(step_detail) # Agregar el detalle del paso a la lista de pasos de cálculo
     
+    if use_sparse and steps.detailed:
+        calculation_steps.append("Los demás elementos de C son 0.")
     steps.extend(calculation_steps) # Agregar los pasos de cálculo a la lista de pasos
     steps.append("Matriz Resultante (C = A x B):") # Agregar un paso al registro
-    steps.extend(format_matrix_for_steps(result_matrix_frac, "Matriz Resultante C")) # Agregar la matriz resultante formateada a los pasos
+    steps.matrix(result_matrix_frac, "Matriz Resultante C") # Agregar la matriz resultante formateada a los pasos
 
     # Formatear resultado para la API
     result_matrix_formatted = [ # Formatear la matriz resultante para la API
@@ -109,5 +124,5 @@ def multiply_matrices_endpoint(data: TwoMatrixInput):
     return ApiResponse( # Retornar la respuesta de la API
         success=True, # Indicar que la operación fue exitosa
         result=result_matrix_formatted, # Agregar la matriz resultante formateada
-        steps=steps # Agregar los pasos
+        steps=steps.for_response() # Agregar los pasos (None si no se pidieron)
     )
\ No newline at end of file
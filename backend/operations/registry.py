@@ -0,0 +1,29 @@
+from typing import Callable, Dict, Tuple, Type
+
+from pydantic import BaseModel
+
+from backend.models import ApiResponse, DeterminantInput, LUInput, MatrixInput, SystemInput, TwoMatrixInput
+from backend.operations.addition import add_matrices
+from backend.operations.subtraction import subtract_matrices
+from backend.operations.multiplication import multiply_matrices_endpoint
+from backend.operations.determinant import calculate_determinant_endpoint
+from backend.operations.inverse import calculate_inverse_endpoint
+from backend.operations.gaussian_elimination import solve_system_gaussian_endpoint
+from backend.operations.lu_factorization import lu_factorization_endpoint
+from backend.operations.ldlt_factorization import ldlt_factorization_endpoint
+from backend.operations.gauss_jordan_elimination import solve_system_gauss_jordan
+
+# Registro de operaciones: nombre (el mismo de la ruta /operations/<nombre>) -> (modelo de entrada, función).
+# Lo usan los endpoints que despachan operaciones por nombre (e.g. /operations/batch), de modo que cada
+# trabajo pasa por exactamente la misma validación y cálculo que su endpoint individual.
+OPERATIONS: Dict[str, Tuple[Type[BaseModel], Callable[[BaseModel], ApiResponse]]] = {
+    "add": (TwoMatrixInput, add_matrices),
+    "subtract": (TwoMatrixInput, subtract_matrices),
+    "multiply": (TwoMatrixInput, multiply_matrices_endpoint),
+    "determinant": (DeterminantInput, calculate_determinant_endpoint),
+    "inverse": (MatrixInput, calculate_inverse_endpoint),
+    "solve_system_gaussian": (SystemInput, solve_system_gaussian_endpoint),
+    "lu_factorization": (LUInput, lu_factorization_endpoint),
+    "ldlt_factorization": (MatrixInput, ldlt_factorization_endpoint),
+    "gauss_jordan_elimination": (SystemInput, solve_system_gauss_jordan),
+}
@@ -0,0 +1,120 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import json
+import os
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Body, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from backend.models import ApiResponse
+from backend.operations.registry import OPERATIONS
+from backend.utils.steps import STEP_SINK, StepEntry, StepRenderer
+
+router = APIRouter()
+
+# Variante en streaming de cada operación: los pasos se envían a medida que la eliminación los
+# registra y el resultado (ApiResponse sin steps) llega al final. Formatos:
+#   NDJSON (por defecto)   Una línea JSON por evento: {"event": "step" | "result" | "error", "data": ...}
+#   SSE                    Con "Accept: text/event-stream": "event: <tipo>\ndata: <json>\n\n"
+# El cálculo corre en un hilo; si el cliente no consume los eventos, el hilo se bloquea al llenarse el
+# búfer (memoria constante) y se cancela si el cliente se desconecta.
+#
+# Variables de entorno:
+#   MATRIX_STREAM_BUFFER_EVENTS  Eventos en espera antes de pausar el cálculo. Por defecto 256.
+STREAM_BUFFER_EVENTS = int(os.environ.get("MATRIX_STREAM_BUFFER_EVENTS", 256))
+
+_PUT_POLL_SECONDS = 0.5
+
+
+class StreamCancelled(BaseException):
+    """El cliente se desconectó. Hereda de BaseException para que el `except Exception` de los endpoints no la absorba."""
+
+
+def _encode_event(event: str, data: Any, sse: bool) -> str:
+    payload = json.dumps(data, ensure_ascii=False)
+    if sse:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+
+def _run_operation(operation: Callable[[BaseModel], ApiResponse], data: BaseModel) -> Tuple[str, Dict[str, Any]]:
+    """Ejecuta la operación y retorna el evento final: ("result", ApiResponse) o ("error", detalle)."""
+    try:
+        response = operation(data)
+    except HTTPException as e:
+        return "error", {"status_code": e.status_code, "detail": e.detail}
+    except Exception as e:
+        return "error", {"status_code": 500, "detail": f"Error inesperado: {str(e)}"}
+    return "result", {**response.model_dump(), "steps": None} # Los pasos ya se enviaron como eventos
+
+
+async def _event_stream(operation: Callable[[BaseModel], ApiResponse], data: BaseModel, sse: bool) -> AsyncIterator[str]:
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[Optional[Tuple[str, Any]]]" = asyncio.Queue(maxsize=STREAM_BUFFER_EVENTS)
+    cancelled = threading.Event()
+    renderer = StepRenderer(getattr(data, "steps_format", "text"))
+
+    def put(item: Optional[Tuple[str, Any]]) -> None:
+        # Se llama desde el hilo del cálculo: espera a que haya espacio en el búfer
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=_PUT_POLL_SECONDS)
+                return
+            except concurrent.futures.TimeoutError:
+                if cancelled.is_set():
+                    future.cancel()
+                    raise StreamCancelled()
+
+    def sink(entry: StepEntry) -> None:
+        if cancelled.is_set():
+            raise StreamCancelled()
+        for step in renderer.feed(entry):
+            put(("step", step))
+
+    def worker() -> None:
+        try:
+            put(_run_operation(operation, data))
+            put(None)
+        except StreamCancelled:
+            pass
+
+    context = contextvars.copy_context()
+    context.run(STEP_SINK.set, sink)
+    loop.run_in_executor(None, context.run, worker)
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield _encode_event(item[0], item[1], sse)
+    finally:
+        cancelled.set() # Si el cliente se desconectó, el hilo del cálculo se detiene en el próximo paso
+
+
+@router.post("/stream/{op}", summary="Ejecuta una operación enviando los pasos a medida que se generan (NDJSON o SSE)",
+             response_class=StreamingResponse,
+             responses={200: {"content": {"application/x-ndjson": {}, "text/event-stream": {}}}})
+async def stream_operation_endpoint(op: str, request: Request, operands: Dict[str, Any] = Body(...)):
+    """
+    Recibe el mismo cuerpo que /operations/<op> y responde con un flujo de eventos: un evento "step"
+    por cada paso (texto, o un objeto {"op": ...} si steps_format es json) y, al final, un evento
+    "result" con la ApiResponse (sin steps) o "error" con {"status_code", "detail"}.
+    """
+    if op not in OPERATIONS:
+        disponibles = ", ".join(OPERATIONS)
+        raise HTTPException(status_code=404, detail=f"Operación desconocida: '{op}'. Operaciones disponibles: {disponibles}.")
+    input_model, operation = OPERATIONS[op]
+    try:
+        data = input_model.model_validate(operands)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(_event_stream(operation, data, sse), media_type=media_type, headers={"Cache-Control": "no-cache"})
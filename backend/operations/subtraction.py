@@ -1,18 +1,26 @@
 from fastapi import APIRouter
-from fractions import Fraction
 
 from backend.models import TwoMatrixInput, ApiResponse
-from backend.utils.validators import validar_dimensiones_para_suma_resta
-from backend.utils.type_converters import to_fraction, format_fraction_output
-from backend.utils.formatters import format_matrix_for_steps
+from backend.utils.validators import validar_dimensiones_para_suma_resta, validar_costo_operacion
+from backend.utils.type_converters import format_fraction_output
+from backend.utils.matrix_parser import MatrixValueError, matrix_fractions, matrix_sparse
+from backend.core.rational_matrix import RationalMatrix
+from backend.utils.steps import StepLog
+from backend.utils.executor import offloaded
+from backend.utils.result_cache import cached_result
+from backend.utils.wire_format import compact_output
+from backend.utils.responses import FastResponseRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastResponseRoute) # Respuestas serializadas sin revalidar (ver backend/utils/responses.py)
 
 @router.post("/subtract", response_model=ApiResponse, summary="Resta de dos matrices")
-async def subtract_matrices(data: TwoMatrixInput):
+@cached_result("subtract")
+@compact_output
+@offloaded("subtract")
+def subtract_matrices(data: TwoMatrixInput):
     """
     Resta dos matrices A y B (A - B). Los elementos pueden ser números o fracciones (ej. "1/2", "1 / 2").
-    Valida la compatibilidad de dimensiones (hasta 4x4) y la validez de los elementos.
+    Valida la compatibilidad de dimensiones, el costo estimado de la operación y la validez de los elementos.
     Retorna la matriz resultante con elementos como enteros o strings de fracción.
     Incluye pasos del proceso en la respuesta, con formato mejorado para matrices.
     """
@@ -24,35 +32,60 @@ async def subtract_matrices(data: TwoMatrixInput):
         return ApiResponse(success=False, error=error_validacion_dim) # Retornar un error si las dimensiones no son válidas
     
     num_filas = len(raw_matrix_a) # Obtener el número de filas de la matriz A
-    num_columnas = len(raw_matrix_a[0]) if num_filas > 0 else 0 # Obtener el número de columnas de la matriz A
+    num_columnas = raw_matrix_a.cols if num_filas > 0 else 0 # Obtener el número de columnas de la matriz A (registrado al convertir la entrada)
     
     try:
-        frac_matrix_a = [[to_fraction(el) for el in row] for row in raw_matrix_a] # Convertir la matriz A a fracciones
-        frac_matrix_b = [[to_fraction(el) for el in row] for row in raw_matrix_b] # Convertir la matriz B a fracciones
-    except ValueError as e:
-        return ApiResponse(success=False, error=str(e)) # Retornar un error si la conversión a fracción falla
+        dispersa_a = matrix_sparse(raw_matrix_a) # Representación dispersa de A (None si conviene el camino denso, ver backend/core/sparse_matrix.py)
+    except MatrixValueError as e:
+        return ApiResponse(success=False, error=e.detail("A")) # Retornar un error si la conversión a fracción falla (con la posición del elemento)
+    try:
+        dispersa_b = matrix_sparse(raw_matrix_b) # Representación dispersa de B
+    except MatrixValueError as e:
+        return ApiResponse(success=False, error=e.detail("B")) # Retornar un error si la conversión a fracción falla (con la posición del elemento)
+    usar_dispersa = dispersa_a is not None and dispersa_b is not None # La resta dispersa sólo conviene si ambas matrices son dispersas
+    densidad = max(dispersa_a.density, dispersa_b.density) if usar_dispersa else 1.0 # Fracción de elementos no nulos que se recorren
+
+    try:
+        frac_matrix_a = None if usar_dispersa else matrix_fractions(raw_matrix_a) # Matriz A como fracciones, sólo para el camino denso (convertida al validar la entrada)
+    except MatrixValueError as e:
+        return ApiResponse(success=False, error=e.detail("A")) # La forma densa de una entrada dispersa puede exceder el presupuesto de memoria
+    try:
+        frac_matrix_b = None if usar_dispersa else matrix_fractions(raw_matrix_b) # Matriz B como fracciones, sólo para el camino denso (convertida al validar la entrada)
+    except MatrixValueError as e:
+        return ApiResponse(success=False, error=e.detail("B")) # La forma densa de una entrada dispersa puede exceder el presupuesto de memoria
+
+    error_costo = validar_costo_operacion("subtract", [dispersa_a, dispersa_b] if usar_dispersa else [frac_matrix_a, frac_matrix_b], num_filas, num_columnas, con_pasos=data.steps == "full", densidad=densidad) # Validar el tamaño contra la política de costo configurada
+    if error_costo:
+        return ApiResponse(success=False, error=error_costo) # Retornar un error si la operación excede el presupuesto de costo
     
-    resultado_frac = [[Fraction(0) for _ in range(num_columnas)] for _ in range(num_filas)] # Inicializar la matriz resultante con ceros
-    pasos = ["Inicio de la resta de matrices A - B."] # Inicializar los pasos con un mensaje de inicio
+    if usar_dispersa:
+        resultado = dispersa_a.subtract(dispersa_b) # Calcular C = A - B recorriendo sólo los elementos no nulos
+    else:
+        resultado = RationalMatrix.from_fractions(frac_matrix_a).subtract(RationalMatrix.from_fractions(frac_matrix_b)) # Calcular C = A - B con el motor de matrices racionales
+    pasos = StepLog(data.steps, ["Inicio de la resta de matrices A - B."], steps_format=data.steps_format) # Inicializar el registro de pasos (con el nivel de detalle pedido) con un mensaje de inicio
+    if usar_dispersa:
+        pasos.append(f"Matrices dispersas ({dispersa_a.nnz} y {dispersa_b.nnz} elementos no nulos de {num_filas * num_columnas}): se restan sólo los elementos no nulos.") # Informar el camino disperso
     
-    output_matrix_a_for_steps = [[format_fraction_output(el) for el in row] for row in frac_matrix_a] # Formatear la matriz A para los pasos
-    pasos.extend(format_matrix_for_steps(output_matrix_a_for_steps, "Matriz A")) # Agregar la matriz A formateada a los pasos
-    output_matrix_b_for_steps = [[format_fraction_output(el) for el in row] for row in frac_matrix_b] # Formatear la matriz B para los pasos
-    pasos.extend(format_matrix_for_steps(output_matrix_b_for_steps, "Matriz B")) # Agregar la matriz B formateada a los pasos
+    if pasos.enabled: # Las matrices de entrada sólo se formatean si se devuelven pasos
+        pasos.input_matrix(raw_matrix_a, "Matriz A") # Agregar la matriz A a los pasos (la forma densa de una entrada dispersa se crea sólo aquí)
+        pasos.input_matrix(raw_matrix_b, "Matriz B") # Agregar la matriz B a los pasos
     
     pasos.append("Calculando cada elemento de la matriz resultante C = A - B:") # Agregar un paso para indicar el cálculo de la matriz resultante
-    if num_columnas > 0: 
+    if num_columnas > 0 and pasos.detailed: # Sólo en modo full se detalla cada elemento
         for i in range(num_filas): # Iterar sobre las filas
             for j in range(num_columnas): # Iterar sobre las columnas
-                a_ij = frac_matrix_a[i][j] # Obtener el elemento A[i][j]
-                b_ij = frac_matrix_b[i][j] # Obtener el elemento B[i][j]
-                resta_elemento_frac = a_ij - b_ij # Calcular la resta del elemento
-                resultado_frac[i][j] = resta_elemento_frac # Asignar el resultado a la matriz resultante
+                a_ij = dispersa_a.get(i, j) if usar_dispersa else frac_matrix_a[i][j] # Obtener el elemento A[i][j]
+                b_ij = dispersa_b.get(i, j) if usar_dispersa else frac_matrix_b[i][j] # Obtener el elemento B[i][j]
+                if usar_dispersa and not a_ij and not b_ij:
+                    continue # En matrices dispersas sólo se detallan los elementos con algún término no nulo
+                resta_elemento_frac = resultado.get(i, j) # Obtener el elemento C[i][j] = A[i][j] - B[i][j] ya calculado
                 str_a_ij = format_fraction_output(a_ij) # Formatear el elemento A[i][j] para mostrarlo en los pasos
                 str_b_ij = format_fraction_output(b_ij) # Formatear el elemento B[i][j] para mostrarlo en los pasos
                 str_resta = format_fraction_output(resta_elemento_frac) # Formatear el resultado de la resta para mostrarlo en los pasos
                 pasos.append(f"  C({i+1},{j+1}) = A({i+1},{j+1}) - B({i+1},{j+1}) = {str_a_ij} - {str_b_ij} = {str_resta}") # Agregar el paso del cálculo al registro
                 
-    resultado_output = [[format_fraction_output(el) for el in row] for row in resultado_frac] # Formatear la matriz resultante para la salida
+        if usar_dispersa:
+            pasos.append("  Los demás elementos de C son 0.") # Los elementos omitidos son 0 - 0
+    resultado_output = [[format_fraction_output(el) for el in row] for row in resultado.to_fractions()] # Formatear la matriz resultante para la salida
     pasos.append("Resta completada.") # Agregar un paso para indicar que la resta se ha completado
-    return ApiResponse(success=True, result=resultado_output, steps=pasos) # Retornar la respuesta de la API con la matriz resultante y los pasos
\ No newline at end of file
+    return ApiResponse(success=True, result=resultado_output, steps=pasos.for_response()) # Retornar la respuesta de la API con la matriz resultante y los pasos
\ No newline at end of file
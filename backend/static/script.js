@@ -1,4 +1,8 @@
 document.addEventListener('DOMContentLoaded', () => {
+
+    // Los pasos se piden en formato compacto (operaciones de fila y matrices como objetos) y se
+    // convierten a texto en el navegador (ver renderStepRecords)
+    const STEPS_FORMAT = 'json';
     
     // Elementos DOM - Entradas de Matriz
     const matrixAInputs = document.getElementById('matrixAInputs');
@@ -574,6 +578,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const matrixB = getMatrixData(matrixMultBInputs, rB, cB);
 
         const payload = {
+            steps_format: STEPS_FORMAT,
             matrix_a: matrixA,
             matrix_b: matrixB
         };
@@ -624,6 +629,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const matrixB = getMatrixData(matrixBInputs, rB, cB);
 
         const payload = {
+            steps_format: STEPS_FORMAT,
             matrix_a: matrixA,
             matrix_b: matrixB
         };
@@ -706,7 +712,54 @@ document.addEventListener('DOMContentLoaded', () => {
         }, 10);
     }
 
+    // Convierte una matriz de pasos ({"op": "matrix"}) en líneas alineadas, igual que backend/utils/formatters.py
+    function formatMatrixStepLines(record) {
+        const rows = record.rows;
+        const numCols = rows.length > 0 ? rows[0].length : 0;
+        if (rows.length === 0) return [`${record.name} (0x0): []`];
+        const lines = [`${record.name} (${rows.length}x${numCols}):`];
+        const widths = new Array(numCols).fill(0);
+        rows.forEach(row => row.forEach((item, j) => { widths[j] = Math.max(widths[j], item.length); }));
+        const split = record.split;
+        rows.forEach(row => {
+            const cells = row.map((item, j) => item.padStart(widths[j]));
+            if (split !== undefined && split > 0 && split < numCols) {
+                lines.push(`  | ${cells.slice(0, split).join('  ')} | ${cells.slice(split).join('  ')} |`);
+            } else {
+                lines.push(`  | ${cells.join('  ')} |`);
+            }
+        });
+        return lines;
+    }
+
+    // Convierte un paso estructurado (steps_format = json) en líneas de texto. Las operaciones de fila
+    // traen su plantilla del backend ("template", con campos {nombre}), la misma que usa el formato text
+    function renderStepRecord(record) {
+        if (record.op === 'matrix') return formatMatrixStepLines(record);
+        if (typeof record.template === 'string') {
+            return [record.template.replace(/\{(\w+)\}/g, (match, name) => (name in record ? String(record[name]) : match))];
+        }
+        return [JSON.stringify(record)];
+    }
+
+    // Los pasos pueden llegar como texto o como lista compacta de strings y objetos {"op": ...}.
+    // Un delta ({"op": "delta"}) trae sólo las filas que cambiaron: se aplica sobre la última matriz.
+    function renderStepRecords(steps) {
+        let frame = null;
+        return steps.flatMap(step => {
+            if (typeof step === 'string') return [step];
+            if (step.op === 'matrix') {
+                frame = step.rows.map(row => row.slice());
+            } else if (step.op === 'delta' && frame) {
+                step.changed.forEach(([index, row]) => { frame[index] = row; });
+                return formatMatrixStepLines({ name: step.name, rows: frame, split: step.split });
+            }
+            return renderStepRecord(step);
+        });
+    }
+
     function formatAndDisplaySteps(stepsContainer, steps, isMultiplication = false) {
+        if (steps) steps = renderStepRecords(steps);
         if (!steps || steps.length === 0) {
             stepsContainer.textContent = 'No hay pasos para mostrar.';
             return;
@@ -787,6 +840,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const matrix = getMatrixData(matrixDetInputs, dimension, dimension);
 
         const payload = {
+            steps_format: STEPS_FORMAT,
             matrix: matrix
         };
 
@@ -859,6 +913,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const matrix = getMatrixData(matrixInvInputs, dimension, dimension);
 
         const payload = {
+            steps_format: STEPS_FORMAT,
             matrix: matrix
         };
 
@@ -965,6 +1020,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const vectorB = getVectorData(vectorGaussBInputs, n);
 
         const payload = {
+            steps_format: STEPS_FORMAT,
             matrix_a: matrixA,
             vector_b: vectorB
         };
@@ -1024,6 +1080,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const vectorB = getVectorData(vectorGaussJordanBInputs, n);
 
         const payload = {
+            steps_format: STEPS_FORMAT,
             matrix_a: matrixA,
             vector_b: vectorB
         };
@@ -1176,6 +1233,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const matrixA = getMatrixData(matrixLuAInputs, dimension, dimension);
 
         const payload = {
+            steps_format: STEPS_FORMAT,
             matrix: matrixA
         };
 
@@ -1,9 +1,19 @@
 import pytest
 from fastapi.testclient import TestClient
 from backend.main import app 
+from backend.core.factor_cache import FACTOR_CACHE
+from backend.utils.result_cache import RESULT_CACHE
 
 @pytest.fixture(scope="session")
 def client():
     """Proporciona una instancia de TestClient para la aplicación FastAPI."""
     with TestClient(app) as c:
-        yield c 
\ No newline at end of file
+        yield c 
+@pytest.fixture(autouse=True)
+def clear_factor_cache():
+    """Cada prueba parte sin factorizaciones LU ni resultados guardados de pruebas anteriores."""
+    FACTOR_CACHE.clear()
+    RESULT_CACHE.clear()
+    yield
+    FACTOR_CACHE.clear()
+    RESULT_CACHE.clear()
@@ -0,0 +1,112 @@
+import random
+from fractions import Fraction
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.core.banded import BandedMatrix, band_solve, is_banded_candidate, matrix_bandwidths, sparse_bandwidths, thomas_solve
+from backend.core.sparse_matrix import SparseMatrix, sparse_eliminate
+from backend.utils.size_policy import SizePolicy
+
+client = TestClient(app)
+
+N = 40
+
+def _banded(n, lower, upper, diagonal=4):
+    return [[diagonal if i == j else (-1 if -lower <= j - i <= upper else 0) for j in range(n)] for i in range(n)]
+
+def _solves(matrix, x, b):
+    return all(sum(Fraction(matrix[i][j]) * Fraction(x[j]) for j in range(len(matrix))) == b[i] for i in range(len(matrix)))
+
+# --- Núcleo ---
+
+def test_bandwidths():
+    matrix = [[Fraction(v) for v in row] for row in _banded(6, 1, 2)]
+    assert matrix_bandwidths(matrix) == (1, 2)
+    assert sparse_bandwidths(SparseMatrix.from_fractions(matrix)) == (1, 2)
+    assert is_banded_candidate(N, 1, 1)
+    assert not is_banded_candidate(N, 2, 2) # Ancho 5 > 10% de 40
+    assert not is_banded_candidate(10, 0, 0) # Demasiado pequeña
+
+def test_banded_solvers_match_sparse_elimination():
+    rng = random.Random(5)
+    for _ in range(300):
+        n = rng.randint(1, 8)
+        lower, upper = rng.randint(0, 3), rng.randint(0, 3)
+        value = lambda: Fraction(rng.choice([0, 1, -2, 3, Fraction(1, 2)]))
+        matrix = [[value() if -lower <= j - i <= upper else Fraction(0) for j in range(n)] for i in range(n)]
+        rhs = [[Fraction(rng.randint(-3, 3)), Fraction(rng.randint(-3, 3))] for _ in range(n)]
+        elimination = sparse_eliminate(SparseMatrix.from_fractions(matrix), rhs)
+        band = BandedMatrix.from_fractions(matrix, lower, upper)
+        solutions = band_solve(band, rhs)
+        assert (solutions is None) == (elimination.determinant() == 0)
+        if solutions is not None:
+            assert solutions == [elimination.solve(c) for c in range(2)]
+        if lower <= 1 and upper <= 1:
+            thomas = thomas_solve(BandedMatrix.from_fractions(matrix, 1, 1), rhs)
+            assert thomas is None or thomas == solutions
+
+def test_thomas_zero_pivot_needs_row_exchange():
+    matrix = [[Fraction(v) for v in row] for row in [[0, 1, 0], [1, 0, 1], [0, 1, 1]]]
+    band = BandedMatrix.from_fractions(matrix, 1, 1)
+    rhs = [[Fraction(1)], [Fraction(2)], [Fraction(3)]]
+    assert thomas_solve(band, rhs) is None
+    x = band_solve(band, rhs)[0]
+    assert _solves(matrix, x, [1, 2, 3])
+
+def test_entries_outside_declared_band():
+    try:
+        BandedMatrix.from_fractions([[Fraction(1), Fraction(0), Fraction(2)], [Fraction(0), Fraction(1), Fraction(0)], [Fraction(0)] * 3], 1, 1)
+        assert False
+    except ValueError as e:
+        assert "La fila 1 de A tiene elementos no nulos fuera de la banda declarada." in str(e)
+
+def test_banded_cost_estimate():
+    policy = SizePolicy()
+    general = policy.estimate("solve_system_gaussian", 1000, 1000, 3, False, 1, density=3 / 1000)
+    banded = policy.estimate("banded", 1000, 1000, 3, False, 1, density=3 / 1000)
+    assert banded.seconds < general.seconds
+    assert policy.check("banded", 3000, 3000, 3, False, 1, density=3 / 3000) is None
+
+# --- Endpoint ---
+
+def test_solve_tridiagonal_with_thomas():
+    a = _banded(N, 1, 1)
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "vector_b": [1] * N, "steps": "summary"}).json()
+    assert body["result"]["message"] == "El sistema tiene una solución única."
+    assert _solves(a, body["result"]["solution_vector"], [1] * N)
+    assert any(step.startswith("Matriz en banda: 1 diagonal(es) debajo y 1 encima") for step in body["steps"])
+    assert any("algoritmo de Thomas" in step for step in body["steps"])
+
+def test_solve_pentadiagonal_with_band_lu():
+    n = 60
+    a = _banded(n, 2, 2, diagonal=6)
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "matrix_b": [[1, i] for i in range(n)], "steps": "summary"}).json()
+    assert any("LU en banda" in step for step in body["steps"])
+    solutions = body["result"]["solution_vectors"]
+    assert _solves(a, solutions[0], [1] * n) and _solves(a, solutions[1], list(range(n)))
+
+def test_declared_bandwidth():
+    a = [[2, 1, 0], [1, 2, 1], [0, 1, 2]]
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "vector_b": [3, 4, 3], "bandwidth": 1, "steps": "summary"}).json()
+    assert body["result"]["solution_vector"] == ["1", "1", "1"]
+    assert any("algoritmo de Thomas" in step for step in body["steps"])
+    outside = client.post("/operations/solve_system_gaussian", json={"matrix_a": [[1, 0, 2], [0, 1, 0], [0, 0, 1]], "vector_b": [1, 1, 1], "bandwidth": 1})
+    assert outside.status_code == 400
+    assert "fuera de la banda declarada" in outside.json()["detail"]
+    assert client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "vector_b": [1, 1, 1], "bandwidth": -1}).status_code == 422
+
+def test_singular_banded_system_falls_back():
+    a = _banded(N, 1, 1)
+    a[N - 1] = [0] * N
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "vector_b": [1] * (N - 1) + [0], "steps": "summary"}).json()
+    assert body["result"]["message"] == "El sistema tiene soluciones infinitas."
+    assert any("La matriz es singular" in step for step in body["steps"])
+
+def test_large_tridiagonal_is_admitted():
+    n = 1000
+    a = {"rows": n, "cols": n, "entries": {str(i): {str(j): (4 if i == j else -1) for j in (i - 1, i, i + 1) if 0 <= j < n} for i in range(n)}}
+    response = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "vector_b": [1] * n, "steps": "none"})
+    assert response.status_code == 200, response.json()
+    x = [Fraction(value) for value in response.json()["result"]["solution_vector"]]
+    assert 4 * x[0] - x[1] == 1 and -x[n - 2] + 4 * x[n - 1] == 1
+    assert all(-x[i - 1] + 4 * x[i] - x[i + 1] == 1 for i in range(1, n - 1))
@@ -0,0 +1,80 @@
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.operations import batch
+
+client = TestClient(app)
+
+# --- Pruebas del endpoint /operations/batch ---
+
+def test_batch_runs_heterogeneous_jobs_in_order():
+    payload = {"jobs": [
+        {"op": "determinant", "operands": {"matrix": [[1, 2], [3, 4]]}},
+        {"op": "inverse", "operands": {"matrix": [[2, 0], [0, 4]]}},
+        {"op": "add", "operands": {"matrix_a": [[1]], "matrix_b": [["1/2"]]}},
+        {"op": "solve_system_gaussian", "operands": {"matrix_a": [[2, 1], [1, 3]], "vector_b": [3, 4]}},
+        {"op": "multiply", "operands": {"matrix_a": [[1, 2]], "matrix_b": [[3], [4]]}},
+    ]}
+    response = client.post("/operations/batch", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] == True
+    results = data["result"]["results"]
+    assert [r["op"] for r in results] == ["determinant", "inverse", "add", "solve_system_gaussian", "multiply"]
+    assert results[0]["result"] == "-2"
+    assert results[1]["result"] == [["1/2", "0"], ["0", "1/4"]]
+    assert results[2]["result"] == [["3/2"]]
+    assert results[3]["result"]["solution_vector"] == ["1", "1"]
+    assert results[4]["result"] == [["11"]]
+    assert all(r["status_code"] == 200 and r["steps"] for r in results)
+    assert data["result"]["failed"] == 0
+
+def test_batch_matches_individual_endpoint():
+    operands = {"matrix": [[6, 1, 1], [4, -2, 5], [2, 8, 7]]}
+    individual = client.post("/operations/determinant", json=operands).json()
+    batched = client.post("/operations/batch", json={"jobs": [{"op": "determinant", "operands": operands}]}).json()
+    job = batched["result"]["results"][0]
+    assert job["result"] == individual["result"]
+    assert job["steps"] == individual["steps"]
+
+def test_batch_reports_errors_per_job_without_aborting():
+    payload = {"jobs": [
+        {"op": "determinant", "operands": {"matrix": [[1, 2, 3], [4, 5, 6]]}}, # No cuadrada -> 400
+        {"op": "inverse", "operands": {"matrix": [[1, 2], [2, 4]]}},           # Singular -> success False
+        {"op": "determinant", "operands": {"matriz": [[1]]}},                  # Campo faltante -> 422
+        {"op": "transpose", "operands": {"matrix": [[1]]}},                    # Operación desconocida
+        {"op": "determinant", "operands": {"matrix": [[5]]}},
+    ]}
+    data = client.post("/operations/batch", json=payload).json()
+    results = data["result"]["results"]
+    assert results[0]["status_code"] == 400 and "debe ser cuadrada" in results[0]["error"]
+    assert results[1]["status_code"] == 200 and results[1]["success"] == False
+    assert results[2]["status_code"] == 422 and results[2]["error"][0]["loc"] == ["matrix"]
+    assert results[3]["status_code"] == 400 and "Operación desconocida" in results[3]["error"]
+    assert results[4]["success"] == True and results[4]["result"] == "5"
+    assert data["result"]["failed"] == 4
+
+def test_batch_unexpected_error_fails_only_its_job(monkeypatch):
+    def failing_inverse(data):
+        raise ZeroDivisionError("division by zero")
+    monkeypatch.setitem(batch.OPERATIONS, "inverse", (batch.OPERATIONS["inverse"][0], failing_inverse))
+    payload = {"jobs": [
+        {"op": "determinant", "operands": {"matrix": [[1, 2], [3, 4]]}},
+        {"op": "inverse", "operands": {"matrix": [[2, 0], [0, 4]]}},
+        {"op": "add", "operands": {"matrix_a": [[1]], "matrix_b": [[2]]}},
+    ]}
+    response = client.post("/operations/batch", json=payload)
+    assert response.status_code == 200
+    results = response.json()["result"]["results"]
+    assert results[0]["success"] == True and results[0]["result"] == "-2"
+    assert results[1] == {"op": "inverse", "success": False, "status_code": 500, "result": None, "steps": None, "error": "Error inesperado: division by zero"}
+    assert results[2]["success"] == True and results[2]["result"] == [["3"]]
+    assert response.json()["result"]["failed"] == 1
+
+def test_batch_limits(monkeypatch):
+    assert client.post("/operations/batch", json={"jobs": []}).status_code == 400
+    monkeypatch.setattr(batch, "BATCH_MAX_JOBS", 2)
+    jobs = [{"op": "determinant", "operands": {"matrix": [[1]]}}] * 3
+    response = client.post("/operations/batch", json={"jobs": jobs})
+    assert response.status_code == 400
+    assert "máximo permitido es 2" in response.json()["detail"]
@@ -0,0 +1,62 @@
+import gzip
+import json
+import zlib
+
+from fastapi.testclient import TestClient
+from backend.main import app, STATIC_ASSETS
+from backend.utils.compression import COMPRESSION_MIN_BYTES, StreamCompressor, compress
+
+client = TestClient(app)
+
+_MATRIX = [[4, -2, 1, 3], [3, 6, -4, 2], [2, 1, 8, -5], [1, -3, 2, 7]]
+
+def test_compress_roundtrip():
+    data = b"[ 1/2  0  0 ]\n" * 200
+    assert gzip.decompress(compress(data, "gzip")) == data
+    assert gzip.decompress(compress(data, "gzip", fast=True)) == data
+
+def test_stream_compressor_flushes_each_part():
+    compressor = StreamCompressor("gzip")
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for part in (b"uno\n", b"dos\n" * 100, b"tres\n"):
+        # Cada parte comprimida se puede descomprimir sin esperar a las siguientes
+        assert decompressor.decompress(compressor.compress(part)) == part
+    assert decompressor.decompress(compressor.finish()) == b""
+    assert decompressor.eof
+
+def test_large_step_response_compressed():
+    payload = {"matrix": _MATRIX, "steps": "full"}
+    plain = client.post("/operations/inverse", json=payload, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    with client.stream("POST", "/operations/inverse", json=payload, headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) == len(raw)
+    assert len(raw) * 5 < len(plain.content)
+    assert json.loads(gzip.decompress(raw)) == plain.json()
+
+def test_small_response_not_compressed():
+    response = client.post("/operations/determinant", json={"matrix": [[1, 2], [3, 4]], "steps": "none"}, headers={"Accept-Encoding": "gzip"})
+    assert len(response.content) < COMPRESSION_MIN_BYTES
+    assert "content-encoding" not in response.headers
+
+def test_unsupported_encoding_not_compressed():
+    response = client.post("/operations/inverse", json={"matrix": _MATRIX}, headers={"Accept-Encoding": "compress, gzip;q=0"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+def test_streaming_response_compressed_in_parts():
+    with client.stream("POST", "/operations/stream/inverse", json={"matrix": _MATRIX}, headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    events = [json.loads(line) for line in gzip.decompress(raw).decode().splitlines()]
+    assert events[-1]["event"] == "result"
+    assert sum(event["event"] == "step" for event in events) > 1
+
+def test_static_assets_not_compressed_twice():
+    with client.stream("GET", "/static/script.js", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw) == STATIC_ASSETS.lookup("script.js")[0].variants["identity"]
@@ -67,7 +67,6 @@ def test_calculate_determinant_valid(test_name, payload, expected_determinant):
 INVALID_DETERMINANT_CASES = [
     ("non_square_2x3", {"matrix": [[1, 2, 3], [4, 5, 6]]}, 400, "La matriz debe ser cuadrada para calcular el determinante."),
     ("non_square_3x2", {"matrix": [[1, 2], [3, 4], [5, 6]]}, 400, "La matriz debe ser cuadrada para calcular el determinante."),
-    ("too_large_5x5", {"matrix": [[1]*5]*5}, 400, "La operación está limitada a matrices de hasta 4 filas."), # validar_matriz debería detectar esto
     ("invalid_element_char", {"matrix": [[1, 'a'], [3, 4]]}, 400, "Valor de entrada inválido: 'a'. No es un número, fracción (ej: '1/2'), ni string numérico (ej: '2.5')."),
     ("invalid_fraction_zero_denom", {"matrix": [["1/0"]]}, 400, "Valor inválido: '1/0'. El denominador no puede ser cero en una fracción."),
     ("empty_matrix", {"matrix": []}, 400, "suministrada no puede estar vacía."),
@@ -236,4 +235,107 @@ def test_determinant_3x3_row_swap():
     if expected_determinant_value != "0": # Si det es 0, podría salir temprano
          assert any(f"det(A) = -1 * (" in step for step in steps), "El cálculo del determinante debería mostrar el uso del multiplicador -1 debido al intercambio de filas."
     
-    assert any(f"El determinante final (calculado mediante eliminación Gaussiana) de la matriz A es: {expected_determinant_value}" in step for step in steps) 
\ No newline at end of file
+    assert any(f"El determinante final (calculado mediante eliminación Gaussiana) de la matriz A es: {expected_determinant_value}" in step for step in steps) 
+# --- Pruebas de la ruta sin fracciones de Bareiss ---
+from backend.core.bareiss import bareiss_determinant
+from backend.core.rational_matrix import RationalMatrix
+from backend.operations.determinant import _calculate_determinant_bareiss, _calculate_determinant_gaussian, _should_use_bareiss
+from backend.utils.steps import StepLog
+
+BAREISS_CASES = [
+    ("3x3_integers", [[6, 1, 1], [4, -2, 5], [2, 8, 7]]),
+    ("3x3_needs_swap", [[0, 1, 2], [3, 4, 5], [6, 7, 9]]),
+    ("3x3_singular", [[1, 2, 3], [4, 5, 6], [7, 8, 9]]),
+    ("3x3_fractions", [["1", "1/2", "0"], ["1/3", "1", "1/4"], ["1/2", "1/5", "1"]]),
+    ("5x5_integers", [[2, -1, 0, 3, 1], [1, 4, -2, 0, 5], [0, 3, 7, -1, 2], [5, 0, 1, 2, -3], [1, 1, 1, 1, 1]]),
+    ("6x6_zero_leading_pivots", [[0, 0, 1, 2, 0, 1], [0, 3, 0, 1, 1, 0], [4, 0, 0, 0, 2, 1], [1, 2, 3, 4, 5, 6], [0, 1, 0, 1, 0, 1], [7, 0, 2, 0, 1, 0]]),
+]
+
+@pytest.mark.parametrize("test_name, matrix", BAREISS_CASES)
+def test_bareiss_matches_gaussian(test_name, matrix):
+    matrix_frac = [[Fraction(val) for val in row] for row in matrix]
+    expected = _calculate_determinant_gaussian(matrix_frac, StepLog())
+    determinant, _ = bareiss_determinant(RationalMatrix.from_fractions(matrix_frac))
+    assert determinant == expected, f"Prueba '{test_name}' falló: Bareiss={determinant}, Gauss={expected}"
+
+def test_bareiss_steps_summarize_scaling_and_swaps():
+    matrix_frac = [[Fraction(0), Fraction(1, 2)], [Fraction(3), Fraction(1, 3)]]
+    steps = []
+    assert _calculate_determinant_bareiss(matrix_frac, steps) == Fraction(-3, 2)
+    assert any("eliminación de Bareiss" in step for step in steps)
+    assert any("det(A) = det(N) / 6" in step for step in steps)
+    assert any("1 intercambio(s) de filas" in step for step in steps)
+
+def test_bareiss_selected_only_for_large_matrices():
+    assert not _should_use_bareiss([[Fraction(1)] * 4] * 4)
+    assert _should_use_bareiss([[Fraction(1)] * 5] * 5)
+
+# --- Motor multimodular (residuos módulo primos + CRT) ---
+from backend.core import modular
+from backend.core.modular import crt_reconstruct, modular_determinant, modular_rank, word_primes
+from backend.utils import executor
+from backend.operations.determinant import _calculate_determinant_modular
+
+@pytest.mark.parametrize("test_name, matrix", BAREISS_CASES)
+def test_modular_matches_bareiss(test_name, matrix):
+    matrix_rm = RationalMatrix.from_fractions([[Fraction(val) for val in row] for row in matrix])
+    expected, _ = bareiss_determinant(matrix_rm)
+    determinant, primes_used, _ = modular_determinant(matrix_rm)
+    assert determinant == expected, f"Prueba '{test_name}' falló: modular={determinant}, Bareiss={expected}"
+    assert primes_used >= 1
+
+def test_modular_determinant_needs_several_primes_and_workers():
+    """Un determinante mayor que un primo de 31 bits se reconstruye igual en serie y repartido entre procesos."""
+    n = 12
+    matrix = RationalMatrix.from_fractions([[Fraction((i * 7 + j * 13) % 97 - 48 + (100 if i == j else 0)) for j in range(n)] for i in range(n)])
+    expected, _ = bareiss_determinant(matrix)
+    determinant, primes_used, _ = modular_determinant(matrix, workers=1)
+    assert determinant == expected
+    assert primes_used > 1
+    assert modular_determinant(matrix, workers=2)[0] == expected
+    pool = modular._pool
+    assert modular_determinant(matrix, workers=2)[0] == expected
+    assert modular._pool is pool # El pool se reutiliza entre cálculos
+
+def test_modular_determinant_runs_serially_inside_executor_workers(monkeypatch):
+    monkeypatch.setattr(executor, "_IN_WORKER", True)
+    monkeypatch.setattr(modular, "_get_pool", lambda workers: pytest.fail("no debe crear un pool dentro de un proceso del pool"))
+    n = 12
+    matrix = RationalMatrix.from_fractions([[Fraction((i * 7 + j * 13) % 97 - 48 + (100 if i == j else 0)) for j in range(n)] for i in range(n)])
+    determinant, primes_used, _ = modular_determinant(matrix, workers=4)
+    assert primes_used > 1
+    assert determinant == bareiss_determinant(matrix)[0]
+
+def test_crt_reconstructs_negative_values():
+    primes = word_primes(3)
+    value = -(2 ** 70) + 12345
+    assert crt_reconstruct([value % p for p in primes], primes) == value
+
+def test_modular_rank():
+    assert modular_rank(RationalMatrix.from_fractions([[1, 2, 3], [4, 5, 6], [7, 8, 9]])) == 2
+    assert modular_rank(RationalMatrix.from_fractions([[Fraction(1, 2), 1], [1, 2], [3, 6]])) == 1
+    assert modular_rank(RationalMatrix.identity(4)) == 4
+
+def test_modular_steps_report_primes_and_rank():
+    steps = []
+    assert _calculate_determinant_modular([[Fraction(1), Fraction(2)], [Fraction(2), Fraction(4)]], steps) == 0
+    assert any("Teorema Chino del Resto" in step for step in steps)
+    assert any("primo(s) de 31 bits" in step for step in steps)
+    assert any("rango(A) = 1" in step for step in steps)
+
+@pytest.mark.parametrize("method, expected_text", [
+    ("modular", "método multimodular"),
+    ("bareiss", "eliminación de Bareiss"),
+    ("gaussian", "eliminación Gaussiana"),
+])
+def test_determinant_endpoint_method_option(method, expected_text):
+    payload = {"matrix": [[6, 1, 1], [4, -2, 5], [2, 8, 7]], "method": method}
+    response = client.post("/operations/determinant", json=payload)
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["result"] == "-306"
+    assert expected_text in data["steps"][-1]
+
+def test_determinant_endpoint_rejects_unknown_method():
+    response = client.post("/operations/determinant", json={"matrix": [[1]], "method": "laplace"})
+    assert response.status_code == 422
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import MatrixInput, SystemInput
+from backend.core.factor_cache import FACTOR_CACHE
+from backend.utils import executor as executor_module
+from backend.utils.executor import OperationExecutor, estimate_seconds
+from backend.utils.steps import STEP_SINK
+
+client = TestClient(app)
+
+def _random_matrix(n, seed):
+    rng = random.Random(seed)
+    return [[rng.randint(-9, 9) for _ in range(n)] for _ in range(n)]
+
+@pytest.fixture(scope="module")
+def pool_executor():
+    """Ejecutor con un proceso que envía todas las operaciones al pool."""
+    executor = OperationExecutor(workers=1, min_seconds=0.0, timeout=60.0)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(executor_module, "EXECUTOR", executor)
+        yield executor
+    executor.shutdown()
+
+# --- Decisión en línea / pool ---
+
+def test_estimate_grows_with_size():
+    small = estimate_seconds("inverse", MatrixInput(matrix=[[1, 2], [3, 4]]))
+    large = estimate_seconds("inverse", MatrixInput(matrix=_random_matrix(30, 1)))
+    assert small < 0.001 < large
+
+def test_trivial_jobs_run_inline():
+    executor = OperationExecutor(workers=2, min_seconds=0.25)
+    assert not executor.should_offload("inverse", MatrixInput(matrix=[[1, 2], [3, 4]]))
+    assert executor.should_offload("inverse", MatrixInput(matrix=_random_matrix(30, 1)))
+    assert not OperationExecutor(workers=0).should_offload("inverse", MatrixInput(matrix=_random_matrix(30, 1)))
+
+def test_streaming_runs_inline():
+    executor = OperationExecutor(workers=2, min_seconds=0.0)
+    token = STEP_SINK.set(lambda entry: None)
+    try:
+        assert not executor.should_offload("determinant", MatrixInput(matrix=[[1, 2], [3, 4]]))
+    finally:
+        STEP_SINK.reset(token)
+
+def test_cached_factors_run_inline():
+    matrix = _random_matrix(6, 2)
+    client.post("/operations/lu_factorization", json={"matrix": matrix, "pivoting": "partial"})
+    executor = OperationExecutor(workers=2, min_seconds=0.0)
+    assert not executor.should_offload("inverse", MatrixInput(matrix=matrix, steps="summary"))
+    assert executor.should_offload("inverse", MatrixInput(matrix=matrix)) # Con pasos detallados no se reutiliza
+    assert executor.should_offload("inverse", MatrixInput(matrix=_random_matrix(6, 3), steps="summary"))
+
+# --- Ejecución en el pool de procesos ---
+
+@pytest.mark.parametrize("operation, payload", [
+    ("inverse", {"matrix": _random_matrix(8, 4)}),
+    ("determinant", {"matrix": _random_matrix(8, 5), "method": "bareiss"}),
+    ("solve_system_gaussian", {"matrix_a": _random_matrix(6, 6), "vector_b": [1, 2, 3, 4, 5, 6], "steps": "summary"}),
+])
+def test_pool_result_matches_inline(pool_executor, operation, payload):
+    pooled = client.post(f"/operations/{operation}", json=payload).json()
+    pool_executor.workers = 0 # Todo en línea
+    try:
+        inline = client.post(f"/operations/{operation}", json=payload).json()
+    finally:
+        pool_executor.workers = 1
+    assert pooled == inline
+
+def test_pool_http_errors_keep_status(pool_executor):
+    response = client.post("/operations/inverse", json={"matrix": [[1, 2], [3]]})
+    assert response.status_code == 400
+    assert "mismo número de columnas" in response.json()["detail"]
+
+def test_pool_exports_factorizations(pool_executor):
+    matrix = _random_matrix(5, 7)
+    assert client.post("/operations/lu_factorization", json={"matrix": matrix, "pivoting": "partial"}).status_code == 200
+    assert len(FACTOR_CACHE) == 1 # La factorización calculada en el proceso del pool está en la caché local
+
+def test_pool_timeout_cancels_and_recovers(pool_executor):
+    pool_executor.timeout = 0.001
+    try:
+        response = client.post("/operations/inverse", json={"matrix": _random_matrix(25, 8)})
+    finally:
+        pool_executor.timeout = 60.0
+    assert response.status_code == 504
+    assert client.post("/operations/determinant", json={"matrix": [[1, 2], [3, 4]]}).json()["result"] == "-2"
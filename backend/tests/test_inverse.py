@@ -171,12 +171,6 @@ INVALID_INPUT_CASES_INVERSE = [
         {"matrix": [["1/0","1"],["2","3"]]},
         400,
         "Valor inválido: '1/0'. El denominador no puede ser cero en una fracción."
-    ),
-    (
-        "matrix_too_large_5x5",
-        {"matrix": [[1]*5 for _ in range(5)]},
-        400,
-        "limitada a matrices de hasta 4 filas. Se recibió una matriz con 5 filas"
     )
 ]
 
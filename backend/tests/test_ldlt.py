@@ -0,0 +1,123 @@
+import random
+from fractions import Fraction
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.core.bareiss import bareiss_determinant
+from backend.core.rational_matrix import RationalMatrix
+from backend.core.ldlt import LDLTBreakdown, is_symmetric, ldlt_factorize, pack_lower
+
+client = TestClient(app)
+
+SPD = [[4, 2, -2], [2, 10, 2], [-2, 2, 5]] # L = [[1,0,0],[1/2,1,0],[-1/2,1/3,1]], D = diag(4, 9, 3)
+
+def _fractions(matrix):
+    return [[Fraction(value) for value in row] for row in matrix]
+
+def _symmetric(n, seed=3):
+    rng = random.Random(seed)
+    matrix = [[Fraction(0)] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1):
+            matrix[i][j] = matrix[j][i] = Fraction(rng.randint(-3, 3), rng.choice([1, 1, 2])) if i != j else Fraction(2 * n)
+    return matrix
+
+# --- Núcleo ---
+
+def test_packed_storage():
+    matrix = _fractions(SPD)
+    assert is_symmetric(matrix) and not is_symmetric(_fractions([[1, 2], [3, 4]]))
+    assert pack_lower(matrix) == _fractions([[4, 2, 10, -2, 2, 5]])[0]
+
+def test_ldlt_reconstructs_and_matches_bareiss():
+    rng = random.Random(2)
+    for _ in range(300):
+        n = rng.randint(1, 6)
+        matrix = [[Fraction(0)] * n for _ in range(n)]
+        for i in range(n):
+            for j in range(i + 1):
+                matrix[i][j] = matrix[j][i] = Fraction(rng.choice([0, 1, -2, 3, Fraction(1, 2), Fraction(-5, 3)]))
+        try:
+            factors = ldlt_factorize(pack_lower(matrix), n)
+        except LDLTBreakdown:
+            continue
+        L, D = factors.lower_matrix(), factors.diagonal
+        assert [[sum(L[i][k] * D[k] * L[j][k] for k in range(n)) for j in range(n)] for i in range(n)] == matrix
+        assert factors.determinant() == bareiss_determinant(RationalMatrix.from_fractions(matrix))[0]
+        if not factors.is_singular:
+            b = [Fraction(rng.randint(-3, 3)) for _ in range(n)]
+            x = factors.solve(b)
+            assert all(sum(matrix[i][j] * x[j] for j in range(n)) == b[i] for i in range(n))
+            assert factors.to_lup().solve(b) == x
+
+def test_ldlt_breakdown_on_zero_leading_minor():
+    try:
+        ldlt_factorize(pack_lower(_fractions([[0, 1], [1, 0]])), 2)
+        assert False
+    except LDLTBreakdown as e:
+        assert e.k == 0
+
+# --- Endpoint de factorización ---
+
+def test_ldlt_endpoint():
+    body = client.post("/operations/ldlt_factorization", json={"matrix": SPD}).json()
+    assert body["success"]
+    assert body["result"]["matrix_l"] == [["1", "0", "0"], ["1/2", "1", "0"], ["-1/2", "1/3", "1"]]
+    assert body["result"]["matrix_d"] == [["4", "0", "0"], ["0", "9", "0"], ["0", "0", "3"]]
+    assert body["result"]["positive_definite"]
+    assert "    L(3,2) = 1/3" in body["steps"]
+    indefinite = client.post("/operations/ldlt_factorization", json={"matrix": [[1, 2], [2, 1]], "steps": "none"}).json()
+    assert indefinite["result"]["matrix_d"] == [["1", "0"], ["0", "-3"]]
+    assert not indefinite["result"]["positive_definite"]
+
+def test_ldlt_endpoint_errors():
+    nonsymmetric = client.post("/operations/ldlt_factorization", json={"matrix": [[1, 2], [3, 4]]})
+    assert nonsymmetric.status_code == 400
+    assert "simétrica" in nonsymmetric.json()["detail"]
+    breakdown = client.post("/operations/ldlt_factorization", json={"matrix": [[0, 1], [1, 0]]}).json()
+    assert not breakdown["success"]
+    assert "Pivote D(1,1) es cero" in breakdown["error"]
+
+def test_ldlt_factors_are_reused():
+    client.post("/operations/ldlt_factorization", json={"matrix": SPD, "steps": "none"})
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": SPD, "vector_b": [4, 14, 5], "steps": "summary"}).json()
+    assert body["result"]["solution_vector"] == ["1", "1", "1"]
+    assert any("factorización PA = LU almacenada" in step for step in body["steps"])
+    assert client.post("/operations/determinant", json={"matrix": SPD}).json()["result"] == "108"
+
+# --- Camino simétrico automático ---
+
+def test_symmetric_solve_fast_path():
+    n = 8
+    a = _symmetric(n)
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": [[str(v) for v in row] for row in a], "vector_b": list(range(n))}).json()
+    x = [Fraction(value) for value in body["result"]["solution_vector"]]
+    assert all(sum(a[i][j] * x[j] for j in range(n)) == i for i in range(n))
+    assert any(step.startswith("Matriz simétrica: A = L D Lᵀ") for step in body["steps"])
+    multiple = client.post("/operations/solve_system_gaussian", json={"matrix_a": [[str(v) for v in row] for row in a], "matrix_b": [[i, 0] for i in range(n)], "steps": "summary"}).json()
+    assert multiple["result"]["solution_vectors"][0] == body["result"]["solution_vector"]
+    assert multiple["result"]["solution_vectors"][1] == ["0"] * n
+
+def test_symmetric_solve_small_full_steps_keep_gaussian_elimination():
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": SPD, "vector_b": [4, 14, 5]}).json()
+    assert body["result"]["solution_vector"] == ["1", "1", "1"]
+    assert not any(step.startswith("Matriz simétrica") for step in body["steps"])
+    summary = client.post("/operations/solve_system_gaussian", json={"matrix_a": SPD, "vector_b": [4, 14, 5], "steps": "summary"}).json()
+    assert any(step.startswith("Matriz simétrica") for step in summary["steps"])
+
+def test_symmetric_solve_falls_back():
+    # A(1,1) = 0: sin pivoteo no hay LDLᵀ, la eliminación con intercambios resuelve
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": [[0, 1, 1], [1, 0, 1], [1, 1, 0]], "vector_b": [2, 3, 1], "steps": "summary"}).json()
+    assert body["result"]["solution_vector"] == ["1", "0", "2"]
+    assert any("Pivote D(1,1) es cero" in step for step in body["steps"])
+    singular = client.post("/operations/solve_system_gaussian", json={"matrix_a": [[1, 1], [1, 1]], "vector_b": [1, 1], "steps": "summary"}).json()
+    assert singular["result"]["message"] == "El sistema tiene soluciones infinitas."
+
+def test_symmetric_determinant_fast_path():
+    a = _symmetric(7)
+    body = client.post("/operations/determinant", json={"matrix": [[str(v) for v in row] for row in a]}).json()
+    assert body["result"] == str(bareiss_determinant(RationalMatrix.from_fractions(a))[0])
+    assert "LDLᵀ" in body["steps"][-1]
+    fallback = client.post("/operations/determinant", json={"matrix": [[0, 1, 1], [1, 0, 1], [1, 1, 0]], "steps": "summary"}).json()
+    assert fallback["result"] == "2"
+    assert "Bareiss" in fallback["steps"][-1]
@@ -74,12 +74,6 @@ INVALID_LU_CASES = [
         400,
         "La matriz A debe ser cuadrada para la descomposición LU. Se recibió 2x3."
     ),
-    (
-        "exceeds_4x4_limit",
-        {"matrix": [[str(i*5+j+1) for j in range(5)] for i in range(5)]}, # 5x5 matrix
-        400,
-        "La matriz A está limitada a dimensiones de hasta 4x4 para LU. Se recibió 5x5."
-    ),
     (
         "empty_matrix",
         {"matrix": []},
@@ -90,7 +84,7 @@ INVALID_LU_CASES = [
         "non_numeric_element",
         {"matrix": [["1", "x"], ["3", "4"]]}, 
         400,
-        "Error de conversión de valor: Valor de entrada inválido: 'x'. No es un número, fracción (ej: '1/2'), ni string numérico (ej: '2.5')."
+        "Error de conversión en A[1][2]: Valor de entrada inválido: 'x'. No es un número, fracción (ej: '1/2'), ni string numérico (ej: '2.5')."
     ),
     (
         "zero_pivot_no_pivoting", # Doolittle sin pivoteo fallará aquí
@@ -115,4 +109,109 @@ def test_lu_factorization_invalid(test_id, payload, expected_status_code, expect
         assert expected_error_detail in data.get("detail", str(data)) # Pydantic vs HTTPException
     elif expected_status_code == 200: # Casos donde success=False pero status=200
         assert data["success"] == False
-        assert data["error"] == expected_error_detail 
\ No newline at end of file
+        assert data["error"] == expected_error_detail 
+# --- Pivoteo parcial (PA = LU) ---
+from fractions import Fraction
+from backend.core.factor_cache import FACTOR_CACHE, FactorCache, canonical_matrix_key
+from backend.core.lup import LUPFactors
+from backend.core.rational_matrix import RationalMatrix
+from backend.utils.result_cache import RESULT_CACHE
+
+def _matmul(a, b):
+    return [[sum(Fraction(a[i][k]) * Fraction(b[k][j]) for k in range(len(b))) for j in range(len(b[0]))] for i in range(len(a))]
+
+@pytest.mark.parametrize("test_id, matrix", [
+    ("zero_leading_pivot", [["0", "1"], ["2", "3"]]),
+    ("zero_middle_pivot", [["1", "1", "1"], ["1", "1", "2"], ["1", "2", "3"]]),
+    ("fractions", [["1/2", "1/3", "1"], ["4", "-2", "1/5"], ["0", "3", "7"]]),
+])
+def test_lu_partial_pivoting_satisfies_pa_equals_lu(test_id, matrix):
+    response = client.post("/operations/lu_factorization", json={"matrix": matrix, "pivoting": "partial"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] == True, f"Prueba '{test_id}' falló: {data.get('error')}"
+    result = data["result"]
+    pa = _matmul(result["matrix_p"], matrix)
+    lu = _matmul(result["matrix_l"], result["matrix_u"])
+    assert pa == lu, f"Prueba '{test_id}' falló: PA != LU"
+
+def test_lu_partial_pivoting_chooses_largest_pivot():
+    response = client.post("/operations/lu_factorization", json={"matrix": [["1", "2"], ["3", "4"]], "pivoting": "partial"})
+    result = response.json()["result"]
+    assert result["matrix_p"] == [["0", "1"], ["1", "0"]]
+    assert result["matrix_l"] == [["1", "0"], ["1/3", "1"]]
+    assert result["matrix_u"] == [["3", "4"], ["0", "2/3"]]
+
+def test_lu_partial_pivoting_singular_matrix_has_zero_in_u():
+    response = client.post("/operations/lu_factorization", json={"matrix": [["1", "2"], ["2", "4"]], "pivoting": "partial"})
+    data = response.json()
+    assert data["success"] == True
+    assert data["result"]["matrix_u"][1][1] == "0"
+
+def test_lu_without_pivoting_returns_no_p():
+    response = client.post("/operations/lu_factorization", json={"matrix": [["2", "3"], ["1", "4"]]})
+    assert response.json()["result"]["matrix_p"] is None
+
+# --- Caché de factorizaciones ---
+
+def test_factorization_is_reused_by_solve_determinant_and_inverse():
+    matrix = [["0", "2", "1"], ["1", "1", "0"], ["3", "0", "1"]]
+    client.post("/operations/lu_factorization", json={"matrix": matrix, "pivoting": "partial"})
+    assert len(FACTOR_CACHE) == 1
+
+    det = client.post("/operations/determinant", json={"matrix": [[0, 2, 1], [1, 1, 0], ["3", "0.0", 1]], "steps": "summary"}).json()
+    assert det["result"] == "-5"
+    assert any("factorización PA = LU almacenada" in step for step in det["steps"])
+
+    inverse = client.post("/operations/inverse", json={"matrix": matrix, "steps": "summary"}).json()
+    assert inverse["result"] == [["-1/5", "2/5", "1/5"], ["1/5", "3/5", "-1/5"], ["3/5", "-6/5", "2/5"]]
+    assert any("factorización PA = LU almacenada" in step for step in inverse["steps"])
+
+    solve = client.post("/operations/solve_system_gaussian", json={"matrix_a": matrix, "vector_b": ["3", "2", "4"], "steps": "summary"}).json()
+    assert solve["result"]["solution_vector"] == ["1", "1", "1"]
+    assert any("factorización PA = LU almacenada" in step for step in solve["steps"])
+    assert FACTOR_CACHE.hits == 3
+
+def test_full_steps_do_not_depend_on_cached_factors():
+    # Con pasos detallados la misma entrada muestra siempre la misma eliminación, haya o no factorización guardada
+    matrix = [[2, 1, 1], [4, 3, 3], [8, 7, 9]]
+    requests = [("inverse", {"matrix": matrix}), ("determinant", {"matrix": matrix}),
+                ("solve_system_gaussian", {"matrix_a": matrix, "vector_b": [1, 2, 3]}),
+                ("solve_system_gaussian", {"matrix_a": matrix, "matrix_b": [[1, 0], [0, 1], [0, 0]]})]
+    cold = [client.post(f"/operations/{op}", json=payload).json()["steps"] for op, payload in requests]
+    client.post("/operations/lu_factorization", json={"matrix": matrix, "pivoting": "partial"})
+    RESULT_CACHE.clear()
+    warm = [client.post(f"/operations/{op}", json=payload).json()["steps"] for op, payload in requests]
+    assert warm == cold
+    assert len(cold[0]) > 12
+    assert FACTOR_CACHE.hits == 0
+
+def test_cached_singular_factorization_falls_back_to_elimination():
+    matrix = [["1", "2"], ["2", "4"]]
+    client.post("/operations/lu_factorization", json={"matrix": matrix, "pivoting": "partial"})
+    solve = client.post("/operations/solve_system_gaussian", json={"matrix_a": matrix, "vector_b": ["1", "2"]}).json()
+    assert solve["result"]["message"] == "El sistema tiene soluciones infinitas."
+    inverse = client.post("/operations/inverse", json={"matrix": matrix}).json()
+    assert inverse["success"] == False
+
+def test_factor_cache_is_lru_bounded():
+    cache = FactorCache(max_entries=2)
+    matrices = [[[Fraction(k)]] for k in (1, 2, 3)]
+    for m in matrices[:2]:
+        cache.put(m, LUPFactors(RationalMatrix.identity(1), RationalMatrix.from_fractions(m), [0], 0))
+    assert cache.get(matrices[0]) is not None # matrices[0] pasa a ser la más reciente
+    cache.put(matrices[2], LUPFactors(RationalMatrix.identity(1), RationalMatrix.from_fractions(matrices[2]), [0], 0))
+    assert cache.get(matrices[1]) is None
+    assert cache.get(matrices[0]) is not None and cache.get(matrices[2]) is not None
+    assert len(cache) == 2
+
+def test_canonical_key_ignores_input_spelling():
+    assert canonical_matrix_key([[Fraction("0.5"), Fraction(2)]]) == canonical_matrix_key([[Fraction(1, 2), Fraction("4/2")]])
+    assert canonical_matrix_key([[Fraction(1), Fraction(2)]]) != canonical_matrix_key([[Fraction(1)], [Fraction(2)]])
+
+def test_cached_factorization_solves_matrix_b():
+    matrix = [["2", "1"], ["1", "3"]]
+    client.post("/operations/lu_factorization", json={"matrix": matrix})
+    data = client.post("/operations/solve_system_gaussian", json={"matrix_a": matrix, "matrix_b": [["3", "1"], ["4", "0"]], "steps": "summary"}).json()
+    assert data["result"]["solution_vectors"] == [["1", "1"], ["3/5", "-1/5"]]
+    assert any("factorización PA = LU almacenada" in step for step in data["steps"])
@@ -0,0 +1,91 @@
+import pickle
+from fractions import Fraction
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import MatrixInput, SystemInput, TwoMatrixInput
+from backend.utils import matrix_parser
+from backend.utils.matrix_parser import FractionMatrix, MatrixValueError, matrix_fractions, parse_matrix, vector_fractions
+from backend.utils.validators import validar_matriz
+
+client = TestClient(app)
+
+def test_models_convert_on_validation():
+    data = TwoMatrixInput(matrix_a=[[1, "1/2"], ["0.25", -3]], matrix_b=[[0]])
+    assert isinstance(data.matrix_a, FractionMatrix)
+    assert data.matrix_a == [[1, "1/2"], ["0.25", -3]] # La entrada original se conserva
+    assert data.matrix_a.fractions == [[Fraction(1), Fraction(1, 2)], [Fraction(1, 4), Fraction(-3)]]
+    assert data.model_dump()["matrix_a"] == [[1, "1/2"], ["0.25", -3]]
+    system = SystemInput(matrix_a=[[2]], vector_b=["2/3"])
+    assert vector_fractions(system.vector_b) == [Fraction(2, 3)]
+
+def test_each_element_is_converted_once(monkeypatch):
+    calls = []
+    original = matrix_parser.to_fraction
+    monkeypatch.setattr(matrix_parser, "to_fraction", lambda value: calls.append(value) or original(value))
+    data = MatrixInput(matrix=[[1, 2], [3, 4]])
+    matrix_fractions(data.matrix)
+    validar_matriz(data.matrix, "A")
+    matrix_fractions(data.matrix)
+    assert len(calls) == 4
+
+def test_value_error_position():
+    data = MatrixInput(matrix=[[1, 2, 3], [4, "5", "x/2"]])
+    with pytest.raises(MatrixValueError) as info:
+        matrix_fractions(data.matrix)
+    assert (info.value.row, info.value.col) == (1, 2)
+    assert str(info.value).startswith("Valor de entrada inválido: 'x/2'")
+
+def test_shape_is_recorded_in_the_same_pass():
+    parsed = parse_matrix([[1, 2], [3, 4], [5], []])
+    assert parsed.cols == 2 and parsed.ragged == 2
+
+@pytest.mark.parametrize("matrix", [[[1, 2], [3]], [[1, 2], []], [[]], [[1], [2, 3], [4]]])
+def test_validation_messages_match_plain_lists(matrix):
+    assert validar_matriz(parse_matrix(matrix), "La matriz A") == validar_matriz(matrix, "La matriz A")
+
+def test_parsed_input_survives_pickling():
+    data = pickle.loads(pickle.dumps(MatrixInput(matrix=[["1/3"]])))
+    assert data.matrix.fractions == [[Fraction(1, 3)]]
+
+def test_gauss_jordan_reports_vector_position():
+    response = client.post("/operations/gauss_jordan_elimination", json={"matrix_a": [[1, 0], [0, 1]], "vector_b": [1, "2/0"]})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Error de conversión en b[2]: Valor inválido: '2/0'")
+
+def test_structural_errors_still_422():
+    response = client.post("/operations/determinant", json={"matrix": [[1, 2], [3, [4]]]})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"][:4] == ["body", "matrix", 1, 1]
+
+def test_list_input_is_not_validated_twice():
+    calls = []
+    def handler(value):
+        calls.append(value)
+        return value
+    parsed = matrix_parser.validate_matrix_input([[1, "1/2"], [3, 4]], handler)
+    assert parsed.fractions == [[Fraction(1), Fraction(1, 2)], [Fraction(3), Fraction(4)]]
+    assert calls == [] # Sin errores, pydantic no recorre los elementos
+    matrix_parser.validate_matrix_input([[1, "1/0"]], handler)
+    assert len(calls) == 1 # Con un elemento inválido se valida con pydantic (errores de tipo con su posición)
+
+INVALID_ELEMENT_CASES = [
+    ("add", {"matrix_a": [[1, 2]], "matrix_b": [[3, "x"]]}, "Error de conversión en B[1][2]: "),
+    ("subtract", {"matrix_a": [[1], ["1/0"]], "matrix_b": [[1], [2]]}, "Error de conversión en A[2][1]: "),
+    ("multiply", {"matrix_a": [[1, 2]], "matrix_b": [[1], ["x"]]}, "Error de conversión en B[2][1]: "),
+    ("determinant", {"matrix": [[1, 2], [3, "x"]]}, "Error de conversión en A[2][2]: "),
+    ("inverse", {"matrix": [[1, "x"], [3, 4]]}, "Error de conversión en A[1][2]: "),
+    ("lu_factorization", {"matrix": [[1, 2], ["x", 4]]}, "Error de conversión en A[2][1]: "),
+    ("ldlt_factorization", {"matrix": [[1, 2], [2, "x"]]}, "Error de conversión en A[2][2]: "),
+    ("solve_system_gaussian", {"matrix_a": [[1, 0], [0, 1]], "matrix_b": [[1], ["x"]]}, "Error de conversión en B[2][1]: "),
+    ("solve_system_gaussian", {"matrix_a": [[1, 0], [0, 1]], "vector_b": [1, "x"]}, "Error de conversión en b[2]: "),
+    ("gauss_jordan_elimination", {"matrix_a": [[1, 0], [0, "x"]], "vector_b": [1, 2]}, "Error de conversión en A[2][2]: "),
+]
+
+@pytest.mark.parametrize("operation, payload, prefix", INVALID_ELEMENT_CASES)
+def test_every_endpoint_reports_element_position(operation, payload, prefix):
+    response = client.post(f"/operations/{operation}", json=payload)
+    body = response.json()
+    message = body["error"] if operation in ("add", "subtract") else body["detail"] # Suma y resta responden success: false
+    assert message.startswith(prefix), message
@@ -111,22 +111,12 @@ GENERAL_INVALID_INPUT_CASES = [
     (
         {"matrix_a": [[1, "abc"]], "matrix_b": [[1],[2]]},
         400,
-        "Valor de entrada inválido: 'abc'. No es un número, fracción (ej: '1/2'), ni string numérico (ej: '2.5')."
+        "Error de conversión en A[1][2]: Valor de entrada inválido: 'abc'. No es un número, fracción (ej: '1/2'), ni string numérico (ej: '2.5')."
     ),
     (
         {"matrix_a": [[1, 2]], "matrix_b": [[1],["1/0"]]}, # Note: matrix_b_frac creation will hit this
         400,
-        "Valor inválido: '1/0'. El denominador no puede ser cero en una fracción."
-    ),
-    (
-        {"matrix_a": [[1,2,3,4,5]], "matrix_b": [[1],[1],[1],[1],[1]]}, # Exceeds column limit for A
-        400,
-        "La operación está limitada a matrices de hasta 4 columnas. La matriz A tiene 5 columnas."
-    ),
-     (
-        {"matrix_a": [[1],[1],[1],[1],[1]], "matrix_b": [[1,2,3,4]]}, # Exceeds row limit for A
-        400,
-        "La operación está limitada a matrices de hasta 4 filas. La matriz A tiene 5 filas."
+        "Error de conversión en B[2][1]: Valor inválido: '1/0'. El denominador no puede ser cero en una fracción."
     ),
 
 ]
@@ -0,0 +1,85 @@
+from fractions import Fraction
+
+import pytest
+
+from backend.core.rational_matrix import RationalMatrix
+
+# Pruebas unitarias del motor de matrices racionales (backend/core/rational_matrix.py).
+# Los endpoints lo usan internamente; aquí se verifica directamente su aritmética exacta.
+
+
+def F(value):
+    return Fraction(value)
+
+
+def test_from_fractions_uses_row_common_denominator():
+    """Cada fila se almacena como enteros sobre el mcm de sus denominadores."""
+    matrix = RationalMatrix.from_fractions([[F("1/2"), F("1/3")], [F(2), F(4)]])
+    assert matrix.data == [3, 2, 2, 4]
+    assert matrix.dens == [6, 1]
+    assert matrix.to_fractions() == [[F("1/2"), F("1/3")], [F(2), F(4)]]
+
+
+def test_subtract_scaled_row_is_exact_and_normalized():
+    matrix = RationalMatrix.from_fractions([[F(2), F(1)], [F(1), F(3)]])
+    matrix.subtract_scaled_row(1, 0, F("1/2"), start=0)
+    assert matrix.to_fractions() == [[F(2), F(1)], [F(0), F("5/2")]]
+    assert matrix.dens[1] == 2
+
+
+def test_subtract_scaled_row_keeps_columns_before_start():
+    """Las columnas anteriores a start conservan su valor aunque cambie el denominador de la fila."""
+    matrix = RationalMatrix.from_fractions([[F(7), F(1), F(1)], [F(5), F(2), F(3)]])
+    matrix.subtract_scaled_row(1, 0, F("1/3"), start=1)
+    assert matrix.row(1) == [F(5), F("5/3"), F("8/3")]
+
+
+def test_scale_and_swap_rows():
+    matrix = RationalMatrix.from_fractions([[F(1), F(2)], [F(3), F(4)]])
+    matrix.swap_rows(0, 1)
+    matrix.scale_row(0, F("-1/3"))
+    assert matrix.to_fractions() == [[F(-1), F("-4/3")], [F(1), F(2)]]
+    with pytest.raises(ValueError):
+        matrix.scale_row(1, 0)
+
+
+def test_add_subtract_and_matmul_match_fraction_arithmetic():
+    a_frac = [[F("1/2"), F(2)], [F(-3), F("3/4")]]
+    b_frac = [[F("1/3"), F(0)], [F("5/6"), F(-1)]]
+    a = RationalMatrix.from_fractions(a_frac)
+    b = RationalMatrix.from_fractions(b_frac)
+
+    assert a.add(b).to_fractions() == [[a_frac[i][j] + b_frac[i][j] for j in range(2)] for i in range(2)]
+    assert a.subtract(b).to_fractions() == [[a_frac[i][j] - b_frac[i][j] for j in range(2)] for i in range(2)]
+    expected_product = [[sum(a_frac[i][k] * b_frac[k][j] for k in range(2)) for j in range(2)] for i in range(2)]
+    assert a.matmul(b).to_fractions() == expected_product
+
+
+def test_matmul_rectangular_and_dimension_error():
+    a = RationalMatrix.from_fractions([[F(1), F(2), F(3)]])
+    b = RationalMatrix.from_fractions([[F(1)], [F("1/2")], [F("1/3")]])
+    assert a.matmul(b).to_fractions() == [[F(3)]]
+    with pytest.raises(ValueError):
+        b.matmul(b)
+
+
+def test_dot_products():
+    a = RationalMatrix.from_fractions([[F("1/2"), F("1/3"), F(1)]])
+    assert a.dot_row_vector(0, [F(2), F(3), F("1/5")]) == F("11/5")
+    assert a.dot_row_vector(0, [F(2), F(3), F("1/5")], start=1, stop=2) == F(1)
+
+    u = RationalMatrix.from_fractions([[F(2)], [F("1/4")], [F(8)]])
+    assert a.dot_row_column(0, u, 0) == F(1) + F("1/12") + F(8)
+    assert a.dot_row_column(0, u, 0, stop=0) == 0
+
+
+def test_augment_submatrix_set_and_transpose():
+    a = RationalMatrix.from_fractions([[F(1), F(2)], [F(3), F(4)]])
+    augmented = a.augment(RationalMatrix.identity(2))
+    assert augmented.shape == (2, 4)
+    assert augmented.submatrix(0, 2, 2, 4) == RationalMatrix.identity(2)
+
+    a.set(0, 1, F("1/7"))
+    assert a.row(0) == [F(1), F("1/7")]
+    a.set_row(1, [F("1/2"), F(0)])
+    assert a.transpose().to_fractions() == [[F(1), F("1/2")], [F("1/7"), F(0)]]
@@ -0,0 +1,59 @@
+import json
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import ApiResponse
+from backend.utils.responses import render_api_response
+from backend.utils.result_cache import RESULT_CACHE
+from backend.utils.wire_format import flatten_response
+
+client = TestClient(app)
+
+def test_body_matches_model_dump():
+    response = client.post("/operations/determinant", json={"matrix": [[1, 2], [3, 4]], "steps": "full"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["success"] is True
+    assert body["result"] == "-2"
+    assert len(body["steps"]) > 0
+
+def test_render_matches_fastapi_serialization():
+    api_response = ApiResponse(success=True, result=[["1/2", "3"]], steps=None)
+    assert json.loads(render_api_response(api_response)) == api_response.model_dump(mode="json")
+
+def test_openapi_keeps_response_model():
+    schema = client.get("/openapi.json").json()
+    for path in ("/operations/determinant", "/operations/add", "/operations/lu_factorization"):
+        content = schema["paths"][path]["post"]["responses"]["200"]["content"]["application/json"]
+        assert content["schema"]["$ref"].endswith("/ApiResponse")
+
+def test_response_model_not_revalidated(monkeypatch):
+    import fastapi.routing
+    calls = []
+    original = fastapi.routing.serialize_response
+    async def spy(*args, **kwargs):
+        calls.append(kwargs)
+        return await original(*args, **kwargs)
+    monkeypatch.setattr(fastapi.routing, "serialize_response", spy)
+    response = client.post("/operations/inverse", json={"matrix": [[2, 0], [0, 4]], "steps": "none"})
+    assert response.status_code == 200
+    assert response.json()["result"] == [["1/2", "0"], ["0", "1/4"]]
+    assert not calls
+    client.get("/cache") # Las rutas sin FastResponseRoute siguen el camino normal
+    assert calls
+
+def test_cached_response_reuses_json():
+    payload = {"matrix": [[5, 1], [2, 3]], "steps": "none"}
+    first = client.post("/operations/determinant", json=payload)
+    cached = next(iter(RESULT_CACHE._entries.values()))[0]
+    serialized = cached._json
+    assert serialized is not None and first.content == serialized
+    second = client.post("/operations/determinant", json=payload)
+    assert second.content == serialized and cached._json is serialized
+
+def test_flatten_discards_serialized_json():
+    api_response = ApiResponse(success=True, result=[["1", "2"]])
+    render_api_response(api_response)
+    flat = flatten_response(api_response)
+    assert json.loads(render_api_response(flat))["result"] == {"rows": 1, "cols": 2, "data": ["1", "2"]}
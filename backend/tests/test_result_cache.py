@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import MatrixInput, TwoMatrixInput
+from backend.utils import result_cache as result_cache_module
+from backend.utils.result_cache import RESULT_CACHE, ResultCache, SingleFlight, cached_result, canonical_request_key
+from backend.models import ApiResponse
+
+client = TestClient(app)
+
+def _response(text):
+    return ApiResponse(success=True, result=[[text]])
+
+# --- Clave canónica ---
+
+def test_equivalent_inputs_share_key():
+    keys = {canonical_request_key("determinant", MatrixInput(matrix=[[value, 1], [2, 3]])) for value in ("0.5", "1/2", 0.5, "2/4")}
+    assert len(keys) == 1
+
+def test_key_depends_on_operation_options_and_shape():
+    base = canonical_request_key("determinant", MatrixInput(matrix=[[1, 2], [3, 4]]))
+    assert base != canonical_request_key("inverse", MatrixInput(matrix=[[1, 2], [3, 4]]))
+    assert base != canonical_request_key("determinant", MatrixInput(matrix=[[1, 2], [3, 4]], steps="none"))
+    assert base != canonical_request_key("determinant", MatrixInput(matrix=[[1, 2], [3, 4]], steps_format="json"))
+    assert canonical_request_key("add", TwoMatrixInput(matrix_a=[[1, 2]], matrix_b=[[3, 4]])) != \
+        canonical_request_key("add", TwoMatrixInput(matrix_a=[[1], [2]], matrix_b=[[3], [4]]))
+
+def test_invalid_values_have_no_key():
+    assert canonical_request_key("determinant", MatrixInput(matrix=[["abc", 1], [2, 3]])) is None
+
+# --- LRU, tamaño y vencimiento ---
+
+def test_lru_eviction_by_entries():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", _response("1"))
+    cache.put("b", _response("2"))
+    assert cache.get("a") is not None # "b" pasa a ser la menos usada
+    cache.put("c", _response("3"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+def test_eviction_by_size():
+    cache = ResultCache(max_entries=100, max_mb=0.001) # ~1 KB
+    cache.put("a", _response("x" * 600))
+    cache.put("b", _response("y" * 600))
+    assert len(cache) == 1 and cache.get("b") is not None
+    cache.put("c", _response("z" * 5000)) # Más grande que la caché completa: no se guarda
+    assert cache.get("c") is None and cache.get("b") is not None
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache_module.time, "monotonic", lambda: now[0])
+    cache = ResultCache(ttl_seconds=10)
+    cache.put("a", _response("1"))
+    now[0] += 5
+    assert cache.get("a") is not None
+    now[0] += 6
+    assert cache.get("a") is None
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+# --- Endpoints ---
+
+def test_endpoint_hits_for_equivalent_input():
+    first = client.post("/operations/determinant", json={"matrix": [["1/2", 1], [2, 3]]})
+    second = client.post("/operations/determinant", json={"matrix": [[0.5, "1"], ["2", 3]]})
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert RESULT_CACHE.stats()["hits"] == 1 and RESULT_CACHE.stats()["misses"] == 1
+
+def test_steps_mode_is_part_of_the_key():
+    full = client.post("/operations/inverse", json={"matrix": [[1, 2], [3, 4]]}).json()
+    none = client.post("/operations/inverse", json={"matrix": [[1, 2], [3, 4]], "steps": "none"}).json()
+    assert full["steps"] and none["steps"] is None
+    assert RESULT_CACHE.stats()["hits"] == 0
+
+def test_errors_are_not_cached():
+    for _ in range(2):
+        response = client.post("/operations/inverse", json={"matrix": [[1, 2, 3], [4, 5, 6]]}) # No cuadrada
+        assert response.status_code == 400
+    assert len(RESULT_CACHE) == 0
+
+def test_streaming_bypasses_cache():
+    client.post("/operations/determinant", json={"matrix": [[1, 2], [3, 4]]})
+    response = client.post("/operations/stream/determinant", json={"matrix": [[1, 2], [3, 4]]})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert any(event["event"] == "step" for event in events)
+    assert RESULT_CACHE.stats()["hits"] == 0
+
+def test_cache_stats_endpoint():
+    client.post("/operations/multiply", json={"matrix_a": [[1, 2]], "matrix_b": [[3], [4]]})
+    client.post("/operations/multiply", json={"matrix_a": [[1, 2]], "matrix_b": [[3], [4]]})
+    stats = client.get("/cache").json()
+    assert stats["results"]["entries"] == 1
+    assert stats["results"]["hits"] == 1 and stats["results"]["misses"] == 1
+    assert stats["results"]["in_flight"] == 0
+    assert set(stats["factorizations"]) == {"entries", "hits", "misses"}
+
+# --- Solicitudes idénticas concurrentes ---
+
+def _run_concurrently(flight, key, function, count):
+    """Lanza `count` llamadas con la misma clave; la función no termina hasta que todas están esperando."""
+    results, errors = [], []
+    def call():
+        try:
+            results.append(flight.do(key, function))
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+def _gated(flight, key, count, outcome):
+    calls = []
+    def function():
+        calls.append(1)
+        deadline = time.monotonic() + 10
+        while flight._flights[key].waiters < count - 1 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return outcome()
+    return function, calls
+
+def test_single_flight_shares_one_computation():
+    flight = SingleFlight()
+    function, calls = _gated(flight, "k", 5, lambda: _response("1"))
+    results, errors = _run_concurrently(flight, "k", function, 5)
+    assert len(calls) == 1 and not errors
+    assert len(results) == 5 and all(result is results[0] for result in results)
+    assert flight.coalesced == 4 and flight.in_flight() == 0
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    def fail():
+        raise HTTPException(status_code=400, detail="Matriz no cuadrada")
+    function, calls = _gated(flight, "k", 3, fail)
+    results, errors = _run_concurrently(flight, "k", function, 3)
+    assert len(calls) == 1 and not results
+    assert [e.status_code for e in errors] == [400, 400, 400]
+    # Terminado el cálculo, una nueva llamada vuelve a calcular
+    assert flight.do("k", lambda: _response("2")).result == [["2"]]
+
+def test_identical_requests_coalesce_without_cache(monkeypatch):
+    monkeypatch.setattr(RESULT_CACHE, "max_entries", 0)
+    flight = SingleFlight()
+    monkeypatch.setattr(result_cache_module, "SINGLE_FLIGHT", flight)
+    calls = []
+    @cached_result("determinant")
+    def endpoint(data):
+        calls.append(1)
+        key = canonical_request_key("determinant", data)
+        deadline = time.monotonic() + 10
+        while flight._flights[key].waiters < 3 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        return _response("-2")
+    payloads = [MatrixInput(matrix=matrix) for matrix in ([[1, 2], [3, 4]], [["1", 2.0], [3, "8/2"]], [[1, 2], [3, 4]], [[1, 2], [3, 4]])]
+    threads = [threading.Thread(target=endpoint, args=(payload,)) for payload in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert len(calls) == 1 and flight.coalesced == 3
@@ -0,0 +1,90 @@
+import multiprocessing
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.models import ApiResponse
+from backend.core.factor_cache import FACTOR_CACHE
+from backend.utils.result_cache import RESULT_CACHE
+from backend.utils.result_store import RESULT_STORE, ResultStore
+
+client = TestClient(app)
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Activa el almacén persistente en un directorio temporal."""
+    monkeypatch.setattr(RESULT_STORE, "directory", str(tmp_path))
+    yield RESULT_STORE
+    RESULT_STORE.clear()
+
+def _put_many(directory, prefix, count):
+    store = ResultStore(directory)
+    for i in range(count):
+        store.put(f"{prefix}{i}", ApiResponse(success=True, result=[[str(i)]]))
+    return count
+
+# --- Almacén ---
+
+def test_disabled_by_default():
+    assert not ResultStore().enabled
+    assert ResultStore().get("x") is None
+    assert ResultStore().stats() == {"enabled": False}
+
+def test_values_survive_a_new_instance(tmp_path):
+    ResultStore(str(tmp_path)).put("k", ApiResponse(success=True, result=[["1/2"]], steps=["paso"]))
+    value = ResultStore(str(tmp_path)).get("k")
+    assert value.result == [["1/2"]] and value.steps == ["paso"]
+
+def test_size_eviction_discards_least_recently_used(tmp_path, monkeypatch):
+    store = ResultStore(str(tmp_path), max_mb=0.01) # ~10 KB
+    clock = [1000.0]
+    monkeypatch.setattr("backend.utils.result_store.time.time", lambda: clock[0])
+    for i in range(4):
+        store.put(f"k{i}", "x" * 3000)
+        clock[0] += 100
+    assert store.get("k0") is None # Desalojada al guardar k3
+    assert store.get("k3") is not None
+    assert store.stats()["bytes"] <= store.max_bytes
+
+def test_unreadable_entry_is_dropped(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.put("k", 1)
+    store._connection().execute("UPDATE entries_v1 SET payload = ? WHERE key = ?", (b"no es pickle", "k"))
+    assert store.get("k") is None
+    assert store.stats()["entries"] == 0
+
+def test_concurrent_writers_from_several_processes(tmp_path):
+    with ProcessPoolExecutor(max_workers=3, mp_context=multiprocessing.get_context("spawn")) as pool:
+        counts = list(pool.map(_put_many, [str(tmp_path)] * 3, ["a", "b", "c"], [40] * 3))
+    assert counts == [40, 40, 40]
+    store = ResultStore(str(tmp_path))
+    assert store.stats()["entries"] == 120
+    assert store.get("b39").result == [["39"]]
+    with sqlite3.connect(store.path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+# --- Integración con las cachés en memoria ---
+
+def test_results_survive_memory_cache_loss(store):
+    payload = {"matrix": [[2, 1], [1, 3]]}
+    first = client.post("/operations/inverse", json=payload).json()
+    RESULT_CACHE.clear() # Como un reinicio u otro worker
+    second = client.post("/operations/inverse", json={"matrix": [["2", "1"], [1.0, "6/2"]]}).json()
+    assert first == second
+    assert store.stats()["hits"] == 1
+
+def test_factorizations_survive_memory_cache_loss(store):
+    matrix = [[4, 3], [6, 3]]
+    client.post("/operations/lu_factorization", json={"matrix": matrix})
+    FACTOR_CACHE.clear()
+    response = client.post("/operations/determinant", json={"matrix": matrix, "steps": "summary"})
+    assert response.json()["result"] == "-6"
+    assert any("factorización" in step for step in response.json()["steps"])
+    assert FACTOR_CACHE.hits == 1 and len(FACTOR_CACHE) == 1
+
+def test_cache_stats_include_store(store):
+    client.post("/operations/add", json={"matrix_a": [[1]], "matrix_b": [[2]]})
+    stats = client.get("/cache").json()["store"]
+    assert stats["enabled"] and stats["entries"] == 1
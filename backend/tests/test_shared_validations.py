@@ -1,4 +1,8 @@
 import json
+import pytest
+
+from backend.utils.size_policy import SIZE_POLICY, SizePolicy
+from backend.utils import matrix_parser
 
 # These tests verify shared validation logic: input type conversion/validation (to_fraction),
 # structural matrix validation (validar_matriz), and dimension/size validation 
@@ -145,33 +149,116 @@ def test_operation_ragged_matrix_a(client):
     assert data["success"] is False
     assert "Todas las filas de la matriz a deben tener el mismo número de columnas" in data["error"]
 
-def test_operation_max_size_exceeded_rows(client):
-    """Prueba una operación con matrices que exceden el máximo de filas (4xN)."""
-    print("\n--- test_operation_max_size_exceeded_rows (in test_shared_validations.py) ---")
+def test_operation_5x5_accepted_by_cost_policy(client):
+    """Matrices de más de 4x4 se admiten mientras su costo estimado quepa en el presupuesto."""
+    print("\n--- test_operation_5x5_accepted_by_cost_policy (in test_shared_validations.py) ---")
     payload = {
-        "matrix_a": [[1]*2 for _ in range(5)], 
-        "matrix_b": [[1]*2 for _ in range(5)] 
+        "matrix_a": [[1]*5 for _ in range(5)],
+        "matrix_b": [[2]*5 for _ in range(5)]
     }
     response = client.post("/operations/add", json=payload)
     data = response.json()
-    print(json.dumps(data, indent=2, ensure_ascii=False))
     assert response.status_code == 200
-    assert data["success"] is False
-    assert "La operación está limitada a matrices de hasta 4 filas." in data["error"]
+    assert data["success"] is True
+    assert data["result"] == [["3"]*5 for _ in range(5)]
 
-def test_operation_max_size_exceeded_cols(client):
-    """Prueba una operación con matrices que exceden el máximo de columnas (Nx5)."""
-    print("\n--- test_operation_max_size_exceeded_cols (in test_shared_validations.py) ---")
+def test_operation_exceeding_time_budget(client, monkeypatch):
+    """Prueba una operación (suma) cuyo costo estimado excede el presupuesto de tiempo configurado."""
+    print("\n--- test_operation_exceeding_time_budget (in test_shared_validations.py) ---")
+    monkeypatch.setattr(SIZE_POLICY, "max_seconds", 1e-9)
     payload = {
-        "matrix_a": [[1]*5 for _ in range(2)], 
-        "matrix_b": [[1]*5 for _ in range(2)] 
+        "matrix_a": [[1]*2 for _ in range(5)],
+        "matrix_b": [[1]*2 for _ in range(5)]
     }
     response = client.post("/operations/add", json=payload)
     data = response.json()
     print(json.dumps(data, indent=2, ensure_ascii=False))
     assert response.status_code == 200
     assert data["success"] is False
-    assert "La operación está limitada a matrices de hasta 4 columnas." in data["error"]
+    assert "La operación excede el presupuesto de tiempo" in data["error"]
+    assert "5x2" in data["error"]
+
+def test_operation_exceeding_memory_budget(client, monkeypatch):
+    """Prueba una operación (resta) cuyo uso de memoria estimado excede el presupuesto configurado."""
+    monkeypatch.setattr(SIZE_POLICY, "max_memory_mb", 1e-9)
+    payload = {
+        "matrix_a": [[1]*5 for _ in range(2)],
+        "matrix_b": [[1]*5 for _ in range(2)]
+    }
+    response = client.post("/operations/subtract", json=payload)
+    data = response.json()
+    assert response.status_code == 200
+    assert data["success"] is False
+    assert "La operación excede el presupuesto de memoria" in data["error"]
+
+def test_oversized_input_is_rejected_before_conversion(client, monkeypatch):
+    """La memoria de la entrada se valida antes de convertir los elementos a Fraction."""
+    calls = []
+    original = matrix_parser.to_fraction
+    monkeypatch.setattr(matrix_parser, "to_fraction", lambda value: calls.append(value) or original(value))
+    monkeypatch.setattr(SIZE_POLICY, "max_memory_mb", 0.001) # 10x10 elementos ocupan unos 3.5 KB
+    matrix = [[i + j for j in range(10)] for i in range(10)]
+    for body in ({"matrix": matrix}, {"matrix": {"rows": 10, "cols": 10, "data": [v for row in matrix for v in row]}}):
+        response = client.post("/operations/determinant", json=body)
+        assert response.status_code == 400
+        assert "La operación excede el presupuesto de memoria: la entrada de 10x10" in response.json()["detail"]
+    assert calls == []
+    assert client.post("/operations/determinant", json={"matrix": [[1, 2], [3, 4]]}).status_code == 200
+
+BUDGET_ENDPOINT_CASES = [
+    ("/operations/multiply", {"matrix_a": [[1]*5], "matrix_b": [[1]]*5}),
+    ("/operations/determinant", {"matrix": [[1]*5 for _ in range(5)]}),
+    ("/operations/inverse", {"matrix": [[1]*5 for _ in range(5)]}),
+    ("/operations/lu_factorization", {"matrix": [[1]*5 for _ in range(5)]}),
+    ("/operations/solve_system_gaussian", {"matrix_a": [[1]*5 for _ in range(5)], "vector_b": [1]*5}),
+    ("/operations/gauss_jordan_elimination", {"matrix_a": [[1]*5 for _ in range(2)], "vector_b": [1]*2}),
+]
+
+@pytest.mark.parametrize("endpoint, payload", BUDGET_ENDPOINT_CASES)
+def test_cost_policy_applies_to_every_endpoint(client, monkeypatch, endpoint, payload):
+    """Todas las operaciones admiten 5x5 por defecto y rechazan (400) lo que excede el presupuesto."""
+    response = client.post(endpoint, json=payload)
+    assert response.status_code == 200, response.text
+
+    monkeypatch.setattr(SIZE_POLICY, "max_seconds", 1e-9)
+    response = client.post(endpoint, json=payload)
+    assert response.status_code == 400
+    assert "La operación excede el presupuesto de tiempo" in response.json()["detail"]
+
+def test_cost_estimate_grows_with_dimension_bits_and_steps():
+    policy = SizePolicy(max_seconds=10, max_memory_mb=256, ops_per_second=1e6)
+    small = policy.estimate("determinant", 10, 10, bits=8, steps_enabled=False)
+    large = policy.estimate("determinant", 50, 50, bits=8, steps_enabled=False)
+    wide_bits = policy.estimate("determinant", 50, 50, bits=256, steps_enabled=False)
+    with_steps = policy.estimate("determinant", 50, 50, bits=8, steps_enabled=True)
+    assert small.seconds < large.seconds < wide_bits.seconds
+    assert with_steps.memory_bytes > large.memory_bytes
+    # 50x50 sin pasos cabe en el presupuesto por defecto; con pasos completos, no.
+    assert policy.check("determinant", 50, 50, bits=8, steps_enabled=False) is None
+    assert policy.check("determinant", 50, 50, bits=8, steps_enabled=True) is not None
+
+@pytest.mark.parametrize("operation, extra_cols", [
+    ("determinant", 0), ("solve_system_gaussian", 1), ("lu_factorization", 0), ("inverse", 0), ("gauss_jordan_elimination", 1),
+])
+def test_large_integer_matrices_admitted_without_steps(operation, extra_cols):
+    """El modelo de costo está calibrado con mediciones: 100x100 de enteros pequeños cabe sin pasos en el presupuesto por defecto."""
+    policy = SizePolicy()
+    assert policy.check(operation, 100, 100, bits=4, steps_enabled=False, extra_cols=extra_cols) is None
+    assert policy.check(operation, 100, 100, bits=4, steps_enabled=True, extra_cols=extra_cols) is not None # Pasos completos: demasiados
+    assert policy.check(operation, 500, 500, bits=4, steps_enabled=False, extra_cols=extra_cols) is not None
+
+def test_200x200_determinant_and_solve_admitted_without_steps(client):
+    policy = SizePolicy()
+    assert policy.check("determinant", 200, 200, bits=4, steps_enabled=False) is None
+    assert policy.check("solve_system_gaussian", 200, 200, bits=4, steps_enabled=False, extra_cols=1) is None
+    n = 100
+    matrix = [[(3 * i + 7 * j) % 10 - 4 + (n if i == j else 0) for j in range(n)] for i in range(n)]
+    response = client.post("/operations/determinant", json={"matrix": matrix, "steps": "none"})
+    assert response.status_code == 200, response.text
+    assert response.json()["success"] is True
+    oversized = client.post("/operations/determinant", json={"matrix": [[1] * 600 for _ in range(600)], "steps": "none"})
+    assert oversized.status_code == 400
+    assert "La operación excede el presupuesto de tiempo" in oversized.json()["detail"]
 
 # ---- Pydantic Model & Custom Structural Validation ----
 
@@ -0,0 +1,193 @@
+import random
+from fractions import Fraction
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.core.bareiss import bareiss_determinant
+from backend.core.rational_matrix import RationalMatrix
+from backend.core.sparse_matrix import SparseMatrix, is_sparse_candidate, sparse_eliminate
+from backend.models import MatrixInput
+from backend.utils.matrix_parser import SparseFractionMatrix, matrix_sparse, parse_matrix
+from backend.utils.result_cache import canonical_request_key
+from backend.utils.size_policy import SizePolicy
+
+client = TestClient(app)
+
+N = 30 # Tridiagonal de 30x30: 88 no nulos de 900 (densidad < 0.1)
+
+def _tridiagonal(n=N, diagonal=4):
+    return [[diagonal if i == j else (-1 if abs(i - j) == 1 else 0) for j in range(n)] for i in range(n)]
+
+def _cyclic_tridiagonal(n=N):
+    # Tridiagonal con las esquinas (condiciones periódicas): dispersa pero sin banda angosta
+    matrix = _tridiagonal(n)
+    matrix[0][n - 1] = matrix[n - 1][0] = -1
+    return matrix
+
+def _entries(matrix):
+    return {str(i): {str(j): value for j, value in enumerate(row) if value} for i, row in enumerate(matrix) if any(row)}
+
+def _csr(matrix):
+    row_ptr, col_idx, values = [0], [], []
+    for row in matrix:
+        for j, value in enumerate(row):
+            if value:
+                col_idx.append(j)
+                values.append(value)
+        row_ptr.append(len(values))
+    return {"rows": len(matrix), "cols": len(matrix[0]), "row_ptr": row_ptr, "col_idx": col_idx, "values": values}
+
+# --- Núcleo ---
+
+def test_sparse_candidate_threshold():
+    assert is_sparse_candidate(20, 20, 40)
+    assert not is_sparse_candidate(20, 20, 41)
+    assert not is_sparse_candidate(10, 10, 1) # Demasiado pequeña
+
+def test_sparse_arithmetic_matches_dense():
+    a = [[Fraction(v) for v in row] for row in _tridiagonal(6)]
+    b = [[Fraction(1, 2) if i == 5 - j else Fraction(0) for j in range(6)] for i in range(6)]
+    dense_a, dense_b = RationalMatrix.from_fractions(a), RationalMatrix.from_fractions(b)
+    sparse_a, sparse_b = SparseMatrix.from_fractions(a), SparseMatrix.from_fractions(b)
+    assert sparse_a.add(sparse_b).to_fractions() == dense_a.add(dense_b).to_fractions()
+    assert sparse_a.subtract(sparse_a).nnz == 0
+    assert sparse_a.matmul(sparse_b).to_fractions() == dense_a.matmul(dense_b).to_fractions()
+
+def test_sparse_elimination_matches_bareiss():
+    rng = random.Random(7)
+    for _ in range(200):
+        n = rng.randint(1, 7)
+        matrix = [[Fraction(rng.choice([0, 0, 0, 1, -2, 3, Fraction(1, 2)])) for _ in range(n)] for _ in range(n)]
+        b = [Fraction(rng.randint(-3, 3)) for _ in range(n)]
+        elimination = sparse_eliminate(SparseMatrix.from_fractions(matrix), [[value] for value in b])
+        determinant, _ = bareiss_determinant(RationalMatrix.from_fractions(matrix))
+        assert elimination.determinant() == determinant
+        if determinant:
+            x = elimination.solve()
+            assert all(sum(matrix[i][j] * x[j] for j in range(n)) == b[i] for i in range(n))
+
+def test_markowitz_ordering_avoids_fill():
+    # Matriz "flecha": fila y columna 0 llenas. Con el pivote (0,0) primero la matriz se llenaría por completo.
+    n = 30
+    arrow = [[Fraction(n) if i == j else (Fraction(1) if i == 0 or j == 0 else Fraction(0)) for j in range(n)] for i in range(n)]
+    elimination = sparse_eliminate(SparseMatrix.from_fractions(arrow))
+    assert elimination.fill == 0
+    assert elimination.determinant() == bareiss_determinant(RationalMatrix.from_fractions(arrow))[0]
+
+def test_matrix_sparse_only_for_large_sparse_inputs():
+    assert matrix_sparse(parse_matrix(_tridiagonal())) is not None
+    assert matrix_sparse(parse_matrix(_tridiagonal(20))) is None # 58 no nulos de 400: densidad 14.5%
+    assert matrix_sparse(parse_matrix(_tridiagonal(4))) is None
+
+def test_density_lowers_cost_estimate():
+    policy = SizePolicy()
+    dense = policy.estimate("solve_system_gaussian", 500, 500, 4, False, 1)
+    sparse = policy.estimate("solve_system_gaussian", 500, 500, 4, False, 1, density=3 / 500)
+    assert sparse.seconds < dense.seconds / 100
+
+# --- Formatos de entrada ---
+
+def test_csr_and_entries_inputs_match_nested():
+    matrix = [[0, 2, 0], [1, 0, "1/2"], [0, 0, 3]]
+    expected = client.post("/operations/determinant", json={"matrix": matrix, "steps": "none"}).json()["result"]
+    for sparse_input in (_csr(matrix), {"rows": 3, "cols": 3, "entries": _entries(matrix)}):
+        response = client.post("/operations/determinant", json={"matrix": sparse_input, "steps": "none"})
+        assert response.status_code == 200
+        assert response.json()["result"] == expected == "-6"
+
+def test_sparse_input_is_not_densified(monkeypatch):
+    # 3000x3000 con un solo elemento no nulo: el camino disperso nunca crea la forma densa
+    def dense(self):
+        raise AssertionError("forma densa creada")
+    monkeypatch.setattr(SparseFractionMatrix, "dense", dense)
+    matrix = {"rows": 3000, "cols": 3000, "entries": {"0": {"0": 2}}}
+    assert client.post("/operations/determinant", json={"matrix": matrix, "steps": "none"}).json()["result"] == "0"
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": matrix, "vector_b": [2] + [0] * 2999, "steps": "summary"}).json()
+    assert body["result"]["message"] == "El sistema tiene soluciones infinitas."
+    assert "A (3000x3000): matriz dispersa con 1 elementos no nulos (demasiado grande para mostrarla completa)." in body["steps"]
+
+def test_sparse_input_size_is_checked_before_allocating():
+    response = client.post("/operations/determinant", json={"matrix": {"rows": 10**9, "cols": 10**9, "entries": {}}})
+    assert response.status_code == 400
+    assert "la entrada de 1000000000x1000000000" in response.json()["detail"]
+    # La forma densa, si un algoritmo denso la necesita, también debe caber en el presupuesto
+    response = client.post("/operations/inverse", json={"matrix": {"rows": 3000, "cols": 3000, "entries": {"0": {"0": 1}}}, "steps": "none"})
+    assert response.status_code == 400
+    assert "excede el presupuesto de memoria" in response.json()["detail"]
+
+def test_sparse_and_nested_inputs_share_cache_key():
+    matrix = _tridiagonal()
+    key = canonical_request_key("determinant", MatrixInput(matrix=matrix))
+    assert key == canonical_request_key("determinant", MatrixInput(matrix={"rows": N, "cols": N, "entries": _entries(matrix)}))
+    assert key == canonical_request_key("determinant", MatrixInput(matrix=_csr(matrix)))
+
+def test_malformed_sparse_input_is_422():
+    bad_inputs = [
+        {"rows": 2, "cols": 2, "row_ptr": [0, 1], "col_idx": [0], "values": [1]}, # row_ptr corto
+        {"rows": 2, "cols": 2, "row_ptr": [0, 1, 1], "col_idx": [5], "values": [1]}, # columna fuera de rango
+        {"rows": 2, "cols": 2, "entries": {"2": {"0": 1}}}, # fila fuera de rango
+        {"rows": 2, "cols": 2, "entries": [1]},
+    ]
+    for bad in bad_inputs:
+        response = client.post("/operations/determinant", json={"matrix": bad})
+        assert response.status_code == 422, bad
+        assert response.json()["detail"][0]["loc"] == ["body", "matrix"]
+
+def test_sparse_input_invalid_element_is_400():
+    response = client.post("/operations/inverse", json={"matrix": {"rows": 1, "cols": 1, "entries": {"0": {"0": "x"}}}})
+    assert response.status_code == 400
+    assert "Valor de entrada inválido: 'x'" in response.json()["detail"]
+
+# --- Operaciones por el camino disperso ---
+
+def test_sparse_add_subtract_multiply():
+    a = _tridiagonal()
+    b = [[1 if j == N - 1 - i else 0 for j in range(N)] for i in range(N)]
+    dense = lambda m: RationalMatrix.from_fractions([[Fraction(v) for v in row] for row in m])
+    expected = {
+        "add": dense(a).add(dense(b)),
+        "subtract": dense(a).subtract(dense(b)),
+        "multiply": dense(a).matmul(dense(b)),
+    }
+    for op, result in expected.items():
+        response = client.post(f"/operations/{op}", json={"matrix_a": {"rows": N, "cols": N, "entries": _entries(a)}, "matrix_b": b, "steps": "full"})
+        body = response.json()
+        assert response.status_code == 200 and body["success"], body
+        assert body["result"] == [[str(value) for value in row] for row in result.to_fractions()]
+        assert any("dispersas" in step for step in body["steps"] if isinstance(step, str))
+
+def test_sparse_multiply_steps_list_only_nonzero_terms():
+    a = _tridiagonal()
+    body = client.post("/operations/multiply", json={"matrix_a": a, "matrix_b": a, "steps": "full"}).json()
+    products = [step for step in body["steps"] if step.startswith("Elemento C")]
+    assert products[0] == "Elemento C[1][1] = (4 * 4) + (-1 * -1) = 17"
+    assert len(products) == 5 * N - 6 # Elementos no nulos de una pentadiagonal
+    assert "Los demás elementos de C son 0." in body["steps"]
+
+def test_sparse_determinant():
+    for method in ("auto", "sparse"):
+        body = client.post("/operations/determinant", json={"matrix": _tridiagonal(), "method": method}).json()
+        expected, _ = bareiss_determinant(RationalMatrix.from_fractions([[Fraction(v) for v in row] for row in _tridiagonal()]))
+        assert body["result"] == str(expected)
+        assert any("eliminación dispersa" in step for step in body["steps"])
+    small = client.post("/operations/determinant", json={"matrix": [[1, 0], [0, 2]], "method": "sparse"}).json()
+    assert small["result"] == "2"
+
+def test_sparse_solve_vector_and_matrix_b():
+    a = _cyclic_tridiagonal()
+    b = [1] * N
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "vector_b": b}).json()
+    x = [Fraction(value) for value in body["result"]["solution_vector"]]
+    assert all(sum(a[i][j] * x[j] for j in range(N)) == b[i] for i in range(N))
+    assert any("eliminación dispersa" in step for step in body["steps"])
+    multiple = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "matrix_b": [[value, 2 * value] for value in b]}).json()
+    assert multiple["result"]["solution_vectors"][0] == body["result"]["solution_vector"]
+    assert multiple["result"]["solution_vectors"][1] == [str(2 * value) for value in x]
+
+def test_sparse_solve_singular_systems():
+    a = _tridiagonal()
+    a[N - 1] = [0] * N # Última fila nula: rango N-1
+    inconsistent = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "vector_b": [1] * N}).json()
+    assert inconsistent["result"]["message"] == "El sistema no tiene solución (es inconsistente)."
+    infinite = client.post("/operations/solve_system_gaussian", json={"matrix_a": a, "vector_b": [1] * (N - 1) + [0]}).json()
+    assert infinite["result"]["message"] == "El sistema tiene soluciones infinitas."
@@ -0,0 +1,97 @@
+import gzip
+import os
+
+from fastapi.testclient import TestClient
+from backend.main import app, STATIC_ASSETS
+from backend.utils.compression import choose_encoding, parse_accept_encoding
+from backend.utils.static_assets import IMMUTABLE_CACHE_CONTROL, StaticAssets
+
+client = TestClient(app)
+
+def _write_assets(directory, script="console.log('hola');\n" * 50):
+    (directory / "index.html").write_text('<link href="/static/style.css"><script src="/static/app.js"></script>', encoding="utf-8")
+    (directory / "app.js").write_text(script, encoding="utf-8")
+    (directory / "style.css").write_text("body { color: red; }\n", encoding="utf-8")
+
+# --- Negociación de Accept-Encoding ---
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, identity;q=0") == {"gzip": 1.0, "br": 0.5, "identity": 0.0}
+
+def test_choose_encoding():
+    assert choose_encoding("gzip", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0.2, gzip;q=0.8", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("gzip;q=0", ["gzip"]) is None
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding(None, ["gzip"]) is None
+
+# --- Carga, huellas y precompresión ---
+
+def test_html_links_fingerprinted_assets(tmp_path):
+    _write_assets(tmp_path)
+    assets = StaticAssets(tmp_path)
+    html = assets.lookup("index.html")[0].variants["identity"].decode()
+    assert assets.url("app.js") in html and assets.url("style.css") in html
+    assert '"/static/app.js"' not in html
+
+def test_fingerprint_follows_content(tmp_path):
+    _write_assets(tmp_path)
+    before = StaticAssets(tmp_path).url("app.js")
+    _write_assets(tmp_path, script="console.log('adiós');\n" * 50)
+    assert StaticAssets(tmp_path).url("app.js") != before
+
+def test_small_files_not_compressed(tmp_path):
+    _write_assets(tmp_path)
+    assets = StaticAssets(tmp_path)
+    assert set(assets.lookup("style.css")[0].variants) == {"identity"}
+    script = assets.lookup("app.js")[0]
+    assert gzip.decompress(script.variants["gzip"]) == script.variants["identity"]
+
+def test_reload_when_enabled(tmp_path):
+    _write_assets(tmp_path)
+    assets = StaticAssets(tmp_path, reload=True)
+    fingerprint = assets.lookup("app.js")[0].fingerprint
+    (tmp_path / "app.js").write_text("console.log(2);", encoding="utf-8")
+    os.utime(tmp_path / "app.js", (0, 0))
+    assert assets.lookup("app.js")[0].fingerprint != fingerprint
+
+# --- Rutas ---
+
+def test_index_served_from_memory(monkeypatch):
+    response = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/html; charset=utf-8"
+    assert response.headers["cache-control"] == "no-cache"
+    assert STATIC_ASSETS.url("script.js") in response.text
+    monkeypatch.setattr("builtins.open", None) # No se vuelve a leer del disco
+    assert client.get("/").status_code == 200
+
+def test_fingerprinted_asset_is_immutable_and_compressed():
+    response = client.get(STATIC_ASSETS.url("script.js"), headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == STATIC_ASSETS.lookup("script.js")[0].variants["identity"] # httpx descomprime
+
+def test_plain_name_still_served():
+    response = client.get("/static/style.css", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/css")
+    assert "content-encoding" not in response.headers
+    assert response.headers["cache-control"] == "no-cache"
+
+def test_if_none_match_returns_304():
+    first = client.get("/static/style.css")
+    second = client.get("/static/style.css", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
+    weak = client.get("/", headers={"If-None-Match": 'W/"otro", W/' + client.get("/").headers["etag"]})
+    assert weak.status_code == 304
+    assert client.get("/static/style.css", headers={"If-None-Match": '"otro"'}).status_code == 200
+
+def test_unknown_asset_404():
+    assert client.get("/static/no_existe.js").status_code == 404
+    assert client.get("/static/script.000000000000.js").status_code == 404
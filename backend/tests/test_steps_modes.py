@@ -0,0 +1,137 @@
+import re
+import pytest
+from fractions import Fraction
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.utils.steps import StepLog
+from backend.core.rational_matrix import RationalMatrix
+
+client = TestClient(app)
+
+# --- Nivel de detalle de los pasos (steps: none | summary | full) ---
+
+STEPS_ENDPOINT_CASES = [
+    ("add", {"matrix_a": [[1, 2], [3, 4]], "matrix_b": [[1, 1], [1, 1]]}),
+    ("subtract", {"matrix_a": [[1, 2], [3, 4]], "matrix_b": [[1, 1], [1, 1]]}),
+    ("multiply", {"matrix_a": [[1, 2], [3, 4]], "matrix_b": [[1, 1], [1, 1]]}),
+    ("determinant", {"matrix": [[2, 1, 0], [1, 3, 1], [0, 1, 4]]}),
+    ("inverse", {"matrix": [[2, 1, 0], [1, 3, 1], [0, 1, 4]]}),
+    ("lu_factorization", {"matrix": [[2, 1, 0], [1, 3, 1], [0, 1, 4]]}),
+    ("solve_system_gaussian", {"matrix_a": [[2, 1, 0], [1, 3, 1], [0, 1, 4]], "vector_b": [1, 2, 3]}),
+    ("gauss_jordan_elimination", {"matrix_a": [[2, 1, 0], [1, 3, 1], [0, 1, 4]], "vector_b": [1, 2, 3]}),
+]
+
+@pytest.mark.parametrize("operation, payload", STEPS_ENDPOINT_CASES)
+def test_steps_modes_same_result_fewer_steps(operation, payload):
+    responses = {mode: client.post(f"/operations/{operation}", json={**payload, "steps": mode}).json() for mode in ("none", "summary", "full")}
+    full, summary, none = responses["full"], responses["summary"], responses["none"]
+    assert full["success"] == summary["success"] == none["success"] == True
+    assert full["result"] == summary["result"] == none["result"]
+    assert none["steps"] is None
+    assert 0 < len(summary["steps"]) < len(full["steps"]), f"{operation}: summary debe ser más corto que full"
+    assert client.post(f"/operations/{operation}", json=payload).json()["steps"] == full["steps"] # full es el valor por defecto
+
+def test_summary_keeps_final_lines():
+    payload = {"matrix": [[2, 1, 0], [1, 3, 1], [0, 1, 4]], "steps": "summary"}
+    steps = client.post("/operations/determinant", json=payload).json()["steps"]
+    assert steps[-1].startswith("El determinante final")
+    assert not any("Pivote actual" in step for step in steps)
+
+def test_invalid_steps_mode_rejected():
+    response = client.post("/operations/determinant", json={"matrix": [[1]], "steps": "verbose"})
+    assert response.status_code == 422
+
+def test_step_log_none_discards_everything():
+    log = StepLog("none")
+    log.append("a")
+    log.extend(["b"])
+    log.matrix([[1]], "M")
+    assert len(log) == 0 and log.for_response() is None
+    assert StepLog("summary", ["x"]).for_response() == ["x"]
+
+# --- Formato de los pasos (steps_format: text | json) ---
+
+@pytest.mark.parametrize("operation, payload", STEPS_ENDPOINT_CASES)
+def test_steps_format_json_same_result(operation, payload):
+    text = client.post(f"/operations/{operation}", json=payload).json()
+    compact = client.post(f"/operations/{operation}", json={**payload, "steps_format": "json"}).json()
+    assert compact["result"] == text["result"]
+    assert all(isinstance(step, (str, dict)) for step in compact["steps"])
+    assert len(compact["steps"]) < len(text["steps"]) # Cada matriz es un solo objeto en lugar de una línea por fila
+
+def test_steps_format_json_row_operations():
+    payload = {"matrix_a": [[0, 2], [1, 1]], "vector_b": [2, 3], "steps_format": "json"}
+    steps = client.post("/operations/solve_system_gaussian", json=payload).json()["steps"]
+    records = [step for step in steps if isinstance(step, dict)]
+    swap = next(record for record in records if record["op"] == "swap")
+    assert (swap["row"], swap["other"]) == (1, 2)
+    pivot = next(record for record in records if record["op"] == "pivot")
+    assert (pivot["row"], pivot["col"], pivot["value"]) == (1, 1, "1")
+    snapshot = next(record for record in records if record["op"] == "matrix" and record["name"] == "Forma Escalonada")
+    assert snapshot == {"op": "matrix", "name": "Forma Escalonada", "rows": [["1", "1", "3"], ["0", "2", "2"]], "split": 2}
+
+def test_step_log_renders_records_lazily():
+    log = StepLog("full")
+    matrix = RationalMatrix.from_fractions([[Fraction(1), Fraction(2)], [Fraction(3), Fraction(4)]])
+    log.row_op("eliminate", "F{row} = F{row} - ({factor}) * F{source}", row=2, source=1, factor=Fraction(3))
+    log.snapshot(matrix, "M")
+    matrix.subtract_scaled_row(1, 0, 3) # La instantánea es una copia: no cambia después
+    assert log.for_response() == ["F2 = F2 - (3) * F1", "M (2x2):", "  | 1  2 |", "  | 3  4 |"]
+    assert log.to_json()[0] == {"op": "eliminate", "template": "F{row} = F{row} - ({factor}) * F{source}", "row": 2, "source": 1, "factor": "3"}
+
+def test_step_log_summary_skips_row_operations():
+    log = StepLog("summary")
+    log.row_op("swap", "Intercambiando Fila {row} con Fila {other}.", row=1, other=2)
+    log.snapshot(RationalMatrix.identity(2), "I")
+    assert len(log) == 0
+
+# --- Instantáneas con deltas y keyframes ---
+
+DELTA_CASES = [
+    ("determinant", {"matrix": [[0, 2, 1, 3], [1, "1/2", 3, 0], [4, 1, 0, 2], [2, 2, 2, "0.5"]], "method": "gaussian"}),
+    ("inverse", {"matrix": [[0, 2, 1, 3], [1, "1/2", 3, 0], [4, 1, 0, 2], [2, 2, 2, "0.5"]]}),
+    ("lu_factorization", {"matrix": [[0, 2, 1, 3], [1, "1/2", 3, 0], [4, 1, 0, 2], [2, 2, 2, "0.5"]], "pivoting": "partial"}),
+    ("solve_system_gaussian", {"matrix_a": [[0, 2, 1, 3], [1, "1/2", 3, 0], [4, 1, 0, 2], [2, 2, 2, "0.5"]], "vector_b": [1, 2, 3, 4]}),
+    ("gauss_jordan_elimination", {"matrix_a": [[0, 2, 1, 3], [1, "1/2", 3, 0], [4, 1, 0, 2], [2, 2, 2, "0.5"]], "vector_b": [1, 2, 3, 4]}),
+]
+
+@pytest.mark.parametrize("operation, payload", DELTA_CASES)
+def test_delta_snapshots_render_full_matrices(operation, payload, monkeypatch):
+    with_deltas = client.post(f"/operations/{operation}", json=payload).json()["steps"]
+    monkeypatch.setattr("backend.utils.steps.KEYFRAME_INTERVAL", 0) # Sólo instantáneas completas
+    assert client.post(f"/operations/{operation}", json=payload).json()["steps"] == with_deltas
+
+@pytest.mark.parametrize("operation, payload", DELTA_CASES)
+def test_delta_snapshots_in_json_format(operation, payload):
+    steps = client.post(f"/operations/{operation}", json={**payload, "steps_format": "json"}).json()["steps"]
+    frame = None
+    for step in steps:
+        if isinstance(step, dict) and step["op"] == "matrix":
+            frame = [list(row) for row in step["rows"]]
+        elif isinstance(step, dict) and step["op"] == "delta":
+            assert frame is not None # Un delta siempre sigue a una instantánea completa
+            for index, row in step["changed"]:
+                assert len(row) == len(frame[index])
+                frame[index] = row
+    assert any(isinstance(step, dict) and step["op"] == "delta" for step in steps)
+
+def test_keyframe_interval(monkeypatch):
+    monkeypatch.setattr("backend.utils.steps.KEYFRAME_INTERVAL", 2) # Menor que las filas: el intervalo es 3
+    log = StepLog("full")
+    matrix = RationalMatrix.identity(3)
+    for k in range(5):
+        matrix.scale_row(k % 3, 2)
+        log.snapshot(matrix, f"M{k}", rows=(k % 3,))
+    assert [step.to_json()["op"] for step in log] == ["matrix", "delta", "delta", "delta", "matrix"]
+    assert log.render()[-4:] == ["M4 (3x3):", "  | 4  0  0 |", "  | 0  4  0 |", "  | 0  0  2 |"]
+
+def _fill_template(record):
+    """Misma sustitución que renderStepRecord en backend/static/script.js."""
+    return re.sub(r"\{(\w+)\}", lambda match: str(record.get(match.group(1), match.group(0))), record["template"])
+
+@pytest.mark.parametrize("operation, payload", DELTA_CASES)
+def test_json_row_operations_render_like_text(operation, payload):
+    text = client.post(f"/operations/{operation}", json=payload).json()["steps"]
+    compact = client.post(f"/operations/{operation}", json={**payload, "steps_format": "json"}).json()["steps"]
+    rendered = [_fill_template(step) for step in compact if isinstance(step, dict) and "template" in step]
+    assert rendered and all(line in text for line in rendered)
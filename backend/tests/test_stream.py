@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from backend.main import app
+
+client = TestClient(app)
+
+# --- /operations/stream/{op} (pasos en NDJSON o SSE) ---
+
+def _ndjson_events(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+def _sse_events(response):
+    events = []
+    for block in response.text.split("\n\n"):
+        if block:
+            event_line, data_line = block.split("\n")
+            events.append({"event": event_line[len("event: "):], "data": json.loads(data_line[len("data: "):])})
+    return events
+
+STREAM_CASES = [
+    ("determinant", {"matrix": [[0, 2, 1], [1, "1/2", 3], [4, 1, 0]]}),
+    ("inverse", {"matrix": [[0, 2, 1], [1, "1/2", 3], [4, 1, 0]]}),
+    ("lu_factorization", {"matrix": [[2, 1, 1], [4, 3, 3], [8, 7, 9]]}),
+    ("solve_system_gaussian", {"matrix_a": [[0, 2, 1], [1, "1/2", 3], [4, 1, 0]], "vector_b": [1, 2, 3]}),
+    ("gauss_jordan_elimination", {"matrix_a": [[0, 2, 1], [1, "1/2", 3], [4, 1, 0]], "vector_b": [1, 2, 3]}),
+    ("multiply", {"matrix_a": [[1, 2], [3, 4]], "matrix_b": [[1, 0], [0, 1]]}),
+]
+
+@pytest.mark.parametrize("operation, payload", STREAM_CASES)
+@pytest.mark.parametrize("steps_format", ["text", "json"])
+def test_stream_matches_regular_endpoint(operation, payload, steps_format):
+    payload = {**payload, "steps_format": steps_format}
+    expected = client.post(f"/operations/{operation}", json=payload).json()
+    response = client.post(f"/operations/stream/{operation}", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = _ndjson_events(response)
+    assert [event["data"] for event in events[:-1]] == expected["steps"]
+    assert all(event["event"] == "step" for event in events[:-1])
+    assert events[-1] == {"event": "result", "data": {**expected, "steps": None}}
+
+def test_stream_sse():
+    payload = {"matrix": [[1, 2], [3, 4]]}
+    expected = client.post("/operations/determinant", json=payload).json()
+    response = client.post("/operations/stream/determinant", json=payload, headers={"Accept": "text/event-stream"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response)
+    assert [event["data"] for event in events if event["event"] == "step"] == expected["steps"]
+    assert events[-1]["event"] == "result" and events[-1]["data"]["result"] == "-2"
+
+def test_stream_steps_none_sends_only_result():
+    events = _ndjson_events(client.post("/operations/stream/inverse", json={"matrix": [[2, 0], [0, 4]], "steps": "none"}))
+    assert len(events) == 1 and events[0]["event"] == "result"
+    assert events[0]["data"]["result"] == [["1/2", "0"], ["0", "1/4"]]
+
+def test_stream_operation_error_is_last_event():
+    events = _ndjson_events(client.post("/operations/stream/inverse", json={"matrix": [[1, 2], [3]]}))
+    assert events[-1]["event"] == "error"
+    assert events[-1]["data"]["status_code"] == 400
+
+def test_stream_unknown_operation():
+    assert client.post("/operations/stream/transpose", json={"matrix": [[1]]}).status_code == 404
+
+def test_stream_invalid_operands():
+    assert client.post("/operations/stream/determinant", json={"matrix": "no es una matriz"}).status_code == 422
+
+def test_stream_small_buffer(monkeypatch):
+    monkeypatch.setattr("backend.operations.stream.STREAM_BUFFER_EVENTS", 1) # El cálculo espera a que se consuma cada evento
+    payload = STREAM_CASES[4][1]
+    expected = client.post("/operations/gauss_jordan_elimination", json=payload).json()
+    events = _ndjson_events(client.post("/operations/stream/gauss_jordan_elimination", json=payload))
+    assert [event["data"] for event in events[:-1]] == expected["steps"]
@@ -0,0 +1,151 @@
+import random
+from fractions import Fraction
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.core.bareiss import bareiss_determinant
+from backend.core.rational_matrix import RationalMatrix
+from backend.core.structure import (BLOCK_DIAGONAL, DIAGONAL, GENERAL, LOWER_TRIANGULAR, PERMUTATION, UPPER_TRIANGULAR,
+                                    detect_structure, structured_determinant, structured_lu, structured_solve)
+from backend.operations.lu_factorization import _lup_decomposition_partial_pivoting
+from backend.utils.steps import StepLog
+
+client = TestClient(app)
+
+def _fractions(matrix):
+    return [[Fraction(value) for value in row] for row in matrix]
+
+UPPER = [[2, 1, 3], [0, 4, "1/2"], [0, 0, -1]]
+LOWER = [[2, 0, 0], [1, 4, 0], [3, "1/2", -1]]
+PERMUTED = [[0, 2, 0], [0, 0, 3], [-1, 0, 0]]
+BLOCKS = [[1, 2, 0, 0], [3, 4, 0, 0], [0, 0, 5, 0], [0, 0, 1, 6]]
+
+# --- Detección ---
+
+def test_detect_structure():
+    assert detect_structure(_fractions([[1, 0], [0, 0]])).kind == DIAGONAL
+    assert detect_structure(_fractions(UPPER)).kind == UPPER_TRIANGULAR
+    assert detect_structure(_fractions(LOWER)).kind == LOWER_TRIANGULAR
+    permutation = detect_structure(_fractions(PERMUTED))
+    assert permutation.kind == PERMUTATION and permutation.perm == [1, 2, 0]
+    blocks = detect_structure(_fractions(BLOCKS))
+    assert blocks.kind == BLOCK_DIAGONAL and blocks.blocks == [(0, 2), (2, 4)]
+    assert detect_structure(_fractions([[1, 2], [3, 4]])).kind == GENERAL
+    assert detect_structure(_fractions([[0, 1, 1], [1, 0, 0], [0, 0, 1]])).kind == GENERAL # Sin estructura: bloques que se cruzan
+
+def test_nonsingular_diagonal():
+    assert detect_structure(_fractions(UPPER)).direct
+    singular = detect_structure(_fractions([[1, 2], [0, 0]]))
+    assert singular.kind == UPPER_TRIANGULAR and not singular.direct
+
+# --- Atajos frente a la eliminación completa ---
+
+def _random_structured(rng, n):
+    kind = rng.choice(["upper", "lower", "permutation", "blocks"])
+    value = lambda: Fraction(rng.choice([0, 1, -2, 3, Fraction(1, 2)]))
+    if kind == "upper":
+        return [[value() if j >= i else Fraction(0) for j in range(n)] for i in range(n)]
+    if kind == "lower":
+        return [[value() if j <= i else Fraction(0) for j in range(n)] for i in range(n)]
+    if kind == "permutation":
+        perm = list(range(n))
+        rng.shuffle(perm)
+        return [[Fraction(rng.choice([1, -1, 3])) if j == perm[i] else Fraction(0) for j in range(n)] for i in range(n)]
+    split = rng.randint(1, n - 1) if n > 1 else 1
+    return [[value() if (i < split) == (j < split) else Fraction(0) for j in range(n)] for i in range(n)]
+
+def test_shortcuts_match_elimination():
+    rng = random.Random(11)
+    for _ in range(300):
+        n = rng.randint(1, 6)
+        matrix = _random_structured(rng, n)
+        structure = detect_structure(matrix)
+        if structure.kind == GENERAL:
+            continue
+        determinant = bareiss_determinant(RationalMatrix.from_fractions(matrix))[0]
+        assert structured_determinant(matrix, structure) == determinant
+        b = [Fraction(rng.randint(-3, 3)) for _ in range(n)]
+        result = structured_solve(matrix, structure, [[value] for value in b])
+        if result is not None and result.solutions is not None:
+            x = result.solutions[0]
+            assert all(sum(matrix[i][j] * x[j] for j in range(n)) == b[i] for i in range(n))
+        if result is not None:
+            assert (result.rank == n) == (determinant != 0)
+
+def test_partial_pivoting_shortcut_matches_general_factorization():
+    for matrix in (UPPER, PERMUTED, [[0, 0, 4], [0, 5, 0], [6, 0, 0]]):
+        matrix = _fractions(matrix)
+        factors = structured_lu(matrix, detect_structure(matrix), "partial")
+        expected = _lup_decomposition_partial_pivoting(matrix, StepLog("none"))
+        assert (factors.L, factors.U, factors.perm) == (expected.L, expected.U, expected.perm)
+        assert factors.determinant() == expected.determinant()
+
+# --- Endpoints ---
+
+def test_determinant_shortcuts_reported():
+    for matrix, expected in ((UPPER, "-8"), (PERMUTED, "-6"), (BLOCKS, "-60")):
+        body = client.post("/operations/determinant", json={"matrix": matrix, "steps": "summary"}).json()
+        assert body["result"] == expected
+        assert any(step.startswith("Estructura detectada") for step in body["steps"])
+        assert "atajo para la estructura detectada" in body["steps"][-1]
+
+def test_determinant_small_full_steps_keep_gaussian_elimination():
+    body = client.post("/operations/determinant", json={"matrix": UPPER}).json()
+    assert body["result"] == "-8"
+    assert not any(step.startswith("Estructura detectada") for step in body["steps"])
+
+def test_inverse_shortcuts():
+    for matrix in (UPPER, LOWER, PERMUTED, BLOCKS):
+        body = client.post("/operations/inverse", json={"matrix": matrix, "steps": "summary"}).json()
+        assert body["success"]
+        assert any(step.startswith("Estructura detectada") for step in body["steps"])
+        inverse = RationalMatrix.from_fractions(_fractions(body["result"]))
+        assert RationalMatrix.from_fractions(_fractions(matrix)).matmul(inverse) == RationalMatrix.identity(len(matrix))
+    singular = client.post("/operations/inverse", json={"matrix": [[1, 2], [0, 0]], "steps": "summary"}).json()
+    assert not singular["success"]
+    assert "La matriz no es invertible (singular)." in singular["steps"]
+
+def test_lu_shortcuts():
+    lower = client.post("/operations/lu_factorization", json={"matrix": LOWER, "steps": "summary"}).json()
+    assert lower["result"]["matrix_l"] == [["1", "0", "0"], ["1/2", "1", "0"], ["3/2", "1/8", "1"]]
+    assert lower["result"]["matrix_u"] == [["2", "0", "0"], ["0", "4", "0"], ["0", "0", "-1"]]
+    assert any(step.startswith("Estructura detectada: matriz triangular inferior") for step in lower["steps"])
+    blocks = client.post("/operations/lu_factorization", json={"matrix": BLOCKS, "pivoting": "partial", "steps": "summary"}).json()
+    assert blocks["result"]["matrix_p"] == [["0", "1", "0", "0"], ["1", "0", "0", "0"], ["0", "0", "1", "0"], ["0", "0", "0", "1"]]
+    assert any("Cada bloque diagonal se factoriza por separado" in step for step in blocks["steps"])
+    # Doolittle sobre una permutación: el atajo no aplica y se mantiene el error de la factorización sin pivoteo
+    failed = client.post("/operations/lu_factorization", json={"matrix": PERMUTED, "steps": "summary"}).json()
+    assert not failed["success"] and "Pivote U(1,1) es cero" in failed["error"]
+
+def test_solve_shortcuts():
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": UPPER, "vector_b": [1, 2, 3], "steps": "summary"}).json()
+    assert body["result"]["solution_vector"] == ["73/16", "7/8", "-3"]
+    assert any("Sustitución hacia atrás directa" in step for step in body["steps"])
+    permuted = client.post("/operations/solve_system_gaussian", json={"matrix_a": PERMUTED, "matrix_b": [[2, 4], [3, 6], [-1, -2]], "steps": "summary"}).json()
+    assert permuted["result"]["solution_vectors"] == [["1", "1", "1"], ["2", "2", "2"]]
+    blocks = client.post("/operations/solve_system_gaussian", json={"matrix_a": BLOCKS, "vector_b": [3, 7, 5, 7], "steps": "summary"}).json()
+    assert blocks["result"]["solution_vector"] == ["1", "1", "1", "1"]
+
+def test_solve_singular_structured_systems():
+    diagonal = [[1, 0], [0, 0]]
+    assert client.post("/operations/solve_system_gaussian", json={"matrix_a": diagonal, "vector_b": [1, 1], "steps": "summary"}).json()["result"]["message"] == "El sistema no tiene solución (es inconsistente)."
+    assert client.post("/operations/solve_system_gaussian", json={"matrix_a": diagonal, "vector_b": [1, 0], "steps": "summary"}).json()["result"]["message"] == "El sistema tiene soluciones infinitas."
+    # Triangular con un cero en la diagonal: el rango requiere eliminación
+    body = client.post("/operations/solve_system_gaussian", json={"matrix_a": [[1, 2], [0, 0]], "vector_b": [1, 0], "steps": "summary"}).json()
+    assert body["result"]["message"] == "El sistema tiene soluciones infinitas."
+    assert not any(step.startswith("Estructura detectada") for step in body["steps"])
+
+def test_small_full_steps_keep_elimination():
+    # Mismo criterio que el determinante: con pasos completos, una matriz pequeña muestra la eliminación
+    requests = (
+        ("/operations/inverse", {"matrix": UPPER}),
+        ("/operations/lu_factorization", {"matrix": LOWER}),
+        ("/operations/solve_system_gaussian", {"matrix_a": UPPER, "vector_b": [1, 2, 3]}),
+        ("/operations/solve_system_gaussian", {"matrix_a": PERMUTED, "matrix_b": [[2, 4], [3, 6], [-1, -2]]}),
+    )
+    for path, payload in requests:
+        full = client.post(path, json=payload).json()
+        summary = client.post(path, json={**payload, "steps": "summary"}).json()
+        assert full["result"] == summary["result"]
+        assert not any(step.startswith("Estructura detectada") for step in full["steps"])
+        assert any(step.startswith("Estructura detectada") for step in summary["steps"])
@@ -0,0 +1,38 @@
+from fractions import Fraction
+
+import pytest
+from backend.utils.type_converters import to_fraction
+
+@pytest.mark.parametrize("value, expected", [
+    ("0", Fraction(0)), ("-17", Fraction(-17)), (" 42 ", Fraction(42)), ("007", Fraction(7)),
+    ("12345678901234567890123", Fraction(12345678901234567890123)),
+    ("0.1", Fraction(1, 10)), ("-.5", Fraction(-1, 2)), ("2.", Fraction(2)), ("-12.340", Fraction(-617, 50)),
+    ("0.3333333", Fraction(3333333, 10000000)), # Exacto: sin pasar por float ni limit_denominator
+    ("37/91", Fraction(37, 91)), ("1 / -2", Fraction(-1, 2)), ("-6/4", Fraction(-3, 2)),
+    ("1.5/2", Fraction(3, 4)), ("0.1/1", Fraction(1, 10)), ("2.5/0.5", Fraction(5)),
+    (3, Fraction(3)), (10**30, Fraction(10**30)), (2.0, Fraction(2)), (0.1, Fraction(1, 10)), (True, Fraction(1)),
+])
+def test_valid_values(value, expected):
+    result = to_fraction(value)
+    assert result == expected and isinstance(result, Fraction)
+
+def test_small_values_are_interned():
+    assert to_fraction("1") is to_fraction("1") is to_fraction(1) is to_fraction(1.0)
+    assert to_fraction("-1/2") is to_fraction("-1/2")
+    assert to_fraction("0") is to_fraction(0)
+
+@pytest.mark.parametrize("value, message", [
+    ("", "El valor de entrada de la matriz no puede ser una cadena vacía."),
+    ("abc", "Valor de entrada inválido: 'abc'. No es un número, fracción (ej: '1/2'), ni string numérico (ej: '2.5')."),
+    ("1/2/3", "Valor de fracción inválido: '1/2/3'. Formato debe ser num/den."),
+    ("/2", "Numerador o denominador inválido en la fracción: '/2'. Deben ser numéricos."),
+    ("1/0", "Valor inválido: '1/0'. El denominador no puede ser cero en una fracción."),
+    ("1/-0.0", "Valor inválido: '1/-0.0'. El denominador no puede ser cero en una fracción."),
+    ("--1", "Valor numérico inválido: '--1'. No es un entero, flotante o fracción válida."),
+    (".", "Valor numérico inválido: '.'. No es un entero, flotante o fracción válida."),
+    ("1.2.3", "Valor numérico inválido: '1.2.3'. No es un entero, flotante o fracción válida."),
+])
+def test_invalid_values_keep_their_messages(value, message):
+    with pytest.raises(ValueError) as info:
+        to_fraction(value)
+    assert str(info.value) == message
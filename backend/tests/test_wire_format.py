@@ -0,0 +1,76 @@
+from fractions import Fraction
+
+from fastapi.testclient import TestClient
+from backend.main import app
+from backend.utils.wire_format import DTYPE_FLOAT64, DTYPE_INT64, DTYPE_RATIONAL, decode_binary, encode_binary
+
+client = TestClient(app)
+
+def _binary(path, fields, dtype=DTYPE_INT64, **params):
+    return client.post(path, params=params, content=encode_binary(fields, dtype), headers={"Content-Type": "application/octet-stream"})
+
+# --- Entrada JSON plana ---
+
+def test_flat_input_matches_nested():
+    nested = client.post("/operations/multiply", json={"matrix_a": [[1, 2], [3, 4]], "matrix_b": [["1/2"], [1]]}).json()
+    flat = client.post("/operations/multiply", json={"matrix_a": {"rows": 2, "cols": 2, "data": [1, 2, 3, 4]},
+                                                     "matrix_b": {"rows": 2, "cols": 1, "data": ["1/2", 1]}}).json()
+    assert flat["result"] == nested["result"] == [["5/2"], ["11/2"]]
+
+def test_flat_input_with_wrong_length_is_422():
+    response = client.post("/operations/determinant", json={"matrix": {"rows": 2, "cols": 2, "data": [1, 2, 3]}})
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "matrix"]
+    assert "rows*cols = 4" in response.json()["detail"][0]["msg"]
+
+def test_flat_input_invalid_element_is_400():
+    response = client.post("/operations/inverse", json={"matrix": {"rows": 1, "cols": 1, "data": ["x"]}})
+    assert response.status_code == 400
+    assert "Valor de entrada inválido: 'x'" in response.json()["detail"]
+
+# --- Entrada binaria ---
+
+def test_binary_round_trip():
+    body = encode_binary({"matrix_a": [[1, 2]], "vector_b": [[3]]}, DTYPE_INT64)
+    assert decode_binary(body) == {"matrix_a": {"rows": 1, "cols": 2, "data": [1, 2]}, "vector_b": [3]}
+    rational = decode_binary(encode_binary({"matrix": [[Fraction(1, 2), (4, 1)]]}, DTYPE_RATIONAL))
+    assert rational["matrix"]["data"] == ["1/2", 4]
+
+def test_binary_int64_with_query_options():
+    response = _binary("/operations/determinant", {"matrix": [[4, 3], [6, 3]]}, steps="none", method="bareiss")
+    assert response.status_code == 200
+    assert response.json()["result"] == "-6" and response.json()["steps"] is None
+
+def test_binary_rational_and_float64():
+    rational = _binary("/operations/add", {"matrix_a": [[Fraction(1, 3)]], "matrix_b": [[Fraction(2, 3)]]}, DTYPE_RATIONAL)
+    assert rational.json()["result"] == [["1"]]
+    floats = _binary("/operations/add", {"matrix_a": [[0.5]], "matrix_b": [[0.25]]}, DTYPE_FLOAT64)
+    assert floats.json()["result"] == [["3/4"]]
+
+def test_binary_system_with_vector():
+    response = _binary("/operations/solve_system_gaussian", {"matrix_a": [[2, 0], [0, 4]], "vector_b": [[2], [2]]})
+    assert response.json()["result"]["solution_vector"] == ["1", "1/2"]
+
+def test_malformed_binary_is_400():
+    response = client.post("/operations/determinant", content=b"MTX1\x06matrix\x01\x02\x00\x00\x00\x02\x00\x00\x00\x01",
+                           headers={"Content-Type": "application/octet-stream"})
+    assert response.status_code == 400
+    assert "más corto" in response.json()["detail"]
+    response = client.post("/operations/determinant", content=b"hola", headers={"Content-Type": "application/octet-stream"})
+    assert response.status_code == 400
+
+# --- Salida plana ---
+
+def test_flat_output():
+    response = client.post("/operations/inverse", json={"matrix": [[2, 0], [0, 4]], "output_format": "flat"}).json()
+    assert response["result"] == {"rows": 2, "cols": 2, "data": ["1/2", "0", "0", "1/4"]}
+    lu = client.post("/operations/lu_factorization", json={"matrix": [[4, 3], [6, 3]], "pivoting": "partial", "output_format": "flat"}).json()
+    assert lu["result"]["matrix_u"] == {"rows": 2, "cols": 2, "data": ["6", "3", "0", "1"]}
+    assert lu["result"]["matrix_p"]["data"] == ["0", "1", "1", "0"]
+
+def test_flat_output_keeps_scalars_and_vectors():
+    determinant = client.post("/operations/determinant", json={"matrix": [[1, 2], [3, 4]], "output_format": "flat"}).json()
+    assert determinant["result"] == "-2"
+    system = client.post("/operations/gauss_jordan_elimination", json={"matrix_a": [[1, 0], [0, 1]], "vector_b": [1, 2], "output_format": "flat"}).json()
+    assert system["result"]["solution_vector"] == ["1", "2"]
+    assert system["result"]["rref_matrix"] == {"rows": 2, "cols": 3, "data": ["1", "0", "1", "0", "1", "2"]}
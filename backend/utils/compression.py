@@ -0,0 +1,217 @@
+import gzip
+import os
+import zlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import anyio.to_thread
+
+try: # Brotli es opcional (pip install brotli): sin él no se ofrece "br"
+    import brotli
+except ImportError:
+    brotli = None
+
+try: # Zstandard: módulo estándar desde Python 3.14, o el paquete zstandard
+    from compression import zstd
+except ImportError:
+    zstd = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Codificaciones de contenido disponibles y negociación con la cabecera Accept-Encoding del cliente.
+# Se usan en los archivos estáticos (precomprimidos al iniciar con el nivel máximo, ver
+# static_assets.py) y en las respuestas de la API (CompressionMiddleware, con un nivel rápido).
+#
+# CompressionMiddleware comprime las respuestas cuyo cuerpo supera un tamaño mínimo y cuyo tipo es
+# texto (JSON, NDJSON, SSE, HTML, ...): los pasos de /operations/inverse o gauss_jordan_elimination
+# son matrices en texto muy repetitivas y se reducen un orden de magnitud. Las respuestas en
+# streaming (StreamingResponse) se comprimen por partes: cada parte se envía comprimida en cuanto
+# llega (flush), así los pasos de /operations/stream siguen llegando a medida que se generan.
+#
+# Variables de entorno:
+#   MATRIX_COMPRESSION_MIN_BYTES  Tamaño mínimo del cuerpo para comprimirlo. Por defecto 1024.
+#   MATRIX_COMPRESSION_ENCODINGS  Codificaciones ofrecidas, en orden de preferencia (vacío = sin
+#                                 compresión). Por defecto "br,zstd,gzip" (las que estén instaladas).
+
+SUPPORTED_ENCODINGS = tuple(name for name, available in (("br", brotli is not None), ("zstd", zstd is not None or zstandard is not None), ("gzip", True)) if available)
+
+# Orden de preferencia del servidor cuando el cliente acepta varias con la misma calidad
+PREFERRED_ENCODINGS = SUPPORTED_ENCODINGS
+
+COMPRESSION_MIN_BYTES = int(os.environ.get("MATRIX_COMPRESSION_MIN_BYTES", 1024))
+COMPRESSION_ENCODINGS = [encoding.strip() for encoding in os.environ.get("MATRIX_COMPRESSION_ENCODINGS", ",".join(SUPPORTED_ENCODINGS)).split(",")
+                         if encoding.strip() in SUPPORTED_ENCODINGS]
+
+# Niveles para comprimir en cada respuesta (rápidos) y una sola vez (máximos)
+_FAST_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+_MAX_LEVELS = {"br": 11, "zstd": 19, "gzip": 9}
+
+_THREAD_BYTES = 256 * 1024 # Los cuerpos más grandes se comprimen en un hilo para no bloquear el bucle de eventos
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def compress(data: bytes, encoding: str, fast: bool = False) -> bytes:
+    """Comprime un cuerpo completo (por defecto con el nivel máximo, para contenido que se comprime una sola vez)."""
+    level = (_FAST_LEVELS if fast else _MAX_LEVELS).get(encoding)
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    if encoding == "zstd":
+        return zstd.compress(data, level=level) if zstd is not None else zstandard.ZstdCompressor(level=level).compress(data)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=level, mtime=0) # mtime fijo: misma entrada, mismos bytes
+    raise ValueError(f"Codificación no soportada: {encoding}")
+
+
+class StreamCompressor:
+    """Compresión por partes: compress(parte) retorna los bytes listos para enviar; finish() cierra el flujo."""
+
+    def __init__(self, encoding: str):
+        level = _FAST_LEVELS[encoding]
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._compressor = zstd.ZstdCompressor(level=level) if zstd is not None else zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == "gzip":
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) # Formato gzip
+        else:
+            raise ValueError(f"Codificación no soportada: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        if self.encoding == "zstd":
+            if zstd is not None:
+                return self._compressor.compress(data, mode=zstd.ZstdCompressor.FLUSH_BLOCK)
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Codificaciones aceptadas y su calidad, e.g. "gzip, br;q=0.5" -> {"gzip": 1.0, "br": 0.5}."""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """
+    Codificación a usar entre las disponibles (en orden de preferencia del servidor), o None para
+    enviar sin comprimir. Respeta q=0 (no aceptada) y el comodín "*".
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _is_compressible(headers: List[Any]) -> bool:
+    content_type = ""
+    for key, value in headers:
+        if key == b"content-encoding":
+            return False # Ya comprimida (e.g. archivos estáticos precomprimidos)
+        if key == b"content-type":
+            content_type = value.decode("latin-1").lower()
+    return content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI de compresión negociada (ver arriba). Las respuestas pequeñas, binarias, ya
+    comprimidas o a solicitudes HEAD se envían sin cambios.
+    """
+
+    def __init__(self, app, min_bytes: int = COMPRESSION_MIN_BYTES, encodings: Iterable[str] = COMPRESSION_ENCODINGS):
+        self.app = app
+        self.min_bytes = min_bytes
+        self.encodings = [encoding for encoding in encodings if encoding in SUPPORTED_ENCODINGS]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = next((value.decode("latin-1") for key, value in scope["headers"] if key == b"accept-encoding"), None)
+        encoding = choose_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Dict[str, Any]] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if message["status"] < 200 or message["status"] in (204, 304) or not _is_compressible(message.get("headers", [])):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message # Se envía con el primer bloque del cuerpo
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body, more_body = message.get("body", b""), message.get("more_body", False)
+            if compressor is None:
+                if not more_body:
+                    # Cuerpo completo: se comprime de una vez si supera el mínimo
+                    if len(body) < self.min_bytes:
+                        passthrough = True
+                        await send(start)
+                        await send(message)
+                        return
+                    if len(body) >= _THREAD_BYTES:
+                        compressed = await anyio.to_thread.run_sync(compress, body, encoding, True)
+                    else:
+                        compressed = compress(body, encoding, fast=True)
+                    await send({**start, "headers": _encoded_headers(start["headers"], encoding, len(compressed))})
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                # Streaming: se desconoce el tamaño final, se comprime por partes
+                compressor = StreamCompressor(encoding)
+                await send({**start, "headers": _encoded_headers(start["headers"], encoding, None)})
+            chunk = compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _encoded_headers(headers: List[Any], encoding: str, length: Optional[int]) -> List[Any]:
+    vary = [value for key, value in headers if key == b"vary"]
+    encoded = [(key, value) for key, value in headers if key not in (b"content-length", b"vary")]
+    encoded.append((b"content-encoding", encoding.encode()))
+    encoded.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+    if length is not None:
+        encoded.append((b"content-length", str(length).encode()))
+    return encoded
@@ -0,0 +1,188 @@
+import functools
+import inspect
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from importlib import import_module
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from backend.core.factor_cache import FACTOR_CACHE
+from backend.utils.matrix_parser import FractionMatrix, SparseFractionMatrix, matrix_compact
+from backend.utils.size_policy import SIZE_POLICY
+from backend.utils.steps import STEP_SINK
+
+# Capa de ejecución de las operaciones. Los endpoints decorados con @offloaded deciden, según el costo
+# estimado (ver size_policy.py), si calculan en el mismo proceso o envían el trabajo a un pool de
+# procesos: así una inversa grande no retiene el GIL del worker de uvicorn ni bloquea a las demás
+# solicitudes. Los trabajos del pool tienen un tiempo máximo; al excederlo se cancelan (si el
+# proceso ya estaba calculando, se termina y el pool se recrea).
+#
+# Siempre se calcula en el mismo proceso si:
+#   - el costo estimado es menor que MATRIX_EXECUTOR_MIN_SECONDS,
+#   - la operación puede reutilizar una factorización de FACTOR_CACHE (que vive en este proceso; sólo sin pasos detallados),
+#   - los pasos se están enviando en streaming (ver /operations/stream), o
+#   - ya se está dentro de un proceso del pool.
+#
+# Variables de entorno:
+#   MATRIX_EXECUTOR_WORKERS      Procesos del pool (0 = todo en el mismo proceso). Por defecto min(4, CPUs).
+#   MATRIX_EXECUTOR_MIN_SECONDS  Costo estimado (segundos) a partir del cual se usa el pool. Por defecto 0.25.
+#   MATRIX_JOB_TIMEOUT_SECONDS   Tiempo máximo de una operación en el pool (0 = sin límite). Por defecto 60.
+
+_IN_WORKER = False # True dentro de los procesos del pool
+
+# Operaciones que consultan FACTOR_CACHE antes de eliminar
+_FACTOR_CACHE_OPERATIONS = {"determinant", "inverse", "solve_system_gaussian"}
+
+
+def _init_worker() -> None:
+    global _IN_WORKER
+    _IN_WORKER = True
+    FACTOR_CACHE.exported = [] # Las factorizaciones nuevas se devuelven al proceso principal
+
+
+def _run_in_worker(module_name: str, function_name: str, data: BaseModel):
+    """Ejecuta el endpoint en un proceso del pool. Retorna (respuesta, error HTTP, factorizaciones nuevas)."""
+    function = inspect.unwrap(getattr(import_module(module_name), function_name)) # Sin los decoradores (caché, pool)
+    FACTOR_CACHE.exported = []
+    try:
+        return function(data), None, FACTOR_CACHE.exported
+    except HTTPException as e:
+        # Se devuelve como tupla: la excepción de Starlette no conserva su detalle al serializarse
+        return None, (e.status_code, e.detail), FACTOR_CACHE.exported
+
+
+def _shape(matrix: Any) -> Sequence[int]:
+    if isinstance(matrix, FractionMatrix):
+        return len(matrix), matrix.cols # Sin armar la primera fila de una entrada dispersa
+    if isinstance(matrix, list) and matrix and isinstance(matrix[0], list):
+        return len(matrix), len(matrix[0])
+    return (len(matrix), 1) if isinstance(matrix, list) else (0, 0)
+
+
+def estimate_seconds(operation: str, data: BaseModel) -> float:
+    """
+    Costo estimado de una operación a partir de su entrada sin convertir: dimensiones y número de
+    dígitos de los elementos (aproxima el tamaño en bits sin crear Fractions).
+    """
+    main = getattr(data, "matrix", None) or getattr(data, "matrix_a", None) or []
+    second = getattr(data, "matrix_b", None)
+    rows, cols = _shape(main)
+    extra_cols = _shape(second)[1] if second else (1 if getattr(data, "vector_b", None) else 0)
+    digits = 1
+    for matrix in (main, second or [], [getattr(data, "vector_b", None) or []]):
+        # De una entrada dispersa sólo se recorren los elementos recibidos, no sus filas densas
+        for row in ([list(row.values()) for row in matrix.entries] if isinstance(matrix, SparseFractionMatrix) else matrix):
+            if isinstance(row, list):
+                for value in row:
+                    digits = max(digits, len(str(value)))
+    bits = int(digits * 3.33) + 1
+    detailed = getattr(data, "steps", "full") == "full"
+    return SIZE_POLICY.estimate(operation, rows, cols, bits, detailed, extra_cols).seconds
+
+
+def _has_cached_factors(data: BaseModel) -> bool:
+    matrix = getattr(data, "matrix", None) or getattr(data, "matrix_a", None)
+    try:
+        return FACTOR_CACHE.contains(matrix_compact(matrix))
+    except (ValueError, OverflowError):
+        return False
+
+
+class OperationExecutor:
+    def __init__(self, workers: int = 4, min_seconds: float = 0.25, timeout: float = 60.0):
+        self.workers = workers
+        self.min_seconds = min_seconds
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "OperationExecutor":
+        return cls(
+            workers=int(os.environ.get("MATRIX_EXECUTOR_WORKERS", min(4, os.cpu_count() or 1))),
+            min_seconds=float(os.environ.get("MATRIX_EXECUTOR_MIN_SECONDS", 0.25)),
+            timeout=float(os.environ.get("MATRIX_JOB_TIMEOUT_SECONDS", 60.0)),
+        )
+
+    def should_offload(self, operation: str, data: BaseModel) -> bool:
+        if _IN_WORKER or self.workers <= 0 or STEP_SINK.get() is not None:
+            return False
+        if estimate_seconds(operation, data) < self.min_seconds:
+            return False
+        return not (operation in _FACTOR_CACHE_OPERATIONS and getattr(data, "steps", "full") != "full" and _has_cached_factors(data))
+
+    def run(self, operation: str, function: Callable[[BaseModel], Any], data: BaseModel):
+        """Ejecuta el endpoint en este proceso o en el pool, según should_offload."""
+        if not self.should_offload(operation, data):
+            return function(data)
+        return self._run_in_pool(function, data)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # "spawn" evita hacer fork de un servidor con varios hilos activos
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+            return self._pool
+
+    def _discard(self, pool: ProcessPoolExecutor, terminate: bool = False) -> None:
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        if terminate:
+            # ProcessPoolExecutor no permite cancelar una tarea en ejecución: se terminan sus procesos.
+            # Los demás trabajos del pool reciben BrokenProcessPool y se reintentan en el pool nuevo.
+            terminate_workers = getattr(pool, "terminate_workers", None) # Python 3.14+
+            if terminate_workers is not None:
+                terminate_workers()
+            else:
+                for process in list((pool._processes or {}).values()):
+                    process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run_in_pool(self, function: Callable[[BaseModel], Any], data: BaseModel):
+        # Se envía el nombre del endpoint (no la función) para que el proceso lo importe
+        for _ in range(2):
+            pool = self._get_pool()
+            future = pool.submit(_run_in_worker, function.__module__, function.__qualname__, data)
+            try:
+                response, http_error, factors = future.result(timeout=self.timeout or None)
+            except FutureTimeoutError:
+                if not future.cancel():
+                    self._discard(pool, terminate=True)
+                raise HTTPException(status_code=504, detail=f"La operación excedió el tiempo máximo de {self.timeout:g} s y fue cancelada.")
+            except BrokenProcessPool:
+                self._discard(pool)
+                continue
+            FACTOR_CACHE.put_entries(factors)
+            if http_error is not None:
+                raise HTTPException(status_code=http_error[0], detail=http_error[1])
+            return response
+        raise HTTPException(status_code=503, detail="El pool de procesos no está disponible. Intente nuevamente.")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+EXECUTOR = OperationExecutor.from_env()
+
+
+def offloaded(operation: str):
+    """
+    Decorador para los endpoints: la función se ejecuta a través de EXECUTOR (en este proceso o en el
+    pool). Va debajo de @router.post; FastAPI sigue viendo la firma original.
+    """
+    def decorate(function: Callable[[BaseModel], Any]):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            data = args[0] if args else next(iter(kwargs.values()))
+            return EXECUTOR.run(operation, function, data)
+        return wrapper
+    return decorate
@@ -0,0 +1,327 @@
+from fractions import Fraction
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from pydantic_core import PydanticCustomError
+
+from backend.core.sparse_matrix import SparseMatrix, is_sparse_candidate
+from backend.utils.size_policy import SIZE_POLICY
+from backend.utils.type_converters import to_fraction
+
+# Conversión de la entrada en una sola pasada. Si la entrada es una lista de listas, parse_matrix la
+# recorre una vez, sin que pydantic valide antes cada elemento: registra la forma (columnas de la
+# primera fila y la primera fila con otra longitud) y convierte cada elemento a Fraction (to_fraction
+# verifica su tipo). Sólo si la estructura no es una lista de listas o algún elemento es inválido se
+# valida además con pydantic, que reporta los errores de tipo (422) con su posición. El resultado es una FractionMatrix: sigue siendo la lista recibida (los
+# endpoints, la caché y el pool la usan igual), pero lleva la matriz convertida, de modo que
+# validar_matriz y matrix_fractions no vuelven a recorrerla.
+#
+# Antes de convertir, el número de elementos se compara con el presupuesto de memoria (ver
+# SizePolicy.check_input): una entrada que no cabe no se convierte, y la FractionMatrix lleva el
+# mensaje en oversized, que validar_matriz reporta como cualquier error de forma.
+#
+# Los errores de forma, de tamaño y de valor no se lanzan durante la validación del modelo: cada endpoint los
+# reporta (400). El error de valor es un MatrixValueError con la posición (fila y columna, base 0)
+# del primer elemento inválido; MatrixValueError.detail construye el mensaje que devuelven todos los
+# endpoints ("Error de conversión en A[2][3]: ...", con la posición en base 1).
+#
+# Formato plano: en lugar de la lista de filas, una matriz puede enviarse como
+# {"rows": r, "cols": c, "data": [... r*c elementos, fila por fila ...]}. Pydantic no valida esos
+# elementos uno a uno (data es una lista cualquiera): el tipo de cada elemento lo verifica to_fraction
+# en la misma pasada de conversión. Un objeto plano mal formado es un error 422, como uno anidado.
+#
+# Formatos dispersos: sólo los elementos no nulos, en CSR
+#   {"rows": r, "cols": c, "row_ptr": [r+1 índices], "col_idx": [...], "values": [...]}
+# (los elementos de la fila i son values[row_ptr[i]:row_ptr[i+1]], en las columnas col_idx[...]) o
+# como diccionario de filas
+#   {"rows": r, "cols": c, "entries": {"<fila>": {"<columna>": valor}}}   (índices base 0)
+# El resultado es una SparseFractionMatrix: guarda sólo los elementos recibidos y la SparseMatrix
+# convertida, sin crear la forma densa. El presupuesto de memoria se compara con rows y el número de
+# elementos recibidos antes de crear cualquier fila (un cuerpo de 60 bytes puede declarar 3000x3000).
+# La forma densa se crea la primera vez que se pide con matrix_fractions, sólo si la operación elige un
+# algoritmo denso, y también debe caber en el presupuesto (MatrixSizeError). Los caminos dispersos
+# (ver matrix_sparse), el costo y las claves de caché usan matrix_compact, que no la crea.
+
+
+class MatrixValueError(ValueError):
+    """Error de conversión de un elemento, con su posición. str(e) es el mensaje de to_fraction."""
+
+    def __init__(self, message: str, row: int, col: Optional[int] = None):
+        super().__init__(message)
+        self.row = row
+        self.col = col
+
+    def detail(self, name: str) -> str:
+        """Mensaje de error (400) para la entrada name (A, B, b...), con la posición en base 1."""
+        position = f"[{self.row+1}]" if self.col is None else f"[{self.row+1}][{self.col+1}]"
+        return f"Error de conversión en {name}{position}: {self}"
+
+
+class MatrixSizeError(MatrixValueError):
+    """La entrada, o la forma densa de una entrada dispersa, excede el presupuesto de memoria. str(e) es el mensaje completo."""
+
+    def __init__(self, message: str):
+        super().__init__(message, 0)
+
+    def detail(self, name: str) -> str:
+        return str(self)
+
+
+class FractionMatrix(list):
+    """
+    Matriz de entrada ya recorrida por parse_matrix. fractions es la matriz convertida (None si algún
+    elemento es inválido, ver error, o si la entrada excede el presupuesto de memoria, ver oversized);
+    cols es la longitud de la primera fila y ragged el índice de la primera fila con otra longitud
+    (None si es rectangular).
+    """
+
+    __slots__ = ("fractions", "error", "cols", "ragged", "sparse", "oversized")
+
+
+class SparseFractionMatrix(FractionMatrix):
+    """
+    Entrada en formato disperso (ver parse_sparse_matrix). entries son los elementos recibidos por fila
+    ({columna: valor}) y nonzero la SparseMatrix convertida (None si algún elemento es inválido). La
+    lista está vacía: cada fila se arma al leerla, de modo que validar_matriz y los endpoints la usan
+    como la lista de filas equivalente. fractions (la forma densa) es None hasta que matrix_fractions la crea.
+    """
+
+    __slots__ = ("rows", "entries", "nonzero")
+
+    @classmethod
+    def build(cls, rows: int, cols: int, entries: List[Dict[int, Any]], nonzero: Optional[SparseMatrix],
+              error: Optional[MatrixValueError] = None, oversized: Optional[str] = None) -> "SparseFractionMatrix":
+        parsed = cls()
+        parsed.rows, parsed.cols, parsed.entries, parsed.nonzero = rows, cols, entries, nonzero
+        parsed.fractions, parsed.error, parsed.ragged, parsed.oversized = None, error, None, oversized
+        parsed.sparse = nonzero if nonzero is not None and is_sparse_candidate(rows, cols, nonzero.nnz) else False
+        return parsed
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.rows))]
+        row = [0] * self.cols
+        for j, value in self.entries[index].items():
+            row[j] = value
+        return row
+
+    def __iter__(self):
+        return (self[i] for i in range(self.rows))
+
+    def __reduce__(self):
+        # Al enviarla al pool de procesos se copian sólo los elementos no nulos, nunca las filas densas
+        return SparseFractionMatrix.build, (self.rows, self.cols, self.entries, self.nonzero, self.error, self.oversized)
+
+    def dense(self) -> List[List[Fraction]]:
+        """Forma densa de la matriz convertida. Lanza MatrixSizeError si no cabe en el presupuesto de memoria."""
+        oversized = SIZE_POLICY.check_input(self.rows, self.cols, self.rows * self.cols)
+        if oversized is not None:
+            raise MatrixSizeError(oversized)
+        return self.nonzero.to_fractions()
+
+
+class FractionVector(list):
+    """Vector de entrada ya convertido por parse_vector (ver FractionMatrix)."""
+
+    __slots__ = ("fractions", "error")
+
+
+def parse_matrix(matrix: List[list], elements: Optional[int] = None) -> FractionMatrix:
+    """Convierte una lista de filas. elements es el número total de elementos, si ya se conoce."""
+    parsed = FractionMatrix(matrix)
+    parsed.cols = len(matrix[0]) if matrix else 0
+    parsed.ragged = None
+    parsed.error = None
+    parsed.sparse = None # Se decide al consultarla (ver matrix_sparse)
+    parsed.oversized = SIZE_POLICY.check_input(len(matrix), parsed.cols, sum(map(len, matrix)) if elements is None else elements)
+    if parsed.oversized is not None:
+        parsed.fractions = None # No se convierte: validar_matriz reporta el error
+        return parsed
+    fractions = []
+    for i, row in enumerate(matrix):
+        if parsed.ragged is None and len(row) != parsed.cols:
+            parsed.ragged = i
+        if parsed.error is None:
+            try:
+                fractions.append([to_fraction(value) for value in row])
+            except (ValueError, OverflowError) as e: # OverflowError: infinito como float
+                col = next(j for j, value in enumerate(row) if not _is_valid(value))
+                parsed.error = MatrixValueError(str(e), i, col)
+    parsed.fractions = fractions if parsed.error is None else None
+    return parsed
+
+
+def parse_flat_matrix(value: dict) -> FractionMatrix:
+    """Convierte una matriz en formato plano {"rows", "cols", "data"} (ver arriba)."""
+    if set(value) != {"rows", "cols", "data"}:
+        raise PydanticCustomError("flat_matrix", "Una matriz en formato plano debe tener exactamente las claves rows, cols y data.")
+    rows, cols, data = value["rows"], value["cols"], value["data"]
+    if type(rows) is not int or type(cols) is not int or rows < 0 or cols < 0:
+        raise PydanticCustomError("flat_matrix", "rows y cols deben ser enteros no negativos.")
+    if not isinstance(data, list) or len(data) != rows * cols:
+        raise PydanticCustomError("flat_matrix", "data debe ser una lista de rows*cols = {expected} elementos.", {"expected": rows * cols})
+    oversized = SIZE_POLICY.check_input(rows, cols, rows * cols)
+    if oversized is not None: # Sin crear las filas
+        parsed = parse_matrix([])
+        parsed.cols, parsed.oversized = cols, oversized
+        return parsed
+    return parse_matrix([data[i * cols:(i + 1) * cols] for i in range(rows)], rows * cols)
+
+
+def _sparse_dimensions(value: dict) -> Tuple[int, int]:
+    rows, cols = value["rows"], value["cols"]
+    if type(rows) is not int or type(cols) is not int or rows < 0 or cols < 0:
+        raise PydanticCustomError("sparse_matrix", "rows y cols deben ser enteros no negativos.")
+    return rows, cols
+
+
+def _index(value: Any, limit: int, name: str) -> int:
+    try:
+        index = int(value) if isinstance(value, str) else value
+    except ValueError:
+        index = None
+    if type(index) is not int or not 0 <= index < limit:
+        raise PydanticCustomError("sparse_matrix", "Índice de {name} fuera de rango: {value} (debe estar entre 0 y {limit}).", {"name": name, "value": value, "limit": limit - 1})
+    return index
+
+
+def parse_sparse_matrix(value: dict) -> SparseFractionMatrix:
+    """Convierte una matriz en formato CSR o diccionario de filas (ver arriba)."""
+    keys = set(value)
+    if keys == {"rows", "cols", "row_ptr", "col_idx", "values"}:
+        rows, cols = _sparse_dimensions(value)
+        row_ptr, col_idx, values = value["row_ptr"], value["col_idx"], value["values"]
+        if not (isinstance(row_ptr, list) and isinstance(col_idx, list) and isinstance(values, list)):
+            raise PydanticCustomError("sparse_matrix", "row_ptr, col_idx y values deben ser listas.")
+        if len(row_ptr) != rows + 1 or len(col_idx) != len(values) or row_ptr[:1] != [0] or row_ptr[-1] != len(values) \
+                or any(type(a) is not int or a > b for a, b in zip(row_ptr, row_ptr[1:] + [len(values)])):
+            raise PydanticCustomError("sparse_matrix", "CSR inválido: row_ptr debe tener rows+1 = {expected} índices crecientes de 0 a len(values), y col_idx tantos elementos como values.", {"expected": rows + 1})
+        oversized = SIZE_POLICY.check_input(rows, cols, len(values), sparse=True)
+        if oversized is not None:
+            return SparseFractionMatrix.build(rows, cols, [], None, oversized=oversized)
+        entries = [{_index(col_idx[k], cols, "columna"): values[k] for k in range(row_ptr[i], row_ptr[i + 1])} for i in range(rows)]
+    elif keys == {"rows", "cols", "entries"}:
+        rows, cols = _sparse_dimensions(value)
+        if not isinstance(value["entries"], dict) or not all(isinstance(row, dict) for row in value["entries"].values()):
+            raise PydanticCustomError("sparse_matrix", "entries debe ser un objeto {fila: {columna: valor}}.")
+        oversized = SIZE_POLICY.check_input(rows, cols, sum(map(len, value["entries"].values())), sparse=True)
+        if oversized is not None: # Sin crear las filas: rows no está acotado por el tamaño del cuerpo
+            return SparseFractionMatrix.build(rows, cols, [], None, oversized=oversized)
+        entries = [{} for _ in range(rows)]
+        for i, row in value["entries"].items():
+            entries[_index(i, rows, "fila")].update((_index(j, cols, "columna"), element) for j, element in row.items())
+    else:
+        raise PydanticCustomError("sparse_matrix", "Una matriz dispersa debe tener las claves rows, cols, row_ptr, col_idx y values (CSR) o rows, cols y entries.")
+
+    error = None
+    data = []
+    for i, row in enumerate(entries):
+        nonzero = {}
+        for j, element in sorted(row.items()):
+            try:
+                fraction = to_fraction(element)
+            except (ValueError, OverflowError) as e:
+                if error is None:
+                    error = MatrixValueError(str(e), i, j)
+                continue
+            if fraction:
+                nonzero[j] = fraction
+        data.append(nonzero)
+    return SparseFractionMatrix.build(rows, cols, entries, SparseMatrix(rows, cols, data) if error is None else None, error)
+
+
+def validate_matrix_input(value: Any, handler: Callable[[Any], List[list]]) -> FractionMatrix:
+    """Validador de ParsedMatrix: formato plano, disperso o lista de filas (convertida en una sola pasada)."""
+    if isinstance(value, dict):
+        return parse_flat_matrix(value) if "data" in value else parse_sparse_matrix(value)
+    if type(value) is list and all(type(row) is list for row in value):
+        parsed = parse_matrix(value)
+        if parsed.error is None:
+            return parsed
+    # Otra estructura o un elemento inválido: pydantic reporta los errores de tipo (422) con su posición;
+    # si sólo hay errores de valor (e.g. "1/0"), el endpoint los reporta (400)
+    return parse_matrix(handler(value))
+
+
+def parse_vector(vector: list) -> FractionVector:
+    parsed = FractionVector(vector)
+    parsed.error = None
+    try:
+        parsed.fractions = [to_fraction(value) for value in vector]
+    except (ValueError, OverflowError) as e:
+        parsed.fractions = None
+        parsed.error = MatrixValueError(str(e), next(i for i, value in enumerate(vector) if not _is_valid(value)))
+    return parsed
+
+
+def _is_valid(value) -> bool:
+    # Sólo se usa para ubicar el elemento inválido tras un error (no en el camino normal)
+    try:
+        to_fraction(value)
+        return True
+    except (ValueError, OverflowError):
+        return False
+
+
+def matrix_fractions(matrix: Sequence[Sequence]) -> List[List[Fraction]]:
+    """
+    Matriz de Fractions de una entrada. Para una FractionMatrix retorna la conversión ya hecha (la forma
+    densa de una entrada dispersa se crea aquí la primera vez); otras listas se convierten aquí.
+    Lanza MatrixValueError si algún elemento es inválido y MatrixSizeError si no cabe en el presupuesto.
+    """
+    if not isinstance(matrix, FractionMatrix):
+        matrix = parse_matrix(matrix)
+    if matrix.oversized is not None:
+        raise MatrixSizeError(matrix.oversized)
+    if matrix.error is not None:
+        raise matrix.error
+    if matrix.fractions is None:
+        matrix.fractions = matrix.dense()
+    return matrix.fractions
+
+
+def matrix_compact(matrix: Sequence[Sequence]) -> Union[List[List[Fraction]], SparseMatrix]:
+    """
+    Entrada convertida sin crear su forma densa: la SparseMatrix de una entrada dispersa, o la matriz de
+    Fractions de las demás. La usan el costo (matrix_bit_size) y las claves de caché, que sólo necesitan
+    los elementos no nulos. Lanza los mismos errores que matrix_fractions.
+    """
+    if isinstance(matrix, SparseFractionMatrix):
+        if matrix.oversized is not None:
+            raise MatrixSizeError(matrix.oversized)
+        if matrix.error is not None:
+            raise matrix.error
+        return matrix.nonzero
+    return matrix_fractions(matrix)
+
+
+def matrix_sparse(matrix: Sequence[Sequence], force: bool = False) -> Optional[SparseMatrix]:
+    """
+    Representación dispersa de una entrada si conviene el camino disperso (ver
+    sparse_matrix.is_sparse_candidate), o None; con force, la representación dispersa en todo caso.
+    La decisión se guarda en la FractionMatrix. Lanza los mismos errores que matrix_fractions.
+    """
+    if not isinstance(matrix, FractionMatrix):
+        matrix = parse_matrix(matrix)
+    if force:
+        compact = matrix_compact(matrix)
+        return compact if isinstance(compact, SparseMatrix) else SparseMatrix.from_fractions(compact)
+    if isinstance(matrix, SparseFractionMatrix):
+        matrix_compact(matrix) # Errores de la entrada
+    elif matrix.sparse is None:
+        fractions = matrix_fractions(matrix)
+        rows, cols = len(fractions), len(fractions[0]) if fractions else 0
+        nonzeros = sum(len(row) - row.count(0) for row in fractions)
+        matrix.sparse = SparseMatrix.from_fractions(fractions) if matrix.ragged is None and is_sparse_candidate(rows, cols, nonzeros) else False
+    return matrix.sparse or None
+
+
+def vector_fractions(vector: Sequence) -> List[Fraction]:
+    """Vector de Fractions de una entrada (ver matrix_fractions)."""
+    if not isinstance(vector, FractionVector):
+        vector = parse_vector(vector)
+    if vector.error is not None:
+        raise vector.error
+    return vector.fractions
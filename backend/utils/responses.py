@@ -0,0 +1,44 @@
+import functools
+from typing import Any, Callable
+
+from fastapi import Response
+from fastapi.routing import APIRoute
+
+from backend.models import ApiResponse
+
+# Camino rápido de las respuestas de las operaciones. Los endpoints declaran response_model=ApiResponse
+# (esquema OpenAPI), pero si retornan un modelo FastAPI lo vuelve a validar contra la unión de
+# ApiResponse.result y cada paso, lo convierte con jsonable_encoder y lo codifica con json. Con
+# FastResponseRoute, la ApiResponse se serializa directamente a JSON con el serializador de
+# pydantic-core (sin validar de nuevo) y se retorna como Response, que FastAPI envía tal cual.
+#
+# El JSON se guarda en la propia ApiResponse: una respuesta servida desde la caché de resultados no se
+# vuelve a serializar. Las copias modificadas de una ApiResponse deben descartar ese JSON (ver
+# wire_format.flatten_response).
+
+
+class ApiJSONResponse(Response):
+    media_type = "application/json"
+
+
+def render_api_response(response: ApiResponse) -> bytes:
+    """JSON de la respuesta (el mismo que generaría FastAPI), calculado una sola vez por respuesta."""
+    if response._json is None:
+        response._json = response.__pydantic_serializer__.to_json(response)
+    return response._json
+
+
+class FastResponseRoute(APIRoute):
+    """
+    Clase de ruta para los routers de operaciones: el endpoint sigue retornando ApiResponse (así lo
+    usan /operations/batch y /operations/stream), y la ruta lo envía ya serializado.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        @functools.wraps(endpoint)
+        def serialized_endpoint(*args, **kwargs):
+            response = endpoint(*args, **kwargs)
+            if isinstance(response, ApiResponse):
+                return ApiJSONResponse(content=render_api_response(response))
+            return response
+        super().__init__(path, serialized_endpoint, **kwargs)
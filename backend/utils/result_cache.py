@@ -0,0 +1,233 @@
+import functools
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from backend.core.factor_cache import canonical_matrix_key
+from backend.models import ApiResponse
+from backend.utils.matrix_parser import matrix_compact, vector_fractions
+from backend.utils.result_store import RESULT_STORE
+from backend.utils.size_policy import SIZE_POLICY
+from backend.utils.steps import STEP_SINK
+
+# Caché de resultados por contenido, delante de todos los endpoints de operaciones. La clave es la
+# operación más la forma canónica de la entrada: los elementos no nulos de las matrices como Fraction (ya
+# convertidos al validar el modelo, ver matrix_parser.py; de modo que "0.5", "1/2" y 0.5 coinciden, y una
+# entrada dispersa no crea su forma densa ni se distingue de la misma matriz en forma de lista) y se incluyen las demás opciones (steps,
+# steps_format, method, ...), porque cambian la respuesta, y los límites de SIZE_POLICY, para que un
+# presupuesto más estricto no devuelva resultados calculados con uno más amplio. Sólo se guardan respuestas ApiResponse;
+# los errores HTTP (400, 504...) no se guardan. En streaming la caché no se usa: los pasos deben
+# generarse en vivo.
+#
+# Además, las solicitudes idénticas (misma clave) que llegan mientras la primera se calcula no repiten
+# el cálculo: esperan a la primera y reciben su respuesta o su error (ver SingleFlight). Esto evita
+# picos de CPU cuando un curso completo o un cliente que reintenta envía la misma matriz grande a la
+# vez; funciona aunque la caché esté desactivada.
+#
+# Si está configurado el almacén persistente (ver result_store.py), las respuestas calculadas también
+# se guardan ahí y, ante un fallo de la caché en memoria, se buscan ahí antes de calcular.
+#
+# Variables de entorno:
+#   MATRIX_RESULT_CACHE_SIZE    Número máximo de respuestas guardadas (0 = desactivada). Por defecto 256.
+#   MATRIX_RESULT_CACHE_MB      Tamaño aproximado máximo de las respuestas guardadas (MB). Por defecto 64.
+#   MATRIX_RESULT_CACHE_TTL     Segundos que una respuesta sigue vigente (0 = sin vencimiento). Por defecto 3600.
+
+_MATRIX_FIELDS = ("matrix", "matrix_a", "matrix_b", "vector_b")
+
+
+def canonical_request_key(operation: str, data: BaseModel) -> Optional[str]:
+    """
+    Hash SHA-256 de la operación y la forma canónica de la entrada. Retorna None si algún elemento no
+    se puede convertir (el endpoint reportará el error; esas solicitudes no se guardan).
+    """
+    digest = hashlib.sha256(operation.encode())
+    digest.update(f";policy={SIZE_POLICY.max_seconds!r},{SIZE_POLICY.max_memory_mb!r},{SIZE_POLICY.ops_per_second!r}".encode())
+    options = data.model_dump(exclude=set(_MATRIX_FIELDS)) # model_dump recorrería las filas densas de una entrada dispersa
+    for name in sorted(type(data).model_fields):
+        digest.update(f";{name}=".encode())
+        field = getattr(data, name)
+        if name in _MATRIX_FIELDS and field is not None:
+            try:
+                if name == "vector_b":
+                    digest.update("".join(f"{fraction.numerator}/{fraction.denominator}," for fraction in vector_fractions(field)).encode())
+                else:
+                    digest.update(canonical_matrix_key(matrix_compact(field)).encode())
+            except (ValueError, OverflowError):
+                return None
+        else:
+            digest.update(repr(options.get(name)).encode())
+    return digest.hexdigest()
+
+
+def _approx_size(value: Any) -> int:
+    # Bytes aproximados de una respuesta: se cuentan los caracteres de los strings (pasos y fracciones)
+    if isinstance(value, str):
+        return len(value) + 50
+    if isinstance(value, dict):
+        return sum(_approx_size(item) for item in value.values()) + 50
+    if isinstance(value, (list, tuple)):
+        return sum(_approx_size(item) for item in value) + 50
+    return 50
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 256, max_mb: float = 64.0, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_mb * 1024 * 1024
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[ApiResponse, float, int]]" = OrderedDict() # clave -> (respuesta, vence, bytes)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        return cls(
+            max_entries=int(os.environ.get("MATRIX_RESULT_CACHE_SIZE", 256)),
+            max_mb=float(os.environ.get("MATRIX_RESULT_CACHE_MB", 64.0)),
+            ttl_seconds=float(os.environ.get("MATRIX_RESULT_CACHE_TTL", 3600.0)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: str) -> Optional[ApiResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and entry[1] < time.monotonic():
+                self._remove(key) # Vencida
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, response: ApiResponse) -> None:
+        size = _approx_size(response.result) + _approx_size(response.steps)
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (response, time.monotonic() + self.ttl_seconds, size)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries))) # Descarta la menos usada recientemente
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.total_bytes, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+RESULT_CACHE = ResultCache.from_env()
+
+
+class _Flight:
+    __slots__ = ("done", "response", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[ApiResponse] = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave: la primera calcula y las demás esperan su
+    resultado. Si el cálculo lanza una excepción, todas la reciben.
+    """
+
+    def __init__(self):
+        self.coalesced = 0 # Solicitudes que esperaron un cálculo en curso en vez de repetirlo
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, function: Callable[[], ApiResponse]) -> ApiResponse:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.waiters += 1
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+        try:
+            flight.response = function()
+            return flight.response
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+def _compute(key: str, function: Callable[[BaseModel], ApiResponse], data: BaseModel) -> ApiResponse:
+    response = RESULT_STORE.get(f"result:{key}")
+    if response is None:
+        response = function(data)
+        if isinstance(response, ApiResponse):
+            RESULT_STORE.put(f"result:{key}", response)
+    if isinstance(response, ApiResponse):
+        RESULT_CACHE.put(key, response)
+    return response
+
+
+def cached_result(operation: str):
+    """
+    Decorador para los endpoints (debajo de @router.post): retorna la respuesta guardada para una
+    entrada equivalente, espera a un cálculo idéntico en curso o calcula y guarda la nueva.
+    """
+    def decorate(function: Callable[[BaseModel], ApiResponse]):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            data = args[0] if args else next(iter(kwargs.values()))
+            if STEP_SINK.get() is not None:
+                return function(data)
+            key = canonical_request_key(operation, data)
+            if key is None:
+                return function(data)
+            if RESULT_CACHE.enabled:
+                response = RESULT_CACHE.get(key)
+                if response is not None:
+                    return response
+            return SINGLE_FLIGHT.do(key, lambda: _compute(key, function, data))
+        return wrapper
+    return decorate
@@ -0,0 +1,150 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Almacén persistente (SQLite) de resultados y factorizaciones, detrás de las cachés en memoria
+# (RESULT_CACHE y FACTOR_CACHE). Sobrevive a los reinicios y lo comparten todos los workers de uvicorn
+# y los procesos del pool que usen el mismo directorio. Es opcional: sin MATRIX_RESULT_STORE_DIR
+# no se abre ningún archivo.
+#
+# La base usa modo WAL (lectores y un escritor simultáneos entre procesos) y un tiempo de espera para
+# los bloqueos; cada hilo abre su propia conexión. Al superar el tamaño máximo se descartan las
+# entradas usadas hace más tiempo. Los errores de SQLite no interrumpen la operación: el almacén
+# sólo evita recalcular, así que ante un error se calcula normalmente.
+#
+# Variables de entorno:
+#   MATRIX_RESULT_STORE_DIR  Directorio del archivo results.sqlite3 (vacío = desactivado). Por defecto vacío.
+#   MATRIX_RESULT_STORE_MB   Tamaño máximo de los valores guardados (MB). Por defecto 512.
+
+# Versión del formato guardado: incrementarla si cambia la forma de ApiResponse, de los pasos o de
+# LUPFactors, para no servir entradas escritas por una versión anterior.
+STORE_FORMAT = 1
+
+_TABLE = f"entries_v{STORE_FORMAT}"
+_TOUCH_SECONDS = 60.0 # Intervalo mínimo entre actualizaciones de la fecha de uso de una entrada
+_EVICT_TO = 0.9 # Al desalojar, se libera espacio hasta quedar en el 90% del máximo
+_BUSY_TIMEOUT_SECONDS = 30.0
+
+
+class ResultStore:
+    def __init__(self, directory: Optional[str] = None, max_mb: float = 512.0):
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "ResultStore":
+        return cls(
+            directory=os.environ.get("MATRIX_RESULT_STORE_DIR") or None,
+            max_mb=float(os.environ.get("MATRIX_RESULT_STORE_MB", 512.0)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, "results.sqlite3")
+
+    def _connection(self) -> sqlite3.Connection:
+        # Una conexión por hilo (y por proceso); se reabre si cambia el directorio
+        local = self._local
+        if getattr(local, "path", None) != self.path or getattr(local, "pid", None) != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"CREATE TABLE IF NOT EXISTS {_TABLE} (key TEXT PRIMARY KEY, payload BLOB NOT NULL, "
+                               "size INTEGER NOT NULL, accessed REAL NOT NULL)")
+            connection.execute(f"CREATE INDEX IF NOT EXISTS {_TABLE}_accessed ON {_TABLE} (accessed)")
+            local.connection, local.path, local.pid = connection, self.path, os.getpid()
+        return local.connection
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            connection = self._connection()
+            row = connection.execute(f"SELECT payload, accessed FROM {_TABLE} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            now = time.time()
+            if now - row[1] > _TOUCH_SECONDS:
+                connection.execute(f"UPDATE {_TABLE} SET accessed = ? WHERE key = ?", (now, key))
+            value = pickle.loads(row[0])
+        except sqlite3.Error:
+            return None
+        except Exception:
+            self.delete(key) # Entrada ilegible (e.g. escrita por otra versión del código)
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            return
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE") # Un solo escritor a la vez entre procesos
+            try:
+                connection.execute(f"INSERT OR REPLACE INTO {_TABLE} (key, payload, size, accessed) VALUES (?, ?, ?, ?)",
+                                   (key, payload, len(payload), time.time()))
+                self._evict(connection)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        total = connection.execute(f"SELECT COALESCE(SUM(size), 0) FROM {_TABLE}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes * _EVICT_TO
+        victims: List[str] = []
+        for key, size in connection.execute(f"SELECT key, size FROM {_TABLE} ORDER BY accessed"):
+            victims.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        connection.executemany(f"DELETE FROM {_TABLE} WHERE key = ?", [(key,) for key in victims])
+
+    def delete(self, key: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._connection().execute(f"DELETE FROM {_TABLE} WHERE key = ?", (key,))
+        except sqlite3.Error:
+            pass
+
+    def clear(self) -> None:
+        if self.enabled:
+            try:
+                self._connection().execute(f"DELETE FROM {_TABLE}")
+            except sqlite3.Error:
+                pass
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        try:
+            entries, total = self._connection().execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {_TABLE}").fetchone()
+        except sqlite3.Error:
+            entries, total = None, None
+        return {"enabled": True, "entries": entries, "bytes": total, "hits": self.hits, "misses": self.misses}
+
+
+RESULT_STORE = ResultStore.from_env()
@@ -0,0 +1,189 @@
+import os
+from fractions import Fraction
+from math import log2
+from typing import Iterable, Optional, Sequence, Union
+
+from backend.core.sparse_matrix import SparseMatrix
+
+# Política de tamaño basada en un costo estimado. Reemplaza el antiguo límite fijo de 4x4:
+# una operación se admite si su tiempo y memoria estimados caben en el presupuesto configurado.
+#
+# Variables de entorno:
+#   MATRIX_MAX_SECONDS     Tiempo máximo estimado por operación (segundos). Por defecto 10.
+#   MATRIX_MAX_MEMORY_MB   Memoria máxima estimada por operación (MB). Por defecto 256.
+#   MATRIX_OPS_PER_SECOND  Operaciones aritméticas por segundo sobre elementos pequeños (costo del intérprete incluido). Por defecto 1e6.
+#
+# Calibración (entradas enteras de un dígito, sin pasos): determinante 100x100 en 0.3 s y 200x200 en 3.3 s;
+# solve 0.7 s y 6.3 s; LU con pivoteo 1.0 s y 15 s; inversa 2.6 s y 48 s. El modelo queda dentro de un
+# factor ~2 de esas mediciones.
+
+# Número de operaciones aritméticas "de fila" aproximado por tipo de operación, en función de
+# (filas, columnas, columnas extra). Las columnas extra son las del segundo operando (multiplicación)
+# o las de la parte aumentada ([A|b], [A|B]).
+_OPERATION_COUNTS = {
+    "add": lambda r, c, k: r * c,
+    "subtract": lambda r, c, k: r * c,
+    "multiply": lambda r, c, k: r * c * max(k, 1),
+    "determinant": lambda r, c, k: r * r * c // 3 + r * c,
+    "determinant_modular": lambda r, c, k: r * r * c // 3 + r * c, # Por cada primo (ver estimate)
+    "lu_factorization": lambda r, c, k: 2 * (r * r * c // 3) + r * c, # Los multiplicadores se guardan en L como Fraction
+    "ldlt_factorization": lambda r, c, k: r * r * c // 6 + r * c * max(k, 1), # Sólo el triángulo inferior (ver backend/core/ldlt.py)
+    "inverse": lambda r, c, k: r * r * (c + r),
+    "solve_system_gaussian": lambda r, c, k: r * r * (c + k) // 3 + r * c,
+    "gauss_jordan_elimination": lambda r, c, k: r * r * (c + k),
+    "substitution": lambda r, c, k: r * c * max(k, 1), # Atajos por estructura (ver backend/core/structure.py)
+    "banded": lambda r, c, k: r * c * (c + k), # Solver en banda (ver backend/core/banded.py); c es el ancho de banda
+}
+
+# Operaciones cuyo costo está dominado por eliminación (los coeficientes crecen con la dimensión).
+_ELIMINATION_OPERATIONS = {"determinant", "determinant_modular", "lu_factorization", "ldlt_factorization", "inverse", "solve_system_gaussian", "gauss_jordan_elimination"}
+
+_WORD_BITS = 64
+_OVERHEAD_WORDS = 16
+_PYTHON_INT_OVERHEAD_BYTES = 28 # Tamaño base de un int de Python
+_INPUT_ELEMENT_BYTES = _PYTHON_INT_OVERHEAD_BYTES + 8 # Elemento de la entrada convertida: referencia en la fila más el valor
+# Entrada dispersa: por fila, los diccionarios de los elementos recibidos y de los convertidos; por
+# elemento, sus entradas en ambos diccionarios y la Fraction con su numerador y denominador
+_SPARSE_ROW_BYTES = 2 * (64 + 8)
+_SPARSE_ELEMENT_BYTES = 2 * 40 + 56 + 2 * _PYTHON_INT_OVERHEAD_BYTES
+
+
+def matrix_bit_size(matrices: Iterable[Union[Sequence[Sequence[Fraction]], SparseMatrix]]) -> int:
+    """
+    Tamaño en bits de la entrada: máxima longitud en bits de numeradores y denominadores. De una
+    SparseMatrix sólo se recorren los elementos no nulos.
+    """
+    bits = 1
+    for matrix in matrices:
+        for row in ([list(row.values()) for row in matrix.data] if isinstance(matrix, SparseMatrix) else matrix):
+            for value in row:
+                value_bits = max(value.numerator.bit_length(), value.denominator.bit_length())
+                if value_bits > bits:
+                    bits = value_bits
+    return bits
+
+
+class CostEstimate:
+    def __init__(self, seconds: float, memory_bytes: float):
+        self.seconds = seconds
+        self.memory_bytes = memory_bytes
+
+    @property
+    def memory_mb(self) -> float:
+        return self.memory_bytes / (1024 * 1024)
+
+
+class SizePolicy:
+    """
+    Estima el costo de una operación (dimensión, tamaño en bits de la entrada y si se generan pasos)
+    y la rechaza sólo si excede el presupuesto de tiempo o memoria configurado.
+    """
+
+    def __init__(self, max_seconds: float = 10.0, max_memory_mb: float = 256.0, ops_per_second: float = 1e6):
+        self.max_seconds = max_seconds
+        self.max_memory_mb = max_memory_mb
+        self.ops_per_second = ops_per_second
+
+    @classmethod
+    def from_env(cls) -> "SizePolicy":
+        return cls(
+            max_seconds=float(os.environ.get("MATRIX_MAX_SECONDS", 10.0)),
+            max_memory_mb=float(os.environ.get("MATRIX_MAX_MEMORY_MB", 256.0)),
+            ops_per_second=float(os.environ.get("MATRIX_OPS_PER_SECOND", 1e6)),
+        )
+
+    def estimate(self, operation: str, rows: int, cols: int, bits: int, steps_enabled: bool, extra_cols: int = 0, density: float = 1.0) -> CostEstimate:
+        """
+        Estima tiempo (segundos) y memoria (bytes) de una operación.
+
+        Args:
+            operation: Nombre de la operación (ver _OPERATION_COUNTS).
+            rows, cols: Dimensiones de la matriz principal.
+            bits: Tamaño en bits de la entrada (ver matrix_bit_size).
+            steps_enabled: Si se generarán los pasos detallados.
+            extra_cols: Columnas del segundo operando o de la parte aumentada.
+            density: Fracción de elementos no nulos cuando se usa la representación dispersa (ver
+                backend/core/sparse_matrix.py), o ancho de banda / dimensión para "banded"; 1.0 para
+                el camino denso.
+        """
+        n = max(rows, cols, 1)
+        total_cols = cols + extra_cols if operation in _ELIMINATION_OPERATIONS else max(cols, extra_cols)
+        row_nonzeros = max(density * cols, 1.0) # Elementos no nulos por fila
+
+        # Tamaño de los coeficientes intermedios: en eliminación exacta crecen como menores de orden n
+        # (cota de Hadamard: |menor| <= (sqrt(no nulos por fila) * 2^bits)^n); en suma/multiplicación apenas crecen.
+        if operation in _ELIMINATION_OPERATIONS:
+            entry_bits = n * (bits + log2(row_nonzeros) / 2)
+        elif operation == "substitution":
+            entry_bits = n * (bits + 1) # Productos de elementos de la diagonal: sin la cota de Hadamard
+        elif operation == "banded":
+            # Los pivotes son cocientes de menores principales consecutivos: crecen linealmente a lo
+            # largo de la banda, y en promedio alcanzan la mitad de la cota.
+            entry_bits = n * (bits + log2(row_nonzeros) + 1) / 2
+        elif operation == "multiply":
+            entry_bits = 2 * bits + log2(max(cols, 1)) + 1
+        else:
+            entry_bits = bits + 1
+        words = max(1.0, entry_bits / _WORD_BITS)
+        # Hasta unas _OVERHEAD_WORDS palabras domina el costo fijo de cada operación en el intérprete;
+        # por encima, la multiplicación de enteros grandes (Karatsuba).
+        cost_per_op = 1.0 + (words / _OVERHEAD_WORDS) ** 1.58
+
+        count = _OPERATION_COUNTS.get(operation, _OPERATION_COUNTS["gauss_jordan_elimination"])(rows, cols, extra_cols)
+        if operation == "banded":
+            # Cada fila combina sus elementos de la banda con los de una fila pivote vecina
+            count = _OPERATION_COUNTS["banded"](rows, row_nonzeros, extra_cols)
+        elif density < 1.0:
+            # Camino disperso: sólo se recorren los no nulos. En la eliminación cada pivote actualiza
+            # (no nulos de su columna) x (no nulos de su fila); el relleno no se conoce de antemano y se
+            # supone que duplica los no nulos por fila.
+            count = rows * (2 * row_nonzeros) ** 2 + rows * extra_cols if operation in _ELIMINATION_OPERATIONS else count * density
+        if operation == "determinant_modular":
+            # Eliminación con enteros de una palabra, repetida por cada primo de 31 bits que exige la cota.
+            count *= int(entry_bits // 30) + 1
+            cost_per_op = 1.0
+            entry_bits = 64.0
+        seconds = count * cost_per_op / self.ops_per_second
+        # El resultado de suma, resta y multiplicación se devuelve denso aunque las entradas sean dispersas
+        memory = rows * total_cols * (_PYTHON_INT_OVERHEAD_BYTES + entry_bits / 8) * (1.0 if operation in ("add", "subtract", "multiply") else min(1.0, 2 * density))
+        if operation == "ldlt_factorization":
+            memory /= 2 # Almacenamiento simétrico empaquetado
+
+        if steps_enabled:
+            # Cada operación de fila agrega una instantánea formateada de la matriz completa.
+            digits = entry_bits * 0.30103 + 2 # Dígitos decimales por elemento, más separadores
+            snapshots = rows * rows if operation in _ELIMINATION_OPERATIONS else rows * max(total_cols, 1)
+            snapshot_chars = rows * total_cols * digits if operation in _ELIMINATION_OPERATIONS else digits * max(cols, 1)
+            memory += snapshots * snapshot_chars
+            seconds += snapshots * snapshot_chars / (self.ops_per_second * 10)
+        return CostEstimate(seconds, memory)
+
+    def check(self, operation: str, rows: int, cols: int, bits: int, steps_enabled: bool = True, extra_cols: int = 0, density: float = 1.0) -> Optional[str]:
+        """
+        Retorna un mensaje de error si la operación excede el presupuesto, o None si se admite.
+        """
+        estimate = self.estimate(operation, rows, cols, bits, steps_enabled, extra_cols, density)
+        if estimate.seconds > self.max_seconds:
+            return (f"La operación excede el presupuesto de tiempo: costo estimado {estimate.seconds:.1f} s "
+                    f"(máximo {self.max_seconds:g} s) para una matriz de {rows}x{cols} con entradas de {bits} bits.")
+        if estimate.memory_mb > self.max_memory_mb:
+            return (f"La operación excede el presupuesto de memoria: uso estimado {estimate.memory_mb:.1f} MB "
+                    f"(máximo {self.max_memory_mb:g} MB) para una matriz de {rows}x{cols} con entradas de {bits} bits.")
+        return None
+
+    def check_input(self, rows: int, cols: int, elements: int, sparse: bool = False) -> Optional[str]:
+        """
+        Retorna un mensaje de error si la entrada, convertida a Fraction, no cabe en el presupuesto de
+        memoria. Se evalúa antes de convertirla (ver backend/utils/matrix_parser.py), con el número de
+        elementos recibidos; el costo de la operación se valida después (ver check). Con sparse, elements
+        son los elementos no nulos recibidos y se cuenta además cada fila (formatos dispersos).
+        """
+        memory = rows * _SPARSE_ROW_BYTES + elements * _SPARSE_ELEMENT_BYTES if sparse else elements * _INPUT_ELEMENT_BYTES
+        memory_mb = memory / (1024 * 1024)
+        if memory_mb > self.max_memory_mb:
+            return (f"La operación excede el presupuesto de memoria: la entrada de {rows}x{cols} ocupa unos "
+                    f"{memory_mb:.1f} MB al convertirla (máximo {self.max_memory_mb:g} MB).")
+        return None
+
+
+SIZE_POLICY = SizePolicy.from_env()
@@ -0,0 +1,142 @@
+import hashlib
+import mimetypes
+import os
+import pathlib
+import threading
+from typing import Dict, Mapping, Optional, Tuple
+
+from fastapi import Response
+
+from backend.utils.compression import PREFERRED_ENCODINGS, choose_encoding, compress
+
+# Archivos estáticos de la interfaz (index.html, script.js, style.css) servidos desde memoria. Al
+# iniciar se leen una vez y, por cada archivo:
+#   - se calcula su huella (hash del contenido) y su ETag;
+#   - se precomprime con gzip (y brotli si está instalado), si la versión comprimida es más pequeña;
+#   - los HTML se reescriben para referenciar los demás archivos por su nombre con huella
+#     (/static/script.js -> /static/script.<huella>.js).
+# Un nombre con huella identifica un contenido que no cambia: se envía con caché inmutable de un año.
+# Los nombres sin huella (index.html, /static/script.js) se envían con "no-cache": el navegador los
+# revalida con If-None-Match y recibe 304 sin cuerpo si no cambiaron.
+#
+# Variables de entorno:
+#   MATRIX_STATIC_RELOAD  1 = recargar los archivos cuando cambian en disco (desarrollo). Por defecto 0.
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+_FINGERPRINT_LENGTH = 12
+_MIN_COMPRESS_BYTES = 256 # Por debajo de este tamaño no se comprime
+
+
+class StaticAsset:
+    """Un archivo cargado: contenido por codificación ("identity", "gzip", "br") y su ETag."""
+
+    __slots__ = ("name", "media_type", "fingerprint", "variants", "etags")
+
+    def __init__(self, name: str, content: bytes, media_type: str):
+        self.name = name
+        self.media_type = media_type
+        self.fingerprint = hashlib.sha256(content).hexdigest()[:_FINGERPRINT_LENGTH]
+        self.variants: Dict[str, bytes] = {"identity": content}
+        if len(content) >= _MIN_COMPRESS_BYTES:
+            for encoding in PREFERRED_ENCODINGS:
+                compressed = compress(content, encoding)
+                if len(compressed) < len(content):
+                    self.variants[encoding] = compressed
+        # Cada codificación es una representación distinta: ETag propio (RFC 9110, 8.8.3)
+        self.etags = {encoding: f'"{self.fingerprint}"' if encoding == "identity" else f'"{self.fingerprint}-{encoding}"'
+                      for encoding in self.variants}
+
+    @property
+    def fingerprinted_name(self) -> str:
+        stem, dot, extension = self.name.rpartition(".")
+        return f"{stem}.{self.fingerprint}.{extension}" if dot else f"{self.name}.{self.fingerprint}"
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True si alguna ETag de If-None-Match corresponde a este contenido (comparación débil)."""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return not tags.isdisjoint(self.etags.values())
+
+    def response(self, request_headers: Mapping[str, str], immutable: bool = False) -> Response:
+        """Respuesta para una solicitud: 304 si el cliente ya tiene el contenido, si no la mejor codificación aceptada."""
+        encoding = choose_encoding(request_headers.get("accept-encoding"), [e for e in PREFERRED_ENCODINGS if e in self.variants]) or "identity"
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        }
+        if len(self.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if self.matches(request_headers.get("if-none-match")):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type=self.media_type, headers=headers)
+
+
+class StaticAssets:
+    def __init__(self, directory: pathlib.Path, reload: bool = False):
+        self.directory = pathlib.Path(directory)
+        self.reload = reload
+        self._assets: Dict[str, StaticAsset] = {}
+        self._fingerprinted: Dict[str, str] = {} # nombre con huella -> nombre
+        self._mtimes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @classmethod
+    def from_env(cls, directory: pathlib.Path) -> "StaticAssets":
+        return cls(directory, reload=os.environ.get("MATRIX_STATIC_RELOAD", "0") == "1")
+
+    def _scan(self) -> Dict[str, float]:
+        if not self.directory.is_dir():
+            return {}
+        return {path.name: path.stat().st_mtime for path in self.directory.iterdir() if path.is_file()}
+
+    def load(self) -> None:
+        mtimes = self._scan()
+        contents = {name: (self.directory / name).read_bytes() for name in mtimes}
+        assets: Dict[str, StaticAsset] = {}
+        # Primero los archivos que no son HTML: los HTML se reescriben con sus nombres con huella
+        for name in sorted(contents, key=lambda name: name.endswith(".html")):
+            content = contents[name]
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if name.endswith(".html"):
+                content = self._link_fingerprints(content.decode("utf-8"), assets).encode("utf-8")
+                media_type = "text/html; charset=utf-8"
+            elif media_type.startswith("text/") or media_type == "application/javascript":
+                media_type += "; charset=utf-8"
+            assets[name] = StaticAsset(name, content, media_type)
+        with self._lock:
+            self._assets = assets
+            self._fingerprinted = {asset.fingerprinted_name: name for name, asset in assets.items()}
+            self._mtimes = mtimes
+
+    @staticmethod
+    def _link_fingerprints(html: str, assets: Mapping[str, StaticAsset]) -> str:
+        for name, asset in assets.items():
+            for quote in ('"', "'"):
+                html = html.replace(f"{quote}/static/{name}{quote}", f"{quote}/static/{asset.fingerprinted_name}{quote}")
+        return html
+
+    def _reload_if_changed(self) -> None:
+        if self.reload and self._scan() != self._mtimes:
+            self.load()
+
+    def lookup(self, name: str) -> Tuple[Optional[StaticAsset], bool]:
+        """Archivo por nombre (con o sin huella) y si el nombre tenía huella (contenido inmutable)."""
+        self._reload_if_changed()
+        if name in self._assets:
+            return self._assets[name], False
+        original = self._fingerprinted.get(name)
+        if original is not None:
+            return self._assets[original], True
+        return None, False
+
+    def url(self, name: str) -> str:
+        """URL con huella de un archivo (e.g. para plantillas)."""
+        return f"/static/{self._assets[name].fingerprinted_name}"
@@ -0,0 +1,270 @@
+import os
+from contextvars import ContextVar
+from fractions import Fraction
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from backend.models import OutputMatrix, StepsMode, StepsFormat
+from backend.core.rational_matrix import RationalMatrix
+from backend.utils.formatters import format_matrix_for_steps, format_augmented_matrix_for_steps
+from backend.utils.matrix_parser import MatrixSizeError, matrix_compact, matrix_fractions
+from backend.utils.type_converters import format_fraction_output
+
+# Nivel de detalle (StepsMode) de los pasos que se devuelven en ApiResponse.steps:
+#   none     No se generan pasos (steps = null). Para clientes que sólo necesitan el resultado.
+#   summary  Sólo los pasos de resumen: matrices de entrada, forma final y resultado, sin las
+#            instantáneas fila a fila de la eliminación.
+#   full     Todos los pasos (comportamiento por defecto).
+#
+# Formato (StepsFormat) de los pasos:
+#   text     Lista de líneas de texto (comportamiento por defecto).
+#   json     Lista compacta: las líneas de resumen siguen siendo strings; las operaciones de fila y las
+#            matrices se envían como objetos {"op": ...} que script.js convierte en texto. Cada operación
+#            de fila lleva su plantilla ("template", con campos {nombre}), de modo que el cliente produce
+#            exactamente el mismo texto que el formato text sin repetir las frases del backend.
+#
+# Los bucles de eliminación no construyen strings: registran operaciones de fila (RowOperation) e
+# instantáneas de la matriz (MatrixSnapshot), que sólo se formatean al serializar la respuesta.
+# Cuando sólo cambiaron algunas filas, la instantánea se guarda como MatrixDelta (las filas cambiadas
+# respecto de la matriz anterior del registro), con una instantánea completa (keyframe) cada
+# max(KEYFRAME_INTERVAL, filas) pasos: una instantánea completa cuesta tanto como n deltas de una fila,
+# de modo que el costo de los keyframes queda en O(n) por paso en promedio, como el de los deltas.
+# En formato text se reconstruye la matriz completa; en formato json se envía el delta
+# ({"op": "delta"}) y script.js reconstruye la matriz.
+#
+# Variables de entorno:
+#   MATRIX_STEPS_KEYFRAME_INTERVAL  Mínimo de deltas consecutivos entre instantáneas completas (el intervalo
+#                                   es al menos el número de filas; 0 = sólo instantáneas completas). Por defecto 8.
+
+KEYFRAME_INTERVAL = int(os.environ.get("MATRIX_STEPS_KEYFRAME_INTERVAL", 8))
+
+# Destino opcional de los pasos. Si está definido en el contexto (ver /operations/stream), cada StepLog
+# creado en ese contexto entrega sus pasos a esta función a medida que se registran, sin guardarlos.
+STEP_SINK: ContextVar[Optional[Callable[["StepEntry"], None]]] = ContextVar("STEP_SINK", default=None)
+
+
+def _render_value(value: Any) -> Any:
+    return format_fraction_output(value) if isinstance(value, Fraction) else value
+
+
+def _render_matrix(rows: List[List[Any]], name: str, split: Optional[int]) -> List[str]:
+    if split is None:
+        return format_matrix_for_steps(rows, name)
+    return format_augmented_matrix_for_steps(rows, split, name)
+
+
+class RowOperation:
+    """
+    Paso estructurado de una operación de fila (intercambio, normalización, eliminación, pivote...).
+
+    op es el tipo de operación ("swap", "scale", "eliminate", "pivot", "skip", "sign"), template es la
+    plantilla del texto (constante, con campos {nombre}) y fields los índices (base 1) y valores.
+    """
+
+    __slots__ = ("op", "template", "fields")
+
+    def __init__(self, op: str, template: str, fields: Dict[str, Any]):
+        self.op = op
+        self.template = template
+        self.fields = fields
+
+    def render(self) -> List[str]:
+        return [self.template.format(**{name: _render_value(value) for name, value in self.fields.items()})]
+
+    def to_json(self) -> Dict[str, Any]:
+        record = {"op": self.op, "template": self.template}
+        record.update((name, _render_value(value)) for name, value in self.fields.items())
+        return record
+
+
+class MatrixSnapshot:
+    """
+    Instantánea de una matriz en un paso. Guarda una copia de los datos (enteros del motor racional o
+    la lista de filas) y sólo la formatea al serializar. split es el número de columnas de A en una
+    matriz aumentada [A|b] (None si no se dibuja separador).
+    """
+
+    __slots__ = ("matrix", "name", "split")
+
+    def __init__(self, matrix: Union[RationalMatrix, Sequence[Sequence[Any]]], name: str, split: Optional[int] = None):
+        self.matrix = matrix.copy() if isinstance(matrix, RationalMatrix) else [list(row) for row in matrix]
+        self.name = name
+        self.split = split
+
+    def rows(self) -> List[List[Any]]:
+        return self.matrix.to_fractions() if isinstance(self.matrix, RationalMatrix) else self.matrix
+
+    def render(self) -> List[str]:
+        return _render_matrix(self.rows(), self.name, self.split)
+
+    def to_json(self) -> Dict[str, Any]:
+        record = {"op": "matrix", "name": self.name, "rows": [[str(value) for value in row] for row in self.rows()]}
+        if self.split is not None:
+            record["split"] = self.split
+        return record
+
+
+class MatrixDelta:
+    """
+    Instantánea que guarda sólo las filas que cambiaron respecto de la matriz anterior del registro
+    (en la representación interna del motor: numeradores y denominador común de la fila).
+    """
+
+    __slots__ = ("name", "split", "changed")
+
+    def __init__(self, matrix: RationalMatrix, name: str, split: Optional[int], rows: Iterable[int]):
+        self.name = name
+        self.split = split
+        self.changed = {i: matrix.raw_row(i) for i in rows}
+
+    def apply(self, frame: RationalMatrix) -> None:
+        for i, (values, den) in self.changed.items():
+            frame.set_raw_row(i, values, den)
+
+    def render(self, frame: RationalMatrix) -> List[str]:
+        return _render_matrix(frame.to_fractions(), self.name, self.split)
+
+    def to_json(self) -> Dict[str, Any]:
+        changed = [[i, [format_fraction_output(Fraction(value, den)) for value in values]] for i, (values, den) in self.changed.items()]
+        record = {"op": "delta", "name": self.name, "changed": changed}
+        if self.split is not None:
+            record["split"] = self.split
+        return record
+
+
+StepEntry = Union[str, RowOperation, MatrixSnapshot, MatrixDelta]
+
+
+class StepRenderer:
+    """
+    Convierte pasos registrados en salida (líneas de texto o objetos compactos), uno a la vez y en
+    orden: conserva el estado de la última matriz para reconstruir los deltas en formato text.
+    """
+
+    def __init__(self, steps_format: StepsFormat = "text"):
+        self.steps_format = steps_format
+        self._frame: Optional[RationalMatrix] = None # Estado de la última matriz, sobre el que se aplican los deltas
+
+    def feed(self, entry: StepEntry) -> List[Union[str, Dict[str, Any]]]:
+        if isinstance(entry, str):
+            return [entry]
+        if self.steps_format == "json":
+            return [entry.to_json()]
+        if isinstance(entry, MatrixDelta):
+            entry.apply(self._frame)
+            return entry.render(self._frame)
+        if isinstance(entry, MatrixSnapshot):
+            self._frame = entry.matrix.copy() if isinstance(entry.matrix, RationalMatrix) else None
+        return entry.render()
+
+
+class StepLog(list):
+    """
+    Registro de pasos de una operación que respeta el nivel de detalle y el formato pedidos.
+
+    append/extend registran líneas de resumen (se descartan en modo none); matrix/augmented_matrix
+    registran matrices de resumen. row_op y snapshot registran los pasos fila a fila, que sólo se
+    guardan en modo full. Los bucles pueden protegerlos con `if steps.detailed:` para no evaluar
+    siquiera los argumentos.
+
+    snapshot(matrix, name, rows=[...]) indica qué filas cambiaron desde la última matriz registrada;
+    si esa matriz es la misma (mismo objeto del motor) se guarda sólo el delta.
+    """
+
+    def __init__(self, mode: StepsMode = "full", lines: Iterable[str] = (), steps_format: StepsFormat = "text"):
+        super().__init__()
+        self.mode = mode
+        self.steps_format = steps_format
+        self._frame_source = None # Última matriz registrada (base de los deltas)
+        self._frame_split: Optional[int] = None
+        self._deltas_since_keyframe = 0
+        self._sink = STEP_SINK.get()
+        self.extend(lines)
+
+    @property
+    def enabled(self) -> bool:
+        """True si se devuelve algún paso (summary o full)."""
+        return self.mode != "none"
+
+    @property
+    def detailed(self) -> bool:
+        """True si se deben generar los pasos detallados (fila a fila)."""
+        return self.mode == "full"
+
+    def append(self, line: StepEntry) -> None:
+        if self.mode != "none":
+            self._record(line)
+
+    def extend(self, lines: Iterable[StepEntry]) -> None:
+        if self.mode != "none":
+            for line in lines:
+                self._record(line)
+
+    def _record(self, entry: StepEntry) -> None:
+        if self._sink is not None:
+            self._sink(entry)
+        else:
+            super().append(entry)
+
+    def matrix(self, matrix: Union[RationalMatrix, OutputMatrix], name: str) -> None:
+        """Registra una matriz; sólo se formatea al serializar."""
+        if self.mode != "none":
+            self._keyframe(matrix, name, None)
+
+    def input_matrix(self, matrix: Sequence[Sequence], name: str) -> None:
+        """
+        Registra una matriz de entrada ya validada. La forma densa de una entrada dispersa sólo se crea si
+        se devuelven pasos; si no cabe en el presupuesto de memoria se registran sus no nulos en una línea.
+        """
+        if self.mode == "none":
+            return
+        try:
+            self.matrix(matrix_fractions(matrix), name)
+        except MatrixSizeError:
+            self._record(f"{name}: matriz dispersa con {matrix_compact(matrix).nnz} elementos no nulos (demasiado grande para mostrarla completa).")
+
+    def augmented_matrix(self, matrix: Union[RationalMatrix, OutputMatrix], main_matrix_cols: int, name: str) -> None:
+        """Registra una matriz aumentada [A|b]; sólo se formatea al serializar."""
+        if self.mode != "none":
+            self._keyframe(matrix, name, main_matrix_cols)
+
+    def row_op(self, op: str, template: str, **fields: Any) -> None:
+        """Registra una operación de fila (sólo en modo full). Los índices deben pasarse en base 1."""
+        if self.mode == "full":
+            self._record(RowOperation(op, template, fields))
+
+    def snapshot(self, matrix: RationalMatrix, name: str, split: Optional[int] = None, rows: Optional[Iterable[int]] = None) -> None:
+        """
+        Registra el estado intermedio de la matriz (sólo en modo full). rows son los índices (base 0)
+        de las filas que cambiaron desde la última matriz registrada; sin rows se guarda la matriz completa.
+        """
+        if self.mode != "full":
+            return
+        interval = max(KEYFRAME_INTERVAL, matrix.rows) if KEYFRAME_INTERVAL > 0 else 0
+        if (rows is not None and matrix is self._frame_source and split == self._frame_split
+                and self._deltas_since_keyframe < interval):
+            self._record(MatrixDelta(matrix, name, split, rows))
+            self._deltas_since_keyframe += 1
+        else:
+            self._keyframe(matrix, name, split)
+
+    def _keyframe(self, matrix: Union[RationalMatrix, OutputMatrix], name: str, split: Optional[int]) -> None:
+        self._record(MatrixSnapshot(matrix, name, split))
+        self._frame_source = matrix
+        self._frame_split = split
+        self._deltas_since_keyframe = 0
+
+    def render(self) -> List[str]:
+        """Todos los pasos como líneas de texto."""
+        renderer = StepRenderer("text")
+        return [line for entry in self for line in renderer.feed(entry)]
+
+    def to_json(self) -> List[Union[str, Dict[str, Any]]]:
+        """Todos los pasos en formato compacto (strings y objetos {"op": ...})."""
+        renderer = StepRenderer("json")
+        return [record for entry in self for record in renderer.feed(entry)]
+
+    def for_response(self) -> Optional[List[Union[str, Dict[str, Any]]]]:
+        """Pasos a devolver en ApiResponse.steps (None en modo none)."""
+        if not self.enabled:
+            return None
+        return self.to_json() if self.steps_format == "json" else self.render()
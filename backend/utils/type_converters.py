@@ -1,35 +1,74 @@
+import re
 from fractions import Fraction
-from typing import Union
+from typing import Optional, Union
 
 # Importación eliminada de MatrixElement y OutputElement ya que no se usan directamente aquí
 # y causaban error si OutputElement no estaba definido en models.py
 # from backend.models import MatrixElement, OutputElement 
 
+# Formas aceptadas en los strings (ya sin espacios al inicio/final). Los enteros, decimales y fracciones
+# p/q se leen directamente como enteros de Python: un decimal "d.ddd" es exactamente dddd/10^k, sin
+# pasar por float. _NUMBER reconoce las tres formas con una sola búsqueda (grupos: entero | signo,
+# parte entera y decimales | numerador y denominador).
+_NUMBER = re.compile(r"(-?[0-9]+)|(-?)([0-9]*)\.([0-9]*)|(-?[0-9]+) */ *(-?[0-9]+)")
+_ALLOWED = re.compile(r"[0-9/\-. ]*") # Dígitos, '/', '-', '.' y espacios (e.g. "1 / 2")
+
+# Tabla de valores frecuentes (Fraction es inmutable, así que se comparten): enteros pequeños como
+# int y como string, y fracciones p/q pequeñas como string. Evita crear una Fraction por cada "0" o "1".
+_INTERN_RANGE = range(-100, 101)
+_SMALL_INTEGERS = {i: Fraction(i) for i in _INTERN_RANGE}
+_INTERNED = {str(i): value for i, value in _SMALL_INTEGERS.items()}
+_INTERNED.update({f"{sign}{p}/{q}": Fraction(int(f"{sign}{p}"), q) for sign in ("", "-") for q in range(2, 13) for p in range(0, 13)})
+
+
+def _parse_number(text: str) -> Optional[Fraction]:
+    """Entero, decimal exacto o fracción p/q de enteros; None si el texto no es ninguno (o si q es 0)."""
+    interned = _INTERNED.get(text)
+    if interned is not None:
+        return interned
+    match = _NUMBER.fullmatch(text)
+    if match is None:
+        return None
+    integer, sign, whole, decimals, numerator, denominator = match.groups()
+    if integer is not None:
+        return Fraction(int(integer))
+    if numerator is not None:
+        return Fraction(int(numerator), int(denominator)) if denominator.strip("-0") else None
+    if not whole and not decimals: # "." o "-."
+        return None
+    value = int(whole + decimals)
+    return Fraction(-value if sign else value, 10 ** len(decimals))
+
+
 def to_fraction(value: Union[int, float, str]) -> Fraction:
     """
     Convierte un valor de entrada (que puede ser int, float, o str representando un número o fracción)
     a un objeto Fraction.
     Maneja espacios en blanco, convierte flotantes a fracciones con denominadores limitados,
-    y valida formatos de fracción.
+    y valida formatos de fracción. Los strings decimales ("0.1", "2.5") se convierten exactamente
+    (1/10, 5/2); los valores pequeños frecuentes se toman de una tabla de Fractions compartidas.
 
     Raises:
         ValueError: Si el valor es inválido (e.g., "1/0", "abc", "1/2a").
     """
-    if isinstance(value, Fraction):
-        return value
-    if isinstance(value, (int, float)):
-        # Limitar el denominador para flotantes para evitar fracciones muy complejas
-        return Fraction(value).limit_denominator(1000000) 
-    
     if isinstance(value, str):
+        interned = _INTERNED.get(value)
+        if interned is not None:
+            return interned
         value = value.strip() # Eliminar espacios al inicio/final
         if not value: # Si la cadena está vacía después de strip
             raise ValueError("El valor de entrada de la matriz no puede ser una cadena vacía.")
-        
+
+        try:
+            number = _parse_number(value) # Camino rápido: entero, decimal o p/q
+        except ValueError: # e.g. más dígitos de los que int() admite
+            number = None
+        if number is not None:
+            return number
+
         # Comprobar caracteres no permitidos (excepto dígitos, '/', '-', '.', y espacio)
-        # El espacio ya se manejó con strip() para los extremos, pero puede estar en medio de una fracción como "1 / 2"
-        allowed_chars = set("0123456789/-. ") 
-        if not all(char in allowed_chars for char in value):
+        # El espacio puede estar en medio de una fracción como "1 / 2"
+        if not _ALLOWED.fullmatch(value):
             # This matches the expected error in several tests for non-numeric/non-fraction characters
             raise ValueError(f"Valor de entrada inválido: '{value}'. No es un número, fracción (ej: '1/2'), ni string numérico (ej: '2.5').")
 
@@ -38,31 +77,33 @@ def to_fraction(value: Union[int, float, str]) -> Fraction:
             parts = value.split('/')
             if len(parts) != 2:
                 raise ValueError(f"Valor de fracción inválido: '{value}'. Formato debe ser num/den.")
-            
-            num_str, den_str = parts[0].strip(), parts[1].strip()
-            
-            # Intentar convertir numerador y denominador, que podrían ser flotantes o enteros
+
+            # Numerador y denominador pueden ser enteros o decimales (e.g. "1.5/2")
             try:
-                # Convertir a float primero para manejar "1.0" o "2.5" como parte de una fracción,
-                # luego a Fraction para que maneje la simplificación si es necesario.
-                num = Fraction(float(num_str)) if '.' in num_str else Fraction(int(num_str))
-                den = Fraction(float(den_str)) if '.' in den_str else Fraction(int(den_str))
+                num = _parse_number(parts[0].strip())
+                den = _parse_number(parts[1].strip())
             except ValueError:
+                num = den = None
+            if num is None or den is None:
                 raise ValueError(f"Numerador o denominador inválido en la fracción: '{value}'. Deben ser numéricos.")
-            
+
             if den == 0:
                 raise ValueError(f"Valor inválido: '{value}'. El denominador no puede ser cero en una fracción.")
             return num / den
-        else:
-            # Intentar convertir como flotante si hay '.', sino como entero
-            try:
-                if '.' in value:
-                    return Fraction(float(value)).limit_denominator(1000000)
-                else:
-                    return Fraction(int(value))
-            except ValueError:
-                raise ValueError(f"Valor numérico inválido: '{value}'. No es un entero, flotante o fracción válida.")
-    
+
+        raise ValueError(f"Valor numérico inválido: '{value}'. No es un entero, flotante o fracción válida.")
+
+    if isinstance(value, Fraction):
+        return value
+    if isinstance(value, int):
+        interned = _SMALL_INTEGERS.get(value)
+        return interned if interned is not None else Fraction(int(value))
+    if isinstance(value, float):
+        if value.is_integer():
+            return to_fraction(int(value))
+        # Limitar el denominador para flotantes (JSON los envía en binario) para evitar fracciones muy complejas
+        return Fraction(value).limit_denominator(1000000)
+
     raise ValueError(f"Tipo de valor no soportado: {type(value)}. Debe ser int, float, o str.")
 
 def format_fraction_output(value: Fraction) -> str:
@@ -1,8 +1,11 @@
 from typing import List, Optional, Tuple, Union
 from fractions import Fraction
 from backend.models import InputMatrix, Matrix # Assuming models.py is in backend/
+from backend.utils.matrix_parser import FractionMatrix
+from backend.utils.size_policy import SIZE_POLICY, matrix_bit_size
 
 def validar_matriz(matriz: InputMatrix, nombre_matriz: str = "La matriz", expected_rows: Optional[int] = None, expected_cols: Optional[int] = None) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    if isinstance(matriz, FractionMatrix) and matriz.oversized: return None, None, matriz.oversized # Entrada sin convertir: excede el presupuesto de memoria
     if not matriz: return None, None, f"{nombre_matriz} no puede estar vacía."
     num_filas = len(matriz)
     if num_filas == 0: return None, None, f"{nombre_matriz} no puede tener cero filas."
@@ -11,7 +14,8 @@ def validar_matriz(matriz: InputMatrix, nombre_matriz: str = "La matriz", expect
         return num_filas, None, f"{nombre_matriz} debe tener {expected_rows} filas, pero tiene {num_filas}."
 
     num_columnas_primera_fila = 0
-    if matriz[0] is not None:
+    if isinstance(matriz, FractionMatrix): num_columnas_primera_fila = matriz.cols # Registradas al convertir: no se arma la primera fila de una entrada dispersa
+    elif matriz[0] is not None:
         try: num_columnas_primera_fila = len(matriz[0])
         except TypeError: return None, None, f"La primera fila de {nombre_matriz.lower()} debe ser una lista de elementos."
     
@@ -22,7 +26,12 @@ def validar_matriz(matriz: InputMatrix, nombre_matriz: str = "La matriz", expect
     if num_columnas_primera_fila == 0 and num_filas > 0 and isinstance(matriz[0], list):
          return num_filas, 0, f"Las filas de {nombre_matriz.lower()} no pueden estar vacías (cero columnas)." # num_columnas_primera_fila is 0 here
     
-    for i, fila in enumerate(matriz):
+    if isinstance(matriz, FractionMatrix):
+        # La forma ya se registró al convertir la entrada: sólo se revisa la primera fila distinta
+        filas_a_revisar = [] if matriz.ragged is None else [(matriz.ragged, matriz[matriz.ragged])]
+    else:
+        filas_a_revisar = enumerate(matriz)
+    for i, fila in filas_a_revisar:
         if not isinstance(fila, list): return num_filas, None, f"Cada elemento de {nombre_matriz.lower()} debe ser una fila (lista). La fila {i+1} no es una lista."
         if not fila and num_columnas_primera_fila > 0: return num_filas, num_columnas_primera_fila, f"La fila {i+1} de {nombre_matriz.lower()} no puede ser una lista vacía si otras filas tienen elementos."
         if len(fila) != num_columnas_primera_fila: return num_filas, num_columnas_primera_fila, f"Todas las filas de {nombre_matriz.lower()} deben tener el mismo número de columnas. La fila {i+1} tiene {len(fila)} columnas, se esperaban {num_columnas_primera_fila}."
@@ -35,10 +44,26 @@ def validar_dimensiones_para_suma_resta(matrix_a: InputMatrix, matrix_b: InputMa
     if error_b: return error_b
     if filas_a != filas_b: return f"Las matrices A y B deben tener el mismo número de filas para la suma/resta. A tiene {filas_a} filas y B tiene {filas_b} filas."
     if cols_a != cols_b: return f"Las matrices A y B deben tener el mismo número de columnas para la suma/resta. A tiene {cols_a} columnas y B tiene {cols_b} columnas."
-    if filas_a is not None and filas_a > 4: return f"La operación está limitada a matrices de hasta 4 filas. La matriz A tiene {filas_a} filas."
-    if cols_a is not None and cols_a > 4: return f"La operación está limitada a matrices de hasta 4 columnas. La matriz A tiene {cols_a} columnas."
     return None 
 
+def validar_costo_operacion(operacion: str, matrices: List[Matrix], filas: int, columnas: int, columnas_extra: int = 0, con_pasos: bool = True, densidad: float = 1.0) -> Optional[str]:
+    """
+    Valida el tamaño de una operación contra la política de costo configurada (ver backend/utils/size_policy.py).
+    Debe llamarse después de convertir las matrices a Fraction, ya que el costo depende del tamaño en bits de la entrada.
+
+    Args:
+        operacion: Nombre de la operación (e.g. "add", "determinant", "inverse").
+        matrices: Matrices de entrada ya convertidas a Fraction.
+        filas, columnas: Dimensiones de la matriz principal.
+        columnas_extra: Columnas del segundo operando o de la parte aumentada ([A|b]).
+        con_pasos: Si se generarán los pasos detallados.
+        densidad: Fracción de elementos no nulos si la operación usa la representación dispersa.
+
+    Returns:
+        Optional[str]: Mensaje de error si la operación excede el presupuesto, None en caso contrario.
+    """
+    return SIZE_POLICY.check(operacion, filas, columnas, matrix_bit_size(matrices), steps_enabled=con_pasos, extra_cols=columnas_extra, density=densidad)
+
 def validar_dimensiones_para_multiplicacion(matrix_a: Matrix, matrix_b: Matrix) -> Tuple[bool, str]:
     """
     Valida que las dimensiones de las matrices sean compatibles para la multiplicación.
@@ -51,18 +76,22 @@ def validar_dimensiones_para_multiplicacion(matrix_a: Matrix, matrix_b: Matrix)
     Returns:
         Tuple[bool, str]: (True, "") si las dimensiones son compatibles, (False, "mensaje de error") en caso contrario.
     """
-    if not matrix_a or not matrix_a[0]:
+    cols_a = _num_columnas(matrix_a) if matrix_a else 0
+    if not cols_a:
         return False, "La primera matriz (A) no puede estar vacía."
-    if not matrix_b or not matrix_b[0]:
+    if not matrix_b or not _num_columnas(matrix_b):
         return False, "La segunda matriz (B) no puede estar vacía."
 
-    cols_a = len(matrix_a[0])
     rows_b = len(matrix_b)
 
     if cols_a != rows_b:
         return False, f"Para la multiplicación, el número de columnas de la matriz A ({cols_a}) debe ser igual al número de filas de la matriz B ({rows_b})."
     return True, ""
 
+def _num_columnas(matriz: Matrix) -> int:
+    # Una FractionMatrix registró sus columnas al convertirse (sin armar la primera fila de una entrada dispersa)
+    return matriz.cols if isinstance(matriz, FractionMatrix) else len(matriz[0])
+
 def validar_vector(vector: List[Union[int, float, str]], nombre_vector: str = "El vector", expected_len: Optional[int] = None) -> Tuple[Optional[int], Optional[str]]:
     """
     Valida un vector (lista de elementos).
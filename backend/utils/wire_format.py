@@ -0,0 +1,181 @@
+import functools
+import json
+import struct
+from typing import Any, Callable, Dict, List
+from urllib.parse import parse_qsl
+
+from pydantic import BaseModel
+
+from backend.models import ApiResponse, LUFactorizationResult
+
+# Formatos compactos de las matrices en la API (además de la lista de filas de siempre):
+#
+# Entrada JSON plana   {"rows": r, "cols": c, "data": [...]} en lugar de la lista de filas (ver
+#                      matrix_parser.py); cualquier campo de matriz de cualquier operación lo acepta.
+#
+# Entrada binaria      Cuerpo "Content-Type: application/octet-stream" en /operations/<op>. Las demás
+#                      opciones (steps, method, ...) van en la query string. Formato (little-endian):
+#                        b"MTX1" y, por cada campo, un bloque:
+#                          u8 largo del nombre, nombre (UTF-8, e.g. "matrix_a"), u8 tipo, u32 filas, u32 columnas,
+#                          filas*columnas elementos fila por fila según el tipo:
+#                            1 = int64, 2 = float64 (como los números JSON), 3 = racional: pares int64 num, den.
+#                        El campo vector_b se envía como una matriz de n x 1.
+#                      BinaryMatrixMiddleware lo convierte al formato plano antes de que FastAPI lo valide.
+#
+# Salida plana         Con "output_format": "flat" (o ?output_format=flat en binario), las matrices del
+#                      resultado (result, matrix_l/u/p, rref_matrix) se devuelven como {"rows", "cols", "data"}.
+
+BINARY_MAGIC = b"MTX1"
+BINARY_CONTENT_TYPE = "application/octet-stream"
+DTYPE_INT64, DTYPE_FLOAT64, DTYPE_RATIONAL = 1, 2, 3
+
+_DTYPE_FORMATS = {DTYPE_INT64: ("q", 1), DTYPE_FLOAT64: ("d", 1), DTYPE_RATIONAL: ("q", 2)} # tipo -> (formato struct, valores por elemento)
+_BLOCK_HEADER = struct.Struct("<BII")
+_VECTOR_FIELDS = {"vector_b"}
+_MATRIX_RESULT_KEYS = ("matrix_l", "matrix_u", "matrix_p", "matrix_d", "rref_matrix")
+
+
+class BinaryFormatError(ValueError):
+    """Cuerpo binario mal formado."""
+
+
+def encode_binary(fields: Dict[str, List[List[Any]]], dtype: int = DTYPE_INT64) -> bytes:
+    """
+    Codifica matrices en el formato binario (para clientes y pruebas). Con DTYPE_RATIONAL cada elemento
+    es un par (num, den) o un valor con numerator/denominator (e.g. Fraction).
+    """
+    code, per_element = _DTYPE_FORMATS[dtype]
+    chunks = [BINARY_MAGIC]
+    for name, matrix in fields.items():
+        rows, cols = len(matrix), len(matrix[0]) if matrix else 0
+        values: List[Any] = []
+        for row in matrix:
+            if dtype == DTYPE_RATIONAL:
+                for value in row:
+                    values.extend(value if isinstance(value, tuple) else (value.numerator, value.denominator))
+            else:
+                values.extend(row)
+        encoded_name = name.encode()
+        chunks.append(bytes([len(encoded_name)]) + encoded_name + _BLOCK_HEADER.pack(dtype, rows, cols))
+        chunks.append(struct.pack(f"<{rows * cols * per_element}{code}", *values))
+    return b"".join(chunks)
+
+
+def decode_binary(body: bytes) -> Dict[str, Any]:
+    """Decodifica un cuerpo binario a los campos JSON equivalentes (matrices en formato plano)."""
+    if not body.startswith(BINARY_MAGIC):
+        raise BinaryFormatError("El cuerpo binario debe comenzar con b'MTX1'.")
+    fields: Dict[str, Any] = {}
+    offset = len(BINARY_MAGIC)
+    while offset < len(body):
+        name_length = body[offset]
+        name = body[offset + 1:offset + 1 + name_length].decode("utf-8", errors="replace")
+        offset += 1 + name_length
+        if offset + _BLOCK_HEADER.size > len(body):
+            raise BinaryFormatError(f"Bloque '{name}' incompleto.")
+        dtype, rows, cols = _BLOCK_HEADER.unpack_from(body, offset)
+        offset += _BLOCK_HEADER.size
+        if dtype not in _DTYPE_FORMATS:
+            raise BinaryFormatError(f"Tipo de elemento desconocido en '{name}': {dtype} (1 = int64, 2 = float64, 3 = racional).")
+        code, per_element = _DTYPE_FORMATS[dtype]
+        count = rows * cols * per_element
+        if offset + count * 8 > len(body):
+            raise BinaryFormatError(f"El bloque '{name}' declara {rows}x{cols} elementos pero el cuerpo es más corto.")
+        values = struct.unpack_from(f"<{count}{code}", body, offset)
+        offset += count * 8
+        if dtype == DTYPE_RATIONAL:
+            values = [num if den == 1 else f"{num}/{den}" for num, den in zip(values[::2], values[1::2])]
+        fields[name] = list(values) if name in _VECTOR_FIELDS else {"rows": rows, "cols": cols, "data": list(values)}
+    return fields
+
+
+class BinaryMatrixMiddleware:
+    """
+    Middleware ASGI: en /operations/*, un cuerpo application/octet-stream se decodifica y se entrega
+    al endpoint como JSON (matrices en formato plano, opciones tomadas de la query string).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/operations/") or not _is_binary(scope):
+            await self.app(scope, receive, send)
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        try:
+            payload = decode_binary(body)
+        except BinaryFormatError as e:
+            await _send_json(send, 400, {"detail": str(e)})
+            return
+        payload.update(_query_options(scope))
+        encoded = json.dumps(payload).encode()
+        headers = [(key, value) for key, value in scope["headers"] if key not in (b"content-type", b"content-length")]
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(encoded)).encode())]
+
+        sent = False
+        async def receive_json():
+            nonlocal sent
+            if sent:
+                return await receive() # e.g. http.disconnect
+            sent = True
+            return {"type": "http.request", "body": encoded, "more_body": False}
+
+        await self.app({**scope, "headers": headers}, receive_json, send)
+
+
+def _is_binary(scope) -> bool:
+    for key, value in scope["headers"]:
+        if key == b"content-type":
+            return value.split(b";")[0].strip().decode("latin-1").lower() == BINARY_CONTENT_TYPE
+    return False
+
+
+def _query_options(scope) -> Dict[str, str]:
+    return dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+
+
+async def _send_json(send, status: int, content: Dict[str, Any]) -> None:
+    body = json.dumps(content, ensure_ascii=False).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _flatten(matrix: Any) -> Any:
+    if isinstance(matrix, list) and matrix and all(isinstance(row, list) for row in matrix):
+        return {"rows": len(matrix), "cols": len(matrix[0]), "data": [value for row in matrix for value in row]}
+    return matrix
+
+
+def flatten_response(response: ApiResponse) -> ApiResponse:
+    """Copia de la respuesta con las matrices del resultado en formato plano."""
+    result = response.result
+    if isinstance(result, LUFactorizationResult):
+        result = result.model_dump()
+    if isinstance(result, dict):
+        result = {key: _flatten(value) if key in _MATRIX_RESULT_KEYS else value for key, value in result.items()}
+    else:
+        result = _flatten(result)
+    flattened = response.model_copy(update={"result": result})
+    flattened._json = None # El JSON guardado corresponde al resultado anidado
+    return flattened
+
+
+def compact_output(function: Callable[[BaseModel], ApiResponse]):
+    """
+    Decorador para los endpoints (debajo de @router.post): aplica output_format a la respuesta.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        data = args[0] if args else next(iter(kwargs.values()))
+        response = function(data)
+        if getattr(data, "output_format", "nested") == "flat" and isinstance(response, ApiResponse):
+            return flatten_response(response)
+        return response
+    return wrapper